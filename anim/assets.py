@@ -0,0 +1,168 @@
+import importlib
+import marshal
+import os
+import tempfile
+
+
+ANIM_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(ANIM_DIR)
+ASSET_CACHE = os.path.join(ANIM_DIR, "__pycache__", "assets.marshal")
+ASSET_CACHE_VERSION = 1
+
+# asset name: (module, attribute) holding the art
+ASSET_SOURCES = {
+    "fire_frames": ("anim.hand.fire", "FireFrames"),
+    "enemy_ascii": ("anim.enemies.enemy_art", "ENEMY_ASCII"),
+    "death_ascii": ("anim.enemies.enemy_art", "DEATH_ASCII"),
+    "boss_ascii": ("anim.enemies.enemy_art", "BOSS_ASCII"),
+    "boss_death_ascii": ("anim.enemies.enemy_art", "BOSS_DEATH_ASCII"),
+    "projectile_patterns": ("anim.projectiles.projectile_art", "PROJECTILE_PATTERNS"),
+    "enemy_projectile_patterns": (
+        "anim.projectiles.projectile_art",
+        "ENEMY_PROJECTILE_PATTERNS",
+    ),
+}
+
+ASSET_SETTINGS = {"use_cache": True}
+ASSET_STATS = {"cache_loads": 0, "module_loads": 0}
+
+_loaded_assets = {}
+
+
+def _source_stamp():
+    """Get the (module, mtime, size) of every art module, to tell when the cache is stale"""
+    stamp = []
+    for module in sorted({module for module, _ in ASSET_SOURCES.values()}):
+        path = os.path.join(ROOT_DIR, *module.split(".")) + ".py"
+        try:
+            info = os.stat(path)
+        except OSError:
+            return None
+        stamp.append((module, info.st_mtime_ns, info.st_size))
+    return tuple(stamp)
+
+
+def _read_cache(stamp):
+    """Load every asset from the marshal cache, or return None if it is missing or stale"""
+    try:
+        with open(ASSET_CACHE, "rb") as cache_file:
+            cached = marshal.load(cache_file)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if (
+        not isinstance(cached, dict)
+        or cached.get("version") != ASSET_CACHE_VERSION
+        or cached.get("stamp") != stamp
+    ):
+        return None
+    return cached["assets"]
+
+
+def _write_cache(stamp, assets):
+    """
+    Store every asset in the marshal cache, ignoring read-only installs.
+
+    Each writer uses its own temporary file, so processes starting together never
+    interleave their writes; whichever finishes last replaces the cache whole.
+    """
+    temporary = None
+    try:
+        directory = os.path.dirname(ASSET_CACHE)
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=directory, prefix="assets.", suffix=".tmp", delete=False
+        ) as cache_file:
+            temporary = cache_file.name
+            marshal.dump(
+                {"version": ASSET_CACHE_VERSION, "stamp": stamp, "assets": assets},
+                cache_file,
+            )
+        os.replace(temporary, ASSET_CACHE)
+    except (OSError, ValueError):
+        if temporary is not None:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+
+
+def _import_assets(names):
+    """Import the art modules that hold the given assets"""
+    ASSET_STATS["module_loads"] += 1
+    assets = {}
+    for name in names:
+        module, attribute = ASSET_SOURCES[name]
+        assets[name] = getattr(importlib.import_module(module), attribute)
+    return assets
+
+
+def load_asset(name):
+    """
+    Get a piece of art, loading it the first time it is asked for.
+
+    With the cache enabled, every asset is read at once from a single marshal file,
+    which is much cheaper than importing the art modules. The file is rebuilt from the
+    art modules whenever one of them changes.
+
+    :param name: str, a key of ASSET_SOURCES.
+    :precondition: name must be a key of ASSET_SOURCES.
+    :postcondition: The asset stays loaded for the rest of the session.
+    :return: list, the art, exactly as defined in its module.
+    >>> len(load_asset("fire_frames")) > 0
+    True
+    """
+    asset = _loaded_assets.get(name)
+    if asset is not None:
+        return asset
+
+    if ASSET_SETTINGS["use_cache"]:
+        stamp = _source_stamp()
+        assets = _read_cache(stamp) if stamp is not None else None
+        if assets is not None:
+            ASSET_STATS["cache_loads"] += 1
+        else:
+            assets = _import_assets(ASSET_SOURCES)
+            if stamp is not None:
+                _write_cache(stamp, assets)
+        _loaded_assets.update(assets)
+    else:
+        _loaded_assets.update(_import_assets([name]))
+
+    return _loaded_assets[name]
+
+
+def unload_assets():
+    """
+    Forget every loaded asset so the next use loads it again.
+
+    :postcondition: No asset is loaded.
+    :return: None
+    """
+    _loaded_assets.clear()
+
+
+class LazyAsset:
+    """
+    A read-only sequence that stands in for a piece of art until it is first used.
+
+    >>> frames = LazyAsset("fire_frames")
+    >>> len(frames) == len(load_asset("fire_frames")), frames[0] is load_asset("fire_frames")[0]
+    (True, True)
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __len__(self):
+        return len(load_asset(self.name))
+
+    def __getitem__(self, index):
+        return load_asset(self.name)[index]
+
+    def __iter__(self):
+        return iter(load_asset(self.name))
+
+    def __repr__(self):
+        return f"LazyAsset({self.name!r})"
@@ -0,0 +1,176 @@
+import copy
+import math
+import random
+
+import entities
+from benchmarks.startup import time_to_menu
+from map.dungeon_generator import (
+    ARCHETYPES,
+    ensure_connectivity,
+    find_farthest_point,
+    generate_dungeon,
+    generate_dungeon_level,
+)
+from map.free_cells import FreeCellIndex, sample_free_cells
+from map.static_map import get_color_layer
+from player import create_player
+from renderer import NullBackend, render_world
+from utils.math_utils import has_line_of_sight
+from world_instance import WorldInstance
+
+
+SEED = 1510
+SCREEN_SIZES = ((24, 80), (50, 160), (100, 300))
+ENTITY_COUNTS = (10, 100, 1000)
+PLAYER_COUNTS = (1, 16, 64)
+SHARED_WORLD_ENEMIES = 200
+LINE_OF_SIGHT_PAIRS = 200
+DUNGEON_SIZE = (80, 50)
+FRAME_DELTA = 1 / 30
+
+# name: factory returning (run, setup, repeat); factories run after seeding random
+CASES = {}
+
+
+def fixed_level(width, height, archetype_key="RUINS"):
+    """Generate the same connected level, spawn included, on every run"""
+    state = random.getstate()
+    random.seed(SEED)
+    level_map, spawn_x, spawn_y, _ = generate_dungeon_level(
+        width, height, 1, archetype_key
+    )
+    random.setstate(state)
+    return level_map, spawn_x + 0.5, spawn_y + 0.5
+
+
+def _render_world_case(height, width):
+    def factory():
+        level_map, spawn_x, spawn_y = fixed_level(60, 40)
+        colors = get_color_layer(level_map)
+        entities.clear_entities()
+        entities.spawn_enemies(level_map, 10)
+        player_state = create_player(x=spawn_x, y=spawn_y)
+        screen = NullBackend(height, width)
+        frame = {"angle": 0.0}
+
+        def run():
+            # Turn a little every frame so the view keeps changing
+            frame["angle"] = (frame["angle"] + 0.05) % (2 * math.pi)
+            render_world(
+                screen, spawn_x, spawn_y, frame["angle"], level_map, colors, player_state
+            )
+
+        return run, None, 60
+
+    return factory
+
+
+def _update_entities_case(count):
+    def factory():
+        level_map, spawn_x, spawn_y = fixed_level(120, 80, "CAVE")
+        cells = sample_free_cells(FreeCellIndex(level_map), count)
+
+        def setup():
+            random.seed(SEED)
+            entities.clear_entities()
+            for x, y in cells:
+                entities.create_enemy(x + 0.5, y + 0.5)
+                entities.create_projectile(x + 0.5, y + 0.5, random.uniform(0, 2 * math.pi))
+            return create_player(x=spawn_x, y=spawn_y)
+
+        def run(player_state):
+            entities.update_entities(
+                FRAME_DELTA, level_map, spawn_x, spawn_y, player_state
+            )
+
+        return run, setup, 20 if count >= 1000 else 50
+
+    return factory
+
+
+def _world_instance_step_case(player_count):
+    def factory():
+        level_map, spawn_x, spawn_y = fixed_level(120, 80, "CAVE")
+        cells = sample_free_cells(FreeCellIndex(level_map), player_count, min_spacing=0)
+
+        def setup():
+            random.seed(SEED)
+            world = WorldInstance(
+                level_map, None, (spawn_x, spawn_y), enemy_count=SHARED_WORLD_ENEMIES
+            )
+            for x, y in cells:
+                player_state = create_player()
+                world.add_player(player_state)
+                player_state["x"], player_state["y"] = x + 0.5, y + 0.5
+            return world
+
+        def run(world):
+            outside = world.enter()
+            try:
+                world.step(FRAME_DELTA)
+            finally:
+                world.leave(outside)
+
+        return run, setup, 30
+
+    return factory
+
+
+def _line_of_sight_factory():
+    level_map, _, _ = fixed_level(*DUNGEON_SIZE)
+    cells = list(FreeCellIndex(level_map))
+    pairs = [
+        (random.choice(cells), random.choice(cells)) for _ in range(LINE_OF_SIGHT_PAIRS)
+    ]
+
+    def run():
+        for (x1, y1), (x2, y2) in pairs:
+            has_line_of_sight(x1 + 0.5, y1 + 0.5, x2 + 0.5, y2 + 0.5, level_map)
+
+    return run, None, 50
+
+
+def _generate_level_case(archetype_key):
+    def factory():
+        def setup():
+            random.seed(SEED)
+
+        def run(_):
+            generate_dungeon_level(*DUNGEON_SIZE, 1, archetype_key)
+
+        return run, setup, 20
+
+    return factory
+
+
+def _ensure_connectivity_factory():
+    raw_map, _ = generate_dungeon(*DUNGEON_SIZE, "CAVE")
+
+    def setup():
+        random.seed(SEED)
+        return copy.deepcopy(raw_map)
+
+    return ensure_connectivity, setup, 30
+
+
+def _find_farthest_point_factory():
+    level_map, spawn_x, spawn_y = fixed_level(*DUNGEON_SIZE)
+
+    def run():
+        find_farthest_point(level_map, int(spawn_x), int(spawn_y))
+
+    return run, None, 50
+
+
+for _height, _width in SCREEN_SIZES:
+    CASES[f"render_world.{_width}x{_height}"] = _render_world_case(_height, _width)
+for _count in ENTITY_COUNTS:
+    CASES[f"update_entities.{_count}"] = _update_entities_case(_count)
+for _players in PLAYER_COUNTS:
+    CASES[f"world_instance.step.{_players}_players"] = _world_instance_step_case(_players)
+CASES[f"has_line_of_sight.{LINE_OF_SIGHT_PAIRS}_pairs"] = _line_of_sight_factory
+for _archetype in ARCHETYPES:
+    CASES[f"generate_dungeon_level.{_archetype}"] = _generate_level_case(_archetype)
+CASES["ensure_connectivity"] = _ensure_connectivity_factory
+CASES["find_farthest_point"] = _find_farthest_point_factory
+CASES["startup.first_menu_frame"] = lambda: (time_to_menu, None, 10)
@@ -0,0 +1,139 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(samples, q):
+    """
+    Get a percentile of sorted samples, interpolating between neighbours.
+
+    :param samples: list[float], the samples in ascending order.
+    :param q: float, the percentile, from 0 to 100.
+    :precondition: samples must be sorted and not empty.
+    :postcondition: Does not modify samples.
+    :return: float, the percentile.
+    >>> percentile([1.0, 2.0, 3.0, 4.0], 50)
+    2.5
+    >>> percentile([5.0], 99)
+    5.0
+    """
+    position = (len(samples) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(samples) - 1)
+    return samples[lower] + (samples[upper] - samples[lower]) * (position - lower)
+
+
+def summarize(samples_ns):
+    """
+    Turn raw timings into milliseconds statistics.
+
+    :param samples_ns: list[int], one timing per call, in nanoseconds.
+    :precondition: samples_ns must not be empty.
+    :postcondition: Does not modify samples_ns.
+    :return: dict, the sample count and the mean, min, max and PERCENTILES in ms.
+    >>> summarize([1_000_000, 3_000_000])["p50_ms"]
+    2.0
+    """
+    samples = sorted(sample / 1e6 for sample in samples_ns)
+    summary = {
+        "samples": len(samples),
+        "mean_ms": sum(samples) / len(samples),
+        "min_ms": samples[0],
+        "max_ms": samples[-1],
+    }
+    for q in PERCENTILES:
+        summary[f"p{q}_ms"] = percentile(samples, q)
+    return summary
+
+
+def measure(run, setup=None, warmup=3, repeat=30):
+    """
+    Time a function over several calls, after a few untimed warmup calls.
+
+    :param run: callable, the code to time; it receives whatever setup returned.
+    :param setup: callable | None, untimed code run before every call to build its input.
+    :param warmup: int, how many calls to make before timing, to fill caches.
+    :param repeat: int, how many calls to time.
+    :precondition: repeat must be a positive integer.
+    :postcondition: Calls setup and run warmup + repeat times.
+    :return: dict, as returned by summarize.
+    >>> measure(lambda value: value * 2, setup=lambda: 21, warmup=1, repeat=5)["samples"]
+    5
+    """
+    clock = time.perf_counter_ns
+    samples = []
+    for i in range(warmup + repeat):
+        argument = setup() if setup is not None else None
+        start = clock()
+        if setup is not None:
+            run(argument)
+        else:
+            run()
+        elapsed = clock() - start
+        if i >= warmup:
+            samples.append(elapsed)
+    return summarize(samples)
+
+
+def environment():
+    """Describe the machine and commit the results were measured on"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def write_results(path, results):
+    """
+    Save benchmark results as JSON, with the environment they were measured in.
+
+    :param path: str, the file to write.
+    :param results: dict[str, dict], the summary of every benchmark by name.
+    :precondition: results must be JSON-serializable.
+    :postcondition: Overwrites path.
+    :return: None
+    """
+    with open(path, "w", encoding="utf-8") as results_file:
+        json.dump({"environment": environment(), "results": results}, results_file, indent=2)
+        results_file.write("\n")
+
+
+def compare(old, new, stat="p50_ms"):
+    """
+    Compare two result sets benchmark by benchmark.
+
+    :param old: dict, results loaded from an earlier run's JSON file.
+    :param new: dict, results of this run, in the same format.
+    :param stat: str, the statistic to compare.
+    :precondition: Both must have a "results" dict.
+    :postcondition: Does not modify old or new.
+    :return: list[tuple[str, float, float, float]], (name, old, new, new / old) for every
+             benchmark present in both.
+    >>> compare({"results": {"a": {"p50_ms": 2.0}}}, {"results": {"a": {"p50_ms": 1.0}}})
+    [('a', 2.0, 1.0, 0.5)]
+    """
+    rows = []
+    for name, summary in new["results"].items():
+        before = old["results"].get(name)
+        if before is None or not before.get(stat):
+            continue
+        rows.append((name, before[stat], summary[stat], summary[stat] / before[stat]))
+    return rows
@@ -0,0 +1,74 @@
+"""
+Run the benchmark suite.
+
+    python3 -m benchmarks.run                      # everything, printed as a table
+    python3 -m benchmarks.run render_world -o new.json
+    python3 -m benchmarks.run --compare old.json   # ratios against an earlier run
+"""
+
+import argparse
+import json
+import random
+
+from benchmarks.cases import CASES, SEED
+from benchmarks.harness import compare, measure, write_results
+
+
+def run_cases(names, warmup=3, repeat=None):
+    """
+    Run benchmark cases with a fixed seed and collect their summaries.
+
+    :param names: iterable of str, keys of CASES.
+    :param warmup: int, untimed calls before each case is measured.
+    :param repeat: int | None, timed calls per case, or None for each case's default.
+    :precondition: Every name must be a key of CASES.
+    :postcondition: Leaves the global entity lists in whatever state the last case left them.
+    :return: dict[str, dict], the summary of every case by name.
+    """
+    results = {}
+    for name in names:
+        random.seed(SEED)
+        run, setup, default_repeat = CASES[name]()
+        results[name] = measure(
+            run, setup, warmup=warmup, repeat=repeat or default_repeat
+        )
+    return results
+
+
+def main(argv=None):
+    """Parse the command line, run the selected cases and report them"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("filters", nargs="*", help="only run cases containing these")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare against an earlier JSON file")
+    parser.add_argument("--repeat", type=int, help="timed calls per case")
+    parser.add_argument("--warmup", type=int, default=3, help="untimed calls per case")
+    args = parser.parse_args(argv)
+
+    names = [
+        name
+        for name in CASES
+        if not args.filters or any(text in name for text in args.filters)
+    ]
+    results = run_cases(names, warmup=args.warmup, repeat=args.repeat)
+
+    print(f"{'case':<36}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for name, summary in results.items():
+        print(
+            f"{name:<36}{summary['p50_ms']:>10.3f}{summary['p90_ms']:>10.3f}"
+            f"{summary['p99_ms']:>10.3f}{summary['mean_ms']:>10.3f}"
+        )
+
+    if args.output:
+        write_results(args.output, results)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as old_file:
+            old = json.load(old_file)
+        print(f"\n{'case':<36}{'old p50':>10}{'new p50':>10}{'ratio':>8}")
+        for name, before, after, ratio in compare(old, {"results": results}):
+            print(f"{name:<36}{before:>10.3f}{after:>10.3f}{ratio:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
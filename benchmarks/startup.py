@@ -0,0 +1,69 @@
+import os
+import pty
+import select
+import signal
+import statistics
+import sys
+import time
+
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MENU_MARKER = b"Version: -0.1"
+TIMEOUT = 10.0
+
+
+def time_to_menu(python=sys.executable, timeout=TIMEOUT):
+    """
+    Start game.py under a pseudo-terminal and time how long the first menu frame takes.
+
+    :param python: str, the interpreter to run the game with.
+    :param timeout: float, how many seconds to wait for the menu before giving up.
+    :precondition: The platform must support pty.fork.
+    :postcondition: The game process is killed and reaped before returning.
+    :return: float, the seconds from fork to the menu title reaching the terminal.
+    """
+    start = time.perf_counter()
+    pid, fd = pty.fork()
+    if pid == 0:
+        os.chdir(GAME_DIR)
+        os.environ["TERM"] = "xterm-256color"
+        os.environ["LINES"], os.environ["COLUMNS"] = "50", "160"
+        os.execv(python, [python, "game.py"])
+
+    output = b""
+    try:
+        while MENU_MARKER not in output:
+            remaining = timeout - (time.perf_counter() - start)
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                raise TimeoutError("the menu did not appear")
+            try:
+                output += os.read(fd, 65536)
+            except OSError:
+                raise RuntimeError("the game exited before showing the menu")
+        return time.perf_counter() - start
+    finally:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+        os.close(fd)
+
+
+def run(runs=20, warmup=2):
+    """Time several game starts and summarize them, after warming the bytecode cache"""
+    for _ in range(warmup):
+        time_to_menu()
+    samples = sorted(time_to_menu() * 1000 for _ in range(runs))
+    return {
+        "runs": runs,
+        "min_ms": samples[0],
+        "median_ms": statistics.median(samples),
+        "max_ms": samples[-1],
+    }
+
+
+if __name__ == "__main__":
+    result = run()
+    print(
+        f"startup to first menu frame over {result['runs']} runs: "
+        f"min {result['min_ms']:.1f} ms, median {result['median_ms']:.1f} ms, "
+        f"max {result['max_ms']:.1f} ms"
+    )
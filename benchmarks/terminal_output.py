@@ -0,0 +1,221 @@
+"""
+Compare the output of the curses screen with the ANSI backend on a real terminal.
+
+    python3 -m benchmarks.terminal_output
+    python3 -m benchmarks.terminal_output --frames 300 -o output.json
+
+Each case draws the same frames of the 3D view in a child process attached to a
+pseudo-terminal, and reports how many bytes reached the terminal per frame and how much
+CPU each frame took, both in total and for the output alone: curses.doupdate for curses,
+encoding and writing the frame for the ANSI backend.
+"""
+
+import argparse
+import curses
+import json
+import math
+import os
+import pty
+import random
+import select
+import signal
+import time
+import traceback
+
+import entities
+from benchmarks.cases import SEED, fixed_level
+from benchmarks.harness import summarize, write_results
+from map.static_map import get_color_layer
+from player import create_player
+from renderer import CursesBackend, render_world
+from renderer.ansi_backend import AnsiBackend
+from renderer.color_utils import init_colors
+
+
+BACKENDS = ("curses", "ansi")
+SCENARIOS = ("turning", "still")  # The camera turns a little every frame, or stays put
+SCREEN_SIZES = ((24, 80), (50, 160))
+DEFAULT_FRAMES = 120
+WARMUP_FRAMES = 10
+TIMEOUT = 30.0
+DRAIN_WAIT = 0.05  # How long the terminal must stay quiet to count as drained
+
+
+def _draw_frames(backend, height, width, scenario, frames, control_fd, result_fd):
+    """Draw the frames of one case on the terminal, reporting the timings to the parent"""
+    random.seed(SEED)
+    level_map, spawn_x, spawn_y = fixed_level(60, 40)
+    colors = get_color_layer(level_map)
+    entities.clear_entities()
+    entities.spawn_enemies(level_map, 10)
+    player_state = create_player(x=spawn_x, y=spawn_y)
+
+    if backend == "curses":
+        window = curses.initscr()
+        curses.noecho()
+        curses.curs_set(0)
+        init_colors()
+        screen = CursesBackend(window)
+        emit = curses.doupdate
+    else:
+        screen = AnsiBackend(height, width)
+
+        def emit():
+            screen.present(1)
+
+    clock = time.process_time_ns
+    frame_samples = []
+    emit_samples = []
+    angle = 0.0
+    try:
+        for frame in range(WARMUP_FRAMES + frames):
+            if frame == WARMUP_FRAMES:
+                # Wait for the parent to take in the warmup output before timing
+                os.write(result_fd, b"ready\n")
+                os.read(control_fd, 1)
+            if scenario == "turning":
+                angle = (angle + 0.05) % (2 * math.pi)
+            start = clock()
+            screen.erase()
+            render_world(screen, spawn_x, spawn_y, angle, level_map, colors, player_state)
+            screen.noutrefresh()
+            drawn = clock()
+            emit()
+            end = clock()
+            if frame >= WARMUP_FRAMES:
+                frame_samples.append(end - start)
+                emit_samples.append(end - drawn)
+
+        result = {"frame": summarize(frame_samples), "emit": summarize(emit_samples)}
+        os.write(result_fd, json.dumps(result).encode() + b"\n")
+        os.read(control_fd, 1)
+    finally:
+        if backend == "curses":
+            curses.endwin()
+
+
+def _drain(fd):
+    """Read from the terminal until it stays quiet, returning how many bytes came"""
+    count = 0
+    while select.select([fd], [], [], DRAIN_WAIT)[0]:
+        try:
+            data = os.read(fd, 65536)
+        except OSError:
+            break
+        if not data:
+            break
+        count += len(data)
+    return count
+
+
+def measure_output(backend, height, width, scenario, frames=DEFAULT_FRAMES):
+    """
+    Draw frames with a backend on a pseudo-terminal and measure its output.
+
+    :param backend: str, one of BACKENDS.
+    :param height: int, the terminal height in rows.
+    :param width: int, the terminal width in columns.
+    :param scenario: str, one of SCENARIOS.
+    :param frames: int, how many frames to time, after WARMUP_FRAMES untimed ones.
+    :precondition: The platform must support pty.fork, and terminfo must know xterm-256color.
+    :postcondition: The child process is killed and reaped before returning.
+    :postcondition: Raises RuntimeError if the child fails and TimeoutError if it hangs.
+    :return: dict, the "bytes_per_frame" and the CPU time summaries of the whole
+             "frame" and of the "emit" step, as returned by summarize.
+    """
+    control_read, control_write = os.pipe()
+    result_read, result_write = os.pipe()
+    pid, fd = pty.fork()
+    if pid == 0:
+        os.close(control_write)
+        os.close(result_read)
+        os.environ["TERM"] = "xterm-256color"
+        os.environ["LINES"], os.environ["COLUMNS"] = str(height), str(width)
+        status = 0
+        try:
+            _draw_frames(backend, height, width, scenario, frames, control_read, result_write)
+        except BaseException:
+            os.write(result_write, traceback.format_exc().encode())
+            status = 1
+        finally:
+            os._exit(status)
+
+    os.close(control_read)
+    os.close(result_write)
+    counted = None
+    messages = b""
+    result = None
+    try:
+        while result is None:
+            readable = select.select([fd, result_read], [], [], TIMEOUT)[0]
+            if not readable:
+                raise TimeoutError(f"the {backend} case stopped drawing")
+            if fd in readable:
+                try:
+                    data = os.read(fd, 65536)
+                except OSError:
+                    data = b""
+                if counted is not None:
+                    counted += len(data)
+            if result_read in readable:
+                chunk = os.read(result_read, 65536)
+                if not chunk:
+                    raise RuntimeError(f"the {backend} case failed:\n{messages.decode()}")
+                messages += chunk
+                while b"\n" in messages and result is None:
+                    line, messages = messages.split(b"\n", 1)
+                    if line == b"ready":
+                        _drain(fd)
+                        counted = 0
+                    elif line.startswith(b"{"):
+                        counted += _drain(fd)
+                        result = json.loads(line)
+                    else:
+                        messages = line + b"\n" + messages
+                        break
+                    os.write(control_write, b"g")
+    finally:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        os.waitpid(pid, 0)
+        for descriptor in (fd, control_write, result_read):
+            os.close(descriptor)
+
+    result["bytes_per_frame"] = counted / frames
+    return result
+
+
+def run(frames=DEFAULT_FRAMES):
+    """Measure every backend on every screen size and scenario"""
+    results = {}
+    for height, width in SCREEN_SIZES:
+        for scenario in SCENARIOS:
+            for backend in BACKENDS:
+                name = f"terminal_output.{backend}.{scenario}.{width}x{height}"
+                results[name] = measure_output(backend, height, width, scenario, frames)
+    return results
+
+
+def main(argv=None):
+    """Parse the command line, measure both backends and report them"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES, help="timed frames per case")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = run(args.frames)
+    print(f"{'case':<42}{'bytes/frame':>12}{'frame ms':>10}{'emit ms':>10}")
+    for name, result in results.items():
+        print(
+            f"{name:<42}{result['bytes_per_frame']:>12.0f}"
+            f"{result['frame']['p50_ms']:>10.3f}{result['emit']['p50_ms']:>10.3f}"
+        )
+
+    if args.output:
+        write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
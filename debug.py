@@ -1,6 +1,20 @@
+import cProfile
 import curses
+import os
+import pstats
 import ui
 from renderer.console_renderer import DEBUG_CONSOLE
+from renderer.world_renderer import set_ray_engine
+from utils import game_clock
+
+DEFAULT_PROFILE_FRAMES = 60
+MAX_PROFILE_FRAMES = 1800
+PROFILE_TOP_FUNCTIONS = 10
+DEFAULT_BENCH_RENDERS = 30
+MAX_BENCH_RENDERS = 300  # Renders run inside a frame, so a long bench freezes the game
+
+# The cProfile run started by 'profile', stopped by tick_profile after its last frame
+PROFILE_SESSION = {"profiler": None, "frames": 0, "frames_left": 0}
 
 COMMANDS = {
     "next": {
@@ -14,6 +28,32 @@ COMMANDS = {
     "clear": {"help": "Clear the console history", "callback": lambda: clear_history()},
     "level": {"help": "Set player level (usage: level <number>)", "callback": None},
     "boss": {"help": "Teleport directly to boss arena", "callback": None},
+    "endless": {
+        "help": "Enter an endless, chunk-streamed dungeon",
+        "callback": None,
+    },
+    "raycast": {
+        "help": "Show or set the ray engine (usage: raycast [march|sphere])",
+        "callback": lambda name=None: set_ray_engine(name),
+    },
+    "save": {"help": "Save the current level (usage: save <name>)", "callback": None},
+    "load": {"help": "Load a saved level (usage: load <name>)", "callback": None},
+    "profile": {
+        "help": "Profile the next N frames and list the slowest functions (usage: profile [frames])",
+        "callback": lambda frames=None: start_profile(frames),
+    },
+    "stats": {
+        "help": "Show entity counts, queue and cache occupancy, and cache hit rates",
+        "callback": lambda: show_stats(),
+    },
+    "time": {
+        "help": "Show or change the game clock (usage: time [pause|resume|scale <factor>|step <seconds>])",
+        "callback": lambda action=None, value=None: set_game_clock(action, value),
+    },
+    "bench": {
+        "help": f"Time renders of the current view offscreen (usage: bench render [count], count up to {MAX_BENCH_RENDERS})",
+        "callback": None,
+    },
 }
 
 
@@ -333,3 +373,246 @@ def teleport_to_boss(player_state=None):
         return f"Error: Missing required module - {e}"
     except Exception as e:
         return f"An error occurred during teleport: {e}"
+
+
+def set_game_clock(action=None, value=None):
+    """
+    Show the game clock mode, or pause, resume, scale or step it.
+
+    'scale' runs the game faster or slower than real time. 'step' advances the game a
+    fixed amount every frame, however long the frame really took.
+
+    :param action: str | None, one of "pause", "resume", "scale" and "step", or None.
+    :param value: str | None, the scale factor or step in seconds for "scale" and "step".
+    :precondition: GAME_CLOCK must exist.
+    :postcondition: Changes the clock mode from the next frame on when action is valid.
+    :return: str, the clock mode after the command or a usage message.
+    >>> set_game_clock("scale", "0.5")
+    'Clock: scaled x0.5'
+    >>> set_game_clock("scale", "fast")
+    'Usage: time [pause|resume|scale <factor>|step <seconds>]'
+    >>> set_game_clock("resume")
+    'Clock: real'
+    """
+    modes = {
+        "pause": game_clock.CLOCK_PAUSED,
+        "resume": game_clock.CLOCK_REAL,
+        "scale": game_clock.CLOCK_SCALED,
+        "step": game_clock.CLOCK_SIMULATED,
+    }
+    if action is not None:
+        try:
+            if action not in modes:
+                raise ValueError(action)
+            game_clock.set_clock_mode(
+                modes[action], float(value) if value is not None else None
+            )
+        except ValueError:
+            return "Usage: time [pause|resume|scale <factor>|step <seconds>]"
+
+    mode = game_clock.GAME_CLOCK["mode"]
+    if mode == game_clock.CLOCK_SCALED:
+        return f"Clock: scaled x{game_clock.GAME_CLOCK['scale']:g}"
+    if mode == game_clock.CLOCK_SIMULATED:
+        return f"Clock: stepping {game_clock.GAME_CLOCK['step'] * 1000:g} ms per frame"
+    return f"Clock: {mode}"
+
+
+def start_profile(frames=None):
+    """
+    Start profiling the game with cProfile for a number of frames.
+
+    The console is closed so the game keeps running while it is profiled, and reopened
+    with the results by tick_profile once the last frame is done.
+
+    :param frames: str | None, the number of frames to profile, or None for the default.
+    :precondition: The game loop must call tick_profile once per frame.
+    :postcondition: If frames is valid, PROFILE_SESSION holds an enabled profiler.
+    :return: str, a message describing what happened.
+    >>> start_profile("lots")
+    'Usage: profile [frames], with frames from 1 to 1800'
+    """
+    try:
+        frames = DEFAULT_PROFILE_FRAMES if frames is None else int(frames)
+    except ValueError:
+        frames = 0
+    if not 1 <= frames <= MAX_PROFILE_FRAMES:
+        return f"Usage: profile [frames], with frames from 1 to {MAX_PROFILE_FRAMES}"
+    if PROFILE_SESSION["profiler"] is not None:
+        return "A profile is already running"
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    PROFILE_SESSION.update(profiler=profiler, frames=frames, frames_left=frames)
+    if DEBUG_CONSOLE["active"]:
+        toggle_console()
+    return f"Profiling the next {frames} frames..."
+
+
+def tick_profile():
+    """
+    Count down the frames of a running profile, reporting it after the last one.
+
+    :precondition: Must be called once at the end of every frame.
+    :postcondition: After the last profiled frame, stops the profiler, opens the console
+                    and puts the report in DEBUG_CONSOLE['last_result'].
+    :return: None
+    """
+    profiler = PROFILE_SESSION["profiler"]
+    if profiler is None:
+        return
+    PROFILE_SESSION["frames_left"] -= 1
+    if PROFILE_SESSION["frames_left"] > 0:
+        return
+
+    profiler.disable()
+    PROFILE_SESSION["profiler"] = None
+    DEBUG_CONSOLE["last_result"] = format_profile(
+        pstats.Stats(profiler), PROFILE_SESSION["frames"]
+    )
+    if not DEBUG_CONSOLE["active"]:
+        toggle_console()
+
+
+def stop_profile():
+    """
+    Abandon a running profile without reporting it, as when the game ends mid-profile.
+
+    :postcondition: The profiler is disabled and PROFILE_SESSION is reset.
+    :return: None
+    >>> stop_profile()
+    >>> PROFILE_SESSION["profiler"] is None
+    True
+    """
+    profiler = PROFILE_SESSION["profiler"]
+    if profiler is not None:
+        profiler.disable()
+    PROFILE_SESSION.update(profiler=None, frames=0, frames_left=0)
+
+
+def format_profile(stats, frames, top=PROFILE_TOP_FUNCTIONS):
+    """
+    Describe the functions that took the most time in a profile, one per line.
+
+    :param stats: pstats.Stats, the collected profile.
+    :param frames: int, the number of frames profiled, to report per-frame times.
+    :param top: int, the number of functions to list.
+    :precondition: frames must be positive.
+    :postcondition: Does not modify stats.
+    :return: str, a header line and one line per function sorted by time spent in it.
+    """
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+    lines = [
+        f"Profiled {frames} frames, {stats.total_tt * 1000 / frames:.2f} ms/frame "
+        f"in {stats.total_calls} calls",
+        f"{'self ms/f':>10}{'total ms/f':>11}{'calls':>9}  function",
+    ]
+    for (filename, line, name), (_, calls, own_time, total_time, _) in rows[:top]:
+        location = f"{os.path.basename(filename)}:{line}" if line else "~"
+        lines.append(
+            f"{own_time * 1000 / frames:>10.3f}{total_time * 1000 / frames:>11.3f}"
+            f"{calls:>9}  {location}({name})"
+        )
+    return "\n".join(lines)
+
+
+def show_stats(world_map=None):
+    """
+    Summarize the live entities, the bounded queues and caches, and cache hit rates.
+
+    :param world_map: list[list[int]] | ChunkedMap | None, the current map, for chunk stats.
+    :precondition: The entity, UI and cache modules must be importable.
+    :postcondition: Does not change any state.
+    :return: str, one line per group of statistics.
+    """
+    import entities
+    from anim.assets import ASSET_STATS
+    from map.map_cache import CACHE_STATS, MAX_CACHED_MAPS, tracked_map_count
+    from renderer.fullmap_renderer import FULL_MAP_CACHE
+    from renderer.minimap_renderer import MINIMAP_CACHE
+
+    alive = sum(1 for enemy in entities.enemies if enemy["state"] != "dead")
+    lines = [
+        f"Entities: {len(entities.entities)} total, {len(entities.enemies)} enemies "
+        f"({alive} alive), {len(entities.projectiles)} projectiles, "
+        f"{len(entities.enemy_projectiles)} enemy projectiles",
+        "Queues: "
+        + ", ".join(
+            f"{name} {len(queue)}/{queue.capacity}" for name, queue in ui.ui_queues.items()
+        )
+        + f", tracked maps {tracked_map_count()}/{MAX_CACHED_MAPS}",
+    ]
+
+    lookups = CACHE_STATS["hits"] + CACHE_STATS["misses"]
+    hit_rate = CACHE_STATS["hits"] / lookups * 100 if lookups else 0.0
+    lines.append(
+        f"Map layers: {hit_rate:.1f}% hits of {lookups}, "
+        f"{CACHE_STATS['invalidations']} invalidations"
+    )
+
+    world = getattr(world_map, "world", None)
+    if world is not None:
+        chunk_stats = world["stats"]
+        chunk_lookups = chunk_stats["hits"] + chunk_stats["generated"]
+        chunk_rate = chunk_stats["hits"] / chunk_lookups * 100 if chunk_lookups else 0.0
+        lines.append(
+            f"Chunks: {len(world['chunks'])}/{world['max_chunks']} loaded, "
+            f"{chunk_rate:.1f}% hits, {chunk_stats['generated']} generated, "
+            f"{chunk_stats['evicted']} evicted"
+        )
+
+    lines.append(
+        f"Rebuilds: minimap {MINIMAP_CACHE['rebuilds']}, "
+        f"full map {FULL_MAP_CACHE['rebuilds']}; assets: "
+        f"{ASSET_STATS['cache_loads']} from cache, {ASSET_STATS['module_loads']} from modules"
+    )
+    return "\n".join(lines)
+
+
+def bench(target=None, count=None, screen=None, view=None):
+    """
+    Time renders of the current view on an offscreen backend.
+
+    :param target: str | None, what to benchmark; only "render" is supported.
+    :param count: str | None, the number of timed renders, from 1 to MAX_BENCH_RENDERS,
+                  or None for the default.
+    :param screen: tuple[int, int] | None, the (height, width) to render at.
+    :param view: tuple | None, the render_world arguments after the screen:
+                 (player_x, player_y, player_angle, world_map, world_colors, player_state).
+    :precondition: view must describe a map that render_world can draw.
+    :postcondition: Does not draw on the real screen or record frame profiler samples.
+    :return: str, the timing summary or a usage message.
+    >>> bench("physics")
+    'Usage: bench render [count]'
+    >>> bench("render", str(MAX_BENCH_RENDERS + 1), (24, 80), ())
+    'Usage: bench render [count]'
+    """
+    if target != "render":
+        return "Usage: bench render [count]"
+    if screen is None or view is None:
+        return "Nothing to render yet"
+    try:
+        count = DEFAULT_BENCH_RENDERS if count is None else int(count)
+    except ValueError:
+        count = 0
+    if not 1 <= count <= MAX_BENCH_RENDERS:
+        return "Usage: bench render [count]"
+
+    from benchmarks.harness import measure
+    from renderer import NullBackend, render_world
+    from utils.frame_profiler import FRAME_PROFILER
+
+    height, width = screen
+    offscreen = NullBackend(height, width)
+    profiling = FRAME_PROFILER["enabled"]
+    FRAME_PROFILER["enabled"] = False
+    try:
+        summary = measure(lambda: render_world(offscreen, *view), warmup=2, repeat=count)
+    finally:
+        FRAME_PROFILER["enabled"] = profiling
+
+    return (
+        f"render {width}x{height} x{count}: p50 {summary['p50_ms']:.2f} ms, "
+        f"p99 {summary['p99_ms']:.2f} ms, max {summary['max_ms']:.2f} ms\n"
+        f"about {1000 / summary['mean_ms']:.0f} renders per second"
+    )
@@ -1,24 +1,17 @@
 import math
 import random
-import time
 import ui
+from utils import game_clock
 from utils.collision import is_collision
 from utils.math_utils import distance_between, has_line_of_sight
-from anim.enemies.enemy_art import (
-    ENEMY_ASCII,
-    DEATH_ASCII,
-    BOSS_ASCII,
-    BOSS_DEATH_ASCII,
-)
-from anim.projectiles.projectile_art import (
-    PROJECTILE_PATTERNS,
-    ENEMY_PROJECTILE_PATTERNS,
-)
+from map.free_cells import get_free_cell_index, sample_free_cells
+from anim.assets import load_asset
 
 entities = []
 projectiles = []
 enemies = []
 enemy_projectiles = []
+interactables = {}  # (grid_x, grid_y) -> entities the player can interact with there
 
 ENTITY_PROJECTILE = "projectile"
 ENTITY_ENEMY = "enemy"
@@ -31,9 +24,11 @@ PROJECTILE_COLOR = 3
 ENEMY_XP_VALUE = 50
 ENEMY_PROJECTILE_COLOR = 1
 ENEMY_PROJECTILE_DAMAGE = 15
+ENEMY_MIN_SPACING = 3.0
+ENEMY_SAFE_DISTANCE = 6.0
 
 
-def create_projectile(x, y, angle, speed=5.0, lifetime=1.5, damage=25):
+def create_projectile(x, y, angle, speed=5.0, lifetime=1.5, damage=25, owner=None):
     """
     Create a new projectile entity at the given position and angle.
     :param x: x-coordinate of the projectile's starting position
@@ -42,6 +37,7 @@ def create_projectile(x, y, angle, speed=5.0, lifetime=1.5, damage=25):
     :param speed: velocity of the projectile (default 5.0)
     :param lifetime: duration in seconds before projectile disappears (default 1.5)
     :param damage: amount of damage the projectile inflicts (default 25)
+    :param owner: the player state of whoever fired it, who gets the XP for kills (default None)
     :precondition: x and y must be valid coordinates in the game world
     :precondition: angle must be in radians between 0 and 2π
     :precondition: speed, lifetime, and damage must be positive numbers
@@ -56,7 +52,7 @@ def create_projectile(x, y, angle, speed=5.0, lifetime=1.5, damage=25):
     True
     """
 
-    pattern = random.choice(PROJECTILE_PATTERNS)
+    pattern = random.choice(load_asset("projectile_patterns"))
 
     projectile = {
         "type": ENTITY_PROJECTILE,
@@ -65,7 +61,7 @@ def create_projectile(x, y, angle, speed=5.0, lifetime=1.5, damage=25):
         "z": 0.5,
         "angle": angle,
         "speed": speed,
-        "creation_time": time.time(),
+        "creation_time": game_clock.now(),
         "lifetime": lifetime,
         "damage": damage,
         "pattern": pattern,
@@ -75,6 +71,7 @@ def create_projectile(x, y, angle, speed=5.0, lifetime=1.5, damage=25):
         "glow": True,
         "pulse_rate": 4.0,
         "remove": False,
+        "owner": owner,
     }
 
     projectiles.append(projectile)
@@ -106,7 +103,7 @@ def create_enemy_projectile(
     >>> proj["damage"] == ENEMY_PROJECTILE_DAMAGE
     True
     """
-    pattern = random.choice(ENEMY_PROJECTILE_PATTERNS)
+    pattern = random.choice(load_asset("enemy_projectile_patterns"))
     projectile = {
         "type": ENTITY_ENEMY_PROJECTILE,
         "x": x,
@@ -114,7 +111,7 @@ def create_enemy_projectile(
         "z": 0.5,
         "angle": angle,
         "speed": speed,
-        "creation_time": time.time(),
+        "creation_time": game_clock.now(),
         "lifetime": lifetime,
         "damage": damage,
         "pattern": pattern,
@@ -149,8 +146,8 @@ def create_enemy(x, y, health=100):
     True
     """
 
-    ascii_art = random.choice(ENEMY_ASCII)
-    death_art = random.choice(DEATH_ASCII)
+    ascii_art = random.choice(load_asset("enemy_ascii"))
+    death_art = random.choice(load_asset("death_ascii"))
 
     enemy = {
         "type": ENTITY_ENEMY,
@@ -165,13 +162,13 @@ def create_enemy(x, y, health=100):
         "width": max(len(line) for line in ascii_art),
         "height": len(ascii_art),
         "color": ENEMY_COLOR,
-        "last_move": time.time(),
+        "last_move": game_clock.now(),
         "move_delay": random.uniform(0.5, 2.0),
         "detection_range": 10.0,
         "attack_range": 3.0,
         "distortion": 0.0,
         "remove": False,
-        "last_state_change": time.time(),
+        "last_state_change": game_clock.now(),
         "attack_cooldown": 1.5,
         "last_attack": 0,
     }
@@ -198,6 +195,7 @@ def create_boss(x, y):
     True
     """
 
+    boss_art = load_asset("boss_ascii")
     boss = {
         "type": ENTITY_ENEMY,
         "subtype": "boss",
@@ -207,24 +205,24 @@ def create_boss(x, y):
         "health": 500,
         "max_health": 500,
         "state": "idle",
-        "ascii": BOSS_ASCII,
-        "death_ascii": BOSS_DEATH_ASCII,
-        "width": len(BOSS_ASCII[0]),
-        "height": len(BOSS_ASCII),
+        "ascii": boss_art,
+        "death_ascii": load_asset("boss_death_ascii"),
+        "width": len(boss_art[0]),
+        "height": len(boss_art),
         "color": 1,
-        "last_move": time.time(),
+        "last_move": game_clock.now(),
         "move_delay": 0.8,
         "detection_range": 40.0,
         "attack_range": 8.0,
         "distortion": 0.0,
         "remove": False,
-        "last_state_change": time.time(),
+        "last_state_change": game_clock.now(),
         "xp_value": 500,
         "attack_cooldown": 2.0,
         "last_attack": 0,
         "attack_patterns": ["projectile", "summon", "charge"],
         "current_pattern": 0,
-        "pattern_timer": time.time(),
+        "pattern_timer": game_clock.now(),
     }
 
     entities.append(boss)
@@ -235,7 +233,9 @@ def create_boss(x, y):
     return boss
 
 
-def update_entities(delta_time, world_map, player_x, player_y, player_state=None):
+def update_entities(
+    delta_time, world_map, player_x, player_y, player_state=None, targets=None
+):
     """
     Update the state of all active entities in the game world.
 
@@ -243,47 +243,64 @@ def update_entities(delta_time, world_map, player_x, player_y, player_state=None
     and enemies (including bosses). It also handles awarding XP to the player
     when enemies are defeated and manages the removal of dead enemies after a delay.
 
+    With targets, several players share the world: every enemy goes after the player
+    nearest to it, enemy projectiles hit whichever player they reach, and kills go to
+    the player whose projectile made them.
+
     :param delta_time: float, the time elapsed since the last frame.
     :param world_map: list[list[int]], the current game map layout.
     :param player_x: float, the player's current x-coordinate.
     :param player_y: float, the player's current y-coordinate.
     :param player_state: dict | None, the player's state dictionary, or None.
+    :param targets: SpatialGrid | None, the states of the players in the world, bucketed
+                    by position; None means only the player at player_x, player_y.
     :precondition: delta_time must be a non-negative float.
     :precondition: world_map must be a valid map structure.
-    :precondition: player_x and player_y must be valid coordinates.
+    :precondition: player_x and player_y must be valid coordinates, unless targets is given.
     :postcondition: All entities (projectiles, enemies) are updated based on delta_time and game logic.
     :postcondition: XP is awarded to the player if enemies are defeated nearby.
     :postcondition: Entities marked for removal are cleaned up.
     :return: list[dict], the updated list of all entities.
     """
-    current_time = time.time()
+    current_time = game_clock.now()
 
     update_projectiles(delta_time, world_map, current_time)
     update_enemy_projectiles(
-        delta_time, world_map, player_x, player_y, player_state, current_time
+        delta_time, world_map, player_x, player_y, player_state, current_time, targets
     )
 
     update_enemies(
-        delta_time, world_map, player_x, player_y, player_state, current_time
+        delta_time, world_map, player_x, player_y, player_state, current_time, targets
     )
 
     for enemy in enemies[:]:
         if enemy["state"] == "dead" and not enemy.get("xp_awarded", False):
 
-            if player_state:
-                distance_to_player = distance_between(
-                    {"x": player_x, "y": player_y}, enemy
-                )
+            killer = enemy.get("killer")
+            if killer is not None:
+                recipient, recipient_position = killer, killer
+            else:
+                recipient, recipient_position = player_state, {"x": player_x, "y": player_y}
+
+            if recipient:
+                distance_to_player = distance_between(recipient_position, enemy)
                 difficulty_bonus = min(1.5, max(1.0, distance_to_player / 5))
                 xp_gained = int(ENEMY_XP_VALUE * difficulty_bonus)
 
-                award_xp(player_state, xp_gained)
-                player_state["kills"] += 1
+                award_xp(recipient, xp_gained)
+                recipient["kills"] += 1
 
                 ui.add_message(f"Enemy defeated! +{xp_gained} XP", 2.0, color=2)
 
                 enemy["xp_awarded"] = True
 
+        if (
+            enemy["state"] == "dead"
+            and enemy.get("subtype") == "boss"
+            and "interaction" not in enemy
+        ):
+            register_interactable(enemy, "boss_corpse")
+
         if enemy["state"] == "dead" and current_time - enemy.get("death_time", 0) > 5.0:
             enemy["remove"] = True
 
@@ -365,12 +382,13 @@ def update_projectiles(delta_time, world_map, current_time):
                     enemy["color"] = ENEMY_DEAD_COLOR
                     enemy["death_time"] = current_time
                     enemy["xp_awarded"] = False
+                    enemy["killer"] = proj.get("owner")
 
                 break
 
 
 def update_enemy_projectiles(
-    delta_time, world_map, player_x, player_y, player_state, current_time
+    delta_time, world_map, player_x, player_y, player_state, current_time, targets=None
 ):
     """
     Update all active enemy projectiles.
@@ -384,6 +402,7 @@ def update_enemy_projectiles(
     :param player_y: float, the player's current y-coordinate.
     :param player_state: dict | None, the player's state dictionary for applying damage.
     :param current_time: float, the current game time.
+    :param targets: SpatialGrid | None, the players that can be hit, instead of the one player.
     :precondition: delta_time must be non-negative.
     :precondition: world_map must be a valid map.
     :precondition: player_x, player_y must be valid coordinates.
@@ -396,7 +415,13 @@ def update_enemy_projectiles(
         if _update_projectile_movement(proj, delta_time, world_map, current_time):
             continue
 
-        if player_state:
+        if targets is not None:
+            hit = targets.nearest(proj["x"], proj["y"], 0.5)
+            if hit is not None and hit["health"] > 0:
+                hit["health"] = max(0, hit["health"] - proj["damage"])
+                proj["remove"] = True
+                ui.add_message(f"HIT! -{proj['damage']} HP", 1.0, color=1)
+        elif player_state:
             dx = proj["x"] - player_x
             dy = proj["y"] - player_y
             dist = math.sqrt(dx * dx + dy * dy)
@@ -412,7 +437,7 @@ def update_enemy_projectiles(
 
 
 def update_enemies(
-    delta_time, world_map, player_x, player_y, player_state, current_time
+    delta_time, world_map, player_x, player_y, player_state, current_time, targets=None
 ):
     """
     Update the state and behavior of all non-boss enemies.
@@ -426,6 +451,8 @@ def update_enemies(
     :param player_y: float, the player's current y-coordinate.
     :param player_state: dict | None, the player's state (used by boss logic indirectly).
     :param current_time: float, the current game time.
+    :param targets: SpatialGrid | None, the players to pick the nearest of, instead of the
+                    one player.
     :precondition: delta_time must be non-negative.
     :precondition: world_map must be a valid map.
     :precondition: player_x, player_y must be valid coordinates.
@@ -438,6 +465,18 @@ def update_enemies(
         if enemy["remove"] or enemy["state"] == "dead":
             continue
 
+        if targets is not None:
+            target = targets.nearest(
+                enemy["x"],
+                enemy["y"],
+                math.inf if enemy.get("subtype") == "boss" else enemy["detection_range"],
+            )
+            if target is None:
+                # Nobody is close enough to notice, so the enemy wanders
+                player_x = player_y = math.inf
+            else:
+                player_x, player_y = target["x"], target["y"]
+
         if enemy.get("subtype") == "boss":
             update_boss_behavior(
                 enemy,
@@ -655,11 +694,50 @@ def cleanup_entities():
 
 def clear_entities():
     """Clear all entities from the game - used when changing levels"""
-    global entities, projectiles, enemies, enemy_projectiles
+    global entities, projectiles, enemies, enemy_projectiles, interactables
     entities = []
     projectiles = []
     enemies = []
     enemy_projectiles = []
+    interactables = {}
+
+
+def register_interactable(entity, kind):
+    """
+    Make a stationary entity available to interaction queries.
+    :param entity: dict, the entity to register
+    :param kind: str, what interacting with the entity means (e.g. "boss_corpse")
+    :precondition: entity must not move after being registered
+    :postcondition: entity["interaction"] is set to kind and the entity is filed under its grid cell
+    :return: None
+    >>> clear_entities()
+    >>> corpse = {"x": 4.2, "y": 7.9}
+    >>> register_interactable(corpse, "boss_corpse")
+    >>> find_interactables(5.0, 7.0, 1.5) == [corpse]
+    True
+    """
+    entity["interaction"] = kind
+    interactables.setdefault((int(entity["x"]), int(entity["y"])), []).append(entity)
+
+
+def find_interactables(x, y, reach):
+    """
+    Find the registered interactable entities within reach of a position.
+    :param x: float, the x-coordinate to search around
+    :param y: float, the y-coordinate to search around
+    :param reach: float, the maximum distance along each axis
+    :precondition: reach must be a positive number
+    :postcondition: only the grid cells overlapping the search square are visited
+    :return: list of entity dictionaries, nearest first
+    """
+    found = []
+    for grid_y in range(int(y - reach), int(y + reach) + 1):
+        for grid_x in range(int(x - reach), int(x + reach) + 1):
+            for entity in interactables.get((grid_x, grid_y), ()):
+                if abs(entity["x"] - x) < reach and abs(entity["y"] - y) < reach:
+                    found.append(entity)
+    found.sort(key=lambda e: (e["x"] - x) ** 2 + (e["y"] - y) ** 2)
+    return found
 
 
 def distort_text(text, distortion_level):
@@ -701,23 +779,33 @@ def get_enemy_display_text(enemy, distance):
     return distorted_art
 
 
-def spawn_enemies(world_map, count=5):
-    """Spawn a number of enemies at valid locations in the world"""
-    map_height = len(world_map)
-    map_width = len(world_map[0]) if map_height > 0 else 0
-
-    if map_height == 0 or map_width == 0:
-        return
-
-    for _ in range(count):
-
-        for attempt in range(100):
-            x = random.uniform(1.5, map_width - 1.5)
-            y = random.uniform(1.5, map_height - 1.5)
-
-            if not is_collision(x, y, world_map):
-                create_enemy(x, y)
-                break
+def spawn_enemies(
+    world_map,
+    count=5,
+    region=None,
+    min_spacing=ENEMY_MIN_SPACING,
+    keep_away=None,
+    keep_away_distance=ENEMY_SAFE_DISTANCE,
+):
+    """
+    Spawn a number of enemies on free cells of the world.
+
+    :param world_map: list[list[int]] | ChunkedMap, the map to spawn on.
+    :param count: int, how many enemies to spawn (default 5).
+    :param region: tuple[float, float, float, float] | None, (x1, y1, x2, y2) bounds to spawn in.
+    :param min_spacing: float, the minimum distance between spawned enemies.
+    :param keep_away: tuple[float, float] | None, a position (e.g. the player's) to keep clear.
+    :param keep_away_distance: float, how far from keep_away enemies must spawn.
+    :precondition: region is required for chunked maps.
+    :postcondition: Adds count enemies, relaxing spacing if the map is too crowded.
+    :postcondition: Adds one enemy per walkable cell at most, so never two on a tile.
+    :return: None
+    """
+    index = get_free_cell_index(world_map, region)
+    for x, y in sample_free_cells(
+        index, count, min_spacing, keep_away, keep_away_distance
+    ):
+        create_enemy(x + 0.5, y + 0.5)
 
 
 def award_xp(player_state, amount):
@@ -1,50 +1,80 @@
+import argparse
 import curses
+import os
+import random
 import time
 from curses import wrapper
 
 import debug
 import entities
 import ui
-from map.static_map import ACTIVE_MAP, ACTIVE_COLORS, interact_raycast, switch_map
+from map.chunked_world import ChunkedMap, full_map_view, prefetch_chunks
+from map.level_file import level_path, save_level
+from map.map_cache import set_tile
+from interaction import query_interaction
+from map.static_map import ACTIVE_MAP, ACTIVE_COLORS, switch_map
 from menu import display_menu
 from player import create_player, update_input, update_player
+from replay import MAX_KEYS_PER_TICK, Recorder, iter_ticks, load_recording, save_recording
+from utils import frame_profiler, game_clock
 
 # Import our modules
-from renderer import init_colors, render_world, render_full_map
+from renderer import (
+    CursesBackend,
+    NullBackend,
+    init_colors,
+    render_world,
+    render_full_map,
+)
 from ui import display_game_over
 
 
 # pip install windows-curses  # Only for Windows users as Unix-based systems have curses pre-installed
 
-
-def run_game(stdscr):
-    """Run the main game loop"""
-    # Setup terminal
-    curses.curs_set(0)  # Hide cursor
-    stdscr.nodelay(True)  # Non-blocking input
-    stdscr.keypad(True)  # Enable special keys
-    stdscr.clear()
-    init_colors()
-
+VIEW_DISTANCE = 20  # Matches the raycaster's maximum wall distance
+# Simulated games start at a fixed epoch time, like live games, so the zero defaults of
+# timestamps such as "last_shot_time" are long in the past
+SIMULATED_START_TIME = 1_000_000_000.0
+
+
+def create_session(stdscr, start_time):
+    """
+    Set up a new game: the player, the starting level, its enemies and the debug commands.
+
+    Everything random happens after the caller seeds the random module, so a recorded
+    game can be set up again exactly.
+
+    :param stdscr: curses.Window, the screen the game draws on.
+    :param start_time: float, the clock time the game starts at.
+    :precondition: The game clock should already be at start_time.
+    :postcondition: Clears the entities and UI left by an earlier game and spawns new ones.
+    :postcondition: Points the debug commands at the new game.
+    :return: dict, the session: the "player" state, the current "map" and "colors",
+             the "last_time" a tick ran at and the "change_level" function.
+    """
+    entities.clear_entities()
+    ui.reset_ui()
+    debug.DEBUG_CONSOLE["active"] = False
     player_state = create_player(x=10.5, y=8.5)
-    running = True
-    last_frame_time = time.time()
-
-    # Get initial map data
-    current_map = ACTIVE_MAP
-    current_colors = ACTIVE_COLORS
+    session = {
+        "player": player_state,
+        "map": ACTIVE_MAP,
+        "colors": ACTIVE_COLORS,
+        "last_time": start_time,
+    }
 
     # Initialize entities
-    entities.spawn_enemies(current_map, 5)  # Spawn 5 enemies
+    entities.spawn_enemies(
+        session["map"], 5, keep_away=(player_state["x"], player_state["y"])
+    )  # Spawn 5 enemies
 
     def _handle_level_change(level_id):
         """Handles the logic for changing levels/maps."""
-        nonlocal current_map, current_colors
         n_map, n_colors, p_spawn, is_new_dungeon = switch_map(
             level_id, player_state["level"]
         )
-        current_map = n_map
-        current_colors = n_colors
+        session["map"] = n_map
+        session["colors"] = n_colors
 
         # Move player to spawn point
         player_state["x"], player_state["y"] = p_spawn
@@ -71,210 +101,485 @@ def run_game(stdscr):
         # Update enemies for the new level
         entities.clear_entities()
         enemy_count = 5 + player_state["stages_descended"] // 2
-        entities.spawn_enemies(current_map, enemy_count)
+        from map.static_map import LEVEL_SPAWNS
+
+        if LEVEL_SPAWNS:
+            # Levels loaded from disk bring their own spawn table
+            for kind, spawn_x, spawn_y in LEVEL_SPAWNS:
+                if kind == "boss":
+                    entities.create_boss(spawn_x, spawn_y)
+                else:
+                    entities.create_enemy(spawn_x, spawn_y)
+        elif isinstance(session["map"], ChunkedMap):
+            # Only populate the area around the player on chunked levels
+            entities.spawn_enemies(
+                session["map"],
+                enemy_count,
+                region=(
+                    player_state["x"] - VIEW_DISTANCE,
+                    player_state["y"] - VIEW_DISTANCE,
+                    player_state["x"] + VIEW_DISTANCE,
+                    player_state["y"] + VIEW_DISTANCE,
+                ),
+                keep_away=(player_state["x"], player_state["y"]),
+            )
+        else:
+            entities.spawn_enemies(
+                session["map"],
+                enemy_count,
+                keep_away=(player_state["x"], player_state["y"]),
+            )
 
         return f"Changed to level {player_state['stages_descended']}"
 
     # Setup debug commands
     def change_level():
         """Debug command to change level"""
-        switch_level = 2 if current_map == ACTIVE_MAP else 1
+        switch_level = 2 if session["map"] == ACTIVE_MAP else 1
         return _handle_level_change(switch_level)
 
+    def save_current_level(name=None):
+        """Debug command to save the current level to disk"""
+        if not name:
+            return "Usage: save <name>"
+        if isinstance(session["map"], ChunkedMap):
+            return "Chunked levels are too large to save."
+        from map.static_map import CURRENT_COLOR_SHIFT
+
+        try:
+            path = level_path(name)
+        except ValueError as error:
+            return str(error)
+        save_level(
+            path,
+            session["map"],
+            session["colors"],
+            (player_state["x"], player_state["y"]),
+            [
+                (
+                    "boss" if enemy.get("subtype") == "boss" else "enemy",
+                    enemy["x"],
+                    enemy["y"],
+                )
+                for enemy in entities.enemies
+                if enemy["state"] != "dead"
+            ],
+            CURRENT_COLOR_SHIFT,
+        )
+        return f"Saved level to {path}"
+
+    def load_saved_level(name=None):
+        """Debug command to load a level saved with 'save'"""
+        if not name:
+            return "Usage: load <name>"
+        try:
+            path = level_path(name)
+        except ValueError as error:
+            return str(error)
+        if not os.path.exists(path):
+            return f"No saved level named '{name}'"
+        return _handle_level_change(path)
+
     debug.COMMANDS["next"]["callback"] = change_level
+    debug.COMMANDS["save"]["callback"] = save_current_level
+    debug.COMMANDS["load"]["callback"] = load_saved_level
+    debug.COMMANDS["endless"]["callback"] = lambda: _handle_level_change("chunked")
+    debug.COMMANDS["stats"]["callback"] = lambda: debug.show_stats(session["map"])
+    debug.COMMANDS["bench"]["callback"] = lambda target=None, count=None: debug.bench(
+        target,
+        count,
+        stdscr.getmaxyx(),
+        (
+            player_state["x"],
+            player_state["y"],
+            player_state["angle"],
+            session["map"],
+            session["colors"],
+            player_state,
+        ),
+    )
+    debug.DEBUG_CONSOLE["initialized"] = False  # Bind the commands to this game's player
     debug.initialize_commands(player_state, change_level)
 
     # Welcome message :)
     ui.add_message("Welcome to the game! Press 'E' to interact with objects.", 5.0)
 
-    while running:
-        current_time = time.time()
-        delta_time = current_time - last_frame_time
-        last_frame_time = current_time
-        delta_time = min(delta_time, 0.1)
+    session["change_level"] = _handle_level_change
+    return session
+
+
+def step_session(session, stdscr, keys, current_time):
+    """
+    Run one tick of a game: apply the keys, update the world and draw the frame.
+
+    The frame is drawn but not shown; the caller decides whether to push it to a
+    terminal. Only the keys, the screen size and current_time affect the tick, besides
+    the random module.
+
+    :param session: dict, as returned by create_session.
+    :param stdscr: curses.Window, the screen to draw on.
+    :param keys: list[int], the keys pressed since the previous tick, in order.
+    :param current_time: float, the time of this tick; the game clock must read it too.
+    :precondition: current_time must not be before the previous tick's.
+    :postcondition: Updates the session, the player and the entities, and draws on stdscr.
+    :return: str | None, "game_over", "win" or "quit" when the game ends this tick,
+             otherwise None.
+    """
+    player_state = session["player"]
+    delta_time = min(current_time - session["last_time"], 0.1)
+    session["last_time"] = current_time
+
+    quit_pressed = False
+    for key in keys:
+        # Update key states and check for quit
+        if update_input(player_state, key, True):
+            quit_pressed = True
+    frame_profiler.mark("input")
+
+    # Check for game over condition *before* processing input/updates for the frame
+    if player_state["health"] <= 0:
+        return "game_over"
+
+    if not player_state["map_mode"] and not debug.DEBUG_CONSOLE["active"]:
+        should_shoot, should_interact = update_player(
+            player_state, delta_time, session["map"]
+        )
+        frame_profiler.mark("update_player")
+
+        # Handle shooting
+        if (
+            should_shoot
+            and current_time - player_state["last_shot_time"]
+            > player_state["shot_cooldown"]
+        ):
+            height, width = stdscr.getmaxyx()
+
+            # Create a closure that captures the current player state and screen dimensions
+            def create_delayed_projectile():
+                muzzle_pos = ui.get_weapon_muzzle_position(height, width)
+                world_x, world_y = ui.convert_screen_to_world(
+                    muzzle_pos,
+                    player_state["x"],
+                    player_state["y"],
+                    player_state["angle"],
+                )
 
-        # Process all queued input events
-        while True:
-            key = stdscr.getch()
-            if key == -1:  # No more keys in buffer
-                break
+                # Create the projectile from the calculated position
+                entities.create_projectile(
+                    world_x, world_y, player_state["angle"], speed=7.0, lifetime=1.5
+                )
 
-            # Update key states and check for quit
-            quit_pressed = update_input(player_state, key, True)
-            if quit_pressed:
-                running = False
+            # Start fire animation with midpoint callback
+            ui.start_animation("fire", midpoint_callback=create_delayed_projectile)
 
-        # Check for game over condition *before* processing input/updates for the frame
-        if player_state["health"] <= 0:
-            display_game_over(stdscr, player_state)
-            running = False
-            return "menu"
+            # Update cooldown and status immediately
+            player_state["last_shot_time"] = current_time
 
-        if not player_state["map_mode"] and not debug.DEBUG_CONSOLE["active"]:
-            should_shoot, should_interact = update_player(
-                player_state, delta_time, current_map
-            )
+        # Update entities with player state for XP
+        entities.update_entities(
+            delta_time,
+            session["map"],
+            player_state["x"],
+            player_state["y"],
+            player_state,
+        )
+        frame_profiler.mark("update_entities")
+
+        # Query what is in front of the player every frame for the HUD hint
+        interaction = query_interaction(
+            player_state["x"],
+            player_state["y"],
+            player_state["angle"],
+            session["map"],
+        )
+        player_state["interaction"] = interaction
+
+        # Handle interaction
+        if should_interact:
+            object_type = interaction.kind
+
+            # Check for boss corpse interaction (Game Win condition)
+            if object_type == "boss_corpse":
+                return "win"
+
+            if object_type == "door":
+                level_to_switch = 2 if session["map"] == ACTIVE_MAP else 1
+                session["change_level"](level_to_switch)
+                ui.add_message(
+                    f"You descended to dungeon depth {player_state['stages_descended']}...",
+                    3.0,
+                    color=5,
+                )
 
-            # Handle shooting
-            if (
-                should_shoot
-                and current_time - player_state["last_shot_time"]
-                > player_state["shot_cooldown"]
-            ):
-                height, width = stdscr.getmaxyx()
-
-                # Create a closure that captures the current player state and screen dimensions
-                def create_delayed_projectile():
-                    muzzle_pos = ui.get_weapon_muzzle_position(height, width)
-                    world_x, world_y = ui.convert_screen_to_world(
-                        muzzle_pos,
-                        player_state["x"],
-                        player_state["y"],
-                        player_state["angle"],
-                    )
-
-                    # Create the projectile from the calculated position
-                    entities.create_projectile(
-                        world_x, world_y, player_state["angle"], speed=7.0, lifetime=1.5
-                    )
-
-                # Start fire animation with midpoint callback
-                ui.start_animation("fire", midpoint_callback=create_delayed_projectile)
-
-                # Update cooldown and status immediately
-                player_state["last_shot_time"] = current_time
-
-            # Update entities with player state for XP
-            entities.update_entities(
-                delta_time,
-                current_map,
-                player_state["x"],
-                player_state["y"],
-                player_state,
-            )
+            elif object_type == "boss_door":
+                # Enter the randomly generated boss arena
+                new_map, new_colors, player_spawn, _ = switch_map("boss_arena")
+                session["map"] = new_map
+                session["colors"] = new_colors
+
+                # Move player to spawn point
+                player_state["x"], player_state["y"] = player_spawn
+
+                # Block the entrance behind the player (no way out)
+                entrance_x, entrance_y = int(player_spawn[0]), int(player_spawn[1])
+                wall_y = entrance_y + 2
+                for offset_x in range(-2, 3):
+                    try:
+                        # Make sure we're not placing walls on the player's position
+                        if 0 <= entrance_y + 2 < len(
+                            session["map"]
+                        ) and 0 <= entrance_x + offset_x < len(session["map"][0]):
+                            set_tile(
+                                session["map"], entrance_x + offset_x, wall_y, 8
+                            )  # Stone wall
+                    except IndexError:
+                        pass  # Skip if out of bounds
+
+                # Spawn boss in the arena - at center of the map
+                entities.clear_entities()
+                boss_x, boss_y = len(session["map"][0]) // 2, len(session["map"]) // 2
+                entities.create_boss(boss_x, boss_y)
+
+                ui.add_message(
+                    "You entered the Boss Arena! The entrance collapses behind you!",
+                    5.0,
+                    color=1,
+                )
 
-            # Handle interaction
-            if should_interact:
-                # Cast ray to see if something can be interacted with
-                object_type, obj_x, obj_y = interact_raycast(
-                    player_state["x"],
-                    player_state["y"],
-                    player_state["angle"],
-                    current_map,
+            elif object_type == "stairs":
+                ui.add_message(
+                    "Well. You found stairs, but they don't lead anywhere yet.", 3.0
                 )
 
-                # Check for boss corpse interaction (Game Win condition)
-                for entity in entities.entities:
-                    if (
-                        entity.get("subtype") == "boss"
-                        and entity.get("state") == "dead"
-                        and abs(entity["x"] - player_state["x"]) < 1.5
-                        and abs(entity["y"] - player_state["y"]) < 1.5
-                    ):
-                        ui.display_win_screen(stdscr, player_state)
-                        return "menu"
-
-                if object_type == "door":
-                    level_to_switch = 2 if current_map == ACTIVE_MAP else 1
-                    _handle_level_change(level_to_switch)
-                    ui.add_message(
-                        f"You descended to dungeon depth {player_state['stages_descended']}...",
-                        3.0,
-                        color=5,
-                    )
-
-                elif object_type == "boss_door":
-                    # Enter the randomly generated boss arena
-                    new_map, new_colors, player_spawn, _ = switch_map("boss_arena")
-                    current_map = new_map
-                    current_colors = new_colors
-
-                    # Move player to spawn point
-                    player_state["x"], player_state["y"] = player_spawn
-
-                    # Block the entrance behind the player (no way out)
-                    entrance_x, entrance_y = int(player_spawn[0]), int(player_spawn[1])
-                    wall_y = entrance_y + 2
-                    for offset_x in range(-2, 3):
-                        try:
-                            # Make sure we're not placing walls on the player's position
-                            if 0 <= entrance_y + 2 < len(
-                                current_map
-                            ) and 0 <= entrance_x + offset_x < len(current_map[0]):
-                                current_map[wall_y][
-                                    entrance_x + offset_x
-                                ] = 8  # Stone wall
-                        except IndexError:
-                            pass  # Skip if out of bounds
-
-                    # Spawn boss in the arena - at center of the map
-                    entities.clear_entities()
-                    boss_x, boss_y = len(current_map[0]) // 2, len(current_map) // 2
-                    entities.create_boss(boss_x, boss_y)
-
-                    ui.add_message(
-                        "You entered the Boss Arena! The entrance collapses behind you!",
-                        5.0,
-                        color=1,
-                    )
-
-                elif object_type == "stairs":
-                    ui.add_message(
-                        "Well. You found stairs, but they don't lead anywhere yet.", 3.0
-                    )
-
-                elif object_type == "wall":
-                    ui.add_message(
-                        "There's nothing to interact with here.", 2.0, color=7
-                    )
-
-                elif object_type is None:
-                    ui.add_message("Nothing to interact with.", 2.0, color=7)
-
-        # First clear the screen - ONCE per frame
-        stdscr.erase()
-
-        # Render the appropriate view based on current mode
-        if player_state["map_mode"]:
-            render_full_map(
-                stdscr,
-                player_state["x"],
-                player_state["y"],
-                player_state["angle"],
-                current_map,
-                current_colors,
-            )
-        else:
-            render_world(
-                stdscr,
-                player_state["x"],
-                player_state["y"],
-                player_state["angle"],
-                current_map,
-                current_colors,
-                player_state,
-            )  # Pass player_state for head-bob
-        ui.draw_ui_layer(stdscr, player_state)  # Pass player_state for UI stats
-
-        # SINGLE screen update per frame - this is key to eliminating flicker
-        if debug.DEBUG_CONSOLE["active"]:
-            stdscr.move(0, len("> ") + debug.DEBUG_CONSOLE["cursor_pos"])
-            curses.curs_set(1)  # Show cursor in debug mode
-        else:
-            curses.curs_set(0)  # Hide cursor in gameplay
+            elif object_type == "wall":
+                ui.add_message(
+                    "There's nothing to interact with here.", 2.0, color=7
+                )
+
+            elif object_type is None:
+                ui.add_message("Nothing to interact with.", 2.0, color=7)
+        frame_profiler.mark("interaction")
+
+    # First clear the screen - ONCE per frame
+    stdscr.erase()
+
+    # Keep the chunks around the player loaded on chunked levels
+    if isinstance(session["map"], ChunkedMap):
+        prefetch_chunks(
+            session["map"].world, player_state["x"], player_state["y"], VIEW_DISTANCE
+        )
 
-        curses.doupdate()
+    # Render the appropriate view based on current mode
+    if player_state["map_mode"]:
+        view_map, view_colors, view_x, view_y = full_map_view(
+            session["map"], session["colors"], player_state["x"], player_state["y"]
+        )
+        render_full_map(
+            stdscr,
+            view_x,
+            view_y,
+            player_state["angle"],
+            view_map,
+            view_colors,
+        )
+        frame_profiler.mark("render_full_map")
+    else:
+        render_world(
+            stdscr,
+            player_state["x"],
+            player_state["y"],
+            player_state["angle"],
+            session["map"],
+            session["colors"],
+            player_state,
+        )  # Pass player_state for head-bob
+    ui.draw_ui_layer(stdscr, player_state)  # Pass player_state for UI stats
+    frame_profiler.mark("ui")
+
+    return "quit" if quit_pressed else None
+
+
+def run_game(stdscr, recorder=None):
+    """
+    Run the main game loop.
+
+    :param stdscr: curses.Window, the terminal screen.
+    :param recorder: replay.Recorder | None, records the game when given.
+    :precondition: curses must be initialized.
+    :postcondition: When recording, seeds the random module with the recording's seed.
+    :return: str, the next state of the menu flow.
+    """
+    # Setup terminal
+    curses.curs_set(0)  # Hide cursor
+    stdscr.nodelay(True)  # Non-blocking input
+    stdscr.keypad(True)  # Enable special keys
+    stdscr.clear()
+    init_colors()
 
-        # Cap frame rate
-        if delta_time < 0.033:  # Target ~30 FPS ish....
-            time.sleep(0.033 - delta_time)
+    last_wall_time = time.time()
+    start_time = last_wall_time
+    if recorder is not None:
+        random.seed(recorder.recording["seed"])
+        start_time = recorder.recording["start_time"]
+    game_clock.start_tick(start_time)
 
-    # Return to menu after game ends (if not already returned via game over)
+    try:
+        session = create_session(stdscr, start_time)
+        outcome = None
+        while outcome is None:
+            frame_profiler.begin_frame()
+
+            # Process the queued input events; any beyond what a tick can record wait
+            keys = []
+            while len(keys) < MAX_KEYS_PER_TICK:
+                key = stdscr.getch()
+                if key == -1:  # No more keys in buffer
+                    break
+                keys.append(key)
+
+            # Read the wall clock once; everything in the tick uses the game clock
+            wall_time = time.time()
+            current_time = game_clock.advance(wall_time)
+            if recorder is not None:
+                current_time = recorder.record_tick(current_time, keys, stdscr.getmaxyx())
+                game_clock.start_tick(current_time)
+            frame_interval = wall_time - last_wall_time
+            last_wall_time = wall_time
+
+            outcome = step_session(session, stdscr, keys, current_time)
+            if outcome == "game_over":
+                display_game_over(stdscr, session["player"])
+                break
+            if outcome == "win":
+                ui.display_win_screen(stdscr, session["player"])
+                break
+
+            # SINGLE screen update per frame - this is key to eliminating flicker
+            if debug.DEBUG_CONSOLE["active"]:
+                stdscr.move(0, len("> ") + debug.DEBUG_CONSOLE["cursor_pos"])
+                curses.curs_set(1)  # Show cursor in debug mode
+            else:
+                curses.curs_set(0)  # Hide cursor in gameplay
+
+            curses.doupdate()
+            frame_profiler.mark("doupdate")
+            frame_profiler.end_frame()
+            debug.tick_profile()
+
+            # Cap frame rate
+            if frame_interval < 0.033:  # Target ~30 FPS ish....
+                time.sleep(0.033 - frame_interval)
+    finally:
+        # A profile cut short by the end of the game must not run on into the next one
+        debug.stop_profile()
+        game_clock.stop_ticks()
+
+    # Return to menu after game ends
     return "menu"
 
 
-def main(stdscr):
-    """Main function that handles the flow between menu and game"""
+def run_headless(seed, screen_size, start_time, ticks, max_ticks=None):
+    """
+    Run a game without a terminal, as fast as possible.
+
+    The same code as the live game runs every tick, drawing on a NullBackend, so random
+    numbers are consumed exactly as they are in a live game on a screen of that size.
+
+    :param seed: int, the random seed the game starts from.
+    :param screen_size: tuple[int, int], the (height, width) of the screen.
+    :param start_time: float, the game time the game starts at.
+    :param ticks: iterable of (tick_time, keys, screen_size) tuples, as yielded by
+                  replay.iter_ticks; screen_size is None when the size did not change.
+    :param max_ticks: int | None, stop after this many ticks, or None to use them all.
+    :precondition: The game modules must be in their freshly imported state, as in a new
+                   process, for the run to match a recorded game.
+    :postcondition: Leaves the world as it was after the last tick run.
+    :postcondition: Puts the game clock back to the wall clock in real mode.
+    :return: dict, the number of "ticks" run, the "outcome" of the last tick, the
+             "seconds" of game time covered, the wall-clock "elapsed" seconds and the
+             final "player" state.
+    """
+    random.seed(seed)
+    screen = NullBackend(*screen_size)
+    game_clock.start_tick(start_time)
+    wall_start = time.perf_counter()
+    ticks_run = 0
+    outcome = None
+    current_time = start_time
+    try:
+        session = create_session(screen, start_time)
+        for current_time, keys, new_size in ticks:
+            if new_size is not None:
+                screen.resize(*new_size)
+            game_clock.start_tick(current_time)
+            outcome = step_session(session, screen, keys, current_time)
+            debug.tick_profile()
+            ticks_run += 1
+            if outcome is not None or ticks_run == max_ticks:
+                break
+    finally:
+        debug.stop_profile()
+        game_clock.stop_ticks()
+
+    return {
+        "ticks": ticks_run,
+        "outcome": outcome,
+        "seconds": current_time - start_time,
+        "elapsed": time.perf_counter() - wall_start,
+        "player": session["player"],
+    }
+
+
+def replay_game(recording, max_ticks=None):
+    """
+    Play a recorded game again, headlessly and as fast as possible.
+
+    :param recording: dict, as returned by replay.load_recording.
+    :param max_ticks: int | None, stop after this many ticks, or None for all of them.
+    :precondition: As for run_headless.
+    :postcondition: As for run_headless.
+    :return: dict, as returned by run_headless.
+    """
+    return run_headless(
+        recording["seed"],
+        recording["screen"],
+        recording["start_time"],
+        iter_ticks(recording),
+        max_ticks,
+    )
+
+
+def simulate_game(ticks, seed=0, screen_size=(24, 80), step=game_clock.DEFAULT_STEP):
+    """
+    Fast-forward a game nobody plays on the simulated clock, e.g. as a soak test.
+
+    :param ticks: int, the number of ticks to run.
+    :param seed: int, the random seed.
+    :param screen_size: tuple[int, int], the (height, width) of the headless screen.
+    :param step: float, the game time every tick covers, in seconds.
+    :precondition: As for run_headless.
+    :postcondition: As for run_headless.
+    :return: dict, as returned by run_headless.
+    """
+    def simulated_ticks():
+        game_clock.set_clock_mode(game_clock.CLOCK_SIMULATED, step)
+        while True:
+            yield game_clock.advance(), [], None
+
+    return run_headless(seed, screen_size, SIMULATED_START_TIME, simulated_ticks(), ticks)
+
+
+def main(stdscr, record_path=None):
+    """
+    Main function that handles the flow between menu and game.
+
+    :param stdscr: curses.Window, the terminal screen from curses.wrapper.
+    :param record_path: str | None, where to save a recording of the first game played.
+    :precondition: curses must be initialized.
+    :postcondition: Saves the recording even if the game is interrupted.
+    :return: None
+    """
+    stdscr = CursesBackend(stdscr)
     state = "menu"
 
     while state != "exit":
@@ -288,15 +593,61 @@ def main(stdscr):
             state = display_menu(stdscr)
 
         elif state == "start_game":
-            # Run the game
-            state = run_game(stdscr)
+            # Run the game, recording it if asked to
+            if record_path is None:
+                state = run_game(stdscr)
+                continue
+            recorder = Recorder(
+                random.getrandbits(32), stdscr.getmaxyx(), time.time()
+            )
+            try:
+                state = run_game(stdscr, recorder)
+            finally:
+                save_recording(record_path, recorder.to_recording())
+                record_path = None
+
+
+def print_headless_result(verb, result, total_ticks):
+    """Print how a headless game went and how fast it ran"""
+    player_state = result["player"]
+    print(
+        f"{verb} {result['ticks']} of {total_ticks} ticks "
+        f"({result['seconds']:.1f} s of play) in {result['elapsed']:.2f} s, "
+        f"{result['ticks'] / max(result['elapsed'], 1e-9):.0f} ticks/s"
+    )
+    print(
+        f"Outcome: {result['outcome'] or 'still playing'}; player at "
+        f"({player_state['x']:.4f}, {player_state['y']:.4f}), "
+        f"HP {player_state['health']}, level {player_state['level']}, "
+        f"kills {player_state['kills']}"
+    )
 
 
 if __name__ == "__main__":
-    try:
-        wrapper(main)  # Initialize and restore terminal properly
-    except KeyboardInterrupt:
-        print("Game terminated by user")
+    parser = argparse.ArgumentParser(description="A raycasting dungeon crawler")
+    parser.add_argument("--record", metavar="PATH", help="record the first game played")
+    parser.add_argument("--replay", metavar="PATH", help="replay a recorded game headlessly")
+    parser.add_argument(
+        "--simulate", metavar="TICKS", type=int, help="fast-forward an idle game headlessly"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed for --simulate")
+    parser.add_argument("--ticks", type=int, help="stop a replay after this many ticks")
+    args = parser.parse_args()
+
+    if args.replay:
+        recording = load_recording(args.replay)
+        print_headless_result(
+            "Replayed", replay_game(recording, args.ticks), recording["ticks"]
+        )
+    elif args.simulate:
+        print_headless_result(
+            "Simulated", simulate_game(args.simulate, args.seed), args.simulate
+        )
+    else:
+        try:
+            wrapper(main, args.record)  # Initialize and restore terminal properly
+        except KeyboardInterrupt:
+            print("Game terminated by user")
 
 ###Citations###
 # Doom: https://github.com/id-Software/DOOM
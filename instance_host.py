@@ -0,0 +1,469 @@
+"""
+Run separate dungeon instances, one per party, on a pool of worker processes.
+
+    python3 -m instance_host --instances 32 --ticks 200 --workers 1 2 4
+
+A WorldInstance lends its state to the entity and UI modules while it runs, so one
+process simulates its instances one after another. The host spreads the instances over
+several processes instead: each worker owns the maps and entities of its instances, and
+the front end only sends it player input and receives a snapshot of every instance
+back, over one pipe per worker. A tick is sent to every worker before any reply is
+read, so the workers simulate at the same time and throughput grows with the cores.
+
+Snapshots carry what a front end needs to draw every player's view with
+render_snapshot: the players' states, the entities' drawing fields, and the level's map
+and colors whenever the instance moves to a new level. The telnet server still
+simulates its worlds in-process; the host is the building block for moving them out.
+
+The game draws from the global random module, so each instance keeps its own random
+state and installs it while it runs. An instance therefore plays out the same from its
+seed whichever instances share its worker.
+"""
+
+import argparse
+import curses
+import multiprocessing
+import os
+import random
+import time
+import traceback
+
+import entities
+import ui
+from map.chunked_world import full_map_view
+from player import create_player
+from renderer import render_full_map, render_world
+from utils import game_clock
+from world_instance import create_world_instance
+
+
+SCREEN_SIZE = (24, 80)  # Where the players' weapons are held, for aiming their shots
+TICK_STEP = 1 / 20
+MAX_DELTA_TIME = 0.1
+START_TIME = 1_000_000_000.0
+PLAYERS_PER_PARTY = 4
+
+# The entity fields the renderers read, the only ones sent to the front end
+RENDER_FIELDS = (
+    "type",
+    "subtype",
+    "x",
+    "y",
+    "state",
+    "color",
+    "ascii",
+    "death_ascii",
+    "pattern",
+    "creation_time",
+    "glow",
+    "pulse_rate",
+)
+
+# Commands sent to the workers, as (command, *arguments)
+CREATE = "create"
+CLOSE = "close"
+JOIN = "join"
+LEAVE = "leave"
+TICK = "tick"
+STOP = "stop"
+
+
+def _create_entry(seed, depth):
+    """Create a worker's record of one instance"""
+    entry = {
+        "depth": depth,
+        "world": None,
+        "players": {},
+        "keys": {},
+        "last_time": None,
+        "random_state": random.Random(seed).getstate(),
+        "new_level": True,
+    }
+    entry["world"] = _run_in_instance(entry, create_world_instance, depth)
+    return entry
+
+
+def _run_in_instance(entry, function, *args):
+    """Call a function with the instance's random state in the global random module"""
+    random.setstate(entry["random_state"])
+    try:
+        return function(*args)
+    finally:
+        entry["random_state"] = random.getstate()
+
+
+def _join_instance(entry, player_id):
+    """Create a player in an instance, at its spawn"""
+    if player_id in entry["players"]:
+        raise ValueError(f"player {player_id!r} is already in the instance")
+    player_state = entry["players"][player_id] = create_player()
+    player_state["stages_descended"] = entry["depth"]
+    entry["world"].add_player(player_state)
+
+
+def _tick_instance(entry, current_time):
+    """Run one tick of an instance in a worker, returning its snapshot"""
+    last_time = entry["last_time"]
+    delta_time = 0.0 if last_time is None else min(current_time - last_time, MAX_DELTA_TIME)
+    entry["last_time"] = current_time
+
+    world = entry["world"]
+    events = {}
+    outside = world.enter()
+    try:
+        for player_id, player_state in entry["players"].items():
+            keys = entry["keys"].pop(player_id, [])
+            outcome = world.apply_input(player_state, keys, delta_time, current_time, SCREEN_SIZE)
+            if outcome is not None:
+                events[player_id] = outcome
+        world.step(delta_time)
+    finally:
+        world.leave(outside)
+
+    for player_id, player_state in list(entry["players"].items()):
+        if events.get(player_id) == "quit":
+            world.remove_player(player_state)
+            del entry["players"][player_id]
+        elif player_state["health"] <= 0:
+            # Start over at the spawn with a fresh character
+            world.remove_player(player_state)
+            entry["players"][player_id] = create_player()
+            world.add_player(entry["players"][player_id])
+            events[player_id] = "died"
+
+    if "door" in events.values():
+        # The party moves down together
+        entry["depth"] += 1
+        world.close()
+        entry["world"] = world = create_world_instance(entry["depth"])
+        entry["new_level"] = True
+        for player_state in entry["players"].values():
+            player_state["stages_descended"] = entry["depth"]
+            world.add_player(player_state)
+
+    level = None
+    if entry["new_level"]:
+        level = {"map": world.map, "colors": [list(row) for row in world.colors]}
+        entry["new_level"] = False
+
+    return {
+        "depth": entry["depth"],
+        "level": level,
+        "players": entry["players"],
+        "entities": [
+            {field: entity[field] for field in RENDER_FIELDS if field in entity}
+            for entity in world.state["entities"]
+        ],
+        "events": events,
+    }
+
+
+def _handle_command(instances, command, arguments):
+    """Apply a command other than a tick to a worker's instances"""
+    if command == CREATE:
+        instance_id, seed, depth = arguments
+        instances[instance_id] = _create_entry(seed, depth)
+    elif command == CLOSE:
+        (instance_id,) = arguments
+        instances.pop(instance_id)["world"].close()
+    elif command == JOIN:
+        instance_id, player_id = arguments
+        entry = instances[instance_id]
+        _run_in_instance(entry, _join_instance, entry, player_id)
+    elif command == LEAVE:
+        instance_id, player_id = arguments
+        entry = instances[instance_id]
+        player_state = entry["players"].pop(player_id, None)
+        if player_state is not None:
+            entry["world"].remove_player(player_state)
+        entry["keys"].pop(player_id, None)
+    else:
+        raise ValueError(f"unknown command {command!r}")
+
+
+def _tick_instances(instances, current_time, inputs, failures):
+    """Tick every instance of a worker, adding a failure for each one that raised"""
+    for instance_id, player_id, keys in inputs:
+        entry = instances.get(instance_id)
+        if entry is not None:
+            entry["keys"].setdefault(player_id, []).extend(keys)
+    game_clock.start_tick(current_time)
+
+    snapshots = {}
+    for instance_id, entry in instances.items():
+        try:
+            snapshots[instance_id] = _run_in_instance(
+                entry, _tick_instance, entry, current_time
+            )
+        except Exception:
+            failures.append(f"instance {instance_id}:\n{traceback.format_exc()}")
+    return snapshots
+
+
+def _worker_main(connection):
+    """
+    Serve commands from the front end until told to stop.
+
+    A command that fails does not stop the worker, so one bad command cannot take the
+    worker's other instances down; its error is sent back with the next tick's reply.
+    """
+    instances = {}
+    failures = []
+    try:
+        while True:
+            command, *arguments = connection.recv()
+            if command == STOP:
+                break
+            if command == TICK:
+                current_time, inputs = arguments
+                snapshots = _tick_instances(instances, current_time, inputs, failures)
+                connection.send((TICK, snapshots, failures))
+                failures = []
+                continue
+            try:
+                _handle_command(instances, command, arguments)
+            except Exception:
+                failures.append(f"{command} {arguments!r}:\n{traceback.format_exc()}")
+    except (EOFError, KeyboardInterrupt):
+        pass  # The front end went away
+    finally:
+        connection.close()
+
+
+class InstanceHost:
+    """
+    A pool of worker processes that each simulate some of the dungeon instances.
+
+    Instances go to the worker with the fewest. Commands reach a worker in the order
+    they are sent, so a player can join an instance right after it is created. Input is
+    held until the next tick and sent along with it, one message per worker.
+    """
+
+    __slots__ = (
+        "processes", "connections", "placement", "members", "loads", "inputs", "next_id"
+    )
+
+    def __init__(self, worker_count=None):
+        worker_count = worker_count or os.cpu_count() or 1
+        self.processes = []
+        self.connections = []
+        self.placement = {}  # instance id -> worker index
+        self.members = {}  # instance id -> the ids of the players in it
+        self.loads = [0] * worker_count
+        self.inputs = [[] for _ in range(worker_count)]  # (instance, player, keys) per worker
+        self.next_id = 0
+        for _ in range(worker_count):
+            front, back = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_worker_main, args=(back,), daemon=True)
+            process.start()
+            back.close()
+            self.processes.append(process)
+            self.connections.append(front)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def create_instance(self, seed, depth=1):
+        """
+        Start a new dungeon instance on the least busy worker.
+
+        :param seed: int, the random seed of the instance's dungeon and everything in it.
+        :param depth: int, the depth of the dungeon.
+        :precondition: depth must not be negative.
+        :postcondition: The instance is ticked with every other from the next tick on.
+        :return: int, the instance's id.
+        """
+        instance_id = self.next_id
+        self.next_id += 1
+        worker = self.loads.index(min(self.loads))
+        self.loads[worker] += 1
+        self.placement[instance_id] = worker
+        self.members[instance_id] = set()
+        self.connections[worker].send((CREATE, instance_id, seed, depth))
+        return instance_id
+
+    def close_instance(self, instance_id):
+        """End an instance, freeing its worker for another"""
+        worker = self.placement.pop(instance_id)
+        del self.members[instance_id]
+        self.loads[worker] -= 1
+        self.connections[worker].send((CLOSE, instance_id))
+
+    def join(self, instance_id, player_id):
+        """
+        Add a new player to an instance, at its spawn.
+
+        :param instance_id: int, an instance of this host.
+        :param player_id: hashable, the player's id, unique within the instance.
+        :precondition: instance_id must not have been closed.
+        :postcondition: Raises ValueError if the player is already in the instance.
+        :return: None
+        """
+        members = self.members[instance_id]
+        if player_id in members:
+            raise ValueError(f"player {player_id!r} is already in instance {instance_id}")
+        members.add(player_id)
+        self.connections[self.placement[instance_id]].send((JOIN, instance_id, player_id))
+
+    def leave(self, instance_id, player_id):
+        """
+        Take a player out of an instance.
+
+        :param instance_id: int, an instance of this host.
+        :param player_id: hashable, the player's id.
+        :precondition: instance_id must not have been closed.
+        :postcondition: Does nothing if the player is not in the instance, such as after
+                        they quit.
+        :return: None
+        """
+        members = self.members[instance_id]
+        if player_id not in members:
+            return
+        members.remove(player_id)
+        self.connections[self.placement[instance_id]].send((LEAVE, instance_id, player_id))
+
+    def send_input(self, instance_id, player_id, keys):
+        """Queue a player's keys for the instance's next tick"""
+        self.inputs[self.placement[instance_id]].append((instance_id, player_id, keys))
+
+    def tick(self, current_time):
+        """
+        Run one tick of every instance, all workers at once.
+
+        :param current_time: float, the game time of the tick.
+        :precondition: current_time must not be before the previous tick's.
+        :postcondition: Raises RuntimeError if a command sent since the previous tick,
+                        or an instance's tick, failed. The workers keep running their
+                        other instances, so later ticks go on as usual.
+        :return: dict[int, dict], the snapshot of every instance by id: its "depth", its
+                 "level" map and colors on its first tick and after every descent
+                 (otherwise None), the state of its "players" by player id, its
+                 "entities" with their RENDER_FIELDS, and the "events" ("quit", "died"
+                 or "door") by player id.
+        """
+        for connection, inputs in zip(self.connections, self.inputs):
+            connection.send((TICK, current_time, inputs))
+        self.inputs = [[] for _ in self.connections]
+        snapshots = {}
+        failures = []
+        for connection in self.connections:
+            _, worker_snapshots, worker_failures = connection.recv()
+            snapshots.update(worker_snapshots)
+            failures.extend(worker_failures)
+        for instance_id, snapshot in snapshots.items():
+            for player_id, event in snapshot["events"].items():
+                if event == "quit":
+                    self.members[instance_id].discard(player_id)
+        if failures:
+            raise RuntimeError("instance commands failed:\n" + "\n".join(failures))
+        return snapshots
+
+    def close(self):
+        """Stop the workers and wait for them to exit"""
+        for connection in self.connections:
+            try:
+                connection.send((STOP,))
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for process in self.processes:
+            process.join()
+
+
+def render_snapshot(screen, level, snapshot, player_id):
+    """
+    Draw a player's view of an instance from the host's snapshots.
+
+    :param screen: a screen backend, such as an AnsiBackend for a telnet session.
+    :param level: dict, the "level" of the latest snapshot of the instance that had one.
+    :param snapshot: dict, the instance's latest snapshot.
+    :param player_id: hashable, a player in the snapshot.
+    :precondition: The snapshot must be from the tick the game clock reads.
+    :postcondition: Leaves the entity module's own entities in place.
+    :return: None
+    """
+    player_state = snapshot["players"][player_id]
+    world_entities = entities.entities
+    entities.entities = snapshot["entities"]  # The minimap draws from the module
+    try:
+        screen.erase()
+        if player_state["map_mode"]:
+            view_map, view_colors, view_x, view_y = full_map_view(
+                level["map"], level["colors"], player_state["x"], player_state["y"]
+            )
+            render_full_map(
+                screen, view_x, view_y, player_state["angle"], view_map, view_colors
+            )
+        else:
+            render_world(
+                screen,
+                player_state["x"],
+                player_state["y"],
+                player_state["angle"],
+                level["map"],
+                level["colors"],
+                player_state,
+                visible_entities=snapshot["entities"],
+            )
+        ui.draw_ui_layer(screen, player_state)
+    finally:
+        entities.entities = world_entities
+
+
+def measure_throughput(worker_count, instance_count, ticks, players=PLAYERS_PER_PARTY):
+    """
+    Time how many instance ticks a pool of workers runs per second.
+
+    Every player walks forward and turns a little each tick, so the enemies have someone
+    to chase and the view keeps changing.
+
+    :param worker_count: int, the number of worker processes.
+    :param instance_count: int, how many instances to run.
+    :param ticks: int, how many ticks to time, after one untimed tick.
+    :param players: int, the number of players in every instance.
+    :precondition: All counts must be positive.
+    :postcondition: The workers are stopped before returning.
+    :return: float, instance ticks per second.
+    """
+    keys = [ord("w"), curses.KEY_LEFT]
+    with InstanceHost(worker_count) as host:
+        for seed in range(instance_count):
+            instance_id = host.create_instance(seed)
+            for player_id in range(players):
+                host.join(instance_id, player_id)
+        host.tick(START_TIME)
+
+        start = time.perf_counter()
+        for tick in range(1, ticks + 1):
+            for instance_id in range(instance_count):
+                for player_id in range(players):
+                    host.send_input(instance_id, player_id, keys)
+            host.tick(START_TIME + tick * TICK_STEP)
+        elapsed = time.perf_counter() - start
+    return instance_count * ticks / elapsed
+
+
+def main(argv=None):
+    """Parse the command line and report the throughput for each pool size"""
+    parser = argparse.ArgumentParser(description="Measure instance throughput per worker count")
+    parser.add_argument("--instances", type=int, default=32, help="dungeon instances to run")
+    parser.add_argument("--ticks", type=int, default=200, help="ticks to time")
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1],
+        help="pool sizes to compare",
+    )
+    args = parser.parse_args(argv)
+
+    baseline = None
+    print(f"{'workers':>8}{'instance ticks/s':>18}{'speedup':>10}")
+    for worker_count in args.workers:
+        throughput = measure_throughput(worker_count, args.instances, args.ticks)
+        baseline = baseline or throughput
+        print(f"{worker_count:>8}{throughput:>18.0f}{throughput / baseline:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
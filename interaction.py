@@ -0,0 +1,51 @@
+"""Unified interaction queries: what the player would interact with by pressing E"""
+
+import collections
+
+import entities
+from map.static_map import trace_interaction
+
+ENTITY_REACH = 1.5
+
+InteractionHit = collections.namedtuple(
+    "InteractionHit", ["kind", "x", "y", "distance", "entity"]
+)
+
+NO_HIT = InteractionHit(None, None, None, None, None)
+
+
+def query_interaction(player_x, player_y, player_angle, world_map):
+    """
+    Find what the player would interact with from their current position.
+
+    Nearby interactable entities take priority over tiles, so a boss corpse can be
+    claimed from any direction. Otherwise the first tile along the view ray is reported.
+
+    :param player_x: float, the player's current x-coordinate.
+    :param player_y: float, the player's current y-coordinate.
+    :param player_angle: float, the player's current viewing angle in radians.
+    :param world_map: list[list[int]], the map grid.
+    :precondition: world_map must be a valid map.
+    :postcondition: Does not modify the map or any entity.
+    :return: InteractionHit, with kind 'boss_corpse', 'door', 'boss_door', 'stairs',
+             'wall' or None (NO_HIT).
+    >>> hit = query_interaction(1.5, 1.5, 0.0, [[1, 1, 1, 1], [1, 0, 0, 6], [1, 1, 1, 1]])
+    >>> hit.kind, hit.x, hit.y, hit.distance
+    ('door', 3, 1, 1.5)
+    """
+    nearby = entities.find_interactables(player_x, player_y, ENTITY_REACH)
+    if nearby:
+        entity = nearby[0]
+        distance = (
+            (entity["x"] - player_x) ** 2 + (entity["y"] - player_y) ** 2
+        ) ** 0.5
+        return InteractionHit(
+            entity["interaction"], int(entity["x"]), int(entity["y"]), distance, entity
+        )
+
+    kind, hit_x, hit_y, distance = trace_interaction(
+        player_x, player_y, player_angle, world_map
+    )
+    if kind is None:
+        return NO_HIT
+    return InteractionHit(kind, hit_x, hit_y, distance, None)
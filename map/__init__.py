@@ -3,3 +3,4 @@ from .static_map import (
     LEGEND, TERRAIN_TYPES, TERRAIN_COLORS, CURRENT_COLOR_SHIFT, TERRAIN_CHARS
 )
 from .dungeon_generator import generate_dungeon, ARCHETYPES
+from .map_cache import set_tile, get_layer, map_version
@@ -0,0 +1,438 @@
+import collections
+import random
+
+from map.distance_field import WALKABLE_TILES
+from map.dungeon_generator import (
+    ARCHETYPES,
+    create_safe_spawn_area,
+    ensure_connectivity,
+    generate_dungeon,
+)
+
+
+CHUNK_SIZE = 20
+
+DEFAULT_MAX_CHUNKS = 36
+
+OUT_OF_BOUNDS_TILE = 1
+
+FULL_MAP_WINDOW = (100, 50)
+
+_EDGE_AXES = {"v": 0, "h": 1}
+
+
+def create_chunked_world(
+    seed=None,
+    archetype_key=None,
+    chunks_wide=64,
+    chunks_high=64,
+    chunk_size=CHUNK_SIZE,
+    max_chunks=DEFAULT_MAX_CHUNKS,
+):
+    """
+    Create the state for a dungeon that is generated one chunk at a time.
+
+    Chunks are generated deterministically from the seed when first touched and are
+    evicted least-recently-used once more than max_chunks are loaded, so memory stays
+    bounded by the view distance rather than the dungeon size.
+
+    :param seed: int | None, the world seed; a random one is drawn when None.
+    :param archetype_key: str | None, a key in ARCHETYPES, or None to pick one at random.
+    :param chunks_wide: int, the number of chunks along the x axis.
+    :param chunks_high: int, the number of chunks along the y axis.
+    :param chunk_size: int, the width and height of a chunk in tiles.
+    :param max_chunks: int, the number of chunks kept in memory at once.
+    :precondition: chunk_size must be at least 12 so rooms and portals fit inside a chunk.
+    :postcondition: No chunk is generated until it is first accessed.
+    :return: dict, the chunked world state.
+    >>> world = create_chunked_world(seed=7, archetype_key="CAVE", chunks_wide=4, chunks_high=3)
+    >>> world["width"], world["height"], len(world["chunks"])
+    (80, 60, 0)
+    """
+    if seed is None:
+        seed = random.getrandbits(32)
+    if not archetype_key or archetype_key not in ARCHETYPES:
+        archetype_key = random.choice(list(ARCHETYPES.keys()))
+
+    return {
+        "seed": seed,
+        "archetype": archetype_key,
+        "chunk_size": chunk_size,
+        "chunks_wide": chunks_wide,
+        "chunks_high": chunks_high,
+        "width": chunks_wide * chunk_size,
+        "height": chunks_high * chunk_size,
+        "max_chunks": max_chunks,
+        "chunks": collections.OrderedDict(),
+        "edits": {},
+        "edit_count": 0,
+        "full_map_view": None,
+        "last_key": None,
+        "last_tiles": None,
+        "stats": {"generated": 0, "evicted": 0, "hits": 0},
+    }
+
+
+def edge_portal(world, axis, edge_x, edge_y):
+    """
+    Get the offset of the opening on a chunk edge, shared by the chunks on both sides.
+
+    :param world: dict, the chunked world state.
+    :param axis: str, "v" for an edge between horizontal neighbours, "h" for vertical ones.
+    :param edge_x: int, the chunk column the edge belongs to (the right/lower chunk).
+    :param edge_y: int, the chunk row the edge belongs to (the right/lower chunk).
+    :precondition: world must come from create_chunked_world.
+    :postcondition: Returns the same offset every time for the same edge.
+    :return: int, the tile offset of the opening along the edge.
+    >>> world = create_chunked_world(seed=7, archetype_key="CAVE")
+    >>> edge_portal(world, "v", 3, 2) == edge_portal(world, "v", 3, 2)
+    True
+    """
+    size = world["chunk_size"]
+    rng = random.Random(hash((world["seed"], _EDGE_AXES[axis], edge_x, edge_y)))
+    return rng.randint(2, size - 3)
+
+
+def _carve_corridor(tiles, x1, y1, x2, y2, tile):
+    step_x = 1 if x2 >= x1 else -1
+    step_y = 1 if y2 >= y1 else -1
+    for x in range(x1, x2 + step_x, step_x):
+        if tiles[y1][x] not in WALKABLE_TILES:
+            tiles[y1][x] = tile
+    for y in range(y1, y2 + step_y, step_y):
+        if tiles[y][x2] not in WALKABLE_TILES:
+            tiles[y][x2] = tile
+
+
+def _nearest_walkable(tiles, x, y):
+    best, best_dist = None, None
+    for cell_y, row in enumerate(tiles):
+        for cell_x, tile in enumerate(row):
+            if tile in WALKABLE_TILES:
+                dist = abs(cell_x - x) + abs(cell_y - y)
+                if best_dist is None or dist < best_dist:
+                    best, best_dist = (cell_x, cell_y), dist
+    return best
+
+
+def generate_chunk(world, chunk_x, chunk_y):
+    """
+    Generate the tiles of one chunk, stitched to its neighbours through edge portals.
+
+    The global random state is saved and restored around generation, so chunk contents
+    only depend on the world seed and chunk coordinates.
+
+    :param world: dict, the chunked world state.
+    :param chunk_x: int, the chunk column.
+    :param chunk_y: int, the chunk row.
+    :precondition: (chunk_x, chunk_y) must be inside the world.
+    :postcondition: Does not add the chunk to the loaded set (see get_chunk).
+    :return: list[list[int]], the chunk_size x chunk_size tile grid.
+    >>> world = create_chunked_world(seed=7, archetype_key="CAVE", chunks_wide=2, chunks_high=1)
+    >>> generate_chunk(world, 0, 0) == generate_chunk(world, 0, 0)
+    True
+    """
+    size = world["chunk_size"]
+    archetype = ARCHETYPES[world["archetype"]]
+    path_tile = archetype["path"]
+
+    saved_state = random.getstate()
+    random.seed(hash((world["seed"], chunk_x, chunk_y)))
+    try:
+        tiles, _ = generate_dungeon(size, size, world["archetype"])
+        ensure_connectivity(tiles)
+    finally:
+        random.setstate(saved_state)
+
+    hub = _nearest_walkable(tiles, size // 2, size // 2)
+    if hub is None:
+        create_safe_spawn_area(tiles, size // 2, size // 2)
+        hub = (size // 2, size // 2)
+    hub_x, hub_y = hub
+
+    if chunk_x > 0:
+        offset = edge_portal(world, "v", chunk_x, chunk_y)
+        _carve_corridor(tiles, 0, offset, hub_x, hub_y, path_tile)
+    if chunk_x < world["chunks_wide"] - 1:
+        offset = edge_portal(world, "v", chunk_x + 1, chunk_y)
+        _carve_corridor(tiles, size - 1, offset, hub_x, hub_y, path_tile)
+    if chunk_y > 0:
+        offset = edge_portal(world, "h", chunk_x, chunk_y)
+        _carve_corridor(tiles, offset, 0, offset, hub_y, path_tile)
+        _carve_corridor(tiles, offset, hub_y, hub_x, hub_y, path_tile)
+    if chunk_y < world["chunks_high"] - 1:
+        offset = edge_portal(world, "h", chunk_x, chunk_y + 1)
+        _carve_corridor(tiles, offset, size - 1, offset, hub_y, path_tile)
+        _carve_corridor(tiles, offset, hub_y, hub_x, hub_y, path_tile)
+
+    return tiles
+
+
+def get_chunk(world, chunk_x, chunk_y):
+    """
+    Get the tiles of a chunk, generating it and evicting old chunks as needed.
+
+    :param world: dict, the chunked world state.
+    :param chunk_x: int, the chunk column.
+    :param chunk_y: int, the chunk row.
+    :precondition: (chunk_x, chunk_y) must be inside the world.
+    :postcondition: The chunk is the most recently used one; at most max_chunks stay loaded.
+    :postcondition: Tiles previously changed through set_world_tile are re-applied.
+    :return: list[list[int]], the chunk's tile grid.
+    """
+    key = (chunk_x, chunk_y)
+    if key == world["last_key"]:
+        world["stats"]["hits"] += 1
+        return world["last_tiles"]
+
+    chunks = world["chunks"]
+    tiles = chunks.get(key)
+    if tiles is None:
+        tiles = generate_chunk(world, chunk_x, chunk_y)
+        for (local_x, local_y), tile in world["edits"].get(key, {}).items():
+            tiles[local_y][local_x] = tile
+        chunks[key] = tiles
+        world["stats"]["generated"] += 1
+        while len(chunks) > world["max_chunks"]:
+            chunks.popitem(last=False)
+            world["stats"]["evicted"] += 1
+    else:
+        chunks.move_to_end(key)
+        world["stats"]["hits"] += 1
+
+    world["last_key"], world["last_tiles"] = key, tiles
+    return tiles
+
+
+def get_world_tile(world, x, y):
+    """
+    Get the tile at world coordinates, treating anything outside the world as wall.
+
+    :param world: dict, the chunked world state.
+    :param x: int, the world x-coordinate.
+    :param y: int, the world y-coordinate.
+    :precondition: world must come from create_chunked_world.
+    :postcondition: Generates the containing chunk if it is not loaded.
+    :return: int, the tile value.
+    >>> world = create_chunked_world(seed=7, archetype_key="CAVE", chunks_wide=2, chunks_high=2)
+    >>> get_world_tile(world, -1, 5)
+    1
+    """
+    if not (0 <= x < world["width"] and 0 <= y < world["height"]):
+        return OUT_OF_BOUNDS_TILE
+    size = world["chunk_size"]
+    return get_chunk(world, x // size, y // size)[y % size][x % size]
+
+
+def set_world_tile(world, x, y, tile):
+    """
+    Change a tile in the world so the change survives the chunk being evicted.
+
+    :param world: dict, the chunked world state.
+    :param x: int, the world x-coordinate.
+    :param y: int, the world y-coordinate.
+    :param tile: int, the new tile value.
+    :precondition: (x, y) must be inside the world.
+    :postcondition: get_world_tile(world, x, y) == tile from now on.
+    :return: None
+    """
+    size = world["chunk_size"]
+    key = (x // size, y // size)
+    local = (x % size, y % size)
+    world["edits"].setdefault(key, {})[local] = tile
+    world["edit_count"] += 1
+    get_chunk(world, *key)[local[1]][local[0]] = tile
+
+
+def prefetch_chunks(world, x, y, radius):
+    """
+    Load every chunk within a radius of a position, nearest chunks last so they stay.
+
+    :param world: dict, the chunked world state.
+    :param x: float, the world x-coordinate of the viewer.
+    :param y: float, the world y-coordinate of the viewer.
+    :param radius: float, the view distance in tiles.
+    :precondition: max_chunks should cover the chunks within radius to avoid thrashing.
+    :postcondition: Chunks around (x, y) are loaded and marked as recently used.
+    :return: int, the number of chunks touched.
+    >>> world = create_chunked_world(seed=7, archetype_key="CAVE", chunks_wide=8, chunks_high=8)
+    >>> prefetch_chunks(world, 5.0, 5.0, 20)
+    9
+    """
+    size = world["chunk_size"]
+    center_x, center_y = int(x) // size, int(y) // size
+    reach = int(radius) // size + 1
+    wanted = [
+        (chunk_x, chunk_y)
+        for chunk_y in range(center_y - reach, center_y + reach + 1)
+        for chunk_x in range(center_x - reach, center_x + reach + 1)
+        if 0 <= chunk_x < world["chunks_wide"] and 0 <= chunk_y < world["chunks_high"]
+    ]
+    wanted.sort(key=lambda c: -(abs(c[0] - center_x) + abs(c[1] - center_y)))
+    for chunk_x, chunk_y in wanted:
+        get_chunk(world, chunk_x, chunk_y)
+    return len(wanted)
+
+
+def find_chunk_spawn(world, chunk_x, chunk_y):
+    """
+    Find a walkable tile in a chunk, as close to its center as possible.
+
+    :param world: dict, the chunked world state.
+    :param chunk_x: int, the chunk column.
+    :param chunk_y: int, the chunk row.
+    :precondition: (chunk_x, chunk_y) must be inside the world.
+    :postcondition: Generates the chunk if it is not loaded.
+    :return: tuple[int, int], the world (x, y) coordinates of the tile.
+    >>> world = create_chunked_world(seed=7, archetype_key="CAVE", chunks_wide=2, chunks_high=2)
+    >>> spawn_x, spawn_y = find_chunk_spawn(world, 1, 1)
+    >>> get_world_tile(world, spawn_x, spawn_y) in WALKABLE_TILES
+    True
+    """
+    size = world["chunk_size"]
+    local_x, local_y = _nearest_walkable(
+        get_chunk(world, chunk_x, chunk_y), size // 2, size // 2
+    )
+    return chunk_x * size + local_x, chunk_y * size + local_y
+
+
+class ChunkedRow:
+    """
+    One row of a ChunkedMap, indexable by world x-coordinate.
+
+    Reads outside the world are walls rather than IndexError, so iteration is bounded
+    by __iter__ instead of the index running off the end.
+    """
+
+    __slots__ = ("world", "y")
+
+    def __init__(self, world, y):
+        self.world = world
+        self.y = y
+
+    def __len__(self):
+        return self.world["width"]
+
+    def __getitem__(self, x):
+        return get_world_tile(self.world, x, self.y)
+
+    def __iter__(self):
+        for x in range(self.world["width"]):
+            yield get_world_tile(self.world, x, self.y)
+
+    def __setitem__(self, x, tile):
+        set_world_tile(self.world, x, self.y, tile)
+
+
+class ChunkedMap:
+    """
+    A chunked world that can be indexed like a map grid, as world_map[y][x].
+
+    Renderers, collision checks and the minimap only read the tiles around the player,
+    so they can take a ChunkedMap wherever they take a list-of-lists map.
+
+    >>> world_map = ChunkedMap(create_chunked_world(seed=7, archetype_key="CAVE", chunks_wide=3, chunks_high=2))
+    >>> len(world_map), len(world_map[0])
+    (40, 60)
+    >>> world_map[0][0]
+    1
+    """
+
+    __slots__ = ("world",)
+
+    def __init__(self, world):
+        self.world = world
+
+    def __len__(self):
+        return self.world["height"]
+
+    def __getitem__(self, y):
+        return ChunkedRow(self.world, y)
+
+    def __iter__(self):
+        for y in range(self.world["height"]):
+            yield ChunkedRow(self.world, y)
+
+    def window(self, left, top, width, height):
+        """Copy a rectangle of tiles into a plain list-of-lists grid"""
+        return [
+            [get_world_tile(self.world, x, y) for x in range(left, left + width)]
+            for y in range(top, top + height)
+        ]
+
+
+class ChunkedColorLayer:
+    """Colors for a ChunkedMap, looked up per tile on access"""
+
+    __slots__ = ("world", "lookup")
+
+    def __init__(self, world, lookup):
+        self.world = world
+        self.lookup = lookup
+
+    def __len__(self):
+        return self.world["height"]
+
+    def __getitem__(self, y):
+        return ChunkedColorRow(self, y)
+
+    def __iter__(self):
+        for y in range(self.world["height"]):
+            yield ChunkedColorRow(self, y)
+
+    def invalidate(self, y=None):
+        """Nothing is cached per row, so there is nothing to forget"""
+
+
+class ChunkedColorRow:
+    """One row of a ChunkedColorLayer"""
+
+    __slots__ = ("layer", "y")
+
+    def __init__(self, layer, y):
+        self.layer = layer
+        self.y = y
+
+    def __len__(self):
+        return self.layer.world["width"]
+
+    def __getitem__(self, x):
+        return self.layer.lookup[get_world_tile(self.layer.world, x, self.y)]
+
+    def __iter__(self):
+        for x in range(self.layer.world["width"]):
+            yield self[x]
+
+
+def full_map_view(world_map, world_colors, x, y):
+    """
+    Get the part of a map to show in the full-map view.
+
+    Plain maps are shown whole. Chunked maps are too large to draw, so a window of
+    FULL_MAP_WINDOW tiles around the player is copied out instead. The copy is reused
+    until the window moves or the world is edited, so the renderer can cache its frame.
+
+    :param world_map: list[list[int]] | ChunkedMap, the current map.
+    :param world_colors: list[list[str]] | LazyColorLayer | ChunkedColorLayer, its colors.
+    :param x: float, the player's x-coordinate.
+    :param y: float, the player's y-coordinate.
+    :precondition: world_colors must belong to world_map.
+    :postcondition: Does not modify the map.
+    :return: tuple, the (tiles, colors, player_x, player_y) to hand to render_full_map.
+    >>> full_map_view([[1]], [["7"]], 0.5, 0.5)
+    ([[1]], [['7']], 0.5, 0.5)
+    """
+    if not isinstance(world_map, ChunkedMap):
+        return world_map, world_colors, x, y
+
+    view_width, view_height = FULL_MAP_WINDOW
+    left = max(0, min(int(x) - view_width // 2, world_map.world["width"] - view_width))
+    top = max(0, min(int(y) - view_height // 2, world_map.world["height"] - view_height))
+    world = world_map.world
+    key = (left, top, world["edit_count"])
+    cached = world["full_map_view"]
+    if cached is None or cached[0] != key:
+        tiles = world_map.window(left, top, view_width, view_height)
+        colors = [[world_colors.lookup[tile] for tile in row] for row in tiles]
+        cached = world["full_map_view"] = (key, tiles, colors)
+    return cached[1], cached[2], x - left, y - top
@@ -0,0 +1,47 @@
+class LazyColorLayer:
+    """
+    Color codes for a map, computed one row at a time on first access.
+
+    Behaves like the 2D list returned by generate_color_map for indexing,
+    iteration and len(), so renderers can use either interchangeably.
+
+    >>> layer = LazyColorLayer([[0, 1], [1, 1]], {0: "0", 1: "7"})
+    >>> layer[1][0], len(layer), layer.computed_rows()
+    ('7', 2, 1)
+    >>> layer.invalidate(1)
+    >>> layer.computed_rows()
+    0
+    """
+
+    __slots__ = ("world_map", "lookup", "_rows")
+
+    def __init__(self, world_map, lookup):
+        self.world_map = world_map
+        self.lookup = lookup
+        self._rows = [None] * len(world_map)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, y):
+        row = self._rows[y]
+        if row is None:
+            lookup = self.lookup
+            row = [lookup[tile] for tile in self.world_map[y]]
+            self._rows[y] = row
+        return row
+
+    def __iter__(self):
+        for y in range(len(self._rows)):
+            yield self[y]
+
+    def invalidate(self, y=None):
+        """Forget one computed row, or every row when y is None"""
+        if y is None:
+            self._rows = [None] * len(self.world_map)
+        else:
+            self._rows[y] = None
+
+    def computed_rows(self):
+        """Count the rows that have already been computed"""
+        return sum(1 for row in self._rows if row is not None)
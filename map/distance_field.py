@@ -0,0 +1,104 @@
+import collections
+
+
+WALKABLE_TILES = frozenset({0, 4, 9})
+
+UNREACHABLE = -1
+
+NEIGHBOURS_4 = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+
+def bfs_distance_field(dmap, sources, walkable=WALKABLE_TILES, interior_only=True):
+    """
+    Compute the walking distance from a set of source cells to every reachable cell.
+
+    Performs a single breadth-first pass over the grid, so the cost is linear in the
+    number of cells regardless of how open the map is.
+
+    :param dmap: a 2D list representing the dungeon layout
+    :param sources: an iterable of (x, y) tuples the distances are measured from
+    :param walkable: a collection of tile values that can be walked through
+    :param interior_only: a boolean, True to keep the search off the border ring
+    :precondition: dmap must be a valid 2D dungeon layout
+    :precondition: every source must be a coordinate inside dmap
+    :postcondition: dmap is not modified
+    :return: a 2D list the same size as dmap holding the step count to each cell,
+             or UNREACHABLE for cells that cannot be reached
+
+    >>> sample_map_field = [[1, 1, 1, 1], [1, 0, 0, 1], [1, 1, 0, 1], [1, 1, 1, 1]]
+    >>> bfs_distance_field(sample_map_field, [(1, 1)])
+    [[-1, -1, -1, -1], [-1, 0, 1, -1], [-1, -1, 2, -1], [-1, -1, -1, -1]]
+    """
+    h, w = len(dmap), len(dmap[0])
+    field = [[UNREACHABLE] * w for _ in range(h)]
+    min_x, min_y = (1, 1) if interior_only else (0, 0)
+    max_x, max_y = (w - 2, h - 2) if interior_only else (w - 1, h - 1)
+
+    queue = collections.deque()
+    for sx, sy in sources:
+        if field[sy][sx] == UNREACHABLE:
+            field[sy][sx] = 0
+            queue.append((sx, sy))
+
+    while queue:
+        cx, cy = queue.popleft()
+        next_dist = field[cy][cx] + 1
+        for dx, dy in NEIGHBOURS_4:
+            nx, ny = cx + dx, cy + dy
+            if (
+                min_x <= nx <= max_x
+                and min_y <= ny <= max_y
+                and field[ny][nx] == UNREACHABLE
+                and dmap[ny][nx] in walkable
+            ):
+                field[ny][nx] = next_dist
+                queue.append((nx, ny))
+
+    return field
+
+
+def reachable_cells(field):
+    """
+    List every reachable cell of a distance field with its distance.
+
+    :param field: a 2D list produced by bfs_distance_field
+    :precondition: field must be a valid distance field
+    :postcondition: field is not modified
+    :return: a list of (distance, x, y) tuples in row-major order
+
+    >>> reachable_cells([[-1, 0], [2, 1]])
+    [(0, 1, 0), (2, 0, 1), (1, 1, 1)]
+    """
+    return [
+        (dist, x, y)
+        for y, row in enumerate(field)
+        for x, dist in enumerate(row)
+        if dist != UNREACHABLE
+    ]
+
+
+def farthest_cell(field, accept=None):
+    """
+    Find the reachable cell with the greatest distance that passes an optional filter.
+
+    Ties are broken in row-major order so the result is deterministic.
+
+    :param field: a 2D list produced by bfs_distance_field
+    :param accept: a function taking (x, y) and returning a boolean, or None to accept all
+    :precondition: field must be a valid distance field
+    :postcondition: field is not modified
+    :return: a tuple of (x, y, distance) for the chosen cell, or None if no cell qualifies
+
+    >>> farthest_cell([[-1, 0], [2, 1]])
+    (0, 1, 2)
+    >>> farthest_cell([[-1, 0], [2, 1]], lambda x, y: x == 1)
+    (1, 1, 1)
+    """
+    best = None
+    for y, row in enumerate(field):
+        for x, dist in enumerate(row):
+            if dist == UNREACHABLE or (best is not None and dist <= best[2]):
+                continue
+            if accept is None or accept(x, y):
+                best = (x, y, dist)
+    return best
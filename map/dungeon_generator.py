@@ -1,4 +1,14 @@
-import random, collections, heapq, math
+import random, collections, math
+
+from map.distance_field import (
+    WALKABLE_TILES,
+    bfs_distance_field,
+    farthest_cell,
+    reachable_cells,
+)
+from map.free_cells import FreeCellIndex
+from map.room_graph import build_room_graph
+from map.tile_passes import fill_border, scatter_tiles
 
 
 ARCHETYPES = {
@@ -12,6 +22,7 @@ ARCHETYPES = {
         "corridor_width": 1,
         "split_bias": 0.4,
         "room_count": (3, 7),
+        "loop_edges": 0,
         "color_shift": 0,
     },
     "RUINS": {
@@ -24,6 +35,7 @@ ARCHETYPES = {
         "corridor_width": 2,
         "split_bias": 0.5,
         "room_count": (4, 8),
+        "loop_edges": 1,
         "color_shift": 1,
     },
     "CRYPT": {
@@ -36,6 +48,7 @@ ARCHETYPES = {
         "corridor_width": 1,
         "split_bias": 0.7,
         "room_count": (6, 10),
+        "loop_edges": 2,
         "color_shift": 2,
     },
     "FOREST": {
@@ -48,6 +61,7 @@ ARCHETYPES = {
         "corridor_width": 2,
         "split_bias": 0.3,
         "room_count": (2, 5),
+        "loop_edges": 0,
         "color_shift": 3,
     },
     "TECH": {
@@ -60,6 +74,7 @@ ARCHETYPES = {
         "corridor_width": 1,
         "split_bias": 0.5,
         "room_count": (8, 12),
+        "loop_edges": 2,
         "color_shift": 4,
     },
     "BOSS_ARENA": {
@@ -72,6 +87,7 @@ ARCHETYPES = {
         "corridor_width": 2,
         "split_bias": 0.5,
         "room_count": (2, 3),
+        "loop_edges": 0,
         "color_shift": 5,
     },
 }
@@ -112,6 +128,7 @@ def generate_dungeon(width, height, archetype_key=None):
     special_wall_tile = archetype["special_walls"]
     decor_tiles = archetype["decor"]
     corridor_w = archetype["corridor_width"]
+    loop_edges = archetype["loop_edges"]
 
     dungeon = [[wall_tile for _ in range(width)] for _ in range(height)]
 
@@ -209,72 +226,26 @@ def generate_dungeon(width, height, archetype_key=None):
         if len(centers) <= 1:
             return
 
-        edges = []
-        for index, p1 in enumerate(centers):
-            for jindex, p2 in enumerate(centers):
-                if index < jindex:
-                    dist = abs(p2[0] - p1[0]) + abs(p2[1] - p1[1])
-                    edges.append((dist, p1, p2))
-
-        edges.sort()
-
-        parent = list(range(len(centers)))
-
-        def find_set(v):
-            if v == parent[v]:
-                return v
-            parent[v] = find_set(parent[v])
-            return parent[v]
-
-        def unite_sets(a, b):
-            a = find_set(a)
-            b = find_set(b)
-            if a != b:
-                parent[b] = a
-                return True
-            return False
-
-        num_edges = 0
-        for _, p1, p2 in edges:
-            idx1 = centers.index(p1)
-            idx2 = centers.index(p2)
-            if unite_sets(idx1, idx2):
-                _carve_path(p1[0], p1[1], p2[0], p2[1])
-                num_edges += 1
-                if num_edges == len(centers) - 1:
-                    break
+        for idx1, idx2 in build_room_graph(centers, loop_edges):
+            p1, p2 = centers[idx1], centers[idx2]
+            _carve_path(p1[0], p1[1], p2[0], p2[1])
 
     connect_rooms()
 
-    for y in range(1, height - 1):
-        for x in range(1, width - 1):
-            current_tile = dungeon[y][x]
-
-            if current_tile == path_tile:
-                continue
-
-            if current_tile == wall_tile and random.random() < 0.15:
-                dungeon[y][x] = special_wall_tile
-            elif current_tile == floor_tile and random.random() < 0.05:
-                if decor_tiles:
-                    dungeon[y][x] = random.choice(decor_tiles)
-
-    for x in range(width):
-        dungeon[0][x] = dungeon[height - 1][x] = wall_tile
-    for y in range(height):
-        dungeon[y][0] = dungeon[y][width - 1] = wall_tile
+    scatter_tiles(dungeon, wall_tile, special_wall_tile, floor_tile, decor_tiles)
 
     return dungeon, archetype_key
 
 
 # noinspection PyTypeChecker
-def generate_dungeon_level(width=40, height=20, player_level=1):
+def generate_dungeon_level(width=40, height=20, player_level=1, archetype_key=None):
     """
     Generate a complete dungeon level with spawn, exit, and features.
 
     :param width: an integer representing the width of the dungeon
     :param height: an integer representing the height of the dungeon
     :param player_level: an integer representing the player's level
+    :param archetype_key: a key of ARCHETYPES, or None to pick one at random
     :precondition: width and height must be positive integers
     :precondition: player_level must be a positive integer
     :postcondition: creates a complete dungeon level with player spawn and exit
@@ -288,7 +259,7 @@ def generate_dungeon_level(width=40, height=20, player_level=1):
     >>> level_key in ARCHETYPES
     True
     """
-    dungeon_map, archetype_key = generate_dungeon(width, height)  # Receive key
+    dungeon_map, archetype_key = generate_dungeon(width, height, archetype_key)
 
     ensure_connectivity(dungeon_map)
 
@@ -328,15 +299,15 @@ def find_safe_spawn_location(dungeon_map, width, height):
     True
     """
     spawn_candidates = []
-    search_areas = [(1, width // 4, 1, height // 4), (1, width - 1, 1, height - 1)]
-
-    for x_min, x_max, y_min, y_max in search_areas:
-        for y in range(y_min, y_max):
-            for x in range(x_min, x_max):
-                if is_valid_spawn(dungeon_map, x, y) and is_open_area(
-                    dungeon_map, x, y
-                ):
-                    spawn_candidates.append((x, y))
+    # Built fresh: the generator writes tiles directly, so a cached index could be stale
+    free_cells = FreeCellIndex(dungeon_map, walkable=(0,))
+    search_areas = [
+        free_cells.in_region(1, 1, width // 4 - 1, height // 4 - 1),
+        free_cells,
+    ]
+
+    for area in search_areas:
+        spawn_candidates = [(x, y) for x, y in area if is_open_area(dungeon_map, x, y)]
         if spawn_candidates:
             break
 
@@ -539,6 +510,12 @@ def find_farthest_point(dmap, sx, sy):
         "y_max": h - 2,
     }
 
+    def _in_target(x, y):
+        return (
+            target_area["x_min"] <= x <= target_area["x_max"]
+            and target_area["y_min"] <= y <= target_area["y_max"]
+        )
+
     is_forest_map = False
     tree_count = 0
     for y in range(1, h - 1):
@@ -551,73 +528,42 @@ def find_farthest_point(dmap, sx, sy):
         if is_forest_map:
             break
 
-    open_set, closed_set = [], set()
-    g_scores = {(sx, sy): 0}
-    heapq.heappush(open_set, (0, sx, sy))
+    walkable = WALKABLE_TILES | {2} if is_forest_map else WALKABLE_TILES
+    field = bfs_distance_field(dmap, [(sx, sy)], walkable)
 
-    best_point, max_dist = (sx, sy), 0
+    best_point = None
     min_distance_required = 10
 
-    walkable_base = {0, 4, 9}
-
-    while open_set:
-        _, cx, cy = heapq.heappop(open_set)
-        if (cx, cy) in closed_set:
-            continue
-        closed_set.add((cx, cy))
-
-        curr_dist = g_scores[(cx, cy)]
-        in_target = (
-            target_area["x_min"] <= cx <= target_area["x_max"]
-            and target_area["y_min"] <= cy <= target_area["y_max"]
-        )
-
-        direct_dist = math.sqrt((cx - sx) ** 2 + (cy - sy) ** 2)
-
-        if is_forest_map:
-            if direct_dist > min_distance_required and is_good_door_spot(dmap, cx, cy):
-                if direct_dist > max_dist:
-                    max_dist, best_point = direct_dist, (cx, cy)
-                    if in_target:
-                        min_distance_required = direct_dist
-        else:
-            if curr_dist > max_dist and is_good_door_spot(dmap, cx, cy):
-                if in_target or not (
-                    target_area["x_min"] <= best_point[0] <= target_area["x_max"]
-                    and target_area["y_min"] <= best_point[1] <= target_area["y_max"]
-                ):
-                    max_dist, best_point = curr_dist, (cx, cy)
+    if is_forest_map:
+        max_dist = min_distance_required
+        for _, cx, cy in reachable_cells(field):
+            direct_dist = math.sqrt((cx - sx) ** 2 + (cy - sy) ** 2)
+            if direct_dist > max_dist and is_good_door_spot(dmap, cx, cy):
+                max_dist, best_point = direct_dist, (cx, cy)
+
+        if best_point is None:
+            for attempt in range(100):
+                test_x = random.randint(w // 2, w - 3)
+                test_y = random.randint(h // 2, h - 3)
+                if is_good_door_spot(dmap, test_x, test_y):
+                    direct_dist = math.sqrt((test_x - sx) ** 2 + (test_y - sy) ** 2)
+                    if direct_dist > min_distance_required:
+                        best_point = (test_x, test_y)
+                        break
+    else:
+        for accept_target_only in (True, False):
+            farthest = farthest_cell(
+                field,
+                lambda x, y: (x, y) != (sx, sy)
+                and (_in_target(x, y) or not accept_target_only)
+                and is_good_door_spot(dmap, x, y),
+            )
+            if farthest:
+                best_point = farthest[:2]
+                break
 
-        for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-            nx, ny = cx + dx, cy + dy
-            if (nx, ny) in closed_set or not (0 < nx < w - 1 and 0 < ny < h - 1):
-                continue
-
-            current_walkable_set = walkable_base.copy()
-            if is_forest_map:
-                current_walkable_set.add(2)
-
-            if dmap[ny][nx] not in current_walkable_set:
-                continue
-
-            tent_g = g_scores[(cx, cy)] + 1
-            if (nx, ny) not in g_scores or tent_g > g_scores[(nx, ny)]:
-                g_scores[(nx, ny)] = tent_g
-                heapq.heappush(open_set, (-tent_g, nx, ny))
-
-    if (
-        is_forest_map
-        and math.sqrt((best_point[0] - sx) ** 2 + (best_point[1] - sy) ** 2)
-        < min_distance_required
-    ):
-        for attempt in range(100):
-            test_x = random.randint(w // 2, w - 3)
-            test_y = random.randint(h // 2, h - 3)
-            if is_good_door_spot(dmap, test_x, test_y):
-                direct_dist = math.sqrt((test_x - sx) ** 2 + (test_y - sy) ** 2)
-                if direct_dist > min_distance_required:
-                    best_point = (test_x, test_y)
-                    break
+    if best_point is None:
+        best_point = (sx, sy)
 
     if not is_good_door_spot(dmap, best_point[0], best_point[1]):
         best_point = find_door_spot(dmap, best_point[0], best_point[1])
@@ -829,10 +775,7 @@ def generate_boss_arena(width=30, height=22):
             if 0 < y < height - 1 and 0 < x < width - 1:
                 dungeon_map[y][x] = 0
 
-    for x in range(width):
-        dungeon_map[0][x] = dungeon_map[height - 1][x] = 8
-    for y in range(height):
-        dungeon_map[y][0] = dungeon_map[y][width - 1] = 8
+    fill_border(dungeon_map, 8)
 
     dungeon_map[entrance_y][entrance_x] = 0
 
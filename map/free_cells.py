@@ -0,0 +1,234 @@
+import math
+import random
+from array import array
+
+from map.distance_field import WALKABLE_TILES
+from map.map_cache import get_layer
+
+
+REGION_SIZE = 16
+
+
+class FreeCellIndex:
+    """
+    A packed array of the walkable cells of a map, in row-major order.
+
+    Each cell is stored as a single int, (y - origin_y) * width + (x - origin_x), so
+    even large maps only cost a few bytes per free cell. Cells are bucketed into
+    REGION_SIZE squares the first time a region is queried.
+
+    >>> index = FreeCellIndex([[1, 1, 1], [1, 0, 1], [1, 4, 1], [1, 1, 1]])
+    >>> len(index), index.cell(0), list(index)
+    (2, (1, 1), [(1, 1), (1, 2)])
+    """
+
+    __slots__ = ("width", "origin_x", "origin_y", "cells", "_buckets")
+
+    def __init__(self, grid, walkable=WALKABLE_TILES, origin=(0, 0), interior_only=True):
+        height = len(grid)
+        self.width = len(grid[0]) if height > 0 else 0
+        self.origin_x, self.origin_y = origin
+        self.cells = array("i")
+        self._buckets = None
+
+        border = 1 if interior_only else 0
+        width = self.width
+        for y in range(border, height - border):
+            row = grid[y]
+            base = y * width
+            self.cells.extend(
+                base + x
+                for x in range(border, width - border)
+                if row[x] in walkable
+            )
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __iter__(self):
+        for packed in self.cells:
+            yield self.unpack(packed)
+
+    def unpack(self, packed):
+        """Turn a packed cell back into world (x, y) coordinates"""
+        y, x = divmod(packed, self.width)
+        return x + self.origin_x, y + self.origin_y
+
+    def cell(self, i):
+        """Get the world (x, y) coordinates of the i-th free cell"""
+        return self.unpack(self.cells[i])
+
+    def in_region(self, x1, y1, x2, y2):
+        """
+        Get the free cells inside a rectangle, as a new index sharing this one's layout.
+
+        :param x1: int, the left edge of the rectangle in world coordinates.
+        :param y1: int, the top edge of the rectangle in world coordinates.
+        :param x2: int, the right edge of the rectangle (inclusive).
+        :param y2: int, the bottom edge of the rectangle (inclusive).
+        :precondition: x1 <= x2 and y1 <= y2.
+        :postcondition: Buckets the cells by region on the first call.
+        :return: FreeCellIndex, the cells inside the rectangle in row-major order.
+        >>> index = FreeCellIndex([[0] * 40 for _ in range(40)])
+        >>> region = index.in_region(10, 10, 12, 11)
+        >>> len(region), region.cell(0), region.cell(5)
+        (6, (10, 10), (12, 11))
+        """
+        if self._buckets is None:
+            self._buckets = {}
+            for packed in self.cells:
+                y, x = divmod(packed, self.width)
+                key = (x // REGION_SIZE, y // REGION_SIZE)
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = array("i")
+                bucket.append(packed)
+
+        left, right = x1 - self.origin_x, x2 - self.origin_x
+        top, bottom = y1 - self.origin_y, y2 - self.origin_y
+        selected = []
+        for bucket_y in range(max(0, top) // REGION_SIZE, bottom // REGION_SIZE + 1):
+            for bucket_x in range(max(0, left) // REGION_SIZE, right // REGION_SIZE + 1):
+                bucket = self._buckets.get((bucket_x, bucket_y))
+                if bucket is None:
+                    continue
+                inside_x = (
+                    left <= bucket_x * REGION_SIZE
+                    and (bucket_x + 1) * REGION_SIZE - 1 <= right
+                )
+                inside_y = (
+                    top <= bucket_y * REGION_SIZE
+                    and (bucket_y + 1) * REGION_SIZE - 1 <= bottom
+                )
+                if inside_x and inside_y:
+                    selected.extend(bucket)
+                else:
+                    width = self.width
+                    selected.extend(
+                        packed
+                        for packed in bucket
+                        if top <= packed // width <= bottom
+                        and left <= packed % width <= right
+                    )
+
+        region = FreeCellIndex.__new__(FreeCellIndex)
+        region.width = self.width
+        region.origin_x, region.origin_y = self.origin_x, self.origin_y
+        region.cells = array("i", sorted(selected))
+        region._buckets = None
+        return region
+
+
+def get_free_cell_index(world_map, region=None):
+    """
+    Get the free-cell index of a map, optionally limited to a rectangle.
+
+    Plain maps are indexed once and cached until they change through set_tile. Chunked
+    maps are too large to index whole, so only the requested region is read.
+
+    :param world_map: list[list[int]] | ChunkedMap, the map grid.
+    :param region: tuple[float, float, float, float] | None, the (x1, y1, x2, y2) bounds.
+    :precondition: region is required for chunked maps.
+    :postcondition: Does not modify world_map; raises ValueError for a chunked map
+                    without a region.
+    :return: FreeCellIndex, the walkable cells of the map or region.
+    >>> sample_map_free = [[1, 1, 1, 1], [1, 0, 9, 1], [1, 1, 1, 1]]
+    >>> list(get_free_cell_index(sample_map_free))
+    [(1, 1), (2, 1)]
+    >>> list(get_free_cell_index(sample_map_free, (2, 0, 3, 2)))
+    [(2, 1)]
+    """
+    if region is not None:
+        x1, y1, x2, y2 = (int(math.floor(bound)) for bound in region)
+
+    if hasattr(world_map, "window"):
+        if region is None:
+            raise ValueError("A chunked map is too large to index whole; give a region")
+        # Keep the window inside the world so the border ring stays excluded
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = min(len(world_map[0]) - 1, x2), min(len(world_map) - 1, y2)
+        if x2 < x1 or y2 < y1:
+            return FreeCellIndex([])
+        tiles = world_map.window(x1, y1, x2 - x1 + 1, y2 - y1 + 1)
+        return FreeCellIndex(tiles, origin=(x1, y1), interior_only=False)
+
+    index = get_layer(world_map, "free_cells", FreeCellIndex)
+    if region is None:
+        return index
+    return index.in_region(x1, y1, x2, y2)
+
+
+def sample_free_cells(
+    index, count, min_spacing=0.0, keep_away=None, keep_away_distance=0.0
+):
+    """
+    Pick distinct free cells at random, keeping them apart from each other and a point.
+
+    Draws with a sparse Fisher-Yates shuffle and checks spacing against a hash grid of
+    the cells already picked, so the cost grows with the number of draws rather than
+    with the map size. If the constraints cannot be met, the remaining cells are picked
+    without them. Cells are never picked twice, so fewer than count cells are returned
+    only when the index holds fewer than count cells.
+
+    :param index: FreeCellIndex, the cells to pick from.
+    :param count: int, how many cells to pick.
+    :param min_spacing: float, the minimum distance between picked cells.
+    :param keep_away: tuple[float, float] | None, a point (e.g. the player) to avoid.
+    :param keep_away_distance: float, the minimum distance from keep_away.
+    :precondition: count must be a non-negative integer.
+    :postcondition: Does not modify index.
+    :return: list[tuple[int, int]], the (x, y) coordinates of the picked cells, at most
+             min(count, len(index)) of them.
+    >>> index = FreeCellIndex([[0] * 12 for _ in range(12)])
+    >>> picked = sample_free_cells(index, 4, min_spacing=3.0)
+    >>> len(picked), len(set(picked))
+    (4, 4)
+    >>> sample_free_cells(FreeCellIndex([[1]]), 3)
+    []
+    """
+    cells = index.cells
+    remaining = len(cells)
+    if remaining == 0 or count <= 0:
+        return []
+
+    spacing_sq = min_spacing * min_spacing
+    away_sq = keep_away_distance * keep_away_distance
+    grid_size = max(1.0, min_spacing)
+    grid = {}
+    picked = []
+    rejected = []
+    swapped = {}
+
+    while remaining and len(picked) < count:
+        i = random.randrange(remaining)
+        remaining -= 1
+        packed = swapped.get(i, cells[i])
+        swapped[i] = swapped.get(remaining, cells[remaining])
+        x, y = index.unpack(packed)
+
+        if keep_away is not None and (
+            (x + 0.5 - keep_away[0]) ** 2 + (y + 0.5 - keep_away[1]) ** 2 < away_sq
+        ):
+            rejected.append((x, y))
+            continue
+
+        grid_x, grid_y = int(x // grid_size), int(y // grid_size)
+        too_close = False
+        if spacing_sq > 0:
+            for near_y in range(grid_y - 1, grid_y + 2):
+                for near_x in range(grid_x - 1, grid_x + 2):
+                    for other_x, other_y in grid.get((near_x, near_y), ()):
+                        if (x - other_x) ** 2 + (y - other_y) ** 2 < spacing_sq:
+                            too_close = True
+        if too_close:
+            rejected.append((x, y))
+            continue
+
+        grid.setdefault((grid_x, grid_y), []).append((x, y))
+        picked.append((x, y))
+
+    # Relax the constraints rather than fail when the map is too crowded
+    while rejected and len(picked) < count:
+        picked.append(rejected.pop(random.randrange(len(rejected))))
+
+    return picked
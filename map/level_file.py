@@ -0,0 +1,139 @@
+import mmap
+import os
+import struct
+
+
+LEVEL_MAGIC = b"MUDL"
+LEVEL_VERSION = 1
+LEVEL_EXTENSION = ".lvl"
+LEVEL_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "levels")
+
+# magic, version, width, height, color shift, spawn x, spawn y, entity count
+HEADER = struct.Struct("<4sHHHhffI")
+# kind, x, y
+ENTITY_RECORD = struct.Struct("<Bff")
+
+ENTITY_KINDS = ("enemy", "boss")
+
+
+def level_path(name):
+    """
+    Get the path of a level file in LEVEL_DIR.
+
+    :param name: str, the level name, with or without the LEVEL_EXTENSION suffix.
+    :precondition: name must not be empty.
+    :postcondition: Does not touch the file system; raises ValueError if name is a path
+                    rather than a plain file name, so it cannot leave LEVEL_DIR.
+    :return: str, the path of the level file.
+    >>> os.path.basename(level_path("arena"))
+    'arena.lvl'
+    >>> level_path("../../foo")
+    Traceback (most recent call last):
+    ...
+    ValueError: Level names cannot contain paths: '../../foo'
+    >>> level_path("/tmp/foo")
+    Traceback (most recent call last):
+    ...
+    ValueError: Level names cannot contain paths: '/tmp/foo'
+    """
+    separators = {"/", os.sep, os.altsep} - {None}
+    if name in ("", ".", "..") or any(separator in name for separator in separators):
+        raise ValueError(f"Level names cannot contain paths: {name!r}")
+    if not name.endswith(LEVEL_EXTENSION):
+        name += LEVEL_EXTENSION
+    return os.path.join(LEVEL_DIR, name)
+
+
+def save_level(path, world_map, world_colors, spawn, entity_spawns=(), color_shift=0):
+    """
+    Write a level to disk in the binary level format.
+
+    The file holds a fixed-size header, then one byte per tile, one byte per color
+    code and finally the entity spawn table. Both planes are stored row by row.
+
+    :param path: str, the file to write.
+    :param world_map: list[list[int]], the map grid (tiles must fit in a byte).
+    :param world_colors: list[list[str | int]], the color code of every tile.
+    :param spawn: tuple[float, float], the player spawn position.
+    :param entity_spawns: iterable of (kind, x, y) tuples, kind being one of ENTITY_KINDS.
+    :param color_shift: int, the color theme of the level.
+    :precondition: world_colors must have the same dimensions as world_map.
+    :precondition: The map must be at most 65535 tiles in each direction.
+    :postcondition: Creates missing parent directories and overwrites path.
+    :return: None
+    """
+    height = len(world_map)
+    width = len(world_map[0]) if height > 0 else 0
+    entity_spawns = list(entity_spawns)
+
+    data = bytearray(
+        HEADER.pack(
+            LEVEL_MAGIC,
+            LEVEL_VERSION,
+            width,
+            height,
+            color_shift,
+            spawn[0],
+            spawn[1],
+            len(entity_spawns),
+        )
+    )
+    for row in world_map:
+        data += bytes(row)
+    for row in world_colors:
+        data += bytes(int(color) for color in row)
+    for kind, x, y in entity_spawns:
+        data += ENTITY_RECORD.pack(ENTITY_KINDS.index(kind), x, y)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "wb") as level_file:
+        level_file.write(data)
+
+
+def load_level(path):
+    """
+    Map a level file into memory and expose its planes as grids without copying.
+
+    Every row is a memoryview into a copy-on-write mapping, so world_map[y][x] reads
+    straight from the page cache and writes stay private to this process.
+
+    :param path: str, the level file to load.
+    :precondition: path must have been written by save_level.
+    :postcondition: Raises ValueError if the file is not a level file of this version.
+    :return: dict, with the "map" and "colors" row lists, the player "spawn", the
+             "color_shift", the "entities" spawn table and the backing "mmap".
+    """
+    with open(path, "rb") as level_file:
+        mapped = mmap.mmap(level_file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    if len(mapped) < HEADER.size:
+        raise ValueError(f"{path} is too short to be a level file")
+    magic, version, width, height, color_shift, spawn_x, spawn_y, entity_count = (
+        HEADER.unpack_from(mapped)
+    )
+    if magic != LEVEL_MAGIC or version != LEVEL_VERSION:
+        raise ValueError(f"{path} is not a version {LEVEL_VERSION} level file")
+
+    plane_size = width * height
+    entity_offset = HEADER.size + 2 * plane_size
+    if len(mapped) < entity_offset + entity_count * ENTITY_RECORD.size:
+        raise ValueError(f"{path} is truncated")
+
+    view = memoryview(mapped)
+    tiles = view[HEADER.size : HEADER.size + plane_size]
+    colors = view[HEADER.size + plane_size : entity_offset]
+    entity_table = view[entity_offset : entity_offset + entity_count * ENTITY_RECORD.size]
+
+    return {
+        "map": [tiles[y * width : (y + 1) * width] for y in range(height)],
+        "colors": [colors[y * width : (y + 1) * width] for y in range(height)],
+        "spawn": (spawn_x, spawn_y),
+        "color_shift": color_shift,
+        "entities": [
+            (ENTITY_KINDS[kind], x, y)
+            for kind, x, y in ENTITY_RECORD.iter_unpack(entity_table)
+        ],
+        "mmap": mapped,
+    }
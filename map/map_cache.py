@@ -0,0 +1,188 @@
+import collections
+import itertools
+
+
+MAX_CACHED_MAPS = 4
+
+CACHE_STATS = {"hits": 0, "misses": 0, "invalidations": 0}
+
+_map_entries = collections.OrderedDict()
+
+# Versions are drawn from one counter for every map, so a map that is evicted and
+# tracked again never reuses a version a renderer may have cached a frame under
+_versions = itertools.count(1)
+
+
+def _find_entry(world_map):
+    entry = _map_entries.get(id(world_map))
+    if entry is not None and entry["map"] is world_map:
+        return entry
+    return None
+
+
+def _get_entry(world_map):
+    entry = _find_entry(world_map)
+    if entry is None:
+        entry = {"map": world_map, "version": next(_versions), "layers": {}, "on_mutate": {}}
+        _map_entries[id(world_map)] = entry
+        _evict()
+    else:
+        _map_entries.move_to_end(id(world_map))
+    return entry
+
+
+def _evict():
+    """
+    Drop the least recently used maps beyond MAX_CACHED_MAPS.
+
+    Maps with a layer patched in place are kept: callers hold on to those layers, and
+    an untracked map would mutate without patching them. They stay until release_map.
+    The newest map is never dropped, since its layers are about to be registered.
+    """
+    excess = len(_map_entries) - MAX_CACHED_MAPS
+    if excess <= 0:
+        return
+    evictable = [
+        key for key, entry in list(_map_entries.items())[:-1] if not entry["on_mutate"]
+    ]
+    for key in evictable[:excess]:
+        del _map_entries[key]
+
+
+def map_version(world_map):
+    """
+    Get the mutation counter of a map.
+
+    :param world_map: list[list[int]], the map grid.
+    :precondition: world_map must be a valid 2D list.
+    :postcondition: Starts tracking world_map if it was not tracked yet.
+    :return: int, a number that increases every time the map is mutated through set_tile
+             and is never shared with another map or an earlier tracking of this one.
+    >>> sample_map_version = [[1, 0]]
+    >>> before = map_version(sample_map_version)
+    >>> set_tile(sample_map_version, 1, 0, 4)
+    >>> map_version(sample_map_version) > before
+    True
+    """
+    return _get_entry(world_map)["version"]
+
+
+def get_layer(world_map, key, builder, on_mutate=None):
+    """
+    Get a derived per-map layer, building it the first time it is requested.
+
+    Layers stay cached until the map is mutated through set_tile. A layer registered with
+    an on_mutate callback is patched in place instead of being dropped, so references
+    already held by the caller stay valid.
+
+    :param world_map: list[list[int]], the map grid the layer is derived from.
+    :param key: hashable, identifies the layer (e.g. ("colors", color_shift)).
+    :param builder: function taking world_map and returning the layer.
+    :param on_mutate: function taking (layer, x, y) called after a tile changes, or None.
+    :precondition: builder must not mutate world_map.
+    :postcondition: The returned layer is cached for later calls with the same map and key.
+    :return: object, the cached or freshly built layer.
+    >>> sample_map_layer = [[1, 0]]
+    >>> first = get_layer(sample_map_layer, "copy", lambda m: [row[:] for row in m])
+    >>> first is get_layer(sample_map_layer, "copy", lambda m: None)
+    True
+    """
+    entry = _get_entry(world_map)
+    layers = entry["layers"]
+    if key in layers:
+        CACHE_STATS["hits"] += 1
+        return layers[key]
+
+    CACHE_STATS["misses"] += 1
+    layer = builder(world_map)
+    layers[key] = layer
+    if on_mutate is not None:
+        entry["on_mutate"][key] = on_mutate
+    return layer
+
+
+def invalidate_map(world_map, x=None, y=None):
+    """
+    Tell the cache that a map changed so its derived layers are refreshed.
+
+    :param world_map: list[list[int]], the map grid that changed.
+    :param x: int | None, the x-coordinate of the changed tile, or None if unknown.
+    :param y: int | None, the y-coordinate of the changed tile, or None if unknown.
+    :precondition: world_map must be a valid 2D list.
+    :postcondition: Bumps the map version; layers without an on_mutate callback are dropped.
+    :return: None
+    """
+    entry = _find_entry(world_map)
+    if entry is None:
+        return
+
+    CACHE_STATS["invalidations"] += 1
+    entry["version"] = next(_versions)
+    patchers = entry["on_mutate"]
+    for key in list(entry["layers"]):
+        if key in patchers:
+            patchers[key](entry["layers"][key], x, y)
+        else:
+            del entry["layers"][key]
+
+
+def set_tile(world_map, x, y, tile):
+    """
+    Change a single tile and refresh every cached layer derived from the map.
+
+    :param world_map: list[list[int]], the map grid to modify.
+    :param x: int, the x-coordinate of the tile.
+    :param y: int, the y-coordinate of the tile.
+    :param tile: int, the new tile value from LEGEND.
+    :precondition: (x, y) must be inside world_map.
+    :postcondition: world_map[y][x] == tile and stale cached layers are refreshed.
+    :return: None
+    >>> sample_map_set = [[1, 1], [1, 0]]
+    >>> set_tile(sample_map_set, 0, 1, 6)
+    >>> sample_map_set
+    [[1, 1], [6, 0]]
+    """
+    world_map[y][x] = tile
+    invalidate_map(world_map, x, y)
+
+
+def release_map(world_map):
+    """
+    Stop tracking a map that is no longer used, with every layer derived from it.
+
+    :param world_map: list[list[int]], the map grid being discarded.
+    :precondition: Nothing may mutate world_map or read its patched layers afterwards.
+    :postcondition: world_map and its layers are no longer kept alive by the cache.
+    :return: None
+    >>> sample_map_release = [[1]]
+    >>> _ = get_layer(sample_map_release, "copy", list, on_mutate=lambda *_: None)
+    >>> release_map(sample_map_release)
+    >>> _find_entry(sample_map_release) is None
+    True
+    """
+    if _find_entry(world_map) is not None:
+        del _map_entries[id(world_map)]
+
+
+def tracked_map_count():
+    """
+    Get how many maps the cache is tracking.
+
+    Only maps with layers patched in place are kept beyond MAX_CACHED_MAPS.
+
+    :postcondition: Does not change the cache.
+    :return: int, the number of tracked maps.
+    """
+    return len(_map_entries)
+
+
+def clear_cache():
+    """
+    Forget every tracked map and reset the cache statistics.
+
+    :postcondition: The cache is empty and CACHE_STATS counters are zero.
+    :return: None
+    """
+    _map_entries.clear()
+    for key in CACHE_STATS:
+        CACHE_STATS[key] = 0
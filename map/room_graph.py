@@ -0,0 +1,118 @@
+def room_distance(p1, p2):
+    """
+    Calculate the corridor length between two room centers.
+
+    :param p1: a tuple of (x, y) integers for the first room center
+    :param p2: a tuple of (x, y) integers for the second room center
+    :precondition: p1 and p2 must be tuples of two integers
+    :postcondition: calculates the Manhattan distance between the centers
+    :return: an integer representing the distance
+
+    >>> room_distance((1, 1), (4, 5))
+    7
+    """
+    return abs(p2[0] - p1[0]) + abs(p2[1] - p1[1])
+
+
+def minimum_spanning_edges(centers):
+    """
+    Build a minimum spanning tree over room centers using Prim's algorithm.
+
+    Works directly on the dense distance matrix, so it runs in O(n²) time and
+    identifies rooms by index, which keeps rooms that share a center distinct.
+
+    :param centers: a list of (x, y) tuples, one per room
+    :precondition: centers must be a list of tuples of two integers
+    :postcondition: centers is not modified
+    :return: a list of (i, j) index pairs with i < j, one per tree edge
+
+    >>> minimum_spanning_edges([(0, 0), (10, 0), (1, 0)])
+    [(0, 2), (1, 2)]
+    >>> minimum_spanning_edges([(3, 3), (3, 3)])
+    [(0, 1)]
+    >>> minimum_spanning_edges([(5, 5)])
+    []
+    """
+    count = len(centers)
+    if count <= 1:
+        return []
+
+    in_tree = [False] * count
+    best_dist = [float("inf")] * count
+    best_link = [-1] * count
+    best_dist[0] = 0
+    edges = []
+
+    for _ in range(count):
+        current = -1
+        for index in range(count):
+            if not in_tree[index] and (
+                current == -1 or best_dist[index] < best_dist[current]
+            ):
+                current = index
+
+        in_tree[current] = True
+        if best_link[current] != -1:
+            link = best_link[current]
+            edges.append((min(link, current), max(link, current)))
+
+        cx, cy = centers[current]
+        for index in range(count):
+            if not in_tree[index]:
+                ox, oy = centers[index]
+                dist = abs(ox - cx) + abs(oy - cy)
+                if dist < best_dist[index]:
+                    best_dist[index] = dist
+                    best_link[index] = current
+
+    return edges
+
+
+def add_loop_edges(centers, tree_edges, extra_count):
+    """
+    Pick the shortest room connections that are not already part of the tree.
+
+    Extra connections create loops so the player is not always forced to
+    backtrack through dead ends.
+
+    :param centers: a list of (x, y) tuples, one per room
+    :param tree_edges: a list of (i, j) index pairs already connected
+    :param extra_count: an integer representing how many loop edges to add
+    :precondition: tree_edges must only reference indices of centers
+    :postcondition: centers and tree_edges are not modified
+    :return: a list of up to extra_count new (i, j) index pairs with i < j
+
+    >>> add_loop_edges([(0, 0), (4, 0), (0, 4), (4, 4)], [(0, 1), (0, 2), (1, 3)], 1)
+    [(2, 3)]
+    >>> add_loop_edges([(0, 0), (4, 0)], [(0, 1)], 2)
+    []
+    """
+    if extra_count <= 0:
+        return []
+
+    existing = set(tree_edges)
+    candidates = [
+        (room_distance(centers[i], centers[j]), i, j)
+        for i in range(len(centers))
+        for j in range(i + 1, len(centers))
+        if (i, j) not in existing
+    ]
+    candidates.sort()
+    return [(i, j) for _, i, j in candidates[:extra_count]]
+
+
+def build_room_graph(centers, extra_count=0):
+    """
+    Build the list of corridors needed to connect every room.
+
+    :param centers: a list of (x, y) tuples, one per room
+    :param extra_count: an integer representing how many loop edges to add on top of the tree
+    :precondition: centers must be a list of tuples of two integers
+    :postcondition: every room is reachable from every other room through the returned edges
+    :return: a list of (i, j) index pairs, tree edges first
+
+    >>> build_room_graph([(0, 0), (4, 0), (0, 4), (4, 4)], 1)
+    [(0, 1), (0, 2), (1, 3), (2, 3)]
+    """
+    tree_edges = minimum_spanning_edges(centers)
+    return tree_edges + add_loop_edges(centers, tree_edges, extra_count)
@@ -1,5 +1,19 @@
 import math
 
+from map.chunked_world import (
+    ChunkedColorLayer,
+    ChunkedMap,
+    create_chunked_world,
+    find_chunk_spawn,
+)
+from map.color_layer import LazyColorLayer
+from map.dungeon_generator import ARCHETYPES
+from map.free_cells import get_free_cell_index
+from map.level_file import LEVEL_EXTENSION, load_level
+from map.map_cache import get_layer, release_map, set_tile
+from map.tile_passes import map_tiles
+from map.wall_distance import get_wall_distance_field
+
 
 TERRAIN_TYPES = {
     "WALL": "#",
@@ -87,10 +101,58 @@ CURRENT_MAP_TYPE = 0
 
 CURRENT_COLOR_SHIFT = 0
 
+LEVEL_SPAWNS = []  # (kind, x, y) entity spawns of the level loaded from disk, if any
+
 
 DIRECTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0)]
 
 
+INTERACT_DISTANCE = 2.0
+
+# What the interaction ray reports for each tile; tiles not listed block it as "wall"
+TILE_INTERACTIONS = {
+    0: None,
+    4: None,
+    9: None,
+    6: "door",
+    7: "stairs",
+    10: "boss_door",
+}
+
+
+COLOR_SHIFT_EFFECTS = {
+    0: {},
+    1: {"WALL": 3, "STONE": 3, "PATH": 3},
+    2: {"WALL": 4, "WATER": 6, "EMPTY": 4, "PATH": 4},
+    3: {"EMPTY": 2, "PATH": 2, "WALL": 2},
+    4: {"WALL": 6, "STONE": 6, "EMPTY": 8, "PATH": 6, "WATER": 4},
+    5: {"WALL": 7, "STONE": 7, "EMPTY": 7, "PATH": 7, "WATER": 6},
+}
+
+_color_lookups = {}
+
+
+def get_color_lookup(color_shift=0):
+    """
+    Build the tile-to-color table for a color theme.
+
+    :param color_shift: int, the identifier for the color theme shift to apply.
+    :precondition: color_shift should correspond to a key in COLOR_SHIFT_EFFECTS.
+    :postcondition: Unknown color shifts fall back to the unshifted palette.
+    :postcondition: The table is built once per color shift and shared afterwards.
+    :return: dict[int, str], the color code string for every tile in LEGEND.
+    >>> get_color_lookup(0)[1], get_color_lookup(1)[1]
+    ('7', '3')
+    """
+    if color_shift not in _color_lookups:
+        shift_map = COLOR_SHIFT_EFFECTS.get(color_shift, {})
+        _color_lookups[color_shift] = {
+            tile: str(shift_map.get(terrain_type, TERRAIN_COLORS[terrain_type]))
+            for tile, terrain_type in LEGEND.items()
+        }
+    return _color_lookups[color_shift]
+
+
 def generate_color_map(world_map=None, color_shift=0):
     """
     Generate a 2D list of color codes corresponding to the terrain types in the world map.
@@ -100,39 +162,53 @@ def generate_color_map(world_map=None, color_shift=0):
     :param world_map: list[list[int]], the map grid to generate colors for. Defaults to ACTIVE_MAP.
     :param color_shift: int, the identifier for the color theme shift to apply.
     :precondition: world_map must be a valid map grid using integers defined in LEGEND.
-    :precondition: color_shift should correspond to a key in `color_shift_effects`.
+    :precondition: color_shift should correspond to a key in COLOR_SHIFT_EFFECTS.
     :postcondition: Returns a map of the same dimensions containing color codes as strings.
     :return: list[list[str]], the generated color map.
     """
     if world_map is None:
         world_map = ACTIVE_MAP
 
-    color_shift_effects = {
-        0: {},
-        1: {"WALL": 3, "STONE": 3, "PATH": 3},
-        2: {"WALL": 4, "WATER": 6, "EMPTY": 4, "PATH": 4},
-        3: {"EMPTY": 2, "PATH": 2, "WALL": 2},
-        4: {"WALL": 6, "STONE": 6, "EMPTY": 8, "PATH": 6, "WATER": 4},
-        5: {"WALL": 7, "STONE": 7, "EMPTY": 7, "PATH": 7, "WATER": 6},
-    }
-
-    shift_map = color_shift_effects.get(color_shift, {})
-
-    color_map = []
-    for row in world_map:
-        color_row = []
-        for cell in row:
-            terrain_type = LEGEND[cell]
-
-            if terrain_type in shift_map:
-                color_row.append(str(shift_map[terrain_type]))
-            else:
-                color_row.append(str(TERRAIN_COLORS[terrain_type]))
-        color_map.append(color_row)
-    return color_map
+    return map_tiles(world_map, get_color_lookup(color_shift))
+
+
+def get_color_layer(world_map, color_shift=0):
+    """
+    Get the cached, lazily computed color layer for a map and color theme.
+
+    The layer is shared between calls with the same map and color shift, so returning to
+    a map does not recolor it. Rows are only computed when a renderer first reads them,
+    and tiles changed through `set_tile` refresh just their row.
+
+    :param world_map: list[list[int]], the map grid to color.
+    :param color_shift: int, the identifier for the color theme shift to apply.
+    :precondition: world_map must be a valid map grid using integers defined in LEGEND.
+    :postcondition: Registers the layer in the map cache if it was not cached yet.
+    :return: LazyColorLayer | ChunkedColorLayer, indexable as layer[y][x] like the result of generate_color_map.
+    >>> sample_map_colors = [[1, 0], [0, 1]]
+    >>> get_color_layer(sample_map_colors, 1)[0][0]
+    '3'
+    >>> get_color_layer(sample_map_colors, 1) is get_color_layer(sample_map_colors, 1)
+    True
+    """
+    if isinstance(world_map, ChunkedMap):
+        layer_type = ChunkedColorLayer
+        source = world_map.world
+    else:
+        layer_type = LazyColorLayer
+        source = world_map
+
+    return get_layer(
+        world_map,
+        ("colors", color_shift),
+        lambda grid: layer_type(source, get_color_lookup(color_shift)),
+        on_mutate=lambda layer, x, y: layer.invalidate(y),
+    )
+
 
+WORLD_COLORS = get_color_layer(WORLD_MAP)
 
-ACTIVE_COLORS = generate_color_map(ACTIVE_MAP)
+ACTIVE_COLORS = WORLD_COLORS
 
 
 def generate_new_dungeon(width=40, height=20):
@@ -148,13 +224,13 @@ def generate_new_dungeon(width=40, height=20):
     :postcondition: Ensures the returned spawn point is valid.
     :return: tuple[float, float], the (x, y) coordinates for player spawn (center of tile).
     """
-    from map.dungeon_generator import generate_dungeon_level, ARCHETYPES
+    from map.dungeon_generator import generate_dungeon_level
 
     dungeon_map, spawn_x, spawn_y, archetype_key = generate_dungeon_level(width, height)
     global ACTIVE_MAP, CURRENT_COLOR_SHIFT, ACTIVE_COLORS
     ACTIVE_MAP = dungeon_map
     CURRENT_COLOR_SHIFT = ARCHETYPES[archetype_key]["color_shift"]
-    ACTIVE_COLORS = generate_color_map(ACTIVE_MAP, CURRENT_COLOR_SHIFT)
+    ACTIVE_COLORS = get_color_layer(ACTIVE_MAP, CURRENT_COLOR_SHIFT)
 
     if not is_spawn_valid(spawn_x, spawn_y, ACTIVE_MAP):
         spawn_x, spawn_y = find_valid_spawn(ACTIVE_MAP)
@@ -162,22 +238,43 @@ def generate_new_dungeon(width=40, height=20):
     return spawn_x + 0.5, spawn_y + 0.5
 
 
+def _get_level_colors(level):
+    """Cache a loaded level's color plane as its color layer, patched on set_tile"""
+    world_map = level["map"]
+    lookup = get_color_lookup(level["color_shift"])
+
+    def _patch_color(colors, x, y):
+        if x is not None and y is not None:
+            colors[y][x] = int(lookup[world_map[y][x]])
+
+    return get_layer(
+        world_map,
+        ("colors", level["color_shift"]),
+        lambda grid: level["colors"],
+        on_mutate=_patch_color,
+    )
+
+
 def switch_map(map_id, player_level=1):
     """
     Switch the active map between the static overworld and generated dungeons, or generate a new level.
 
     Handles logic for entering/leaving dungeons and boss arenas, updating global map state.
 
-    :param map_id: int | str, identifier for the target map (1 for overworld, 2+ or 'boss_arena' for dungeons).
+    :param map_id: int | str, identifier for the target map (1 for overworld, 2+ or 'boss_arena' for dungeons, 'chunked' for an endless chunked dungeon, or the path of a level file).
     :param player_level: int, the current player level, used to determine boss door placement.
     :precondition: Global map state variables (ACTIVE_MAP, etc.) must be initialized.
     :precondition: `map.dungeon_generator` must be available if generating new levels.
-    :postcondition: Updates global ACTIVE_MAP, ACTIVE_COLORS, CURRENT_MAP_TYPE, CURRENT_COLOR_SHIFT.
+    :postcondition: Updates global ACTIVE_MAP, ACTIVE_COLORS, CURRENT_MAP_TYPE, CURRENT_COLOR_SHIFT, LEVEL_SPAWNS.
     :postcondition: Places a boss door (tile 10) in new dungeons if player_level >= 3.
     :return: tuple[list[list[int]], list[list[str]], tuple[float, float], bool], the new map, new colors, player spawn coordinates, and a flag indicating if a new dungeon was entered.
     """
-    global ACTIVE_MAP, ACTIVE_COLORS, CURRENT_MAP_TYPE, CURRENT_COLOR_SHIFT
+    global ACTIVE_MAP, ACTIVE_COLORS, CURRENT_MAP_TYPE, CURRENT_COLOR_SHIFT, LEVEL_SPAWNS
+    if ACTIVE_MAP is not WORLD_MAP:
+        # Only the overworld is ever returned to; every other map is left for good
+        release_map(ACTIVE_MAP)
     is_new_dungeon = False
+    LEVEL_SPAWNS = []
 
     if map_id == "boss_arena":
         from map.dungeon_generator import generate_boss_arena
@@ -186,13 +283,37 @@ def switch_map(map_id, player_level=1):
         ACTIVE_MAP = boss_map
 
         CURRENT_COLOR_SHIFT = 5
-        ACTIVE_COLORS = generate_color_map(ACTIVE_MAP, CURRENT_COLOR_SHIFT)
+        ACTIVE_COLORS = get_color_layer(ACTIVE_MAP, CURRENT_COLOR_SHIFT)
+        get_wall_distance_field(ACTIVE_MAP)
 
         player_spawn = (entrance_x + 0.5, entrance_y + 0.5)
         CURRENT_MAP_TYPE = 999
         is_new_dungeon = True
         return ACTIVE_MAP, ACTIVE_COLORS, player_spawn, is_new_dungeon
 
+    if isinstance(map_id, str) and map_id.endswith(LEVEL_EXTENSION):
+        level = load_level(map_id)
+        ACTIVE_MAP = level["map"]
+        CURRENT_COLOR_SHIFT = level["color_shift"]
+        ACTIVE_COLORS = _get_level_colors(level)
+        get_wall_distance_field(ACTIVE_MAP)
+        LEVEL_SPAWNS = level["entities"]
+        CURRENT_MAP_TYPE = max(1, CURRENT_MAP_TYPE)
+        return ACTIVE_MAP, ACTIVE_COLORS, level["spawn"], True
+
+    if map_id == "chunked":
+        world = create_chunked_world()
+        ACTIVE_MAP = ChunkedMap(world)
+        CURRENT_COLOR_SHIFT = ARCHETYPES[world["archetype"]]["color_shift"]
+        ACTIVE_COLORS = get_color_layer(ACTIVE_MAP, CURRENT_COLOR_SHIFT)
+
+        spawn_x, spawn_y = find_chunk_spawn(
+            world, world["chunks_wide"] // 2, world["chunks_high"] // 2
+        )
+        player_spawn = (spawn_x + 0.5, spawn_y + 0.5)
+        CURRENT_MAP_TYPE = max(1, CURRENT_MAP_TYPE)
+        return ACTIVE_MAP, ACTIVE_COLORS, player_spawn, True
+
     if map_id != 1 and CURRENT_MAP_TYPE == 0:
         # Generate first dungeon level
         player_spawn = generate_new_dungeon()
@@ -208,14 +329,14 @@ def switch_map(map_id, player_level=1):
     elif map_id == 1 and CURRENT_MAP_TYPE > 0:
         ACTIVE_MAP = WORLD_MAP
         CURRENT_COLOR_SHIFT = 0
-        ACTIVE_COLORS = generate_color_map(ACTIVE_MAP)
+        ACTIVE_COLORS = get_color_layer(WORLD_MAP)
         player_spawn = (10.5, 8.5)
         CURRENT_MAP_TYPE = 0
 
     else:
         ACTIVE_MAP = WORLD_MAP
         CURRENT_COLOR_SHIFT = 0
-        ACTIVE_COLORS = generate_color_map(ACTIVE_MAP)
+        ACTIVE_COLORS = get_color_layer(WORLD_MAP)
         player_spawn = (10.5, 8.5)
         CURRENT_MAP_TYPE = 0
 
@@ -228,14 +349,17 @@ def switch_map(map_id, player_level=1):
             for dx, dy in DIRECTIONS:
                 new_x, new_y = door_x + dx, door_y + dy
                 if is_valid_boss_door_location(ACTIVE_MAP, new_x, new_y):
-                    ACTIVE_MAP[new_y][new_x] = 10
+                    set_tile(ACTIVE_MAP, new_x, new_y, 10)
                     placed = True
                     break
 
             if not placed:
                 boss_door_pos = find_nearby_empty_space(ACTIVE_MAP, door_x, door_y)
                 if boss_door_pos:
-                    ACTIVE_MAP[boss_door_pos[1]][boss_door_pos[0]] = 10
+                    set_tile(ACTIVE_MAP, boss_door_pos[0], boss_door_pos[1], 10)
+
+    # Build the renderer's sphere-tracing field now rather than on the first frame
+    get_wall_distance_field(ACTIVE_MAP)
 
     return ACTIVE_MAP, ACTIVE_COLORS, player_spawn, is_new_dungeon
 
@@ -382,7 +506,7 @@ def find_valid_spawn(current_map):
     """
     Find a guaranteed valid spawn location if the initial one fails.
 
-    Searches the map for any walkable tile, defaulting to carving out the center if none are found.
+    Takes the first walkable tile from the map's free-cell index, defaulting to carving out the center if none are found.
 
     :param current_map: list[list[int]], the map grid.
     :precondition: current_map must be a valid 2D list.
@@ -396,16 +520,65 @@ def find_valid_spawn(current_map):
     if is_spawn_valid(center_x, center_y, current_map):
         return center_x, center_y
 
-    for y in range(1, height - 1):
-        for x in range(1, width - 1):
-            if is_spawn_valid(x, y, current_map):
-                return x, y
+    free_cells = get_free_cell_index(current_map)
+    if free_cells:
+        return free_cells.cell(0)
 
-    center_x, center_y = width // 2, height // 2
-    current_map[center_y][center_x] = 0
+    set_tile(current_map, center_x, center_y, 0)
     return center_x, center_y
 
 
+def trace_interaction(
+    player_x, player_y, player_angle, world_map, max_distance=INTERACT_DISTANCE
+):
+    """
+    Walk the grid cells along the player's view ray until something blocks it.
+
+    Uses a DDA traversal, so every cell the ray enters is visited exactly once and the
+    distance to the hit is exact. Tiles are classified through TILE_INTERACTIONS.
+
+    :param player_x: float, the player's current x-coordinate.
+    :param player_y: float, the player's current y-coordinate.
+    :param player_angle: float, the player's current viewing angle in radians.
+    :param world_map: list[list[int]], the map grid.
+    :param max_distance: float, how far the ray reaches.
+    :precondition: Player coordinates and angle must be valid. world_map must be a valid map.
+    :postcondition: Does not modify world_map.
+    :return: tuple[str | None, int | None, int | None, float | None], the type of object hit, its (x, y) integer coordinates and the distance to it, or all None if nothing is hit within range.
+    >>> trace_interaction(1.5, 1.5, 0.0, [[1, 1, 1, 1], [1, 0, 0, 6], [1, 1, 1, 1]])
+    ('door', 3, 1, 1.5)
+    """
+    dir_x, dir_y = math.cos(player_angle), math.sin(player_angle)
+    map_x, map_y = int(player_x), int(player_y)
+    height, width = len(world_map), len(world_map[0])
+
+    delta_x = abs(1 / dir_x) if dir_x else math.inf
+    delta_y = abs(1 / dir_y) if dir_y else math.inf
+    step_x = 1 if dir_x >= 0 else -1
+    step_y = 1 if dir_y >= 0 else -1
+    side_x = ((map_x + 1 - player_x) if dir_x >= 0 else (player_x - map_x)) * delta_x
+    side_y = ((map_y + 1 - player_y) if dir_y >= 0 else (player_y - map_y)) * delta_y
+
+    while True:
+        if side_x < side_y:
+            distance = side_x
+            side_x += delta_x
+            map_x += step_x
+        else:
+            distance = side_y
+            side_y += delta_y
+            map_y += step_y
+
+        if distance > max_distance:
+            return None, None, None, None
+        if not (0 <= map_x < width and 0 <= map_y < height):
+            return None, None, None, None
+
+        kind = TILE_INTERACTIONS.get(world_map[map_y][map_x], "wall")
+        if kind is not None:
+            return kind, map_x, map_y, distance
+
+
 def interact_raycast(player_x, player_y, player_angle, world_map):
     """
     Cast a short ray forward from the player to detect interactable objects.
@@ -420,37 +593,10 @@ def interact_raycast(player_x, player_y, player_angle, world_map):
     :postcondition: Identifies the type and location of the first interactable or blocking object hit by the ray.
     :return: tuple[str | None, int | None, int | None], the type of object hit ('door', 'boss_door', 'stairs', 'wall', or None), and its (x, y) integer coordinates, or (None, None, None) if nothing is hit within range.
     """
-    max_distance = 2.0
-    distance = 0
-
-    while distance < max_distance:
-
-        distance += 0.1
-
-        test_x = player_x + distance * math.cos(player_angle)
-        test_y = player_y + distance * math.sin(player_angle)
-
-        if (
-            int(test_x) < 0
-            or int(test_x) >= len(world_map[0])
-            or int(test_y) < 0
-            or int(test_y) >= len(world_map)
-        ):
-            return None, None, None
-
-        cell_type = world_map[int(test_y)][int(test_x)]
-
-        if cell_type == 6:
-            return "door", int(test_x), int(test_y)
-        elif cell_type == 10:
-            return "boss_door", int(test_x), int(test_y)
-        elif cell_type == 7:
-            return "stairs", int(test_x), int(test_y)
-
-        elif cell_type != 0 and cell_type != 4 and cell_type != 9:
-            return "wall", int(test_x), int(test_y)
-
-    return None, None, None
+    object_type, hit_x, hit_y, _ = trace_interaction(
+        player_x, player_y, player_angle, world_map
+    )
+    return object_type, hit_x, hit_y
 
 
 # TODO: Figure out how to scale the map.
@@ -518,9 +664,6 @@ def get_map_str(player_x, player_y):
     return map_str.strip()  # Remove trailing newline
 
 
-WORLD_COLORS = generate_color_map()
-
-
 def get_terrain_at(x, y):
     """
     Get the terrain type name (e.g., 'WALL', 'EMPTY') at the given float coordinates.
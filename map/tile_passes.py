@@ -0,0 +1,157 @@
+import random
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, every pass has a pure-Python fallback
+    np = None
+
+
+NUMPY_MIN_CELLS = 4096
+
+
+def _use_numpy(grid, force_python):
+    return (
+        np is not None
+        and not force_python
+        and len(grid) * len(grid[0]) >= NUMPY_MIN_CELLS
+    )
+
+
+def scatter_tiles(
+    dungeon,
+    wall_tile,
+    special_wall_tile,
+    floor_tile,
+    decor_tiles,
+    special_chance=0.15,
+    decor_chance=0.05,
+    force_python=False,
+):
+    """
+    Sprinkle special walls and decor over the interior of a dungeon, then seal its border.
+
+    Every interior wall tile becomes a special wall with probability special_chance, and
+    every interior floor tile becomes a random decor tile with probability decor_chance.
+    Large maps are processed as masked NumPy array operations when NumPy is installed;
+    the pure-Python pass produces the same distribution.
+
+    :param dungeon: a 2D list representing the dungeon layout
+    :param wall_tile: an integer representing the archetype's wall tile
+    :param special_wall_tile: an integer representing the tile walls are swapped for
+    :param floor_tile: an integer representing the archetype's floor tile
+    :param decor_tiles: a list of integers to choose decor from, may be empty
+    :param special_chance: a float representing the chance a wall becomes special
+    :param decor_chance: a float representing the chance a floor becomes decor
+    :param force_python: a boolean, True to skip the NumPy pass
+    :precondition: dungeon must be a rectangular 2D list at least 3 cells wide and high
+    :postcondition: modifies dungeon in place, leaving every border cell set to wall_tile
+
+    >>> sample_map_scatter = [[0 for _ in range(6)] for _ in range(5)]
+    >>> scatter_tiles(sample_map_scatter, 1, 8, 0, [], decor_chance=1.0)
+    >>> sample_map_scatter[0] == [1] * 6 and sample_map_scatter[2][1:5] == [0] * 4
+    True
+    >>> scatter_tiles(sample_map_scatter, 1, 8, 0, [3], decor_chance=1.0)
+    >>> sample_map_scatter[2][1:5]
+    [3, 3, 3, 3]
+    """
+    if _use_numpy(dungeon, force_python):
+        _scatter_tiles_numpy(
+            dungeon,
+            wall_tile,
+            special_wall_tile,
+            floor_tile,
+            decor_tiles,
+            special_chance,
+            decor_chance,
+        )
+        return
+
+    height, width = len(dungeon), len(dungeon[0])
+    roll = random.random
+    choose = random.choice
+
+    for y in range(1, height - 1):
+        row = dungeon[y]
+        for x in range(1, width - 1):
+            tile = row[x]
+            if tile == wall_tile:
+                if roll() < special_chance:
+                    row[x] = special_wall_tile
+            elif tile == floor_tile and decor_tiles:
+                if roll() < decor_chance:
+                    row[x] = choose(decor_tiles)
+
+    fill_border(dungeon, wall_tile)
+
+
+def _scatter_tiles_numpy(
+    dungeon,
+    wall_tile,
+    special_wall_tile,
+    floor_tile,
+    decor_tiles,
+    special_chance,
+    decor_chance,
+):
+    """Vectorised body of scatter_tiles, seeded from the random module for reproducibility"""
+    grid = np.array(dungeon, dtype=np.int16)
+    rng = np.random.default_rng(random.getrandbits(64))
+
+    interior = grid[1:-1, 1:-1]
+    rolls = rng.random(interior.shape)
+
+    special_mask = (interior == wall_tile) & (rolls < special_chance)
+    decor_mask = (interior == floor_tile) & (rolls < decor_chance)
+
+    interior[special_mask] = special_wall_tile
+    if decor_tiles:
+        interior[decor_mask] = rng.choice(decor_tiles, size=int(decor_mask.sum()))
+
+    grid[0, :] = grid[-1, :] = wall_tile
+    grid[:, 0] = grid[:, -1] = wall_tile
+
+    dungeon[:] = grid.tolist()
+
+
+def fill_border(grid, tile):
+    """
+    Set every cell on the outer ring of a grid to the given tile.
+
+    :param grid: a 2D list representing a map layout
+    :param tile: an integer representing the tile to write
+    :precondition: grid must be a rectangular 2D list
+    :postcondition: modifies grid in place so its first and last rows and columns hold tile
+
+    >>> sample_map_border = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
+    >>> fill_border(sample_map_border, 8)
+    >>> sample_map_border
+    [[8, 8, 8], [8, 0, 8], [8, 8, 8]]
+    """
+    width = len(grid[0])
+    grid[0][:] = [tile] * width
+    grid[-1][:] = [tile] * width
+    for row in grid:
+        row[0] = row[-1] = tile
+
+
+def map_tiles(grid, lookup, force_python=False):
+    """
+    Translate every tile of a grid through a lookup table.
+
+    :param grid: a 2D list of integer tiles
+    :param lookup: a dict mapping every tile value present in grid to its replacement
+    :param force_python: a boolean, True to skip the NumPy pass
+    :precondition: every tile in grid must be a key of lookup
+    :postcondition: grid is not modified
+    :return: a new 2D list the same size as grid holding the translated values
+
+    >>> map_tiles([[0, 1], [1, 0]], {0: ".", 1: "#"})
+    [['.', '#'], ['#', '.']]
+    """
+    if _use_numpy(grid, force_python):
+        table = np.empty(max(lookup) + 1, dtype=object)
+        for tile, value in lookup.items():
+            table[tile] = value
+        return table[np.array(grid, dtype=np.intp)].tolist()
+
+    return [[lookup[tile] for tile in row] for row in grid]
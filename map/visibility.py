@@ -0,0 +1,143 @@
+import math
+
+from map.distance_field import WALKABLE_TILES
+from map.map_cache import get_layer
+
+
+VIEW_DISTANCE = 20.0
+SECTOR_SIZE = 4
+
+
+def sector_of(x, y):
+    """
+    Get the sector key of a world position.
+
+    >>> sector_of(9.5, 3.2)
+    (2, 0)
+    """
+    return int(x) // SECTOR_SIZE, int(y) // SECTOR_SIZE
+
+
+def _box_distances(left, top, right, bottom, x, y):
+    """Get the nearest and farthest distance between a box and the cell at (x, y)"""
+    near_x = max(0, left - (x + 1), x - right)
+    near_y = max(0, top - (y + 1), y - bottom)
+    far_x = max(x + 1 - left, right - x)
+    far_y = max(y + 1 - top, bottom - y)
+    return math.hypot(near_x, near_y), math.hypot(far_x, far_y)
+
+
+def compute_sector_visibility(world_map, sector, max_distance=VIEW_DISTANCE):
+    """
+    Compute which sectors can be seen from anywhere inside a sector.
+
+    A line of sight only crosses walkable cells, each one touching the next across an
+    edge or a corner, and never leaves the view distance of its start. So flooding the
+    walkable cells from the sector, 8-connected and only as far as the view distance,
+    reaches every cell that can be seen from any point of the sector, plus the walls
+    bounding them. The result is a conservative potentially-visible set: anything
+    outside it is hidden by walls or beyond the view distance from every position in
+    the sector. Cells reached around corners are kept too; the renderer's per-column
+    wall test still hides what is behind them.
+
+    :param world_map: list[list[int]], the map grid.
+    :param sector: tuple[int, int], the sector key, as returned by sector_of.
+    :param max_distance: float, how far the player can see.
+    :precondition: world_map must be a valid map grid.
+    :postcondition: Does not modify world_map.
+    :return: dict, with the "sectors" frozenset of visible sector keys and "max_distance",
+             an upper bound on the distance from any point of the sector to any point
+             of a walkable cell it can see.
+    >>> corridor = [[1] * 12, [1] + [0] * 10 + [1], [1] * 12]
+    >>> pvs = compute_sector_visibility(corridor, (0, 0))
+    >>> (2, 0) in pvs["sectors"], (0, 2) in pvs["sectors"], pvs["max_distance"] <= 12
+    (True, False, True)
+    """
+    sector_x, sector_y = sector
+    height, width = len(world_map), len(world_map[0]) if world_map else 0
+    left, top = sector_x * SECTOR_SIZE, sector_y * SECTOR_SIZE
+    right, bottom = min(width, left + SECTOR_SIZE), min(height, top + SECTOR_SIZE)
+
+    frontier = [
+        (x, y)
+        for y in range(top, bottom)
+        for x in range(left, right)
+        if world_map[y][x] in WALKABLE_TILES
+    ]
+    reached = set(frontier)
+    visible = set()
+    longest = 0.0
+
+    while frontier:
+        x, y = frontier.pop()
+        visible.add((x // SECTOR_SIZE, y // SECTOR_SIZE))
+        if world_map[y][x] not in WALKABLE_TILES:
+            continue  # Walls are seen, but not seen through
+        longest = max(longest, _box_distances(left, top, right, bottom, x, y)[1])
+
+        for next_y in range(max(0, y - 1), min(height, y + 2)):
+            for next_x in range(max(0, x - 1), min(width, x + 2)):
+                if (next_x, next_y) in reached:
+                    continue
+                if _box_distances(left, top, right, bottom, next_x, next_y)[0] > max_distance:
+                    continue
+                reached.add((next_x, next_y))
+                frontier.append((next_x, next_y))
+
+    return {"sectors": frozenset(visible), "max_distance": min(max_distance, longest)}
+
+
+def get_visibility(world_map, x, y):
+    """
+    Get the potentially-visible set for a position, computing its sector on first use.
+
+    Results are cached per map until it changes through set_tile, so each sector is only
+    computed the first time the player enters it.
+
+    :param world_map: list[list[int]], the map grid.
+    :param x: float, the viewer's x-coordinate.
+    :param y: float, the viewer's y-coordinate.
+    :precondition: world_map must be a valid map grid.
+    :postcondition: Stores the sector's visibility in the map cache.
+    :return: dict, as returned by compute_sector_visibility.
+    """
+    sectors = get_layer(world_map, "pvs", lambda grid: {})
+    sector = sector_of(x, y)
+    pvs = sectors.get(sector)
+    if pvs is None:
+        pvs = sectors[sector] = compute_sector_visibility(world_map, sector)
+    return pvs
+
+
+def build_pvs(world_map):
+    """
+    Precompute the potentially-visible set of every sector that has a walkable cell.
+
+    Meant for load time or offline use; get_visibility fills the same cache lazily.
+
+    :param world_map: list[list[int]], the map grid.
+    :precondition: world_map must be a valid map grid.
+    :postcondition: Every sector's visibility is stored in the map cache.
+    :return: dict[tuple[int, int], dict], the visibility of every computed sector.
+    >>> sample_map_pvs = [[1, 1, 1], [1, 0, 1], [1, 1, 1]]
+    >>> sorted(build_pvs(sample_map_pvs))
+    [(0, 0)]
+    """
+    sectors = get_layer(world_map, "pvs", lambda grid: {})
+    for y, row in enumerate(world_map):
+        for x, tile in enumerate(row):
+            sector = sector_of(x, y)
+            if tile in WALKABLE_TILES and sector not in sectors:
+                sectors[sector] = compute_sector_visibility(world_map, sector)
+    return sectors
+
+
+def is_potentially_visible(pvs, x, y):
+    """
+    Check whether a position can possibly be seen according to a visibility set.
+
+    >>> pvs = {"sectors": frozenset({(0, 0)}), "max_distance": 5.0}
+    >>> is_potentially_visible(pvs, 2.5, 3.5), is_potentially_visible(pvs, 6.5, 1.0)
+    (True, False)
+    """
+    return sector_of(x, y) in pvs["sectors"]
@@ -0,0 +1,81 @@
+from map.distance_field import WALKABLE_TILES
+from map.map_cache import get_layer
+
+
+def build_wall_distance_field(world_map, walkable=WALKABLE_TILES):
+    """
+    Compute, for every cell, how many cells away the nearest opaque cell is.
+
+    Distances use the Chebyshev metric (diagonal neighbours are 1 apart) and everything
+    outside the map counts as opaque. Two chamfer passes make the cost linear in the
+    number of cells. A point anywhere inside a cell with distance d is at least d - 1
+    tiles away from every opaque cell, which is the safe step for sphere tracing.
+
+    :param world_map: list[list[int]], the map grid.
+    :param walkable: a collection of tile values that rays pass through.
+    :precondition: world_map must be a valid, rectangular map grid.
+    :postcondition: Does not modify world_map.
+    :return: list[list[int]], the distance of every cell; 0 for opaque cells.
+    >>> build_wall_distance_field([[0, 0, 0, 0, 0]] * 5)[2]
+    [1, 2, 3, 2, 1]
+    >>> build_wall_distance_field([[0, 1, 0]])
+    [[1, 0, 1]]
+    """
+    height = len(world_map)
+    width = len(world_map[0]) if height > 0 else 0
+    field = [
+        [
+            min(x + 1, y + 1, width - x, height - y) if tile in walkable else 0
+            for x, tile in enumerate(row)
+        ]
+        for y, row in enumerate(world_map)
+    ]
+
+    for y in range(height):
+        row = field[y]
+        above = field[y - 1] if y > 0 else None
+        for x in range(width):
+            best = row[x]
+            if best <= 1:
+                continue
+            if x > 0 and row[x - 1] + 1 < best:
+                best = row[x - 1] + 1
+            if above is not None:
+                for near_x in (x - 1, x, x + 1):
+                    if 0 <= near_x < width and above[near_x] + 1 < best:
+                        best = above[near_x] + 1
+            row[x] = best
+
+    for y in range(height - 1, -1, -1):
+        row = field[y]
+        below = field[y + 1] if y < height - 1 else None
+        for x in range(width - 1, -1, -1):
+            best = row[x]
+            if best <= 1:
+                continue
+            if x < width - 1 and row[x + 1] + 1 < best:
+                best = row[x + 1] + 1
+            if below is not None:
+                for near_x in (x - 1, x, x + 1):
+                    if 0 <= near_x < width and below[near_x] + 1 < best:
+                        best = below[near_x] + 1
+            row[x] = best
+
+    return field
+
+
+def get_wall_distance_field(world_map):
+    """
+    Get the cached wall-distance field of a map, building it on first use.
+
+    Chunked maps are unbounded for practical purposes and have no field; renderers fall
+    back to fixed-step marching on them.
+
+    :param world_map: list[list[int]] | ChunkedMap, the map grid.
+    :precondition: world_map must be a valid map grid.
+    :postcondition: The field is cached until the map changes through set_tile.
+    :return: list[list[int]] | None, the field, or None for chunked maps.
+    """
+    if hasattr(world_map, "window"):
+        return None
+    return get_layer(world_map, "wall_distance", build_wall_distance_field)
@@ -0,0 +1,290 @@
+"""
+Serve the game over telnet, to many players at once.
+
+    python3 -m net.server --port 4000
+    telnet localhost 4000
+
+Every connection gets its own player and screen. Players on the same level share one
+world: its map, its enemies and projectiles, and its messages. The whole server runs
+on one asyncio event loop, and every tick simulates each world once and then draws a
+frame for each of its players. Frames only carry the cells that changed since the
+player's previous one, and a player whose connection cannot keep up is skipped until
+the output it already has is sent, instead of being queued ever more frames.
+"""
+
+import argparse
+import asyncio
+
+import ui
+from map.chunked_world import full_map_view
+from net.telnet import NEGOTIATION, TelnetDecoder
+from player import create_player
+from renderer import render_full_map, render_world
+from renderer.ansi_backend import CLEAR_SCREEN, HIDE_CURSOR, RESET, SHOW_CURSOR, AnsiBackend
+from utils import game_clock
+from world_instance import SURFACE_SPAWN, create_world_instance
+
+
+DEFAULT_PORT = 4000
+TICK_RATE = 20  # Ticks per second; every tick draws a frame for every player
+DEFAULT_SCREEN = (24, 80)
+MAX_SCREEN = (150, 300)  # Bigger windows are clipped, to bound the cost of a frame
+MAX_PENDING_OUTPUT = 256 * 1024  # Bytes a client may have unsent before frames are skipped
+MAX_DELTA_TIME = 0.1
+
+
+def create_game_server():
+    """
+    Create the state of a game server with no players yet.
+
+    :postcondition: No world exists until the first player joins.
+    :return: dict, with the "worlds" by depth and the connected "sessions".
+    >>> create_game_server()
+    {'worlds': {}, 'sessions': []}
+    """
+    return {"worlds": {}, "sessions": []}
+
+
+def join_world(server, session, depth):
+    """
+    Move a session's player to the spawn of the world at a depth, creating it if needed.
+
+    :param server: dict, as returned by create_game_server.
+    :param session: TelnetSession, the player's connection.
+    :param depth: int, the depth of the world to join.
+    :precondition: depth must not be negative.
+    :postcondition: The session is in exactly one world; an empty dungeon it left is dropped.
+    :return: dict, the world joined, with its "depth", its WorldInstance "instance", its
+             "sessions" and the "last_time" it was ticked.
+    """
+    leave_world(server, session)
+    world = server["worlds"].get(depth)
+    if world is None:
+        world = server["worlds"][depth] = {
+            "depth": depth,
+            "instance": create_world_instance(depth),
+            "sessions": [],
+            "last_time": None,
+        }
+    world["sessions"].append(session)
+    world["instance"].add_player(session.player)
+    session.world = world
+    session.player["stages_descended"] = depth
+    return world
+
+
+def leave_world(server, session):
+    """Take a session out of its world, dropping the world if it was the last one in a dungeon"""
+    world = session.world
+    if world is None:
+        return
+    world["sessions"].remove(session)
+    world["instance"].remove_player(session.player)
+    session.world = None
+    if not world["sessions"] and world["depth"] > 0:
+        del server["worlds"][world["depth"]]
+        world["instance"].close()
+
+
+class TelnetSession(asyncio.Protocol):
+    """One player's telnet connection, with their player state and screen."""
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.decoder = TelnetDecoder()
+        self.keys = []
+        self.screen = AnsiBackend(*DEFAULT_SCREEN)
+        self.player = create_player(*SURFACE_SPAWN)
+        self.world = None
+        self.next_depth = None
+        self.can_write = True
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.frames_skipped = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.set_write_buffer_limits(high=MAX_PENDING_OUTPUT)
+        transport.write(NEGOTIATION + HIDE_CURSOR.encode())
+        self.server["sessions"].append(self)
+        join_world(self.server, self, 0)
+
+    def data_received(self, data):
+        keys, size = self.decoder.feed(data)
+        self.keys.extend(keys)
+        if size is not None:
+            height = min(size[0], MAX_SCREEN[0])
+            width = min(size[1], MAX_SCREEN[1])
+            if (height, width) != self.screen.getmaxyx():
+                self.screen.resize(height, width)
+
+    def connection_lost(self, exc):
+        leave_world(self.server, self)
+        if self in self.server["sessions"]:
+            self.server["sessions"].remove(self)
+
+    def pause_writing(self):
+        # Called by asyncio once more than MAX_PENDING_OUTPUT bytes are waiting
+        self.can_write = False
+
+    def resume_writing(self):
+        # Frames skipped meanwhile were never encoded, so the next one carries their changes
+        self.can_write = True
+
+    def close(self):
+        """Restore the client's terminal and hang up"""
+        if self.transport is not None and not self.transport.is_closing():
+            self.transport.write((RESET + CLEAR_SCREEN + SHOW_CURSOR).encode())
+            self.transport.close()
+
+
+def _update_session(session, world, delta_time, current_time):
+    """Apply a player's input, hanging up if they quit and sending them down if they took a door"""
+    keys, session.keys = session.keys, []
+    outcome = world["instance"].apply_input(
+        session.player, keys, delta_time, current_time, session.screen.getmaxyx()
+    )
+    if outcome == "quit":
+        session.close()
+    elif outcome == "door":
+        session.next_depth = world["depth"] + 1
+
+
+def _draw_session(session, world):
+    """Draw a player's view and send it, unless their connection is backed up"""
+    if not session.can_write or session.transport.is_closing():
+        session.frames_skipped += 1
+        return
+
+    instance = world["instance"]
+    screen = session.screen
+    player_state = session.player
+    screen.erase()
+    if player_state["map_mode"]:
+        view_map, view_colors, view_x, view_y = full_map_view(
+            instance.map, instance.colors, player_state["x"], player_state["y"]
+        )
+        render_full_map(
+            screen, view_x, view_y, player_state["angle"], view_map, view_colors
+        )
+    else:
+        render_world(
+            screen,
+            player_state["x"],
+            player_state["y"],
+            player_state["angle"],
+            instance.map,
+            instance.colors,
+            player_state,
+            visible_entities=instance.visible_entities(player_state["x"], player_state["y"]),
+        )
+    ui.draw_ui_layer(screen, player_state)
+
+    frame = screen.encode_frame()
+    if frame:
+        session.transport.write(frame)
+        session.bytes_sent += len(frame)
+    session.frames_sent += 1
+
+
+def tick_world(world, current_time):
+    """
+    Run one tick of a world: every player's input, then its entities, then every frame.
+
+    :param world: dict, as returned by join_world.
+    :param current_time: float, the game clock time of the tick.
+    :precondition: current_time must not be before the world's previous tick.
+    :postcondition: Sets next_depth on the sessions that took a door.
+    :return: None
+    """
+    last_time = world["last_time"]
+    delta_time = 0.0 if last_time is None else min(current_time - last_time, MAX_DELTA_TIME)
+    world["last_time"] = current_time
+
+    instance = world["instance"]
+    outside = instance.enter()
+    try:
+        for session in list(world["sessions"]):
+            _update_session(session, world, delta_time, current_time)
+
+        instance.step(delta_time)
+
+        for session in world["sessions"]:
+            _draw_session(session, world)
+    finally:
+        instance.leave(outside)
+
+
+def tick_server(server, current_time):
+    """
+    Run one tick of every world, then move players who took a door or died.
+
+    :param server: dict, as returned by create_game_server.
+    :param current_time: float, the game clock time of the tick.
+    :precondition: The game clock should read current_time.
+    :postcondition: Every world with players has advanced by one tick.
+    :return: None
+    """
+    for world in list(server["worlds"].values()):
+        if world["sessions"]:
+            tick_world(world, current_time)
+
+    for session in list(server["sessions"]):
+        if session.player["health"] <= 0:
+            # Start over on the surface with a fresh character
+            leave_world(server, session)
+            session.player = create_player(*SURFACE_SPAWN)
+            session.next_depth = 0
+        if session.next_depth is not None:
+            join_world(server, session, session.next_depth)
+            session.next_depth = None
+
+
+async def run_ticks(server, tick_rate=TICK_RATE, stop=None):
+    """
+    Tick the server at a fixed rate until stop is set.
+
+    :param server: dict, as returned by create_game_server.
+    :param tick_rate: float, ticks per second.
+    :param stop: asyncio.Event | None, ends the loop once set; None runs forever.
+    :precondition: Must run on the event loop that serves the sessions.
+    :postcondition: Puts the game clock back to the wall clock when it stops.
+    :return: None
+    """
+    loop = asyncio.get_running_loop()
+    interval = 1 / tick_rate
+    try:
+        while stop is None or not stop.is_set():
+            started = loop.time()
+            tick_server(server, game_clock.advance())
+            await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
+    finally:
+        game_clock.stop_ticks()
+
+
+async def serve(host="127.0.0.1", port=DEFAULT_PORT, tick_rate=TICK_RATE):
+    """Accept telnet connections and run the game for them until cancelled"""
+    server = create_game_server()
+    loop = asyncio.get_running_loop()
+    listener = await loop.create_server(lambda: TelnetSession(server), host, port)
+    print(f"Serving on {', '.join(str(s.getsockname()) for s in listener.sockets)}")
+    async with listener:
+        await run_ticks(server, tick_rate)
+
+
+def main(argv=None):
+    """Parse the command line and serve the game"""
+    parser = argparse.ArgumentParser(description="Serve the game over telnet")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument("--tick-rate", type=float, default=TICK_RATE, help="ticks per second")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.tick_rate))
+    except KeyboardInterrupt:
+        print("Server stopped")
+
+
+if __name__ == "__main__":
+    main()
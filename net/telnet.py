@@ -0,0 +1,149 @@
+"""
+The parts of the telnet protocol a game session needs.
+
+The server asks the client to send every key as it is typed (no line mode, no local
+echo) and to report its window size (NAWS, RFC 1073). Everything the client sends is
+turned into the key codes curses would have returned, so player.update_input can't
+tell a telnet player from a local one.
+"""
+
+import curses
+
+
+IAC = 255
+DONT = 254
+DO = 253
+WONT = 252
+WILL = 251
+SB = 250
+SE = 240
+ECHO = 1
+SUPPRESS_GO_AHEAD = 3
+NAWS = 31
+LINEMODE = 34
+
+# Sent when a client connects: the server echoes (so the client does not) and sends
+# characters one at a time, and the client should report its window size
+NEGOTIATION = bytes(
+    [IAC, WILL, ECHO, IAC, WILL, SUPPRESS_GO_AHEAD, IAC, DO, NAWS, IAC, DONT, LINEMODE]
+)
+
+ESCAPE = 27
+ESCAPE_KEYS = {
+    b"[A": curses.KEY_UP,
+    b"[B": curses.KEY_DOWN,
+    b"[C": curses.KEY_RIGHT,
+    b"[D": curses.KEY_LEFT,
+    b"OA": curses.KEY_UP,
+    b"OB": curses.KEY_DOWN,
+    b"OC": curses.KEY_RIGHT,
+    b"OD": curses.KEY_LEFT,
+    b"OR": curses.KEY_F3,
+    b"[13~": curses.KEY_F3,
+}
+MAX_ESCAPE_LENGTH = max(len(sequence) for sequence in ESCAPE_KEYS)
+
+
+class TelnetDecoder:
+    """
+    Turns the bytes a telnet client sends into keys and window sizes.
+
+    Input may arrive split anywhere, even inside a command or an escape sequence; the
+    unfinished part is kept until the rest arrives.
+
+    >>> decoder = TelnetDecoder()
+    >>> decoder.feed(bytes([IAC, SB, NAWS, 0, 120, 0]))
+    ([], None)
+    >>> decoder.feed(bytes([40, IAC, SE]) + b"w\\x1b[D")
+    ([119, 260], (40, 120))
+    """
+
+    __slots__ = ("pending", "after_return")
+
+    def __init__(self):
+        self.pending = b""
+        self.after_return = False
+
+    def feed(self, data):
+        """
+        Decode the next bytes received from the client.
+
+        :param data: bytes, as received.
+        :precondition: data must follow the bytes fed before it.
+        :postcondition: Keeps an unfinished command or escape sequence for the next call.
+        :return: tuple[list[int], tuple[int, int] | None], the keys typed, as curses key
+                 codes, and the last (height, width) the client reported, if any.
+        """
+        data = self.pending + data
+        self.pending = b""
+        keys = []
+        size = None
+        i = 0
+        if self.after_return and data[:1] in (b"\n", b"\0"):
+            i = 1
+        self.after_return = False
+        while i < len(data):
+            byte = data[i]
+            if byte == IAC:
+                if i + 1 >= len(data):
+                    break
+                command = data[i + 1]
+                if command == IAC:
+                    keys.append(IAC)
+                    i += 2
+                elif command in (DO, DONT, WILL, WONT):
+                    if i + 2 >= len(data):
+                        break
+                    i += 3
+                elif command == SB:
+                    end = data.find(bytes([IAC, SE]), i + 2)
+                    if end < 0:
+                        break
+                    size = _parse_subnegotiation(data[i + 2 : end]) or size
+                    i = end + 2
+                else:
+                    i += 2
+            elif byte == ESCAPE:
+                sequence = data[i + 1 : i + 1 + MAX_ESCAPE_LENGTH]
+                match = next(
+                    (known for known in ESCAPE_KEYS if sequence.startswith(known)), None
+                )
+                if match is not None:
+                    keys.append(ESCAPE_KEYS[match])
+                    i += 1 + len(match)
+                elif i + 1 + len(sequence) == len(data) and any(
+                    known.startswith(sequence) for known in ESCAPE_KEYS
+                ):
+                    break  # The rest of the sequence has not arrived yet
+                else:
+                    keys.append(ESCAPE)
+                    i += 1
+            elif byte == 13:
+                # Telnet ends lines with CR LF or CR NUL; curses reports Enter as 10
+                keys.append(10)
+                if data[i + 1 : i + 2] in (b"\n", b"\0"):
+                    i += 2
+                else:
+                    i += 1
+                    # The LF or NUL may come in the next packet
+                    self.after_return = i == len(data)
+            elif byte == 127:
+                keys.append(curses.KEY_BACKSPACE)
+                i += 1
+            else:
+                keys.append(byte)
+                i += 1
+        self.pending = data[i:]
+        return keys, size
+
+
+def _parse_subnegotiation(payload):
+    """Get the (height, width) from a NAWS subnegotiation, or None for any other option"""
+    payload = payload.replace(bytes([IAC, IAC]), bytes([IAC]))
+    if len(payload) != 5 or payload[0] != NAWS:
+        return None
+    width = payload[1] << 8 | payload[2]
+    height = payload[3] << 8 | payload[4]
+    if not width or not height:
+        return None
+    return height, width
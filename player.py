@@ -1,8 +1,9 @@
 import math
 import curses
-import time
 from debug import toggle_console, process_input, DEBUG_CONSOLE
+from utils import game_clock
 from utils.collision import would_collide
+from utils.frame_profiler import toggle_profiler
 
 
 def create_player(x=1.5, y=1.5, angle=0.0):
@@ -46,6 +47,7 @@ def create_player(x=1.5, y=1.5, angle=0.0):
         "active_keys": set(),
         "key_timestamps": {},
         "map_mode": False,
+        "interaction": None,
         "last_shot_time": 0,
         "shot_cooldown": 0.5,
         "health": 100,
@@ -62,7 +64,8 @@ def update_input(player_state, key, pressed=True):
     """
     Update the player's active key set and timestamps based on key events.
 
-    Handles toggling the debug console (';') and map mode ('m').
+    Handles toggling the debug console (';'), map mode ('m') and the performance
+    overlay (F3).
     Passes input to the debug console if it's active.
 
     :param player_state: dict, the player's state dictionary.
@@ -71,7 +74,8 @@ def update_input(player_state, key, pressed=True):
     :precondition: player_state must be a valid player dictionary with 'active_keys' and 'key_timestamps'.
     :precondition: DEBUG_CONSOLE dictionary must exist.
     :postcondition: Modifies player_state['active_keys'] and player_state['key_timestamps'].
-    :postcondition: May toggle DEBUG_CONSOLE['active'] or player_state['map_mode'].
+    :postcondition: May toggle DEBUG_CONSOLE['active'], player_state['map_mode'] or the
+                    frame profiler.
     :postcondition: May call debug.process_input if console is active.
     :return: bool, True if the quit key ('q' or 'Q') was pressed and console is inactive, False otherwise.
     """
@@ -83,9 +87,12 @@ def update_input(player_state, key, pressed=True):
         if key == ord(";"):
             toggle_console()
             return False
+        if key == curses.KEY_F3:
+            toggle_profiler()
+            return False
 
         player_state["active_keys"].add(key)
-        player_state["key_timestamps"][key] = time.time()
+        player_state["key_timestamps"][key] = game_clock.now()
 
         if key == ord("m") or key == ord("M"):
             player_state["map_mode"] = not player_state["map_mode"]
@@ -141,7 +148,7 @@ def update_player(player_state, delta_time, world_map):
     :postcondition: Removes shoot (' ') and interact ('e'/'E') keys from 'active_keys' if they were processed.
     :return: tuple[bool, bool], flags indicating if shoot and interact actions should occur this frame.
     """
-    check_key_timeout(player_state, time.time())
+    check_key_timeout(player_state, game_clock.now())
 
     active_keys = player_state["active_keys"]
 
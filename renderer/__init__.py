@@ -1,3 +1,4 @@
+from .backends import CursesBackend, MemoryBackend, NullBackend
 from .color_utils import init_colors, get_color_pair
 from .fullmap_renderer import render_full_map
 from .minimap_renderer import render_minimap
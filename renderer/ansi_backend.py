@@ -0,0 +1,213 @@
+"""
+A backend that turns the screen into ANSI escape sequences instead of drawing with curses.
+
+The renderers draw into a MemoryBackend framebuffer as usual; encode_frame then turns the
+framebuffer into the bytes a terminal needs to show it, ready to be written to a socket
+or a file descriptor.
+
+Like curses, the backend remembers what the terminal already shows, so a frame only
+sends the cells that changed: the cursor is moved only to skip over unchanged cells,
+the attributes are set only where they change, and the whole frame is one write.
+"""
+
+import curses
+import os
+
+from renderer.backends import MemoryBackend
+
+
+CSI = "\x1b["
+RESET = CSI + "0m"
+HIDE_CURSOR = CSI + "?25l"
+SHOW_CURSOR = CSI + "?25h"
+CLEAR_SCREEN = CSI + "2J"
+
+# Unchanged cells between two changes are rewritten rather than jumped over when there
+# are this few of them, since a cursor movement is at least this many bytes
+MAX_REWRITTEN_GAP = 3
+
+# Foreground of every color pair set up by init_colors, all on a black background
+PAIR_FOREGROUNDS = {
+    1: "31",
+    2: "32",
+    3: "33",
+    4: "34",
+    5: "35",
+    6: "36",
+    7: "37",
+    8: "37",
+    9: "30",
+}
+# Pairs 10-15 are the grays of the distance shading, from white down to dark gray
+for _pair in range(10, 16):
+    PAIR_FOREGROUNDS[_pair] = f"38;5;{232 + round(23 * (16 - _pair) / 6)}"
+
+
+def sgr(attr):
+    """
+    Get the escape sequence that sets the terminal to a curses attribute.
+
+    :param attr: int, a curses attribute: a color pair and A_BOLD, A_DIM or A_REVERSE.
+    :precondition: The color pair must be one set up by init_colors, or 0.
+    :postcondition: Resets any attribute that attr does not have.
+    :return: str, the SGR escape sequence.
+    >>> sgr(0)
+    '\\x1b[0m'
+    >>> sgr((2 << 8) | curses.A_BOLD)
+    '\\x1b[0;1;32m'
+    """
+    codes = ["0"]
+    if attr & curses.A_BOLD:
+        codes.append("1")
+    if attr & curses.A_DIM:
+        codes.append("2")
+    if attr & curses.A_REVERSE:
+        codes.append("7")
+    foreground = PAIR_FOREGROUNDS.get((attr & curses.A_COLOR) >> 8)
+    if foreground:
+        codes.append(foreground)
+    return CSI + ";".join(codes) + "m"
+
+
+def move_cursor(from_y, from_x, to_y, to_x):
+    """
+    Get the shortest escape sequence that moves the cursor.
+
+    :param from_y: int | None, the row the cursor is on, or None if it is not known.
+    :param from_x: int, the column the cursor is on.
+    :param to_y: int, the row to move to.
+    :param to_x: int, the column to move to.
+    :precondition: Rows and columns count from 0.
+    :postcondition: Moves to an absolute position when the cursor is lost.
+    :return: str, the escape sequence, empty when the cursor is already there.
+    >>> move_cursor(3, 4, 3, 10), move_cursor(3, 4, 5, 0), move_cursor(None, 0, 0, 0)
+    ('\\x1b[6C', '\\x1b[6;1H', '\\x1b[H')
+    """
+    if from_y == to_y:
+        if from_x == to_x:
+            return ""
+        if from_x < to_x:
+            return f"{CSI}{to_x - from_x}C"
+    if to_y == 0 and to_x == 0:
+        return CSI + "H"
+    return f"{CSI}{to_y + 1};{to_x + 1}H"
+
+
+class AnsiBackend(MemoryBackend):
+    """
+    A framebuffer that can be encoded as ANSI output, one change at a time.
+
+    >>> screen = AnsiBackend(2, 4)
+    >>> screen.addstr(0, 0, "ab", 1 << 8)
+    >>> screen.encode_frame()
+    b'\\x1b[0m\\x1b[2J\\x1b[H\\x1b[0;31mab'
+    >>> screen.addstr(0, 1, "c", 1 << 8)
+    >>> screen.encode_frame()
+    b'\\x1b[1;2Hc'
+    >>> screen.encode_frame()
+    b''
+    """
+
+    __slots__ = ("shown_chars", "shown_attrs", "shown_attr", "shown_cursor")
+
+    def __init__(self, height=24, width=80):
+        super().__init__(height, width)
+        self.invalidate()
+
+    def invalidate(self):
+        """Forget what the terminal shows, so the next frame clears it and redraws everything"""
+        self.shown_chars = None
+        self.shown_attrs = None
+        self.shown_attr = 0
+        self.shown_cursor = (None, 0)
+
+    def resize(self, height, width):
+        """Change the screen size, clearing it and redrawing it in full on the next frame"""
+        super().resize(height, width)
+        self.invalidate()
+
+    def encode_frame(self):
+        """
+        Encode what changed on the screen since the previous frame.
+
+        :precondition: Attributes must be ones sgr understands.
+        :precondition: Nothing else may have written to the terminal since the previous
+                       frame, unless invalidate was called.
+        :postcondition: Remembers the frame as what the terminal shows.
+        :return: bytes, UTF-8 output that brings the terminal up to date, empty when
+                 nothing changed.
+        """
+        parts = []
+        if self.shown_chars is None:
+            # Start from a blank screen, so only the cells that are not blank are sent
+            parts.append(RESET + CLEAR_SCREEN)
+            self.shown_chars = [[" "] * self.width for _ in range(self.height)]
+            self.shown_attrs = [[0] * self.width for _ in range(self.height)]
+            self.shown_attr = 0
+            self.shown_cursor = (None, 0)
+
+        width = self.width
+        current = self.shown_attr
+        cursor_y, cursor_x = self.shown_cursor
+        for y in range(self.height):
+            chars = self.chars[y]
+            attrs = self.attrs[y]
+            shown_chars = self.shown_chars[y]
+            shown_attrs = self.shown_attrs[y]
+            if chars == shown_chars and attrs == shown_attrs:
+                continue
+
+            x = 0
+            while x < width:
+                if chars[x] == shown_chars[x] and attrs[x] == shown_attrs[x]:
+                    x += 1
+                    continue
+
+                # Find the end of this run of changes, taking in short unchanged gaps
+                end = x + 1
+                gap = 0
+                while end + gap < width and gap <= MAX_REWRITTEN_GAP:
+                    cell = end + gap
+                    if chars[cell] != shown_chars[cell] or attrs[cell] != shown_attrs[cell]:
+                        end = cell + 1
+                        gap = 0
+                    else:
+                        gap += 1
+
+                parts.append(move_cursor(cursor_y, cursor_x, y, x))
+                start = x
+                for cell in range(x + 1, end + 1):
+                    if cell < end and attrs[cell] == attrs[start]:
+                        continue
+                    if attrs[start] != current:
+                        current = attrs[start]
+                        parts.append(sgr(current))
+                    parts.append("".join(chars[start:cell]))
+                    start = cell
+
+                # After the last column the terminal is waiting to wrap, so the
+                # cursor position is not reliable
+                cursor_y, cursor_x = (y, end) if end < width else (None, 0)
+                x = end
+
+            self.shown_chars[y] = chars[:]
+            self.shown_attrs[y] = attrs[:]
+
+        self.shown_attr = current
+        self.shown_cursor = (cursor_y, cursor_x)
+        return "".join(parts).encode("utf-8")
+
+    def present(self, fd):
+        """
+        Send what changed on the screen to a file descriptor, in a single write.
+
+        :param fd: int, a file descriptor open for writing, such as a terminal's.
+        :precondition: Only this backend may write to the terminal while it is used.
+        :postcondition: Writes the rest of the frame if the descriptor takes only part of it.
+        :return: int, the number of bytes written.
+        """
+        frame = self.encode_frame()
+        written = 0
+        while written < len(frame):
+            written += os.write(fd, frame[written:])
+        return written
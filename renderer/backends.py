@@ -0,0 +1,202 @@
+"""
+Screen backends the renderers can draw on.
+
+Renderers only use a small part of the curses window interface: getmaxyx, addstr,
+attron/attroff, box, erase/clear, move and noutrefresh. Every backend here provides
+that interface, so the same rendering code can draw on a terminal, into memory for
+tests, or nowhere at all for timing.
+"""
+
+import curses
+
+
+class CursesBackend:
+    """
+    A curses window used as a backend.
+
+    The drawing methods are the window's own bound methods, so drawing through the
+    backend costs nothing extra. Anything else is forwarded to the window.
+    """
+
+    __slots__ = ("window", "getmaxyx", "addstr", "attron", "attroff", "noutrefresh")
+
+    def __init__(self, window):
+        self.window = window
+        self.getmaxyx = window.getmaxyx
+        self.addstr = window.addstr
+        self.attron = window.attron
+        self.attroff = window.attroff
+        self.noutrefresh = window.noutrefresh
+
+    def __getattr__(self, name):
+        return getattr(self.window, name)
+
+
+class MemoryBackend:
+    """
+    A backend that keeps the screen as a grid of characters and a grid of attributes.
+
+    Writes follow curses: text that runs off the end of a line wraps onto the next one,
+    and writing outside the screen or past its last cell raises curses.error. Every
+    addstr call is counted in writes, so tests can check how much work a frame took.
+
+    >>> screen = MemoryBackend(2, 6)
+    >>> screen.addstr(0, 1, "hi", 256)
+    >>> screen.attron(512)
+    >>> screen.addstr(1, 0, "there")
+    >>> screen.lines(), screen.attrs[0][1], screen.attrs[1][0], screen.writes
+    ([' hi', 'there'], 256, 512, 2)
+    """
+
+    __slots__ = (
+        "height",
+        "width",
+        "chars",
+        "attrs",
+        "current_attr",
+        "cursor",
+        "frames",
+        "writes",
+    )
+
+    def __init__(self, height=24, width=80):
+        self.height = height
+        self.width = width
+        self.current_attr = 0
+        self.cursor = (0, 0)
+        self.frames = 0
+        self.writes = 0
+        self.chars = []
+        self.attrs = []
+        self.erase()
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def addstr(self, y, x, text, attr=None):
+        self.writes += 1
+        if not (0 <= y < self.height and 0 <= x < self.width):
+            raise curses.error("addstr() returned ERR")
+        if attr is None:
+            attr = self.current_attr
+        for char in text:
+            if x >= self.width:
+                y, x = y + 1, 0
+                if y >= self.height:
+                    raise curses.error("addstr() returned ERR")
+            self.chars[y][x] = char
+            self.attrs[y][x] = attr
+            x += 1
+        if x >= self.width and y == self.height - 1:
+            # curses cannot move the cursor past the last cell
+            raise curses.error("addstr() returned ERR")
+        self.cursor = (y, x)
+
+    def attron(self, attr):
+        self.current_attr |= attr
+
+    def attroff(self, attr):
+        self.current_attr &= ~attr
+
+    def attrset(self, attr):
+        self.current_attr = attr
+
+    def box(self):
+        if self.height < 2 or self.width < 2:
+            return
+        last_y, last_x = self.height - 1, self.width - 1
+        for x in range(1, last_x):
+            self.chars[0][x] = self.chars[last_y][x] = "─"
+        for y in range(1, last_y):
+            self.chars[y][0] = self.chars[y][last_x] = "│"
+        self.chars[0][0], self.chars[0][last_x] = "┌", "┐"
+        self.chars[last_y][0], self.chars[last_y][last_x] = "└", "┘"
+        for y in (0, last_y):
+            for x in range(self.width):
+                self.attrs[y][x] = self.current_attr
+        for y in range(1, last_y):
+            self.attrs[y][0] = self.attrs[y][last_x] = self.current_attr
+
+    def erase(self):
+        self.chars = [[" "] * self.width for _ in range(self.height)]
+        self.attrs = [[0] * self.width for _ in range(self.height)]
+
+    clear = erase
+
+    def move(self, y, x):
+        if not (0 <= y < self.height and 0 <= x < self.width):
+            raise curses.error("wmove() returned ERR")
+        self.cursor = (y, x)
+
+    def noutrefresh(self):
+        self.frames += 1
+
+    refresh = noutrefresh
+
+    def resize(self, height, width):
+        """Change the screen size, clearing it"""
+        self.height = height
+        self.width = width
+        self.erase()
+
+    def lines(self):
+        """Get the screen contents as text, one string per row, without trailing blanks"""
+        return ["".join(row).rstrip() for row in self.chars]
+
+    def text(self):
+        """Get the screen contents as one string"""
+        return "\n".join(self.lines())
+
+
+class NullBackend:
+    """
+    A backend that throws everything away, for timing the rendering code on its own.
+
+    >>> screen = NullBackend(40, 120)
+    >>> screen.addstr(3, 4, "ignored")
+    >>> screen.getmaxyx(), screen.frames
+    ((40, 120), 0)
+    """
+
+    __slots__ = ("height", "width", "frames")
+
+    def __init__(self, height=24, width=80):
+        self.height = height
+        self.width = width
+        self.frames = 0
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def addstr(self, y, x, text, attr=0):
+        pass
+
+    def attron(self, attr):
+        pass
+
+    def attroff(self, attr):
+        pass
+
+    def attrset(self, attr):
+        pass
+
+    def box(self):
+        pass
+
+    def erase(self):
+        pass
+
+    clear = erase
+
+    def move(self, y, x):
+        pass
+
+    def noutrefresh(self):
+        self.frames += 1
+
+    refresh = noutrefresh
+
+    def resize(self, height, width):
+        """Change the screen size"""
+        self.height = height
+        self.width = width
@@ -25,28 +25,44 @@ def init_colors():
         curses.init_pair(i, i + 10, curses.COLOR_BLACK)
 
 
+def color_pair(number):
+    """
+    Get the attribute of a color pair, even when curses has not been started.
+
+    Off-screen backends render without a terminal, so the attribute falls back to the
+    value curses itself uses: the pair number shifted into the color bits.
+
+    >>> color_pair(3) == 3 << 8
+    True
+    """
+    try:
+        return curses.color_pair(number)
+    except curses.error:
+        return number << 8
+
+
 # noinspection PyBroadException
 def get_color_pair(color_code):
     """Convert color code to curses color pair"""
     try:
-        return curses.color_pair(int(color_code))
+        return color_pair(int(color_code))
     except:
-        return curses.color_pair(7)
+        return color_pair(7)
 
 
 def get_cell_style(cell_type, cell_color):
     """Get the appropriate style for a cell based on its type and color"""
     if cell_type in [1, 8]:  # Wall, Stone
-        return curses.color_pair(cell_color) | curses.A_BOLD
+        return color_pair(cell_color) | curses.A_BOLD
     elif cell_type == 3:  # Water
-        return curses.color_pair(4) | curses.A_BOLD
+        return color_pair(4) | curses.A_BOLD
     elif cell_type == 2:  # Tree
-        return curses.color_pair(2) | curses.A_BOLD
+        return color_pair(2) | curses.A_BOLD
     elif cell_type == 4:  # Path
-        return curses.color_pair(3)
+        return color_pair(3)
     elif cell_type == 5:  # Mountain
-        return curses.color_pair(7) | curses.A_BOLD
+        return color_pair(7) | curses.A_BOLD
     elif cell_type == 9:  # Sand
-        return curses.color_pair(3) | curses.A_DIM
+        return color_pair(3) | curses.A_DIM
     else:
-        return curses.color_pair(cell_color)
+        return color_pair(cell_color)
@@ -1,5 +1,7 @@
 import curses
 
+MAX_RESULT_LINES = 14  # Longer results, like profiles, are cut off with "..."
+
 DEBUG_CONSOLE = {
     "active": False,
     "command": "",
@@ -16,7 +18,8 @@ def render_console(stdscr):
     """
     Render the debug console interface at the top of the screen.
 
-    Displays the command input line and the last command result.
+    Displays the command input line and, under it, the last command result, which may
+    span several lines.
 
     :param stdscr: curses.Window, the main window object.
     :precondition: DEBUG_CONSOLE must exist. curses must be initialized.
@@ -32,7 +35,14 @@ def render_console(stdscr):
     console_style = curses.A_REVERSE
     prompt_style = curses.A_REVERSE | curses.A_BOLD
 
-    for i in range(2):
+    result_lines = []
+    if DEBUG_CONSOLE["last_result"]:
+        result_lines = str(DEBUG_CONSOLE["last_result"]).split("\n")
+        visible_lines = max(1, min(MAX_RESULT_LINES, height - 2))
+        if len(result_lines) > visible_lines:
+            result_lines = result_lines[: visible_lines - 1] + ["..."]
+
+    for i in range(1 + max(1, len(result_lines))):
         try:
             stdscr.addstr(i, 0, " " * (width - 1), console_style)
         except curses.error:
@@ -57,17 +67,16 @@ def render_console(stdscr):
         stdscr.addstr(0, len(prompt), display_cmd, console_style)
 
         cursor_y, cursor_x = 0, min(width - 1, max(0, cursor_screen_pos))
-        curses.setsyx(cursor_y, cursor_x)
         stdscr.move(cursor_y, cursor_x)
+        curses.setsyx(cursor_y, cursor_x)
 
     except curses.error:
         pass
 
-    if DEBUG_CONSOLE["last_result"]:
+    for i, result in enumerate(result_lines):
         try:
-            result = str(DEBUG_CONSOLE["last_result"])
             if len(result) >= width:
                 result = result[: width - 4] + "..."
-            stdscr.addstr(1, 0, result.ljust(width - 1), console_style)
+            stdscr.addstr(1 + i, 0, result.ljust(width - 1), console_style)
         except curses.error:
             pass
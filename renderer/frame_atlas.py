@@ -0,0 +1,90 @@
+import re
+
+VISIBLE_RUN = re.compile(r"[^ \t]+")
+
+FRAME_ATLAS = {"parsed": {}, "size": None, "layouts": {}}
+
+
+def parse_frame(frame):
+    """
+    Split a multi-line ASCII frame into run-length-encoded spans of visible characters.
+
+    Blanks are transparent, so each row becomes a list of (offset, text) spans that
+    together cover every non-blank character of the row.
+
+    :param frame: str, the frame, one art row per line.
+    :precondition: frame must be a string.
+    :postcondition: Does not modify frame.
+    :return: list[list[tuple[int, str]]], the spans of every row, in row order.
+    >>> parse_frame("  /^  \\n |  |\\n")
+    [[(2, '/^')], [(1, '|'), (4, '|')], []]
+    """
+    return [
+        [(match.start(), match.group()) for match in VISIBLE_RUN.finditer(line)]
+        for line in frame.split("\n")
+    ]
+
+
+def layout_frame(rows, origin_x, origin_y, height, width):
+    """
+    Place parsed frame rows on screen, clipping every span to the screen bounds.
+
+    :param rows: list[list[tuple[int, str]]], the spans returned by parse_frame.
+    :param origin_x: int, the screen column of the frame's left edge.
+    :param origin_y: int, the screen row of the frame's top edge.
+    :param height: int, the screen height.
+    :param width: int, the screen width.
+    :precondition: height and width must be non-negative.
+    :postcondition: Does not modify rows.
+    :return: list[tuple[int, int, str]], the (y, x, text) spans that are on screen.
+    >>> layout_frame([[(0, "abc")], [(1, "de")]], -1, 0, 2, 2)
+    [(0, 0, 'bc'), (1, 0, 'de')]
+    """
+    placed = []
+    for row_index, spans in enumerate(rows):
+        y = origin_y + row_index
+        if not 0 <= y < height:
+            continue
+        for offset, text in spans:
+            x = origin_x + offset
+            if x < 0:
+                text = text[-x:]
+                x = 0
+            text = text[: width - x]
+            if text:
+                placed.append((y, x, text))
+    return placed
+
+
+def get_frame_spans(frame, origin_x, origin_y, height, width):
+    """
+    Get the on-screen spans of a frame, parsing and placing it only once.
+
+    Frames are parsed once for the whole session; their placements are cached for the
+    current terminal size and dropped when the terminal is resized.
+
+    :param frame: str, the frame to draw.
+    :param origin_x: int, the screen column of the frame's left edge.
+    :param origin_y: int, the screen row of the frame's top edge.
+    :param height: int, the screen height.
+    :param width: int, the screen width.
+    :precondition: frame must be a string.
+    :postcondition: Stores the parsed frame and its placement in FRAME_ATLAS.
+    :return: list[tuple[int, int, str]], as returned by layout_frame.
+    >>> get_frame_spans("x  y", 3, 1, 5, 6)
+    [(1, 3, 'x')]
+    """
+    if FRAME_ATLAS["size"] != (height, width):
+        FRAME_ATLAS["size"] = (height, width)
+        FRAME_ATLAS["layouts"] = {}
+
+    key = (frame, origin_x, origin_y)
+    placed = FRAME_ATLAS["layouts"].get(key)
+    if placed is None:
+        rows = FRAME_ATLAS["parsed"].get(frame)
+        if rows is None:
+            rows = FRAME_ATLAS["parsed"][frame] = parse_frame(frame)
+        placed = FRAME_ATLAS["layouts"][key] = layout_frame(
+            rows, origin_x, origin_y, height, width
+        )
+    return placed
@@ -1,69 +1,162 @@
 import curses
 import math
 from map import TERRAIN_CHARS
-from renderer.color_utils import get_cell_style
-
-
-def render_full_map(stdscr, player_x, player_y, player_angle, world_map, world_colors):
-    """Render a full-screen map of the world"""
-    height, width = stdscr.getmaxyx()
-    height -= 1
-
-    stdscr.clear()
-
-    border_style = curses.color_pair(6) | curses.A_BOLD
-    stdscr.attron(border_style)
-    stdscr.box()
-    stdscr.attroff(border_style)
-
+from map.map_cache import map_version
+from renderer.color_utils import color_pair, get_cell_style
+
+
+MAP_TITLE = "[ DUNGEON MAP ]"
+HELP_TEXT = "Press 'M' to return to 3D view, 'Q' to quit"
+LEGEND_ITEMS = [
+    ("# - Wall", 7),
+    ("♣ - Tree", 2),
+    ("~ - Water", 4),
+    ("· - Path", 3),
+    ("▲ - Mountain", 7),
+    ("+ - Door", 5),
+    ("≡ - Stairs", 6),
+    ("▓ - Stone", 8),
+    (": - Sand", 3),
+    ("B - Boss Door", 1),
+    ("  - Empty", 0),
+    ("@ - You", 1),
+]
+
+FULL_MAP_CACHE = {"key": None, "map": None, "frame": None, "rebuilds": 0}
+
+
+def _merge_runs(cells):
+    """Merge a row's sorted (screen_x, char, attr) cells into (screen_x, text, attr) runs"""
+    runs = []
+    run_x, run_text, run_attr = 0, "", None
+    for screen_x, char, attr in cells:
+        if run_text and (attr != run_attr or screen_x != run_x + len(run_text)):
+            runs.append((run_x, run_text, run_attr))
+            run_text = ""
+        if not run_text:
+            run_x = screen_x
+        run_text += char
+        run_attr = attr
+    if run_text:
+        runs.append((run_x, run_text, run_attr))
+    return runs
+
+
+def build_full_map_frame(world_map, world_colors, height, width):
+    """
+    Lay out the static part of the full-map view: the title, the map and the legend.
+
+    :param world_map: list[list[int]], the map grid to draw.
+    :param world_colors: list[list[str]], the color codes of world_map.
+    :param height: int, the usable screen height (the last line is left free).
+    :param width: int, the screen width.
+    :precondition: curses colors must be initialized.
+    :postcondition: Does not modify the map.
+    :return: dict, the "rows" of (screen_y, runs) to blit, with the "scale" and the
+             "offset_x" and "offset_y" needed to place the player marker.
+    """
     map_height = len(world_map)
     map_width = len(world_map[0])
 
-    scale_x = (width - 4) / map_width
-    scale_y = (height - 4) / map_height
-
-    scale = min(scale_x, scale_y)
-
+    scale = min((width - 4) / map_width, (height - 4) / map_height)
     offset_x = int((width - (map_width * scale)) / 2)
     offset_y = int((height - (map_height * scale)) / 2)
 
-    title = "[ DUNGEON MAP ]"
-    title_x = max(0, (width - len(title)) // 2)
-    stdscr.attron(curses.color_pair(3) | curses.A_BOLD)
-    stdscr.addstr(1, title_x, title)
-    stdscr.attroff(curses.color_pair(3) | curses.A_BOLD)
-
-    # Use imported terrain characters
-    terrain_chars = TERRAIN_CHARS
-
+    screen_cells = {}
     for y in range(map_height):
-
         if scale < 1 and int(y * scale) == int((y + 1) * scale):
             continue
 
-        for x in range(map_width):
+        screen_y = offset_y + int(y * scale) + 2
+        if not 0 <= screen_y < height:
+            continue
+        row = world_map[y]
+        colors = world_colors[y]
+        line = screen_cells.setdefault(screen_y, {})
 
+        for x in range(map_width):
             if scale < 1 and int(x * scale) == int((x + 1) * scale):
                 continue
 
-            screen_y = offset_y + int(y * scale) + 2
             screen_x = offset_x + int(x * scale) + 1
+            if 0 <= screen_x < width:
+                cell_type = row[x]
+                line[screen_x] = (
+                    TERRAIN_CHARS.get(cell_type, "?"),
+                    get_cell_style(cell_type, int(colors[x])),
+                )
+
+    title_style = color_pair(3) | curses.A_BOLD
+    rows = [(1, [(max(0, (width - len(MAP_TITLE)) // 2), MAP_TITLE, title_style)])]
+    for screen_y in sorted(screen_cells):
+        line = screen_cells[screen_y]
+        rows.append(
+            (screen_y, _merge_runs((x, *line[x]) for x in sorted(line)))
+        )
+
+    legend_y = height - 2
+    items_per_line = max(1, min(len(LEGEND_ITEMS), width // 15))
+    item_width = width // items_per_line
+    for i, (text, color) in enumerate(LEGEND_ITEMS):
+        style = color_pair(color) | (curses.A_BOLD if color in [1, 5, 6] else 0)
+        rows.append(
+            (
+                legend_y - i // items_per_line,
+                [(2 + (i % items_per_line) * item_width, text, style)],
+            )
+        )
+
+    help_x = max(0, (width - len(HELP_TEXT)) // 2)
+    rows.append((height - 1, [(help_x, HELP_TEXT, color_pair(3))]))
+
+    return {"rows": rows, "scale": scale, "offset_x": offset_x, "offset_y": offset_y}
 
-            cell_type = world_map[y][x]
-            cell_char = terrain_chars.get(cell_type, "?")
 
-            cell_color = int(world_colors[y][x])
+def get_full_map_frame(world_map, world_colors, height, width):
+    """
+    Get the laid-out full-map frame, rebuilding it only when the map or screen changes.
 
-            style = get_cell_style(cell_type, cell_color)
+    :param world_map: list[list[int]], the map grid to draw.
+    :param world_colors: list[list[str]], the color codes of world_map.
+    :param height: int, the usable screen height.
+    :param width: int, the screen width.
+    :precondition: curses colors must be initialized.
+    :postcondition: Stores the frame in FULL_MAP_CACHE.
+    :return: dict, as returned by build_full_map_frame.
+    """
+    cache = FULL_MAP_CACHE
+    key = (id(world_map), map_version(world_map), id(world_colors), height, width)
+    if cache["key"] != key or cache["map"] is not world_map:
+        cache["frame"] = build_full_map_frame(world_map, world_colors, height, width)
+        cache["key"] = key
+        cache["map"] = world_map  # Keeps id(world_map) from being reused
+        cache["rebuilds"] += 1
+    return cache["frame"]
+
+
+def render_full_map(stdscr, player_x, player_y, player_angle, world_map, world_colors):
+    """Render a full-screen map of the world"""
+    height, width = stdscr.getmaxyx()
+    height -= 1
 
-            if 0 <= screen_y < height and 0 <= screen_x < width:
-                try:
-                    stdscr.addstr(screen_y, screen_x, cell_char, style)
-                except curses.error:
-                    pass
+    # The game loop erases the screen every frame; only the border, the cached frame
+    # and the player marker are drawn here
+    border_style = color_pair(6) | curses.A_BOLD
+    stdscr.attron(border_style)
+    stdscr.box()
+    stdscr.attroff(border_style)
 
-    player_screen_y = offset_y + int(player_y * scale) + 2
-    player_screen_x = offset_x + int(player_x * scale) + 1
+    frame = get_full_map_frame(world_map, world_colors, height, width)
+    for screen_y, runs in frame["rows"]:
+        for screen_x, text, attr in runs:
+            try:
+                stdscr.addstr(screen_y, screen_x, text, attr)
+            except curses.error:
+                pass
+
+    scale = frame["scale"]
+    player_screen_y = frame["offset_y"] + int(player_y * scale) + 2
+    player_screen_x = frame["offset_x"] + int(player_x * scale) + 1
 
     if 0 <= player_screen_y < height and 0 <= player_screen_x < width:
         try:
@@ -75,52 +168,11 @@ def render_full_map(stdscr, player_x, player_y, player_angle, world_map, world_c
             )
             direction = direction_chars[direction_idx]
 
-            stdscr.attron(curses.color_pair(1) | curses.A_BOLD)
+            stdscr.attron(color_pair(1) | curses.A_BOLD)
             stdscr.addstr(player_screen_y, player_screen_x, player_char)
             stdscr.addstr(player_screen_y - 1, player_screen_x, direction)
-            stdscr.attroff(curses.color_pair(1) | curses.A_BOLD)
+            stdscr.attroff(color_pair(1) | curses.A_BOLD)
         except curses.error:
             pass
 
-    legend_y = height - 2
-    legend_items = [
-        ("# - Wall", 7),
-        ("♣ - Tree", 2),
-        ("~ - Water", 4),
-        ("· - Path", 3),
-        ("▲ - Mountain", 7),
-        ("+ - Door", 5),
-        ("≡ - Stairs", 6),
-        ("▓ - Stone", 8),
-        (": - Sand", 3),
-        ("B - Boss Door", 1),
-        ("  - Empty", 0),
-        ("@ - You", 1),
-    ]
-
-    items_per_line = max(1, min(len(legend_items), width // 15))
-    item_width = width // items_per_line
-
-    for i, (text, color) in enumerate(legend_items):
-        line = i // items_per_line
-        col = i % items_per_line
-        legend_x = 2 + col * item_width
-
-        try:
-            stdscr.attron(curses.color_pair(color) | (curses.A_BOLD if color in [1, 5, 6] else 0))
-            stdscr.addstr(legend_y - line, legend_x, text)
-            stdscr.attroff(curses.color_pair(color) | (curses.A_BOLD if color in [1, 5, 6] else 0))
-        except curses.error:
-            pass
-
-    help_text = "Press 'M' to return to 3D view, 'Q' to quit"
-    help_x = max(0, (width - len(help_text)) // 2)
-
-    try:
-        stdscr.attron(curses.color_pair(3))
-        stdscr.addstr(height - 1, help_x, help_text)
-        stdscr.attroff(curses.color_pair(3))
-    except curses.error:
-        pass
-
     stdscr.noutrefresh()
@@ -1,83 +1,155 @@
 import curses
 import math
 from map import TERRAIN_CHARS
-from renderer.color_utils import get_cell_style
+from map.map_cache import get_layer, map_version
+from renderer.color_utils import color_pair, get_cell_style
 
 
-def render_minimap(
-    stdscr, player_x, player_y, player_angle, world_map, world_colors, height, width
-):
-    """Render an enhanced Aardwolf-style minimap in the corner of the screen"""
+MAP_SIZE = 16
+MAP_TITLE = "[ MAP ]"
 
-    map_size = 16
-    map_title = "[ MAP ]"
-    map_start_x = width - map_size - 2
-    map_start_y = 1
+MINIMAP_CACHE = {"key": None, "map": None, "rows": None, "rebuilds": 0}
 
-    border_color = curses.color_pair(6) | curses.A_BOLD
 
+def _border_rows(map_start_x, map_start_y):
+    """Build the title and bottom border lines of the minimap box"""
     left_border = "╔═"
     right_border = "═╗"
-    title_space = map_size - len(left_border) - len(right_border) + 2
+    title_space = MAP_SIZE - len(left_border) - len(right_border) + 2
 
-    title_padding = (title_space - len(map_title)) // 2
+    title_padding = (title_space - len(MAP_TITLE)) // 2
     title_border = (
         "═" * title_padding
-        + map_title
-        + "═" * (title_space - len(map_title) - title_padding)
+        + MAP_TITLE
+        + "═" * (title_space - len(MAP_TITLE) - title_padding)
     )
-
-    stdscr.addstr(
-        map_start_y,
-        map_start_x,
-        left_border + title_border + right_border,
-        border_color,
+    return (
+        (map_start_y, map_start_x, left_border + title_border + right_border),
+        (map_start_y + MAP_SIZE + 1, map_start_x, "╚" + "═" * MAP_SIZE + "╝"),
     )
 
-    for y in range(1, map_size + 1):
-        stdscr.addstr(map_start_y + y, map_start_x, "║", border_color)
-        stdscr.addstr(map_start_y + y, map_start_x + map_size + 1, "║", border_color)
 
-    stdscr.addstr(
-        map_start_y + map_size + 1,
-        map_start_x,
-        "╚" + "═" * map_size + "╝",
-        border_color,
+def _style_row(world_map, world_colors, map_y, start_x, end_x):
+    """Get the (char, attr) of the cells of one map row"""
+    row = world_map[map_y]
+    colors = world_colors[map_y]
+    return [
+        (
+            TERRAIN_CHARS.get(row[map_x], "?"),
+            get_cell_style(row[map_x], int(colors[map_x])),
+        )
+        for map_x in range(start_x, end_x)
+    ]
+
+
+def get_styled_cells(world_map, world_colors, map_y, start_x, end_x):
+    """
+    Get the minimap (char, attr) of a span of cells, styling each map row only once.
+
+    Styled rows are cached per map and color layer and refreshed through set_tile.
+    Chunked maps are styled on the fly, since their rows are too long to cache.
+
+    :param world_map: list[list[int]] | ChunkedMap, the map grid.
+    :param world_colors: list[list[str]], the color codes of world_map.
+    :param map_y: int, the map row.
+    :param start_x: int, the first column of the span.
+    :param end_x: int, the column after the span.
+    :precondition: curses colors must be initialized.
+    :postcondition: Caches the styled row for plain maps.
+    :return: list[tuple[str, int]], the styled cells.
+    """
+    if hasattr(world_map, "window"):
+        return _style_row(world_map, world_colors, map_y, start_x, end_x)
+
+    def _forget_row(rows, x, y):
+        if y is None:
+            rows[:] = [None] * len(rows)
+        else:
+            rows[y] = None
+
+    rows = get_layer(
+        world_map,
+        ("minimap_cells", id(world_colors)),
+        lambda grid: [None] * len(grid),
+        on_mutate=_forget_row,
     )
+    if rows[map_y] is None:
+        rows[map_y] = _style_row(world_map, world_colors, map_y, 0, len(world_map[0]))
+    return rows[map_y][start_x:end_x]
 
-    view_radius = map_size // 2
 
-    center_x = int(player_x)
-    center_y = int(player_y)
+def _build_minimap_rows(
+    world_map, world_colors, center_x, center_y, map_start_x, map_start_y
+):
+    """Lay out the bordered minimap as rows of (screen_x, text, attr) runs"""
+    border_color = color_pair(6) | curses.A_BOLD
+    view_radius = MAP_SIZE // 2
 
     start_x = max(0, center_x - view_radius)
     start_y = max(0, center_y - view_radius)
-    end_x = min(len(world_map[0]), center_x + view_radius + 1)
-    end_y = min(len(world_map), center_y + view_radius + 1)
-
-    terrain_chars = TERRAIN_CHARS
-
-    for map_y in range(start_y, end_y):
-        for map_x in range(start_x, end_x):
+    end_x = min(len(world_map[0]), center_x + view_radius + 1, start_x + MAP_SIZE)
+    end_y = min(len(world_map), center_y + view_radius + 1, start_y + MAP_SIZE)
+
+    top, bottom = _border_rows(map_start_x, map_start_y)
+    rows = [(top[0], [(top[1], top[2], border_color)])]
+
+    for offset_y in range(MAP_SIZE):
+        map_y = start_y + offset_y
+        runs = [(map_start_x, "║", border_color)]
+        if map_y < end_y:
+            run_x, run_text, run_attr = map_start_x + 1, "", None
+            for char, attr in get_styled_cells(
+                world_map, world_colors, map_y, start_x, end_x
+            ):
+                if attr != run_attr and run_text:
+                    runs.append((run_x, run_text, run_attr))
+                    run_x, run_text = run_x + len(run_text), ""
+                run_text += char
+                run_attr = attr
+            if run_text:
+                runs.append((run_x, run_text, run_attr))
+        runs.append((map_start_x + MAP_SIZE + 1, "║", border_color))
+        rows.append((map_start_y + 1 + offset_y, runs))
 
-            mini_x = map_start_x + 1 + (map_x - start_x)
-            mini_y = map_start_y + 1 + (map_y - start_y)
+    rows.append((bottom[0], [(bottom[1], bottom[2], border_color)]))
+    return rows, start_x, start_y
 
-            if (
-                0 <= mini_y <= map_start_y + map_size
-                and 0 <= mini_x <= map_start_x + map_size
-            ):
-                cell_type = world_map[map_y][map_x]
-                cell_color = int(world_colors[map_y][map_x])
 
-                cell_char = terrain_chars.get(cell_type, "?")
+def render_minimap(
+    stdscr, player_x, player_y, player_angle, world_map, world_colors, height, width
+):
+    """Render an enhanced Aardwolf-style minimap in the corner of the screen"""
 
-                style = get_cell_style(cell_type, cell_color)
+    map_size = MAP_SIZE
+    map_start_x = width - map_size - 2
+    map_start_y = 1
 
-                try:
-                    stdscr.addstr(mini_y, mini_x, cell_char, style)
-                except curses.error:
-                    pass
+    # The terrain and border only change when the player changes tile or the map mutates
+    center_x = int(player_x)
+    center_y = int(player_y)
+    cache_key = (
+        id(world_map),
+        map_version(world_map),
+        id(world_colors),
+        center_x,
+        center_y,
+        map_start_x,
+    )
+    if MINIMAP_CACHE["key"] != cache_key:
+        MINIMAP_CACHE["rows"] = _build_minimap_rows(
+            world_map, world_colors, center_x, center_y, map_start_x, map_start_y
+        )
+        MINIMAP_CACHE["key"] = cache_key
+        MINIMAP_CACHE["map"] = world_map  # Keeps id(world_map) from being reused
+        MINIMAP_CACHE["rebuilds"] += 1
+    rows, start_x, start_y = MINIMAP_CACHE["rows"]
+
+    for screen_y, runs in rows:
+        for screen_x, text, attr in runs:
+            try:
+                stdscr.addstr(screen_y, screen_x, text, attr)
+            except curses.error:
+                pass
 
     import entities as entity_system
 
@@ -94,26 +166,26 @@ def render_minimap(
             if entity["type"] == entity_system.ENTITY_PROJECTILE:
                 char = "*"
                 style = (
-                    curses.color_pair(entity_system.PROJECTILE_COLOR) | curses.A_BOLD
+                    color_pair(entity_system.PROJECTILE_COLOR) | curses.A_BOLD
                 )
             elif entity["type"] == entity_system.ENTITY_ENEMY:
                 if entity.get("subtype") == "boss":
                     char = "K"
-                    style = curses.color_pair(1) | curses.A_BOLD
+                    style = color_pair(1) | curses.A_BOLD
                 elif entity["state"] == "dead":
                     char = "x"
-                    style = curses.color_pair(entity_system.ENEMY_DEAD_COLOR)
+                    style = color_pair(entity_system.ENEMY_DEAD_COLOR)
                 else:
                     char = "E"
-                    style = curses.color_pair(entity_system.ENEMY_COLOR)
+                    style = color_pair(entity_system.ENEMY_COLOR)
                     if entity["state"] in ["chase", "attack"]:
                         style |= curses.A_BOLD
             elif entity["type"] == entity_system.ENTITY_ENEMY_PROJECTILE:
                 char = "o"
-                style = curses.color_pair(entity_system.ENEMY_PROJECTILE_COLOR) | curses.A_BOLD
+                style = color_pair(entity_system.ENEMY_PROJECTILE_COLOR) | curses.A_BOLD
             else:
                 char = "?"
-                style = curses.color_pair(7)
+                style = color_pair(7)
 
             try:
                 stdscr.addstr(mini_y, mini_x, char, style)
@@ -129,7 +201,7 @@ def render_minimap(
     ):
         try:
             player_char = "@"
-            player_style = curses.color_pair(1) | curses.A_BOLD
+            player_style = color_pair(1) | curses.A_BOLD
             stdscr.addstr(player_mini_y, player_mini_x, player_char, player_style)
 
             direction_length = 1.0
@@ -152,7 +224,7 @@ def render_minimap(
             ):
                 try:
                     stdscr.addstr(
-                        dir_y, dir_x, direction_char, curses.color_pair(3) | curses.A_BOLD
+                        dir_y, dir_x, direction_char, color_pair(3) | curses.A_BOLD
                     )
                 except curses.error:
                     pass
@@ -164,7 +236,7 @@ def render_minimap(
     compass_x_left = map_start_x + 1
     compass_x_right = map_start_x + map_size
     
-    compass_style = curses.color_pair(7) | curses.A_DIM
+    compass_style = color_pair(7) | curses.A_DIM
     
     try:
         stdscr.addstr(compass_y_top, compass_x_left, "NW", compass_style)
@@ -1,16 +1,21 @@
 import curses
 import math
 import random
-import time
 
 import entities as entity_system
-from anim.hand.fire import FireFrames
-from renderer.color_utils import get_color_pair
+from anim.assets import load_asset
+from map.visibility import get_visibility, sector_of
+from map.wall_distance import get_wall_distance_field
+from renderer.color_utils import color_pair, get_color_pair
+from utils import frame_profiler, game_clock
 
 DENSE_SHADING = " ░▒▓█"
 DETAILED_SHADING = " .,:;i1tfLCG08@"
 UNICODE_BLOCKS = " ▏▎▍▌▋▊▉█"
 
+MARCH_STEP = 0.05
+MAX_RAY_DISTANCE = 20
+
 SHADING_CHARS = " .'`,:;!-+=iIl|/\\tfjrxnuvcTYUJCLQ0OZ#MW&8%B@$"
 
 WALL_EDGE_CHARS = {
@@ -59,7 +64,8 @@ def get_distance_shade(distance, max_distance=40, wall_x=0, wall_y=0):
 # noinspection PyUnusedLocal
 def shoot_animation(stdscr, height, width):
     """Advanced shooting animation using imported fire frames"""
-    if not FireFrames or len(FireFrames) == 0:
+    fire_frames = load_asset("fire_frames")
+    if not fire_frames or len(fire_frames) == 0:
         return
 
     try:
@@ -67,7 +73,7 @@ def shoot_animation(stdscr, height, width):
     except:
         return
 
-    frame_lines = FireFrames[0].split("\n")
+    frame_lines = fire_frames[0].split("\n")
     anim_height = len(frame_lines)
     anim_width = max(len(line) for line in frame_lines)
 
@@ -75,7 +81,7 @@ def shoot_animation(stdscr, height, width):
         tmpwin = curses.newpad(anim_height, anim_width)
         prepared_frames = []
 
-        for frame in FireFrames:
+        for frame in fire_frames:
             tmpwin.clear()
             lines = frame.split("\n")
 
@@ -84,7 +90,7 @@ def shoot_animation(stdscr, height, width):
                     if char != " " and char != "\t":
                         try:
                             tmpwin.addstr(
-                                i, j, char, curses.color_pair(1) | curses.A_BOLD
+                                i, j, char, color_pair(1) | curses.A_BOLD
                             )
                         except:
                             return
@@ -142,7 +148,7 @@ def _render_pattern_entity(
         0.7
         + 0.3
         * math.sin(
-            (time.time() - entity["creation_time"])
+            (game_clock.now() - entity["creation_time"])
             * entity.get("pulse_rate", 5.0)
             * 2
             * math.pi
@@ -153,7 +159,7 @@ def _render_pattern_entity(
 
     brightness = min(1.0, pulse_factor / max(0.5, entity_distance * 0.1))
 
-    color_attr = curses.color_pair(entity["color"])
+    color_attr = color_pair(entity["color"])
     if brightness > 0.8:
         color_attr |= curses.A_BOLD
     elif brightness <= 0.4:
@@ -197,10 +203,152 @@ def _render_pattern_entity(
                         pass
 
 
+def march_ray(player_x, player_y, angle, world_map, world_colors):
+    """
+    Cast a ray by marching it forward in fixed MARCH_STEP increments.
+    :param player_x: float, the x-coordinate the ray starts from
+    :param player_y: float, the y-coordinate the ray starts from
+    :param angle: float, the direction of the ray in radians
+    :param world_map: list[list[int]], the map grid
+    :param world_colors: list[list[str]], the color code of every tile
+    :precondition: the ray must start inside world_map
+    :postcondition: does not modify the map
+    :return: tuple of (hit_wall, distance, wall_x, wall_y, color, orientation)
+    >>> hit = march_ray(1.5, 1.5, 0.0, [[1, 1, 1, 1], [1, 0, 0, 1]], [["7"] * 4] * 2)
+    >>> hit[0], round(hit[1], 2), hit[2:5]
+    (True, 1.5, (3, 1, '7'))
+    """
+    distance_to_wall = 0
+    hit_wall = False
+    wall_x, wall_y = player_x, player_y
+    current_color = 7
+    wall_orientation = "vertical"
+    dir_x, dir_y = math.cos(angle), math.sin(angle)
+
+    while not hit_wall and distance_to_wall < MAX_RAY_DISTANCE:
+        distance_to_wall += MARCH_STEP
+        test_x = player_x + distance_to_wall * dir_x
+        test_y = player_y + distance_to_wall * dir_y
+
+        if not (0 <= int(test_x) < len(world_map[0]) and 0 <= int(test_y) < len(world_map)):
+            hit_wall = True
+            distance_to_wall = MAX_RAY_DISTANCE
+        else:
+            cell_type = world_map[int(test_y)][int(test_x)]
+            if cell_type not in [0, 4, 9]:
+                hit_wall = True
+                wall_x, wall_y = int(test_x), int(test_y)
+                current_color = world_colors[int(test_y)][int(test_x)]
+                wall_orientation = (
+                    "vertical"
+                    if abs(test_x - int(test_x)) < abs(test_y - int(test_y))
+                    else "horizontal"
+                )
+
+    return hit_wall, distance_to_wall, wall_x, wall_y, current_color, wall_orientation
+
+
+def sphere_trace_ray(player_x, player_y, angle, world_map, world_colors):
+    """
+    Cast a ray by sphere tracing through the map's wall-distance field.
+
+    In open space the ray jumps as far as the field guarantees is free of walls; next to
+    walls it falls back to MARCH_STEP increments, so hits match march_ray to within a
+    step. Maps without a field (chunked maps) are marched instead.
+
+    :param player_x: float, the x-coordinate the ray starts from
+    :param player_y: float, the y-coordinate the ray starts from
+    :param angle: float, the direction of the ray in radians
+    :param world_map: list[list[int]], the map grid
+    :param world_colors: list[list[str]], the color code of every tile
+    :precondition: the ray must start inside world_map
+    :postcondition: does not modify the map
+    :return: tuple of (hit_wall, distance, wall_x, wall_y, color, orientation)
+    >>> hit = sphere_trace_ray(1.5, 1.5, 0.0, [[1, 1, 1, 1], [1, 0, 0, 1]], [["7"] * 4] * 2)
+    >>> hit[0], round(hit[1], 2), hit[2:5]
+    (True, 1.5, (3, 1, '7'))
+    """
+    field = get_wall_distance_field(world_map)
+    if field is None:
+        return march_ray(player_x, player_y, angle, world_map, world_colors)
+
+    height, width = len(world_map), len(world_map[0])
+    dir_x, dir_y = math.cos(angle), math.sin(angle)
+    distance_to_wall = MARCH_STEP
+
+    while distance_to_wall < MAX_RAY_DISTANCE:
+        test_x = player_x + distance_to_wall * dir_x
+        test_y = player_y + distance_to_wall * dir_y
+        cell_x, cell_y = int(test_x), int(test_y)
+
+        if not (0 <= cell_x < width and 0 <= cell_y < height):
+            return True, MAX_RAY_DISTANCE, player_x, player_y, 7, "vertical"
+
+        clearance = field[cell_y][cell_x]
+        if clearance == 0:
+            wall_orientation = (
+                "vertical"
+                if abs(test_x - cell_x) < abs(test_y - cell_y)
+                else "horizontal"
+            )
+            return (
+                True,
+                distance_to_wall,
+                cell_x,
+                cell_y,
+                world_colors[cell_y][cell_x],
+                wall_orientation,
+            )
+
+        distance_to_wall += clearance - 1 if clearance > 1 else MARCH_STEP
+
+    return False, MAX_RAY_DISTANCE, player_x, player_y, 7, "vertical"
+
+
+RAY_ENGINES = {"march": march_ray, "sphere": sphere_trace_ray}
+
+RENDER_SETTINGS = {"ray_engine": "sphere"}
+
+
+def set_ray_engine(name=None):
+    """
+    Choose the ray engine render_world uses by default.
+    :param name: str | None, a key of RAY_ENGINES, or None to report the current engine
+    :precondition: RENDER_SETTINGS must exist
+    :postcondition: RENDER_SETTINGS["ray_engine"] is name if it is a known engine
+    :return: str, a message describing the result
+    >>> set_ray_engine("march")
+    'Ray engine set to march.'
+    >>> set_ray_engine("laser")
+    'Unknown ray engine. Choose one of: march, sphere'
+    >>> set_ray_engine("sphere")
+    'Ray engine set to sphere.'
+    """
+    if name is None:
+        return f"Current ray engine: {RENDER_SETTINGS['ray_engine']}"
+    if name not in RAY_ENGINES:
+        return "Unknown ray engine. Choose one of: " + ", ".join(sorted(RAY_ENGINES))
+    RENDER_SETTINGS["ray_engine"] = name
+    return f"Ray engine set to {name}."
+
+
 def render_world(
-    stdscr, player_x, player_y, player_angle, world_map, world_colors, player_state=None
+    stdscr,
+    player_x,
+    player_y,
+    player_angle,
+    world_map,
+    world_colors,
+    player_state=None,
+    ray_engine=None,
+    visible_entities=None,
 ):
-    """Render the world using ASCII characters with colored walls and Unicode edges"""
+    """
+    Render the world using ASCII characters with colored walls and Unicode edges.
+
+    Entities are drawn from visible_entities when it is given (such as a shared world's
+    interest query for this viewer), otherwise from all the entities of the world.
+    """
     height, width = stdscr.getmaxyx()
     height -= 1
     resolution = 1
@@ -221,7 +369,7 @@ def render_world(
                 min(len(ceiling_chars) - 1, int(y / (height / 2) * len(ceiling_chars)))
             ]
             * width,
-            curses.color_pair(9),
+            color_pair(9),
         )
 
     for y in range(height // 2, height):
@@ -235,44 +383,20 @@ def render_world(
                 )
             ]
             * width,
-            curses.color_pair(8),
+            color_pair(8),
         )
 
     wall_segments = []
     entity_renders = []
+    cast_ray = RAY_ENGINES[ray_engine or RENDER_SETTINGS["ray_engine"]]
 
     for column in range(0, width, resolution):
         ray_offset = (column / width - 0.5) * fov
         column_angle = player_angle + ray_offset
 
-        distance_to_wall = 0
-        hit_wall = False
-        wall_x, wall_y = player_x, player_y
-        current_color = 7
-        wall_orientation = "vertical"
-
-        while not hit_wall and distance_to_wall < 20:
-            distance_to_wall += 0.05
-            test_x = player_x + distance_to_wall * math.cos(column_angle)
-            test_y = player_y + distance_to_wall * math.sin(column_angle)
-
-            if not (
-                0 <= int(test_x) < len(world_map[0])
-                and 0 <= int(test_y) < len(world_map)
-            ):
-                hit_wall = True
-                distance_to_wall = 20
-            else:
-                cell_type = world_map[int(test_y)][int(test_x)]
-                if cell_type not in [0, 4, 9]:
-                    hit_wall = True
-                    wall_x, wall_y = int(test_x), int(test_y)
-                    current_color = world_colors[int(test_y)][int(test_x)]
-                    wall_orientation = (
-                        "vertical"
-                        if abs(test_x - int(test_x)) < abs(test_y - int(test_y))
-                        else "horizontal"
-                    )
+        hit_wall, distance_to_wall, wall_x, wall_y, current_color, wall_orientation = (
+            cast_ray(player_x, player_y, column_angle, world_map, world_colors)
+        )
 
         distance_to_wall *= math.cos(ray_offset)
         wall_height = (
@@ -299,12 +423,23 @@ def render_world(
                 }
             )
 
-    for entity in entity_system.entities:
+    # Skip entities that walls hide from every position in the player's sector
+    pvs = get_visibility(world_map, player_x, player_y)
+    pvs_sectors = pvs["sectors"]
+    max_entity_distance = min(20.0, pvs["max_distance"])
+
+    if visible_entities is None:
+        visible_entities = entity_system.entities
+
+    for entity in visible_entities:
+        if sector_of(entity["x"], entity["y"]) not in pvs_sectors:
+            continue
+
         dx = entity["x"] - player_x
         dy = entity["y"] - player_y
         entity_distance = math.sqrt(dx * dx + dy * dy)
 
-        if entity_distance > 20.0 or entity_distance <= 0:
+        if entity_distance > max_entity_distance or entity_distance <= 0:
             continue
 
         entity_angle = math.atan2(dy, dx)
@@ -446,16 +581,16 @@ def render_world(
 
         elif entity["type"] == entity_system.ENTITY_ENEMY:
             display_text = entity_system.get_enemy_display_text(entity, entity_distance)
-            color_attr = curses.color_pair(entity["color"])
+            color_attr = color_pair(entity["color"])
             if entity["state"] == "dead":
-                color_attr = curses.color_pair(entity_system.ENEMY_DEAD_COLOR)
+                color_attr = color_pair(entity_system.ENEMY_DEAD_COLOR)
             elif entity["state"] == "attack":
-                blink_on = int(time.time() * 4) % 2 == 0
-                color_attr = curses.color_pair(entity_system.ENEMY_ALERT_COLOR) | (
+                blink_on = int(game_clock.now() * 4) % 2 == 0
+                color_attr = color_pair(entity_system.ENEMY_ALERT_COLOR) | (
                     curses.A_BOLD if blink_on else 0
                 )
             elif entity["state"] == "chase":
-                color_attr = curses.color_pair(entity_system.ENEMY_ALERT_COLOR)
+                color_attr = color_pair(entity_system.ENEMY_ALERT_COLOR)
 
             text_height = len(display_text)
             scaled_height = max(1, min(text_height, int(text_height * entity_scale)))
@@ -495,9 +630,12 @@ def render_world(
 
     from renderer.minimap_renderer import render_minimap
 
+    # The minimap is timed apart from the 3D view for the performance overlay
+    frame_profiler.mark("render_world")
     render_minimap(
         stdscr, player_x, player_y, player_angle, world_map, world_colors, height, width
     )
+    frame_profiler.mark("minimap")
 
     status = (
         f"WASD: Move | Arrows: Turn | Space: Shoot | E: Interact | Q: Quit | M: Map"
@@ -0,0 +1,196 @@
+"""
+Recording games as compact key logs that can be replayed deterministically.
+
+A game only depends on the keys pressed, the random seed, the screen size and the
+time of every tick, so that is all a recording keeps. Tick times are rounded to the
+microsecond while recording and the game runs on the rounded times, so a replay sees
+exactly the clock the recorded game saw.
+"""
+
+import os
+import struct
+
+
+REPLAY_MAGIC = b"MUDR"
+REPLAY_VERSION = 2
+REPLAY_EXTENSION = ".replay"
+
+# magic, version, seed, screen height, screen width, start time, tick count
+HEADER = struct.Struct("<4sHIHHdI")
+# microseconds since the previous tick, event count
+TICK_RECORD = struct.Struct("<IH")
+# event kind, value
+EVENT_RECORD = struct.Struct("<Bi")
+
+EVENT_KEY = 0
+EVENT_RESIZE = 1  # The value is height << 16 | width
+MAX_EVENTS_PER_TICK = 2**16 - 1
+MAX_KEYS_PER_TICK = MAX_EVENTS_PER_TICK - 1  # Room for a resize in the same tick
+MAX_TICK_STEP_US = 2**32 - 1
+
+
+def tick_time(start_time, elapsed_us):
+    """
+    Turn whole microseconds since the start of a recording into a tick time.
+
+    Recording and replaying both go through here, so they get bit-identical times.
+
+    >>> tick_time(100.0, 250_000)
+    100.25
+    """
+    return start_time + elapsed_us / 1e6
+
+
+class Recorder:
+    """
+    Collects the ticks of a game as it is played.
+
+    >>> recorder = Recorder(seed=7, screen_size=(24, 80), start_time=100.0)
+    >>> recorder.record_tick(100.25, [ord("w")], (24, 80))
+    100.25
+    >>> recorder.record_tick(100.5000004, [], (30, 90))
+    100.5
+    >>> list(iter_ticks(recorder.to_recording()))
+    [(100.25, [119], None), (100.5, [], (30, 90))]
+    """
+
+    __slots__ = ("recording", "screen_size", "elapsed_us")
+
+    def __init__(self, seed, screen_size, start_time):
+        self.recording = {
+            "seed": seed,
+            "screen": tuple(screen_size),
+            "start_time": start_time,
+            "ticks": 0,
+            "data": bytearray(),
+        }
+        self.screen_size = tuple(screen_size)
+        self.elapsed_us = 0
+
+    def record_tick(self, wall_time, keys, screen_size):
+        """
+        Add a tick to the recording and get the time the game should use for it.
+
+        :param wall_time: float, the wall clock time at the start of the tick.
+        :param keys: list[int], the keys read this tick, in order.
+        :param screen_size: tuple[int, int], the (height, width) of the screen this tick.
+        :precondition: keys must be a list of ints.
+        :postcondition: The tick is appended to the recording; raises ValueError without
+                        recording anything if there are more than MAX_KEYS_PER_TICK keys.
+        :return: float, wall_time rounded to the microsecond since the recording started.
+        """
+        if len(keys) > MAX_KEYS_PER_TICK:
+            raise ValueError(
+                f"A tick can record at most {MAX_KEYS_PER_TICK} keys, got {len(keys)}"
+            )
+        recording = self.recording
+        elapsed_us = round((wall_time - recording["start_time"]) * 1e6)
+        step_us = min(max(0, elapsed_us - self.elapsed_us), MAX_TICK_STEP_US)
+        self.elapsed_us += step_us
+
+        events = [(EVENT_KEY, key) for key in keys]
+        if tuple(screen_size) != self.screen_size:
+            self.screen_size = tuple(screen_size)
+            events.append((EVENT_RESIZE, screen_size[0] << 16 | screen_size[1]))
+
+        data = recording["data"]
+        data += TICK_RECORD.pack(step_us, len(events))
+        for kind, value in events:
+            data += EVENT_RECORD.pack(kind, value)
+        recording["ticks"] += 1
+        return tick_time(recording["start_time"], self.elapsed_us)
+
+    def to_recording(self):
+        """Get the recording so far, in the form load_recording returns"""
+        return dict(self.recording, data=bytes(self.recording["data"]))
+
+
+def save_recording(path, recording):
+    """
+    Write a recording to disk in the binary replay format.
+
+    The file holds a fixed-size header, then one record per tick: the microseconds since
+    the previous tick and the number of events, followed by the events themselves.
+
+    :param path: str, the file to write.
+    :param recording: dict, as returned by Recorder.to_recording or load_recording.
+    :precondition: The recording must hold fewer than 2**32 ticks.
+    :postcondition: Creates missing parent directories and overwrites path.
+    :return: None
+    """
+    height, width = recording["screen"]
+    header = HEADER.pack(
+        REPLAY_MAGIC,
+        REPLAY_VERSION,
+        recording["seed"],
+        height,
+        width,
+        recording["start_time"],
+        recording["ticks"],
+    )
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "wb") as replay_file:
+        replay_file.write(header)
+        replay_file.write(recording["data"])
+
+
+def load_recording(path):
+    """
+    Read a recording written by save_recording.
+
+    :param path: str, the replay file.
+    :precondition: path must have been written by save_recording.
+    :postcondition: Raises ValueError if the file is not a replay of this version.
+    :return: dict, with the random "seed", the initial "screen" size, the "start_time",
+             the number of "ticks" and the raw tick "data".
+    """
+    with open(path, "rb") as replay_file:
+        contents = replay_file.read()
+
+    if len(contents) < HEADER.size:
+        raise ValueError(f"{path} is too short to be a replay file")
+    magic, version, seed, height, width, start_time, ticks = HEADER.unpack_from(contents)
+    if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+        raise ValueError(f"{path} is not a version {REPLAY_VERSION} replay file")
+
+    return {
+        "seed": seed,
+        "screen": (height, width),
+        "start_time": start_time,
+        "ticks": ticks,
+        "data": contents[HEADER.size :],
+    }
+
+
+def iter_ticks(recording):
+    """
+    Go through the ticks of a recording in order.
+
+    :param recording: dict, as returned by load_recording.
+    :precondition: recording["data"] must hold recording["ticks"] complete ticks.
+    :postcondition: Does not modify the recording; raises ValueError if it is truncated.
+    :return: generator of (tick_time, keys, screen_size) tuples, screen_size being the
+             new (height, width) when the screen was resized that tick, otherwise None.
+    """
+    data = recording["data"]
+    offset = 0
+    elapsed_us = 0
+    try:
+        for _ in range(recording["ticks"]):
+            step_us, event_count = TICK_RECORD.unpack_from(data, offset)
+            offset += TICK_RECORD.size
+            elapsed_us += step_us
+            keys = []
+            screen_size = None
+            for _ in range(event_count):
+                kind, value = EVENT_RECORD.unpack_from(data, offset)
+                offset += EVENT_RECORD.size
+                if kind == EVENT_RESIZE:
+                    screen_size = (value >> 16, value & 0xFFFF)
+                else:
+                    keys.append(value)
+            yield tick_time(recording["start_time"], elapsed_us), keys, screen_size
+    except struct.error:
+        raise ValueError("The replay is truncated") from None
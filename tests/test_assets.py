@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+from anim import assets
+from anim.assets import ASSET_STATS, LazyAsset, load_asset, unload_assets
+from anim.enemies.enemy_art import BOSS_ASCII
+from anim.hand.fire import FireFrames
+
+
+class TestAssets(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        cache_path = os.path.join(self.cache_dir.name, "assets.marshal")
+        self.cache_patch = patch.object(assets, "ASSET_CACHE", cache_path)
+        self.cache_patch.start()
+        unload_assets()
+        ASSET_STATS.update(cache_loads=0, module_loads=0)
+
+    def tearDown(self):
+        self.cache_patch.stop()
+        self.cache_dir.cleanup()
+        unload_assets()
+
+    def test_assets_match_their_modules(self):
+        self.assertEqual(FireFrames, load_asset("fire_frames"))
+        self.assertEqual(BOSS_ASCII, load_asset("boss_ascii"))
+
+    def test_second_session_reads_the_cache(self):
+        load_asset("enemy_ascii")
+        unload_assets()
+        self.assertEqual(BOSS_ASCII, load_asset("boss_ascii"))
+        self.assertEqual({"cache_loads": 1, "module_loads": 1}, ASSET_STATS)
+
+    def test_stale_cache_is_rebuilt(self):
+        load_asset("enemy_ascii")
+        unload_assets()
+        with patch.object(assets, "_source_stamp", lambda: (("changed", 0, 0),)):
+            load_asset("enemy_ascii")
+        self.assertEqual({"cache_loads": 0, "module_loads": 2}, ASSET_STATS)
+
+    def test_cache_writes_leave_no_temporary_files(self):
+        load_asset("enemy_ascii")
+        self.assertEqual(["assets.marshal"], os.listdir(self.cache_dir.name))
+        os.remove(assets.ASSET_CACHE)
+        with patch("marshal.dump", side_effect=ValueError):
+            assets._write_cache(assets._source_stamp(), {})
+        self.assertEqual([], os.listdir(self.cache_dir.name))
+
+    def test_lazy_asset_loads_on_first_use(self):
+        frames = LazyAsset("fire_frames")
+        self.assertEqual(0, ASSET_STATS["module_loads"])
+        self.assertEqual(FireFrames[3], frames[3])
+        self.assertEqual(len(FireFrames), len(frames))
+
+    def test_game_import_does_not_load_art(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        loaded = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, game; print(sorted(m for m in sys.modules "
+                "if m.startswith('anim.') and m != 'anim.assets'))",
+            ],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual("[]", loaded.stdout.strip())
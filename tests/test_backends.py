@@ -0,0 +1,112 @@
+import curses
+from unittest import TestCase
+import entities
+import ui
+from map.map_cache import clear_cache
+from player import create_player
+from renderer import render_full_map, render_minimap, render_world
+from renderer.backends import CursesBackend, MemoryBackend, NullBackend
+
+
+class TestMemoryBackend(TestCase):
+    def setUp(self):
+        self.screen = MemoryBackend(3, 5)
+
+    def test_long_text_wraps_to_next_line(self):
+        self.screen.addstr(0, 3, "abcd")
+        self.assertEqual(["   ab", "cd", ""], self.screen.lines())
+
+    def test_writes_outside_screen_raise(self):
+        with self.assertRaises(curses.error):
+            self.screen.addstr(3, 0, "x")
+        with self.assertRaises(curses.error):
+            self.screen.addstr(0, -1, "x")
+
+    def test_last_cell_writes_then_raises(self):
+        with self.assertRaises(curses.error):
+            self.screen.addstr(2, 4, "z")
+        self.assertEqual("z", self.screen.chars[2][4])
+
+    def test_attron_applies_to_plain_writes(self):
+        self.screen.attron(curses.A_BOLD)
+        self.screen.addstr(1, 0, "b")
+        self.screen.attroff(curses.A_BOLD)
+        self.screen.addstr(1, 1, "n")
+        self.assertEqual([curses.A_BOLD, 0], self.screen.attrs[1][:2])
+
+    def test_box_and_erase(self):
+        self.screen.box()
+        self.assertEqual(["┌───┐", "│   │", "└───┘"], self.screen.lines())
+        self.screen.erase()
+        self.assertEqual(["", "", ""], self.screen.lines())
+
+
+class FakeWindow:
+    def __init__(self):
+        self.calls = []
+
+    def getmaxyx(self):
+        return 10, 20
+
+    def addstr(self, *args):
+        self.calls.append(args)
+
+    def attron(self, attr):
+        pass
+
+    def attroff(self, attr):
+        pass
+
+    def noutrefresh(self):
+        pass
+
+    def getch(self):
+        return 42
+
+
+class TestCursesBackend(TestCase):
+    def test_draws_with_window_methods_and_forwards_the_rest(self):
+        window = FakeWindow()
+        screen = CursesBackend(window)
+        screen.addstr(1, 2, "x")
+        self.assertEqual([(1, 2, "x")], window.calls)
+        self.assertEqual(42, screen.getch())
+
+
+class TestRenderersOnBackends(TestCase):
+    def setUp(self):
+        clear_cache()
+        entities.clear_entities()
+        self.test_map = [[1] * 24] + [[1] + [0] * 22 + [1] for _ in range(14)] + [[1] * 24]
+        self.test_colors = [["7"] * 24 for _ in range(16)]
+        self.player_state = create_player(x=6.5, y=7.5)
+
+    def tearDown(self):
+        for queue in ui.ui_queues.values():
+            queue.clear()
+
+    def test_frame_renders_into_memory(self):
+        screen = MemoryBackend(80, 200)
+        render_world(screen, 6.5, 7.5, 0.0, self.test_map, self.test_colors, self.player_state)
+        ui.add_message("Backend test")
+        ui.draw_ui_layer(screen, self.player_state)
+        text = screen.text()
+        self.assertIn("[ MAP ]", text)
+        self.assertIn("LVL: 1", text)
+        self.assertIn("Backend test", text)
+        self.assertTrue(screen.lines()[-1].startswith("WASD: Move"))
+        self.assertTrue(any(char in "█▓▒░" for char in text))
+
+    def test_full_map_renders_into_memory(self):
+        screen = MemoryBackend(30, 80)
+        render_full_map(screen, 6.5, 7.5, 0.0, self.test_map, self.test_colors)
+        self.assertIn("[ DUNGEON MAP ]", screen.text())
+        self.assertIn("@", screen.text())
+
+    def test_null_backend_runs_every_renderer(self):
+        screen = NullBackend(40, 120)
+        render_world(screen, 6.5, 7.5, 0.0, self.test_map, self.test_colors, self.player_state)
+        render_minimap(screen, 6.5, 7.5, 0.0, self.test_map, self.test_colors, 40, 120)
+        render_full_map(screen, 6.5, 7.5, 0.0, self.test_map, self.test_colors)
+        ui.draw_ui_layer(screen, self.player_state)
+        self.assertGreaterEqual(screen.frames, 2)
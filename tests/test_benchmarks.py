@@ -0,0 +1,43 @@
+from unittest import TestCase
+import entities
+from benchmarks.cases import CASES
+from benchmarks.harness import measure, percentile, summarize
+from benchmarks.run import run_cases
+from benchmarks.terminal_output import BACKENDS, measure_output
+
+
+class TestHarness(TestCase):
+    def test_percentiles_interpolate(self):
+        samples = [float(value) for value in range(1, 101)]
+        self.assertAlmostEqual(50.5, percentile(samples, 50))
+        self.assertAlmostEqual(99.01, percentile(samples, 99))
+
+    def test_summary_is_in_milliseconds(self):
+        summary = summarize([2_000_000, 1_000_000, 3_000_000])
+        self.assertEqual((1.0, 2.0, 3.0), (summary["min_ms"], summary["p50_ms"], summary["max_ms"]))
+
+    def test_setup_is_not_timed(self):
+        calls = []
+        summary = measure(calls.append, setup=lambda: len(calls), warmup=2, repeat=4)
+        self.assertEqual([0, 1, 2, 3, 4, 5], calls)
+        self.assertEqual(4, summary["samples"])
+
+
+class TestCases(TestCase):
+    def tearDown(self):
+        entities.clear_entities()
+
+    def test_every_case_runs(self):
+        names = [name for name in CASES if not name.startswith("startup.")]
+        results = run_cases(names, warmup=0, repeat=1)
+        self.assertEqual(names, list(results))
+        self.assertTrue(all(summary["p50_ms"] >= 0 for summary in results.values()))
+
+
+class TestTerminalOutput(TestCase):
+    def test_both_backends_reach_the_terminal(self):
+        for backend in BACKENDS:
+            result = measure_output(backend, 24, 80, "turning", frames=3)
+            self.assertGreater(result["bytes_per_frame"], 0)
+            self.assertEqual(3, result["frame"]["samples"])
+            self.assertLessEqual(result["emit"]["p50_ms"], result["frame"]["max_ms"])
@@ -0,0 +1,146 @@
+from collections import defaultdict
+from unittest import TestCase
+from map.chunked_world import (
+    FULL_MAP_WINDOW,
+    ChunkedColorLayer,
+    ChunkedMap,
+    create_chunked_world,
+    edge_portal,
+    full_map_view,
+    generate_chunk,
+    get_chunk,
+    get_world_tile,
+    prefetch_chunks,
+    set_world_tile,
+)
+from map import static_map
+from map.distance_field import WALKABLE_TILES
+from map.static_map import get_color_layer, switch_map
+
+
+class TestChunkedWorld(TestCase):
+    def setUp(self):
+        self.world = create_chunked_world(
+            seed=11, archetype_key="RUINS", chunks_wide=4, chunks_high=4
+        )
+
+    def test_chunks_are_deterministic(self):
+        other = create_chunked_world(
+            seed=11, archetype_key="RUINS", chunks_wide=4, chunks_high=4
+        )
+        self.assertEqual(generate_chunk(self.world, 2, 1), generate_chunk(other, 2, 1))
+
+    def test_generation_does_not_disturb_global_random(self):
+        import random
+
+        random.seed(3)
+        expected = random.random()
+        random.seed(3)
+        generate_chunk(self.world, 1, 1)
+        self.assertEqual(expected, random.random())
+
+    def test_vertical_edges_are_stitched(self):
+        size = self.world["chunk_size"]
+        offset = edge_portal(self.world, "v", 1, 2)
+        y = 2 * size + offset
+        self.assertIn(get_world_tile(self.world, size - 1, y), WALKABLE_TILES)
+        self.assertIn(get_world_tile(self.world, size, y), WALKABLE_TILES)
+
+    def test_horizontal_edges_are_stitched(self):
+        size = self.world["chunk_size"]
+        offset = edge_portal(self.world, "h", 3, 1)
+        x = 3 * size + offset
+        self.assertIn(get_world_tile(self.world, x, size - 1), WALKABLE_TILES)
+        self.assertIn(get_world_tile(self.world, x, size), WALKABLE_TILES)
+
+    def test_lru_eviction_bounds_loaded_chunks(self):
+        self.world["max_chunks"] = 3
+        for chunk_x in range(4):
+            get_chunk(self.world, chunk_x, 0)
+        self.assertEqual(3, len(self.world["chunks"]))
+        self.assertNotIn((0, 0), self.world["chunks"])
+        self.assertEqual(4, self.world["stats"]["generated"])
+        self.assertEqual(1, self.world["stats"]["evicted"])
+
+    def test_edits_survive_eviction(self):
+        self.world["max_chunks"] = 1
+        set_world_tile(self.world, 5, 5, 9)
+        get_chunk(self.world, 3, 3)
+        self.assertNotIn((0, 0), self.world["chunks"])
+        self.assertEqual(9, get_world_tile(self.world, 5, 5))
+
+    def test_prefetch_is_bounded_by_world(self):
+        self.assertEqual(4, prefetch_chunks(self.world, 1.0, 1.0, 5))
+        self.assertEqual(4, len(self.world["chunks"]))
+
+
+class TestChunkedMap(TestCase):
+    def setUp(self):
+        self.world = create_chunked_world(
+            seed=5, archetype_key="CAVE", chunks_wide=3, chunks_high=2
+        )
+        self.world_map = ChunkedMap(self.world)
+
+    def test_indexing_matches_world_tiles(self):
+        self.assertEqual(40, len(self.world_map))
+        self.assertEqual(60, len(self.world_map[0]))
+        self.assertEqual(get_world_tile(self.world, 33, 27), self.world_map[27][33])
+
+    def test_out_of_bounds_is_wall(self):
+        self.assertEqual(1, self.world_map[-1][0])
+        self.assertEqual(1, self.world_map[0][60])
+
+    def test_iteration_stops_at_the_edges(self):
+        rows = list(self.world_map)
+        self.assertEqual(40, len(rows))
+        self.assertEqual([get_world_tile(self.world, x, 27) for x in range(60)], list(rows[27]))
+        self.assertTrue(any(1 in row for row in self.world_map))
+        colors = ChunkedColorLayer(self.world, defaultdict(lambda: "7"))
+        self.assertEqual((40, 60), (len(list(colors)), len(list(colors[0]))))
+
+    def test_row_assignment_records_edit(self):
+        self.world_map[12][45] = 4
+        self.assertEqual({(5, 12): 4}, self.world["edits"][(2, 0)])
+
+    def test_full_map_view_windows_large_maps(self):
+        colors = get_color_layer(self.world_map)
+        tiles, view_colors, view_x, view_y = full_map_view(
+            self.world_map, colors, 30.5, 20.5
+        )
+        self.assertEqual(FULL_MAP_WINDOW[1], len(tiles))
+        self.assertEqual(FULL_MAP_WINDOW[0], len(tiles[0]))
+        self.assertEqual(len(tiles), len(view_colors))
+        self.assertEqual((30.5, 20.5), (view_x, view_y))
+
+    def test_full_map_view_is_reused_until_moved_or_edited(self):
+        colors = get_color_layer(self.world_map)
+        tiles = full_map_view(self.world_map, colors, 30.5, 20.5)[0]
+        self.assertIs(tiles, full_map_view(self.world_map, colors, 30.9, 20.1)[0])
+        self.world_map[12][45] = 4
+        edited = full_map_view(self.world_map, colors, 30.9, 20.1)[0]
+        self.assertIsNot(tiles, edited)
+        self.assertEqual(4, edited[12][45])
+
+
+class TestSwitchMapChunked(TestCase):
+    def setUp(self):
+        self.saved_state = {
+            name: getattr(static_map, name)
+            for name in (
+                "ACTIVE_MAP",
+                "ACTIVE_COLORS",
+                "CURRENT_MAP_TYPE",
+                "CURRENT_COLOR_SHIFT",
+            )
+        }
+
+    def tearDown(self):
+        for name, value in self.saved_state.items():
+            setattr(static_map, name, value)
+
+    def test_switch_to_chunked_spawns_on_walkable_tile(self):
+        world_map, colors, spawn, is_new = switch_map("chunked")
+        self.assertIsInstance(world_map, ChunkedMap)
+        self.assertTrue(is_new)
+        self.assertIn(world_map[int(spawn[1])][int(spawn[0])], WALKABLE_TILES)
+        self.assertEqual(len(world_map), len(colors))
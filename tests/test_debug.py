@@ -10,6 +10,10 @@ class TestDebugModule(TestCase):
 
     def setUp(self):
         """Reset DEBUG_CONSOLE state before each test."""
+        for name in ("DEBUG_CONSOLE", "COMMANDS"):
+            patcher = patch.object(debug, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
         debug.DEBUG_CONSOLE = {
             "active": False,
             "command": "",
@@ -325,5 +329,100 @@ class TestDebugModule(TestCase):
         self.assertEqual(debug.DEBUG_CONSOLE["cursor_pos"], 3)
 
 
+class TestDiagnosticCommands(TestCase):
+    def setUp(self):
+        self.addCleanup(debug.stop_profile)
+        patcher = patch.object(
+            debug,
+            "DEBUG_CONSOLE",
+            {"active": True, "command": "", "cursor_pos": 0, "last_result": None},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_profile_reports_after_its_last_frame(self):
+        self.assertEqual("Profiling the next 2 frames...", debug.start_profile("2"))
+        self.assertFalse(debug.DEBUG_CONSOLE["active"])
+        self.assertEqual("A profile is already running", debug.start_profile("2"))
+
+        sorted(range(1000))
+        debug.tick_profile()
+        self.assertIsNotNone(debug.PROFILE_SESSION["profiler"])
+        debug.tick_profile()
+
+        self.assertIsNone(debug.PROFILE_SESSION["profiler"])
+        self.assertTrue(debug.DEBUG_CONSOLE["active"])
+        report = debug.DEBUG_CONSOLE["last_result"].split("\n")
+        self.assertTrue(report[0].startswith("Profiled 2 frames"))
+        self.assertTrue(any("sorted" in line for line in report[2:]))
+        self.assertLessEqual(len(report), 2 + debug.PROFILE_TOP_FUNCTIONS)
+
+    def test_stopping_a_profile_discards_it(self):
+        debug.start_profile("5")
+        profiler = debug.PROFILE_SESSION["profiler"]
+        debug.stop_profile()
+        self.assertIsNone(debug.PROFILE_SESSION["profiler"])
+        self.assertEqual(0, debug.PROFILE_SESSION["frames_left"])
+        self.assertIsNone(debug.DEBUG_CONSOLE["last_result"])
+        self.assertEqual("Profiling the next 2 frames...", debug.start_profile("2"))
+        self.assertIsNot(profiler, debug.PROFILE_SESSION["profiler"])
+
+    def test_profile_rejects_bad_frame_counts(self):
+        for frames in ("0", "-3", "many", str(debug.MAX_PROFILE_FRAMES + 1)):
+            self.assertTrue(debug.start_profile(frames).startswith("Usage"))
+        self.assertIsNone(debug.PROFILE_SESSION["profiler"])
+
+    @patch("entities.enemy_projectiles", [])
+    @patch("entities.projectiles", [{}])
+    @patch("entities.enemies", [{"state": "idle"}, {"state": "dead"}])
+    @patch("entities.entities", [{}, {}, {}])
+    def test_stats_lists_entities_queues_and_caches(self):
+        lines = debug.show_stats([[1, 1], [1, 0]]).split("\n")
+        self.assertEqual(
+            "Entities: 3 total, 2 enemies (1 alive), 1 projectiles, 0 enemy projectiles",
+            lines[0],
+        )
+        self.assertTrue(lines[1].startswith("Queues: message "))
+        self.assertTrue(lines[2].startswith("Map layers: "))
+        self.assertFalse(any(line.startswith("Chunks") for line in lines))
+
+    def test_stats_include_chunks_on_chunked_maps(self):
+        from map.chunked_world import ChunkedMap, create_chunked_world
+
+        world = create_chunked_world(seed=3, chunks_wide=2, chunks_high=2)
+        world_map = ChunkedMap(world)
+        world_map[0][0]
+        self.assertIn("Chunks: 1/36 loaded", debug.show_stats(world_map))
+
+    def test_bench_render_times_the_view_offscreen(self):
+        world_map = [[1] * 8] + [[1] + [0] * 6 + [1] for _ in range(6)] + [[1] * 8]
+        colors = [[7] * 8 for _ in range(8)]
+        view = (3.5, 3.5, 0.0, world_map, colors, None)
+        result = debug.bench("render", "3", (24, 80), view)
+        self.assertTrue(result.startswith("render 80x24 x3: p50 "))
+        self.assertEqual("Usage: bench render [count]", debug.bench("render", "x", (24, 80), view))
+        self.assertEqual(
+            "Usage: bench render [count]", debug.bench("render", "1000000", (24, 80), view)
+        )
+        self.assertEqual("Nothing to render yet", debug.bench("render"))
+
+    def test_console_shows_every_result_line(self):
+        from renderer import MemoryBackend, console_renderer
+
+        screen = MemoryBackend(10, 40)
+        lines = [f"line {i}" for i in range(20)]
+        with patch.dict(
+            console_renderer.DEBUG_CONSOLE,
+            {"active": True, "command": "stats", "cursor_pos": 5, "last_result": "\n".join(lines)},
+        ):
+            console_renderer.render_console(screen)
+        self.assertEqual("> stats", screen.lines()[0])
+        # The bottom row is left for the status line
+        self.assertEqual(
+            lines[:7] + ["..."], [line.rstrip() for line in screen.lines()[1:9]]
+        )
+        self.assertEqual("", screen.lines()[9])
+
+
 if __name__ == "__main__":
     unittest.main()
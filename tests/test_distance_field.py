@@ -0,0 +1,68 @@
+from unittest import TestCase
+from map.distance_field import (
+    UNREACHABLE,
+    bfs_distance_field,
+    farthest_cell,
+    reachable_cells,
+)
+from map.dungeon_generator import find_farthest_point, is_good_door_spot
+
+
+class TestDistanceField(TestCase):
+    def setUp(self):
+        self.test_map = [
+            [1, 1, 1, 1, 1, 1],
+            [1, 0, 0, 1, 0, 1],
+            [1, 4, 1, 1, 0, 1],
+            [1, 9, 0, 0, 0, 1],
+            [1, 1, 1, 1, 1, 1],
+        ]
+
+    def test_bfs_distance_field_counts_steps(self):
+        field = bfs_distance_field(self.test_map, [(1, 1)])
+        self.assertEqual(0, field[1][1])
+        self.assertEqual(1, field[1][2])
+        self.assertEqual(2, field[3][1])
+        self.assertEqual(7, field[1][4])
+        self.assertEqual(UNREACHABLE, field[0][0])
+        self.assertEqual(UNREACHABLE, field[2][2])
+
+    def test_bfs_distance_field_multiple_sources(self):
+        field = bfs_distance_field(self.test_map, [(1, 1), (4, 1)])
+        self.assertEqual(0, field[1][4])
+        self.assertEqual(2, field[3][4])
+        self.assertEqual(3, field[3][2])
+
+    def test_bfs_distance_field_custom_walkable(self):
+        field = bfs_distance_field(self.test_map, [(1, 1)], walkable={0})
+        self.assertEqual(UNREACHABLE, field[2][1])
+        self.assertEqual(1, field[1][2])
+
+    def test_reachable_cells(self):
+        field = bfs_distance_field(self.test_map, [(1, 1)])
+        cells = reachable_cells(field)
+        self.assertEqual(9, len(cells))
+        self.assertIn((0, 1, 1), cells)
+
+    def test_farthest_cell(self):
+        field = bfs_distance_field(self.test_map, [(1, 1)])
+        self.assertEqual((4, 1, 7), farthest_cell(field))
+        self.assertEqual((2, 3, 3), farthest_cell(field, lambda x, y: x < 3))
+        self.assertIsNone(farthest_cell(field, lambda x, y: False))
+
+    def test_find_farthest_point_prefers_distant_door_spot(self):
+        test_map = [[1] * 12 for _ in range(8)]
+        for x in range(1, 11):
+            test_map[3][x] = test_map[4][x] = 0
+        door_x, door_y = find_farthest_point(test_map, 1, 3)
+        self.assertEqual((10, 4), (door_x, door_y))
+        self.assertTrue(is_good_door_spot(test_map, door_x, door_y))
+
+    def test_find_farthest_point_on_open_map(self):
+        test_map = [[1] * 60 for _ in range(60)]
+        for y in range(1, 59):
+            for x in range(1, 59):
+                test_map[y][x] = 0
+        test_map[40][40] = 1
+        door_x, door_y = find_farthest_point(test_map, 5, 5)
+        self.assertTrue(is_good_door_spot(test_map, door_x, door_y))
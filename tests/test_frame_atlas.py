@@ -0,0 +1,52 @@
+import curses
+from unittest import TestCase
+from anim.hand.fire import FireFrames
+from renderer.backends import MemoryBackend
+from renderer.frame_atlas import FRAME_ATLAS, get_frame_spans, parse_frame
+import ui
+
+
+def draw_per_char(frame, height, width):
+    """The per-character drawing the atlas replaces"""
+    screen = MemoryBackend(height, width)
+    for i, line in enumerate(frame.split("\n")):
+        for j, char in enumerate(line):
+            y, x = height - 65 + i, width - 118 + j
+            if char not in " \t" and 0 <= y < height and 0 <= x < width:
+                try:
+                    screen.addstr(y, x, char)
+                except curses.error:
+                    pass
+    return screen
+
+
+class TestFrameAtlas(TestCase):
+    def setUp(self):
+        FRAME_ATLAS.update(parsed={}, size=None, layouts={})
+
+    def test_spans_cover_every_visible_character(self):
+        for line, spans in zip(FireFrames[2].split("\n"), parse_frame(FireFrames[2])):
+            rebuilt = [" "] * len(line)
+            for offset, text in spans:
+                rebuilt[offset : offset + len(text)] = text
+            self.assertEqual(line.replace("\t", " ").rstrip(), "".join(rebuilt).rstrip())
+
+    def test_drawing_matches_per_character_drawing(self):
+        for height, width in ((140, 200), (50, 90), (30, 60)):
+            screen = MemoryBackend(height, width)
+            ui.draw_fire_frame(screen, FireFrames[0])
+            expected = draw_per_char(FireFrames[0], height, width)
+            self.assertEqual(expected.chars, screen.chars)
+
+    def test_runs_need_far_fewer_calls(self):
+        screen = MemoryBackend(140, 200)
+        ui.draw_fire_frame(screen, FireFrames[0])
+        per_char = draw_per_char(FireFrames[0], 140, 200)
+        self.assertLess(screen.writes * 4, per_char.writes)
+
+    def test_layouts_are_cached_per_terminal_size(self):
+        spans = get_frame_spans(FireFrames[1], 10, 5, 100, 150)
+        self.assertIs(spans, get_frame_spans(FireFrames[1], 10, 5, 100, 150))
+        get_frame_spans(FireFrames[1], 10, 5, 90, 150)
+        self.assertEqual(1, len(FRAME_ATLAS["layouts"]))
+        self.assertEqual(1, len(FRAME_ATLAS["parsed"]))
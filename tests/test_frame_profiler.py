@@ -0,0 +1,75 @@
+import curses
+from unittest import TestCase
+from unittest.mock import patch
+import ui
+from player import create_player, update_input
+from renderer import MemoryBackend
+from utils import frame_profiler
+from utils.frame_profiler import FRAME_PROFILER, RollingHistogram
+
+
+class TestRollingHistogram(TestCase):
+    def test_percentiles_are_within_a_bucket(self):
+        histogram = RollingHistogram(window=1000)
+        for sample in range(1, 1001):
+            histogram.add(sample * 10_000)
+        self.assertAlmostEqual(5_000_000, histogram.percentile(50), delta=350_000)
+        self.assertAlmostEqual(9_900_000, histogram.percentile(99), delta=700_000)
+        self.assertAlmostEqual(5_005_000, histogram.mean())
+
+    def test_old_samples_roll_out(self):
+        histogram = RollingHistogram(window=10)
+        for _ in range(10):
+            histogram.add(50_000_000)
+        for _ in range(10):
+            histogram.add(1_000_000)
+        self.assertEqual(10, len(histogram))
+        self.assertLess(histogram.percentile(99), 1_100_000)
+        self.assertEqual(10, sum(histogram.counts))
+
+
+class TestFrameProfiler(TestCase):
+    def setUp(self):
+        self.addCleanup(FRAME_PROFILER.update, dict(FRAME_PROFILER))
+        FRAME_PROFILER["enabled"] = False
+
+    def run_frame(self, clock, stages):
+        with patch("time.perf_counter_ns", side_effect=clock):
+            frame_profiler.begin_frame()
+            for stage in stages:
+                frame_profiler.mark(stage)
+            frame_profiler.end_frame()
+
+    def test_disabled_records_nothing(self):
+        self.run_frame(iter([]), ["input", "ui"])
+        self.assertEqual({}, FRAME_PROFILER["stages"])
+
+    def test_stages_are_charged_the_time_since_the_last_mark(self):
+        self.assertTrue(frame_profiler.toggle_profiler())
+        for start in (0, 40_000_000):
+            ms = 1_000_000
+            self.run_frame(
+                iter([start + 1, start + ms, start + 9 * ms, start + 10 * ms, start + 10 * ms]),
+                ["input", "render_world", "doupdate"],
+            )
+        summary = frame_profiler.profiler_summary()
+        self.assertEqual("render_world", summary["top_stage"])
+        self.assertAlmostEqual(8.0, summary["top_ms"], places=3)
+        self.assertAlmostEqual(25.0, summary["fps"], places=3)
+        self.assertAlmostEqual(10.0, summary["p50_ms"], delta=0.7)
+        self.assertEqual({"input", "render_world", "doupdate"}, set(summary["stages"]))
+
+    def test_f3_toggles_the_overlay(self):
+        player_state = create_player()
+        update_input(player_state, curses.KEY_F3)
+        self.assertTrue(FRAME_PROFILER["enabled"])
+        self.assertNotIn(curses.KEY_F3, player_state["active_keys"])
+
+        screen = MemoryBackend(40, 200)
+        ui.draw_ui_layer(screen, player_state)
+        self.assertTrue(screen.lines()[ui.PERF_OVERLAY_Y].lstrip().startswith("FPS"))
+
+        update_input(player_state, curses.KEY_F3)
+        screen.erase()
+        ui.draw_ui_layer(screen, player_state)
+        self.assertNotIn("FPS", screen.text())
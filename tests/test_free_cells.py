@@ -0,0 +1,96 @@
+import math
+from unittest import TestCase
+from map.chunked_world import ChunkedMap, create_chunked_world
+from map.distance_field import WALKABLE_TILES
+from map.free_cells import (
+    REGION_SIZE,
+    FreeCellIndex,
+    get_free_cell_index,
+    sample_free_cells,
+)
+from map.map_cache import clear_cache, set_tile
+
+
+class TestFreeCellIndex(TestCase):
+    def setUp(self):
+        clear_cache()
+        self.open_map = [[0] * 50 for _ in range(40)]
+        self.open_map[10][10] = 1
+
+    def test_index_skips_walls_and_border(self):
+        index = FreeCellIndex(self.open_map)
+        self.assertEqual(48 * 38 - 1, len(index))
+        self.assertNotIn((10, 10), set(index))
+        self.assertNotIn((0, 5), set(index))
+
+    def test_region_matches_brute_force(self):
+        index = FreeCellIndex(self.open_map)
+        region = index.in_region(5, 3, REGION_SIZE + 7, 2 * REGION_SIZE + 1)
+        expected = [
+            (x, y)
+            for y in range(3, 2 * REGION_SIZE + 2)
+            for x in range(5, REGION_SIZE + 8)
+            if (x, y) != (10, 10)
+        ]
+        self.assertEqual(expected, list(region))
+
+    def test_index_is_cached_until_map_changes(self):
+        first = get_free_cell_index(self.open_map)
+        self.assertIs(first, get_free_cell_index(self.open_map))
+        set_tile(self.open_map, 10, 10, 0)
+        second = get_free_cell_index(self.open_map)
+        self.assertIsNot(first, second)
+        self.assertEqual(len(first) + 1, len(second))
+
+    def test_chunked_map_region_uses_world_coordinates(self):
+        world_map = ChunkedMap(
+            create_chunked_world(
+                seed=2, archetype_key="CAVE", chunks_wide=3, chunks_high=3
+            )
+        )
+        index = get_free_cell_index(world_map, (15.5, 25.0, 45.0, 44.9))
+        self.assertTrue(len(index) > 0)
+        for x, y in index:
+            self.assertTrue(15 <= x <= 45 and 25 <= y <= 44)
+            self.assertIn(world_map[y][x], WALKABLE_TILES)
+        self.assertEqual(6, world_map.world["stats"]["generated"])
+
+    def test_chunked_map_requires_a_region(self):
+        world_map = ChunkedMap(
+            create_chunked_world(seed=2, archetype_key="CAVE", chunks_wide=2, chunks_high=2)
+        )
+        with self.assertRaises(ValueError):
+            get_free_cell_index(world_map)
+
+
+class TestSampleFreeCells(TestCase):
+    def setUp(self):
+        self.index = FreeCellIndex([[0] * 30 for _ in range(30)])
+
+    def test_spacing_and_keep_away(self):
+        picked = sample_free_cells(
+            self.index,
+            10,
+            min_spacing=4.0,
+            keep_away=(15.5, 15.5),
+            keep_away_distance=5.0,
+        )
+        self.assertEqual(10, len(picked))
+        for i, (x, y) in enumerate(picked):
+            self.assertGreaterEqual(math.hypot(x + 0.5 - 15.5, y + 0.5 - 15.5), 5.0)
+            for other_x, other_y in picked[i + 1:]:
+                self.assertGreaterEqual(math.hypot(x - other_x, y - other_y), 4.0)
+
+    def test_relaxes_constraints_when_crowded(self):
+        index = FreeCellIndex([[1, 1, 1, 1], [1, 0, 0, 1], [1, 1, 1, 1]])
+        picked = sample_free_cells(index, 2, min_spacing=10.0)
+        self.assertEqual({(1, 1), (2, 1)}, set(picked))
+
+    def test_never_picks_a_cell_twice(self):
+        index = FreeCellIndex([[0] * 5 for _ in range(5)])
+        picked = sample_free_cells(index, 12, min_spacing=2.0)
+        self.assertEqual(9, len(picked))
+        self.assertEqual(9, len(set(picked)))
+
+    def test_empty_index(self):
+        self.assertEqual([], sample_free_cells(FreeCellIndex([[1, 1], [1, 1]]), 3))
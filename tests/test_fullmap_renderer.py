@@ -0,0 +1,55 @@
+from unittest import TestCase
+from map import TERRAIN_CHARS
+from map.map_cache import clear_cache, set_tile
+from renderer.backends import MemoryBackend
+from renderer.fullmap_renderer import FULL_MAP_CACHE, render_full_map
+
+
+class TestFullMapRenderer(TestCase):
+    def setUp(self):
+        clear_cache()
+        FULL_MAP_CACHE.update(key=None, map=None, frame=None, rebuilds=0)
+        self.test_map = [[1] * 20] + [[1] + [0] * 18 + [1] for _ in range(8)] + [[1] * 20]
+        self.test_map[4][6] = 3
+        self.test_colors = [["7"] * 20 for _ in range(10)]
+
+    def _render(self, x=5.5, y=5.5, height=31, width=80, world_map=None):
+        screen = MemoryBackend(height, width)
+        render_full_map(
+            screen, x, y, 0.0, world_map or self.test_map, self.test_colors
+        )
+        return screen
+
+    def test_frame_is_reused_between_frames(self):
+        self._render()
+        self._render(x=9.5, y=3.5)
+        self.assertEqual(1, FULL_MAP_CACHE["rebuilds"])
+
+    def test_resize_and_mutation_rebuild_frame(self):
+        self._render()
+        self._render(width=60)
+        self.assertEqual(2, FULL_MAP_CACHE["rebuilds"])
+        set_tile(self.test_map, 6, 4, 8)
+        screen = self._render(width=60)
+        self.assertEqual(3, FULL_MAP_CACHE["rebuilds"])
+        frame = FULL_MAP_CACHE["frame"]
+        screen_y = frame["offset_y"] + int(4 * frame["scale"]) + 2
+        screen_x = frame["offset_x"] + int(6 * frame["scale"]) + 1
+        self.assertEqual(TERRAIN_CHARS[8], screen.chars[screen_y][screen_x])
+
+    def test_new_map_rebuilds_frame(self):
+        self._render()
+        self._render(world_map=[row[:] for row in self.test_map])
+        self.assertEqual(2, FULL_MAP_CACHE["rebuilds"])
+
+    def test_player_marker_drawn_over_map(self):
+        screen = self._render(x=5.5, y=5.5)
+        frame = FULL_MAP_CACHE["frame"]
+        screen_y = frame["offset_y"] + int(5.5 * frame["scale"]) + 2
+        screen_x = frame["offset_x"] + int(5.5 * frame["scale"]) + 1
+        self.assertEqual("@", screen.chars[screen_y][screen_x])
+        self.assertEqual("↑", screen.chars[screen_y - 1][screen_x])
+
+    def test_rows_are_blitted_as_runs(self):
+        screen = self._render(height=12, width=24)
+        self.assertLess(screen.writes, 60)
@@ -0,0 +1,76 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+import debug
+import entities
+import game
+from utils import game_clock
+from utils.game_clock import GAME_CLOCK
+
+
+class TestGameClock(TestCase):
+    def setUp(self):
+        self.addCleanup(game_clock.stop_ticks)
+
+    @patch("time.time", return_value=42.0)
+    def test_reads_the_wall_clock_outside_ticks(self, _):
+        self.assertEqual(42.0, game_clock.now())
+
+    def test_one_time_per_tick(self):
+        with patch("time.time", side_effect=[100.0, 100.5]) as wall_clock:
+            self.assertEqual(100.0, game_clock.advance())
+            entities.create_enemy(1.5, 1.5)
+            self.assertEqual(100.0, entities.enemies[-1]["last_move"])
+            self.assertEqual(100.0, game_clock.now())
+            self.assertEqual(100.5, game_clock.advance())
+        self.assertEqual(2, wall_clock.call_count)
+        entities.clear_entities()
+
+    def test_modes(self):
+        self.assertEqual(10.0, game_clock.advance(10.0))
+        game_clock.set_clock_mode(game_clock.CLOCK_PAUSED)
+        self.assertEqual(10.0, game_clock.advance(12.0))
+        game_clock.set_clock_mode(game_clock.CLOCK_SCALED, 3.0)
+        self.assertEqual(13.0, game_clock.advance(13.0))
+        game_clock.set_clock_mode(game_clock.CLOCK_SIMULATED, 0.5)
+        self.assertEqual(13.5, game_clock.advance(100.0))
+        game_clock.set_clock_mode(game_clock.CLOCK_REAL)
+        self.assertEqual(14.5, game_clock.advance(101.0))
+
+    def test_wall_clock_going_back_does_not_rewind(self):
+        game_clock.advance(50.0)
+        self.assertEqual(50.0, game_clock.advance(49.0))
+        self.assertEqual(51.0, game_clock.advance(50.0))
+
+    def test_bad_modes_are_rejected(self):
+        with self.assertRaises(ValueError):
+            game_clock.set_clock_mode("fast")
+        with self.assertRaises(ValueError):
+            game_clock.set_clock_mode(game_clock.CLOCK_SCALED, 0)
+        self.assertEqual(game_clock.CLOCK_REAL, GAME_CLOCK["mode"])
+
+    def test_stop_resets_the_mode(self):
+        game_clock.set_clock_mode(game_clock.CLOCK_SCALED, 2.0)
+        game_clock.advance(1.0)
+        game_clock.stop_ticks()
+        self.assertEqual((game_clock.CLOCK_REAL, 1.0, None), (
+            GAME_CLOCK["mode"], GAME_CLOCK["scale"], GAME_CLOCK["tick_time"]
+        ))
+
+    def test_time_command(self):
+        self.assertEqual("Clock: paused", debug.set_game_clock("pause"))
+        self.assertEqual("Clock: stepping 10 ms per frame", debug.set_game_clock("step", "0.01"))
+        self.assertEqual("Clock: stepping 10 ms per frame", debug.set_game_clock())
+        self.assertTrue(debug.set_game_clock("step", "-1").startswith("Usage"))
+
+
+class TestSimulatedGame(TestCase):
+    def test_simulation_is_deterministic(self):
+        first = game.simulate_game(120, seed=4)
+        first_enemies = [(enemy["x"], enemy["y"]) for enemy in entities.enemies]
+        second = game.simulate_game(120, seed=4)
+        self.assertEqual(first_enemies, [(enemy["x"], enemy["y"]) for enemy in entities.enemies])
+        self.assertEqual(120, first["ticks"])
+        self.assertAlmostEqual(119 / 30, first["seconds"], delta=1e-4)
+        self.assertEqual(first["player"]["health"], second["player"]["health"])
+        self.assertEqual(game_clock.CLOCK_REAL, GAME_CLOCK["mode"])
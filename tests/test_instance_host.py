@@ -0,0 +1,173 @@
+from unittest import TestCase
+
+import world_instance
+from instance_host import (
+    START_TIME,
+    TICK_STEP,
+    RENDER_FIELDS,
+    InstanceHost,
+    _create_entry,
+    _join_instance,
+    _run_in_instance,
+    _tick_instance,
+    measure_throughput,
+    render_snapshot,
+)
+from renderer.backends import MemoryBackend
+from utils import game_clock
+
+
+class TestInstanceHost(TestCase):
+    def setUp(self):
+        self.host = InstanceHost(2)
+        self.addCleanup(self.host.close)
+
+    def test_instances_are_spread_over_the_workers(self):
+        for seed in range(3):
+            self.host.create_instance(seed)
+        self.assertEqual([2, 1], self.host.loads)
+        self.assertEqual([0, 1, 2], sorted(self.host.tick(START_TIME)))
+
+    def test_players_move_in_their_own_instance(self):
+        first = self.host.create_instance(1)
+        second = self.host.create_instance(2)
+        self.host.join(first, "ann")
+        self.host.join(second, "bo")
+        ann = self.host.tick(START_TIME)[first]["players"]["ann"]
+        spawn = (ann["x"], ann["y"])
+        for tick in range(1, 11):
+            self.host.send_input(first, "ann", [ord("w")])
+            snapshots = self.host.tick(START_TIME + tick * TICK_STEP)
+        ann = snapshots[first]["players"]["ann"]
+        self.assertNotEqual(spawn, (ann["x"], ann["y"]))
+        self.assertEqual(["bo"], list(snapshots[second]["players"]))
+        self.assertEqual(1, snapshots[first]["depth"])
+
+    def test_same_seed_same_instance(self):
+        other = InstanceHost(1)
+        self.addCleanup(other.close)
+        alone = other.create_instance(9)
+        other.join(alone, "p")
+        # The seed 9 instance shares its worker with another, which also uses randomness
+        neighbor = self.host.create_instance(5)
+        self.host.create_instance(7)
+        shared = self.host.create_instance(9)
+        self.assertEqual(self.host.placement[neighbor], self.host.placement[shared])
+        self.host.join(neighbor, "n")
+        self.host.join(shared, "p")
+        for tick in range(5):
+            self.host.send_input(neighbor, "n", [ord(" "), ord("a")])
+            self.host.send_input(shared, "p", [ord("d")])
+            other.send_input(alone, "p", [ord("d")])
+            current_time = START_TIME + tick * TICK_STEP
+            self.assertEqual(
+                other.tick(current_time)[alone], self.host.tick(current_time)[shared]
+            )
+
+    def test_leaving_and_closing(self):
+        instance_id = self.host.create_instance(3)
+        self.host.join(instance_id, "p")
+        self.host.leave(instance_id, "p")
+        self.assertEqual({}, self.host.tick(START_TIME)[instance_id]["players"])
+        self.host.close_instance(instance_id)
+        self.assertEqual({}, self.host.tick(START_TIME + TICK_STEP))
+        self.assertEqual([0, 0], self.host.loads)
+
+    def test_players_join_an_instance_once(self):
+        instance_id = self.host.create_instance(6)
+        self.host.join(instance_id, "p")
+        with self.assertRaises(ValueError):
+            self.host.join(instance_id, "p")
+        self.host.send_input(instance_id, "p", [ord("q")])
+        self.assertEqual("quit", self.host.tick(START_TIME)[instance_id]["events"]["p"])
+        self.host.join(instance_id, "p")
+        self.host.leave(instance_id, "p")
+        self.host.join(instance_id, "p")
+        snapshot = self.host.tick(START_TIME + TICK_STEP)[instance_id]
+        self.assertEqual(["p"], list(snapshot["players"]))
+
+    def test_snapshots_are_enough_to_draw_a_frame(self):
+        instance_id = self.host.create_instance(8)
+        self.host.join(instance_id, "p")
+        first = self.host.tick(START_TIME)[instance_id]
+        second = self.host.tick(START_TIME + TICK_STEP)[instance_id]
+        self.assertIsNone(second["level"])
+        self.assertEqual(world_instance.ENEMIES_PER_LEVEL, len(second["entities"]))
+        self.assertLessEqual(set(second["entities"][0]), set(RENDER_FIELDS))
+
+        game_clock.start_tick(START_TIME + TICK_STEP)
+        self.addCleanup(game_clock.stop_ticks)
+        screen = MemoryBackend(24, 80)
+        render_snapshot(screen, first["level"], second, "p")
+        self.assertIn("HP: 100/100", screen.text())
+        self.assertTrue(screen.lines()[-1].startswith("WASD: Move"))
+
+    def test_leaving_after_quitting(self):
+        instance_id = self.host.create_instance(4)
+        self.host.join(instance_id, "p")
+        self.host.send_input(instance_id, "p", [ord("q")])
+        self.assertEqual("quit", self.host.tick(START_TIME)[instance_id]["events"]["p"])
+        self.host.leave(instance_id, "p")
+        self.host.leave(instance_id, "nobody")
+        self.assertEqual({}, self.host.tick(START_TIME + TICK_STEP)[instance_id]["players"])
+
+    def test_worker_failures_are_reported_without_losing_instances(self):
+        first = self.host.create_instance(4)
+        second = self.host.create_instance(5)
+        third = self.host.create_instance(6)
+        self.assertEqual(self.host.placement[first], self.host.placement[third])
+        self.host.join(third, "p")
+        # Bypass the host's membership check, as a buggy front end might
+        self.host.connections[self.host.placement[third]].send(("join", third, "p"))
+        with self.assertRaises(RuntimeError):
+            self.host.tick(START_TIME)
+        snapshots = self.host.tick(START_TIME + TICK_STEP)
+        self.assertEqual([first, second, third], sorted(snapshots))
+        self.assertEqual(["p"], list(snapshots[third]["players"]))
+
+
+class TestInstanceEntries(TestCase):
+    def setUp(self):
+        self.original_state = {
+            name: getattr(module, name)
+            for module, names in world_instance.WORLD_STATE.items()
+            for name in names
+        }
+        self.addCleanup(self.restore_state)
+        self.addCleanup(game_clock.stop_ticks)
+        game_clock.start_tick(START_TIME)
+
+    def restore_state(self):
+        for module, names in world_instance.WORLD_STATE.items():
+            for name in names:
+                setattr(module, name, self.original_state[name])
+
+    def play(self, entries, ticks=60):
+        for tick in range(ticks):
+            current_time = START_TIME + (tick + 1) * TICK_STEP
+            game_clock.start_tick(current_time)
+            for entry in entries:
+                _run_in_instance(entry, _tick_instance, entry, current_time)
+        return [
+            [(enemy["x"], enemy["y"]) for enemy in entry["world"].state["enemies"]]
+            for entry in entries
+        ]
+
+    def test_neighbors_do_not_change_an_instance(self):
+        (alone,) = self.play([_create_entry(9, 1)])
+        game_clock.start_tick(START_TIME)
+        neighbor = _create_entry(5, 1)
+        _, shared = self.play([neighbor, _create_entry(9, 1)])
+        self.assertEqual(alone, shared)
+
+    def test_duplicate_joins_are_rejected(self):
+        entry = _create_entry(2, 1)
+        _join_instance(entry, "p")
+        with self.assertRaises(ValueError):
+            _join_instance(entry, "p")
+        self.assertEqual(1, len(entry["world"].players))
+
+
+class TestThroughput(TestCase):
+    def test_measures_instance_ticks(self):
+        self.assertGreater(measure_throughput(2, 2, 3, players=1), 0)
@@ -0,0 +1,58 @@
+import math
+from unittest import TestCase
+from unittest.mock import patch
+import entities
+from interaction import NO_HIT, query_interaction
+from map.static_map import trace_interaction
+
+
+class TestInteraction(TestCase):
+    def setUp(self):
+        entities.clear_entities()
+        self.test_map = [
+            [1, 1, 1, 1, 1, 1],
+            [1, 0, 0, 0, 10, 1],
+            [1, 0, 0, 0, 0, 1],
+            [1, 7, 0, 0, 0, 1],
+            [1, 1, 1, 1, 1, 1],
+        ]
+
+    def tearDown(self):
+        entities.clear_entities()
+
+    def test_trace_reports_exact_distance(self):
+        self.assertEqual(
+            ("boss_door", 4, 1, 1.5), trace_interaction(2.5, 1.5, 0.0, self.test_map)
+        )
+
+    def test_trace_respects_range(self):
+        self.assertEqual(
+            (None, None, None, None), trace_interaction(1.5, 1.5, 0.0, self.test_map)
+        )
+
+    def test_trace_diagonal_hits_stairs(self):
+        kind, hit_x, hit_y, distance = trace_interaction(
+            2.5, 2.5, 3 * math.pi / 4, self.test_map
+        )
+        self.assertEqual(("stairs", 1, 3), (kind, hit_x, hit_y))
+        self.assertAlmostEqual(math.sqrt(0.5), distance)
+
+    def test_query_prefers_nearby_corpse(self):
+        boss = entities.create_boss(2.0, 2.5)
+        boss["state"] = "dead"
+        entities.register_interactable(boss, "boss_corpse")
+        hit = query_interaction(2.5, 1.5, 0.0, self.test_map)
+        self.assertEqual("boss_corpse", hit.kind)
+        self.assertIs(boss, hit.entity)
+
+    def test_query_nothing_in_range(self):
+        self.assertEqual(NO_HIT, query_interaction(1.5, 2.5, 0.0, self.test_map))
+
+    @patch("entities.update_enemies")
+    def test_dead_boss_becomes_interactable(self, mock_update_enemies):
+        boss = entities.create_boss(3.5, 2.5)
+        boss["state"] = "dead"
+        boss["xp_awarded"] = True
+        entities.update_entities(0.016, self.test_map, 3.0, 2.0)
+        self.assertEqual("boss_corpse", boss["interaction"])
+        self.assertEqual([boss], entities.find_interactables(3.0, 2.0, 1.5))
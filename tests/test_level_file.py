@@ -0,0 +1,113 @@
+import os
+import struct
+import tempfile
+from unittest import TestCase
+from map import static_map
+from map.level_file import HEADER, load_level, save_level
+from map.map_cache import clear_cache, set_tile
+from map.static_map import WORLD_MAP, get_color_layer, switch_map
+
+
+class TestLevelFile(TestCase):
+    def setUp(self):
+        clear_cache()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "test.lvl")
+        self.test_map = [
+            [1, 1, 1, 1],
+            [1, 0, 6, 1],
+            [1, 9, 0, 1],
+            [1, 1, 1, 1],
+        ]
+        self.test_colors = [[str(tile % 8) for tile in row] for row in self.test_map]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        save_level(
+            self.path,
+            self.test_map,
+            self.test_colors,
+            (1.5, 2.5),
+            [("enemy", 2.5, 2.5), ("boss", 1.25, 1.75)],
+            color_shift=3,
+        )
+        level = load_level(self.path)
+        self.assertEqual(self.test_map, [list(row) for row in level["map"]])
+        self.assertEqual(
+            [[int(color) for color in row] for row in self.test_colors],
+            [list(row) for row in level["colors"]],
+        )
+        self.assertEqual((1.5, 2.5), level["spawn"])
+        self.assertEqual(3, level["color_shift"])
+        self.assertEqual(
+            [("enemy", 2.5, 2.5), ("boss", 1.25, 1.75)], level["entities"]
+        )
+
+    def test_file_size(self):
+        save_level(self.path, self.test_map, self.test_colors, (1.5, 1.5))
+        self.assertEqual(HEADER.size + 2 * 16, os.path.getsize(self.path))
+
+    def test_rows_are_views_of_the_mapping(self):
+        save_level(self.path, self.test_map, self.test_colors, (1.5, 1.5))
+        level = load_level(self.path)
+        self.assertIsInstance(level["map"][0], memoryview)
+        self.assertIs(level["mmap"], level["map"][2].obj)
+
+    def test_writes_stay_private(self):
+        save_level(self.path, self.test_map, self.test_colors, (1.5, 1.5))
+        level = load_level(self.path)
+        level["map"][1][1] = 4
+        self.assertEqual(4, level["map"][1][1])
+        self.assertEqual(0, load_level(self.path)["map"][1][1])
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as other_file:
+            other_file.write(struct.pack("<4sH", b"NOPE", 1) + bytes(64))
+        with self.assertRaises(ValueError):
+            load_level(self.path)
+
+    def test_save_world_map(self):
+        save_level(self.path, WORLD_MAP, get_color_layer(WORLD_MAP), (10.5, 8.5))
+        level = load_level(self.path)
+        self.assertEqual(WORLD_MAP, [list(row) for row in level["map"]])
+
+
+class TestSwitchMapLevelFile(TestCase):
+    def setUp(self):
+        clear_cache()
+        self.saved_state = {
+            name: getattr(static_map, name)
+            for name in (
+                "ACTIVE_MAP",
+                "ACTIVE_COLORS",
+                "CURRENT_MAP_TYPE",
+                "CURRENT_COLOR_SHIFT",
+                "LEVEL_SPAWNS",
+            )
+        }
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "test.lvl")
+        test_map = [[1, 1, 1], [1, 0, 1], [1, 1, 1]]
+        save_level(
+            self.path, test_map, [["7"] * 3] * 3, (1.5, 1.5), [("enemy", 1.5, 1.5)], 2
+        )
+
+    def tearDown(self):
+        for name, value in self.saved_state.items():
+            setattr(static_map, name, value)
+        self.directory.cleanup()
+
+    def test_switch_map_loads_level(self):
+        world_map, colors, spawn, _ = switch_map(self.path)
+        self.assertEqual(0, world_map[1][1])
+        self.assertEqual(7, colors[1][1])
+        self.assertEqual((1.5, 1.5), spawn)
+        self.assertEqual(2, static_map.CURRENT_COLOR_SHIFT)
+        self.assertEqual([("enemy", 1.5, 1.5)], static_map.LEVEL_SPAWNS)
+
+    def test_set_tile_patches_color_plane(self):
+        world_map, colors, _, _ = switch_map(self.path)
+        set_tile(world_map, 1, 1, 1)
+        self.assertEqual(4, colors[1][1])
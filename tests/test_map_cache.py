@@ -0,0 +1,106 @@
+from unittest import TestCase
+from map import map_cache
+from map.color_layer import LazyColorLayer
+from map.map_cache import (
+    CACHE_STATS,
+    clear_cache,
+    get_layer,
+    map_version,
+    release_map,
+    set_tile,
+    tracked_map_count,
+)
+from map.static_map import (
+    WORLD_MAP,
+    generate_color_map,
+    get_color_layer,
+    switch_map,
+)
+
+
+class TestMapCache(TestCase):
+    def setUp(self):
+        clear_cache()
+        self.test_map = [
+            [1, 1, 1, 1],
+            [1, 0, 4, 1],
+            [1, 9, 0, 1],
+            [1, 1, 1, 1],
+        ]
+
+    def test_get_layer_builds_once(self):
+        calls = []
+
+        def _builder(grid):
+            calls.append(grid)
+            return len(grid)
+
+        self.assertEqual(4, get_layer(self.test_map, "rows", _builder))
+        self.assertEqual(4, get_layer(self.test_map, "rows", _builder))
+        self.assertEqual(1, len(calls))
+        self.assertEqual(1, CACHE_STATS["hits"])
+        self.assertEqual(1, CACHE_STATS["misses"])
+
+    def test_set_tile_drops_plain_layers(self):
+        get_layer(self.test_map, "rows", lambda grid: "old")
+        set_tile(self.test_map, 1, 1, 6)
+        self.assertEqual(6, self.test_map[1][1])
+        self.assertGreater(map_version(self.test_map), 0)
+        self.assertEqual("new", get_layer(self.test_map, "rows", lambda grid: "new"))
+
+    def test_set_tile_on_untracked_map(self):
+        other_map = [[1, 1], [1, 1]]
+        set_tile(other_map, 0, 0, 0)
+        self.assertEqual(0, other_map[0][0])
+        self.assertEqual(0, CACHE_STATS["invalidations"])
+
+    def test_cache_is_bounded(self):
+        maps = [[[1]] for _ in range(map_cache.MAX_CACHED_MAPS + 2)]
+        for grid in maps:
+            get_layer(grid, "rows", len)
+        self.assertEqual(map_cache.MAX_CACHED_MAPS, len(map_cache._map_entries))
+
+    def test_patched_layers_survive_eviction(self):
+        layer = get_color_layer(self.test_map, 2)
+        self.assertEqual("4", layer[1][1])
+        for _ in range(map_cache.MAX_CACHED_MAPS + 2):
+            get_layer([[1]], "rows", len)
+        set_tile(self.test_map, 1, 1, 10)
+        self.assertEqual("1", layer[1][1])
+        self.assertEqual(map_cache.MAX_CACHED_MAPS, tracked_map_count())
+        release_map(self.test_map)
+        self.assertEqual(map_cache.MAX_CACHED_MAPS - 1, tracked_map_count())
+
+    def test_versions_are_not_reused_after_eviction(self):
+        version = map_version(self.test_map)
+        set_tile(self.test_map, 1, 1, 6)
+        edited = map_version(self.test_map)
+        for _ in range(map_cache.MAX_CACHED_MAPS):
+            map_version([[1]])
+        self.assertNotIn(id(self.test_map), map_cache._map_entries)
+        self.assertNotIn(map_version(self.test_map), (version, edited))
+        self.assertGreater(map_version(self.test_map), edited)
+
+    def test_color_layer_matches_eager_color_map(self):
+        for color_shift in range(6):
+            layer = get_color_layer(self.test_map, color_shift)
+            self.assertEqual(
+                generate_color_map(self.test_map, color_shift), list(layer)
+            )
+
+    def test_color_layer_is_lazy_and_patched_on_mutation(self):
+        layer = get_color_layer(self.test_map, 2)
+        self.assertIsInstance(layer, LazyColorLayer)
+        self.assertEqual(0, layer.computed_rows())
+        self.assertEqual("4", layer[1][1])
+        self.assertEqual(1, layer.computed_rows())
+
+        set_tile(self.test_map, 1, 1, 10)
+        self.assertIs(layer, get_color_layer(self.test_map, 2))
+        self.assertEqual("1", layer[1][1])
+
+    def test_switch_map_reuses_world_colors(self):
+        _, first_colors, _, _ = switch_map(1)
+        _, second_colors, _, _ = switch_map(1)
+        self.assertIs(first_colors, second_colors)
+        self.assertIs(first_colors, get_color_layer(WORLD_MAP))
@@ -0,0 +1,96 @@
+from unittest import TestCase
+from unittest.mock import patch
+import ui
+from renderer.backends import MemoryBackend
+from utils.message_queue import MessageQueue
+
+
+def message(text, start_time, duration=1.0):
+    return {"text": text, "start_time": start_time, "duration": duration}
+
+
+class TestMessageQueue(TestCase):
+    def setUp(self):
+        self.queue = MessageQueue(capacity=4)
+
+    def test_full_queue_drops_oldest(self):
+        for i in range(6):
+            self.queue.push(message(f"msg {i}", i, 100.0))
+        self.assertEqual(4, len(self.queue))
+        self.assertEqual(
+            ["msg 5", "msg 4", "msg 3", "msg 2"],
+            [element["text"] for element in self.queue.newest()],
+        )
+
+    def test_duplicates_coalesce_and_restart_timer(self):
+        self.queue.push(message("HIT!", 0.0), key="HIT!")
+        self.queue.push(message("other", 0.5), key="other")
+        self.queue.push(message("HIT!", 0.8), key="HIT!")
+        newest = self.queue.newest(1)[0]
+        self.assertEqual(("HIT!", 2), (newest["text"], newest["count"]))
+        self.assertEqual(1, self.queue.expire(1.5))
+        self.assertEqual(["HIT!"], [element["text"] for element in self.queue.newest()])
+        self.assertEqual(1, self.queue.expire(1.8))
+        self.assertEqual(0, len(self.queue))
+
+    def test_expiry_skips_overwritten_elements(self):
+        for i in range(8):
+            self.queue.push(message(f"msg {i}", i))
+        self.assertEqual(4, self.queue.expire(100.0))
+        self.assertEqual([], self.queue.newest())
+
+    def test_expired_slots_are_reused_before_evicting(self):
+        self.queue.push(message("burning", 0.0, None))
+        for i in range(3):
+            self.queue.push(message(f"msg {i}", 1.0))
+        self.assertEqual(3, self.queue.expire(5.0))
+        for i in range(3):
+            self.queue.push(message(f"new {i}", 6.0))
+        self.assertEqual(
+            ["new 2", "new 1", "new 0", "burning"],
+            [element["text"] for element in self.queue.newest()],
+        )
+        self.queue.push(message("new 3", 6.0))
+        self.assertEqual("new 0", self.queue.newest()[-1]["text"])
+
+    def test_elements_without_duration_never_expire(self):
+        self.queue.push(message("burning", 0.0, None))
+        self.assertEqual(0, self.queue.expire(1e9))
+        self.assertEqual(1, len(self.queue))
+
+    def test_expiry_heap_stays_bounded_under_floods(self):
+        for i in range(1000):
+            self.queue.push(message("HIT!", i * 0.001, 5.0), key="HIT!")
+        self.assertLessEqual(len(self.queue.expiry), 4 * self.queue.capacity + 1)
+        self.assertEqual(1000, self.queue.newest(1)[0]["count"])
+
+
+class TestUiMessages(TestCase):
+    def setUp(self):
+        for queue in ui.ui_queues.values():
+            queue.clear()
+
+    def tearDown(self):
+        for queue in ui.ui_queues.values():
+            queue.clear()
+
+    @patch("time.time", return_value=100.0)
+    def test_flood_of_hits_is_drawn_once(self, _):
+        for _ in range(50):
+            ui.add_message("HIT! -10 HP", 1.0, color=1)
+        ui.add_message("Enemy defeated! +10 XP", 2.0, color=2)
+        screen = MemoryBackend(40, 120)
+        with patch("ui.draw_weapon_hud"):
+            ui.draw_ui_layer(screen)
+        self.assertEqual(
+            ["Enemy defeated! +10 XP", "HIT! -10 HP x50"],
+            [line.strip() for line in screen.lines() if line],
+        )
+
+    def test_expired_messages_are_not_drawn(self):
+        with patch("time.time", return_value=100.0):
+            ui.add_message("old", 1.0)
+        with patch("time.time", return_value=101.0), patch("ui.draw_weapon_hud"):
+            screen = MemoryBackend(40, 120)
+            ui.draw_ui_layer(screen)
+        self.assertEqual("", screen.text().strip())
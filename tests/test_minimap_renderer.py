@@ -0,0 +1,53 @@
+from unittest import TestCase
+import entities
+from map import TERRAIN_CHARS
+from map.map_cache import clear_cache, set_tile
+from renderer import minimap_renderer
+from renderer.backends import MemoryBackend
+from renderer.minimap_renderer import MAP_SIZE, MINIMAP_CACHE, render_minimap
+
+
+class TestMinimapRenderer(TestCase):
+    def setUp(self):
+        clear_cache()
+        entities.clear_entities()
+        MINIMAP_CACHE.update(key=None, map=None, rows=None, rebuilds=0)
+        self.test_map = [[1] * 30] + [[1] + [0] * 28 + [1] for _ in range(18)] + [[1] * 30]
+        self.test_map[5][7] = 3
+        self.test_colors = [["7"] * 30 for _ in range(20)]
+
+    def _render(self, x, y, screen=None):
+        screen = screen or MemoryBackend(40, 80)
+        render_minimap(screen, x, y, 0.0, self.test_map, self.test_colors, 40, 80)
+        return screen
+
+    def test_cells_match_map(self):
+        screen = self._render(10.5, 10.5)
+        map_start_x = 80 - MAP_SIZE - 2
+        start_x, start_y = 10 - MAP_SIZE // 2, 10 - MAP_SIZE // 2
+        for map_y in (5, 12, 17):
+            for map_x in (4, 7, 11, 16):
+                if (map_x, map_y) == (10, 10) or map_y == 17 and map_x in (4, 16):
+                    continue
+                screen_x = map_start_x + 1 + map_x - start_x
+                char = screen.chars[2 + map_y - start_y][screen_x]
+                self.assertEqual(TERRAIN_CHARS[self.test_map[map_y][map_x]], char)
+        self.assertEqual("║", screen.chars[5][map_start_x])
+
+    def test_rows_are_blitted_as_runs(self):
+        screen = self._render(10.5, 10.5)
+        self.assertLess(screen.writes, 100)
+
+    def test_rebuilds_only_on_tile_change_or_mutation(self):
+        self._render(10.5, 10.5)
+        self._render(10.9, 10.1)
+        self.assertEqual(1, MINIMAP_CACHE["rebuilds"])
+        self._render(11.2, 10.1)
+        self.assertEqual(2, MINIMAP_CACHE["rebuilds"])
+        set_tile(self.test_map, 12, 12, 8)
+        screen = self._render(11.2, 10.1)
+        self.assertEqual(3, MINIMAP_CACHE["rebuilds"])
+        map_start_x = 80 - MAP_SIZE - 2
+        self.assertEqual(
+            TERRAIN_CHARS[8], screen.chars[2 + 12 - 2][map_start_x + 1 + 12 - 3]
+        )
@@ -0,0 +1,121 @@
+import curses
+import os
+import tempfile
+from unittest import TestCase
+
+import entities
+import game
+from replay import (
+    HEADER,
+    MAX_KEYS_PER_TICK,
+    Recorder,
+    iter_ticks,
+    load_recording,
+    save_recording,
+)
+from utils import game_clock
+
+
+def scripted_recording(ticks=90):
+    """Record a short walk with some turning and shooting, without a terminal"""
+    recorder = Recorder(seed=1510, screen_size=(40, 120), start_time=5000.0)
+    script = {1: [ord("w")], 10: [ord("w"), ord(" ")], 30: [curses.KEY_LEFT], 50: [ord("d")]}
+    for tick in range(1, ticks + 1):
+        size = (50, 160) if tick >= 60 else (40, 120)
+        recorder.record_tick(5000.0 + tick / 30, script.get(tick, []), size)
+    return recorder.to_recording()
+
+
+def snapshot(result):
+    player_state = result["player"]
+    return (
+        result["ticks"],
+        player_state["x"],
+        player_state["y"],
+        player_state["angle"],
+        player_state["last_shot_time"],
+        [(enemy["x"], enemy["y"], enemy["state"]) for enemy in entities.enemies],
+        [(projectile["x"], projectile["y"]) for projectile in entities.projectiles],
+    )
+
+
+class TestReplayFile(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "run.replay")
+
+    def test_round_trip(self):
+        recording = scripted_recording()
+        save_recording(self.path, recording)
+        loaded = load_recording(self.path)
+        self.assertEqual(recording, loaded)
+        ticks = list(iter_ticks(loaded))
+        self.assertEqual(90, len(ticks))
+        self.assertEqual([ord("w"), ord(" ")], ticks[9][1])
+        self.assertEqual((50, 160), ticks[59][2])
+        self.assertIsNone(ticks[60][2])
+
+    def test_times_are_rounded_to_the_microsecond(self):
+        recorder = Recorder(seed=1, screen_size=(24, 80), start_time=10.0)
+        self.assertEqual(10.000001, recorder.record_tick(10.0000012, [], (24, 80)))
+        # The wall clock going backwards never moves the game clock back
+        self.assertEqual(10.000001, recorder.record_tick(9.5, [], (24, 80)))
+
+    def test_ticks_with_many_keys(self):
+        recorder = Recorder(seed=1, screen_size=(24, 80), start_time=0.0)
+        recorder.record_tick(0.1, [ord("a")] * 300, (30, 90))
+        self.assertEqual(
+            [(0.1, [ord("a")] * 300, (30, 90))], list(iter_ticks(recorder.to_recording()))
+        )
+        with self.assertRaises(ValueError):
+            recorder.record_tick(0.2, [ord("a")] * (MAX_KEYS_PER_TICK + 1), (30, 90))
+        self.assertEqual(1, recorder.recording["ticks"])
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as replay_file:
+            replay_file.write(b"MUDL" + bytes(HEADER.size))
+        with self.assertRaises(ValueError):
+            load_recording(self.path)
+
+    def test_truncated_replay(self):
+        recording = scripted_recording()
+        recording["data"] = recording["data"][:-3]
+        with self.assertRaises(ValueError):
+            list(iter_ticks(recording))
+
+
+class TestReplayGame(TestCase):
+    def test_replays_are_identical(self):
+        recording = scripted_recording()
+        first = snapshot(game.replay_game(recording))
+        second = snapshot(game.replay_game(recording))
+        self.assertEqual(first, second)
+        self.assertEqual(90, first[0])
+        self.assertNotEqual((10.5, 8.5), (first[1], first[2]))
+        self.assertEqual(5000.333333, first[4])  # Shot on tick 10
+        self.assertIsNone(game_clock.GAME_CLOCK["tick_time"])
+
+    def test_max_ticks_stops_early(self):
+        result = game.replay_game(scripted_recording(), max_ticks=12)
+        self.assertEqual(12, result["ticks"])
+        self.assertIsNone(result["outcome"])
+
+    def test_game_ending_mid_profile_stops_the_profiler(self):
+        import debug
+
+        debug.start_profile("100")
+        self.addCleanup(debug.stop_profile)
+        self.addCleanup(debug.DEBUG_CONSOLE.update, active=False)
+        recorder = Recorder(seed=3, screen_size=(24, 80), start_time=0.0)
+        for tick in range(1, 6):
+            recorder.record_tick(tick / 30, [ord("q")] if tick == 5 else [], (24, 80))
+        self.assertEqual("quit", game.replay_game(recorder.to_recording())["outcome"])
+        self.assertIsNone(debug.PROFILE_SESSION["profiler"])
+
+    def test_quit_ends_the_replay(self):
+        recorder = Recorder(seed=3, screen_size=(24, 80), start_time=0.0)
+        for tick in range(1, 20):
+            recorder.record_tick(tick / 30, [ord("q")] if tick == 5 else [], (24, 80))
+        result = game.replay_game(recorder.to_recording())
+        self.assertEqual((5, "quit"), (result["ticks"], result["outcome"]))
@@ -0,0 +1,58 @@
+from unittest import TestCase
+from map.room_graph import (
+    add_loop_edges,
+    build_room_graph,
+    minimum_spanning_edges,
+    room_distance,
+)
+
+
+def _connected(count, edges):
+    parent = list(range(count))
+
+    def find(v):
+        while parent[v] != v:
+            v = parent[v]
+        return v
+
+    for i, j in edges:
+        parent[find(i)] = find(j)
+    return len({find(v) for v in range(count)}) == 1
+
+
+class TestRoomGraph(TestCase):
+    def test_room_distance(self):
+        self.assertEqual(7, room_distance((1, 1), (4, 5)))
+        self.assertEqual(0, room_distance((2, 2), (2, 2)))
+
+    def test_minimum_spanning_edges_total_weight(self):
+        centers = [(0, 0), (5, 0), (5, 5), (0, 5), (20, 20)]
+        edges = minimum_spanning_edges(centers)
+        self.assertEqual(len(centers) - 1, len(edges))
+        self.assertTrue(_connected(len(centers), edges))
+        total = sum(room_distance(centers[i], centers[j]) for i, j in edges)
+        self.assertEqual(5 + 5 + 5 + 30, total)
+
+    def test_minimum_spanning_edges_shared_centers(self):
+        centers = [(3, 3), (3, 3), (8, 3), (3, 3)]
+        edges = minimum_spanning_edges(centers)
+        self.assertEqual(3, len(edges))
+        self.assertTrue(_connected(len(centers), edges))
+
+    def test_minimum_spanning_edges_small_inputs(self):
+        self.assertEqual([], minimum_spanning_edges([]))
+        self.assertEqual([], minimum_spanning_edges([(1, 1)]))
+
+    def test_add_loop_edges_skips_tree_edges(self):
+        centers = [(0, 0), (4, 0), (0, 4), (4, 4)]
+        tree_edges = minimum_spanning_edges(centers)
+        extra = add_loop_edges(centers, tree_edges, 2)
+        self.assertEqual(2, len(extra))
+        self.assertFalse(set(extra) & set(tree_edges))
+        self.assertEqual([], add_loop_edges(centers, tree_edges, 0))
+
+    def test_build_room_graph(self):
+        centers = [(x * 7 % 31, x * 11 % 17) for x in range(12)]
+        edges = build_room_graph(centers, 3)
+        self.assertEqual(len(centers) - 1 + 3, len(edges))
+        self.assertTrue(_connected(len(centers), edges))
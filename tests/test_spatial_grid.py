@@ -0,0 +1,42 @@
+import math
+import random
+from unittest import TestCase
+
+from utils.spatial_grid import SpatialGrid
+
+
+class TestSpatialGrid(TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.items = [{"x": rng.uniform(0, 60), "y": rng.uniform(0, 40)} for _ in range(300)]
+        self.grid = SpatialGrid(4)
+        self.grid.rebuild(self.items)
+
+    def test_query_matches_brute_force(self):
+        for x, y, radius in ((10.0, 10.0, 5.0), (0.0, 0.0, 12.5), (59.0, 39.0, 30.0)):
+            expected = [item for item in self.items if math.dist((x, y), (item["x"], item["y"])) <= radius]
+            found = self.grid.query(x, y, radius)
+            self.assertCountEqual([id(item) for item in expected], [id(item) for item in found])
+
+    def test_query_only_searches_allowed_cells(self):
+        found = self.grid.query(30.0, 20.0, 40.0, allowed_cells={(0, 0), (1, 0)})
+        self.assertTrue(found)
+        self.assertTrue(all(self.grid.cell_of(item["x"], item["y"]) in {(0, 0), (1, 0)} for item in found))
+
+    def test_nearest_matches_brute_force(self):
+        rng = random.Random(3)
+        for _ in range(50):
+            x, y = rng.uniform(-10, 70), rng.uniform(-10, 50)
+            expected = min(self.items, key=lambda item: math.dist((x, y), (item["x"], item["y"])))
+            self.assertIs(expected, self.grid.nearest(x, y))
+
+    def test_nearest_respects_the_distance_limit(self):
+        grid = SpatialGrid(4)
+        grid.rebuild([{"x": 20.0, "y": 20.0}])
+        self.assertIsNone(grid.nearest(0.0, 0.0, 28.0))
+        self.assertIsNotNone(grid.nearest(0.0, 0.0, 28.5))
+
+    def test_empty_grid(self):
+        grid = SpatialGrid(4)
+        grid.rebuild([])
+        self.assertEqual((0, [], None), (len(grid), grid.query(1.0, 1.0, 5.0), grid.nearest(1.0, 1.0)))
@@ -88,8 +88,7 @@ class TestStaticMap(unittest.TestCase):
         self.assertFalse(is_spawn_valid(-1.0, 2.0, self.test_map))
         self.assertFalse(is_spawn_valid(10.0, 2.0, self.test_map))
 
-    @patch("map.static_map.is_spawn_valid")
-    def test_find_valid_spawn(self, mock_is_spawn_valid):
+    def test_find_valid_spawn(self):
         test_map = [
             [1, 1, 1, 1, 1],
             [1, 1, 1, 1, 1],
@@ -97,23 +96,26 @@ class TestStaticMap(unittest.TestCase):
             [1, 1, 1, 1, 1],
             [1, 1, 1, 1, 1],
         ]
-
-        mock_is_spawn_valid.side_effect = lambda x, y, m: x == 2 and y == 2
         spawn_x, spawn_y = find_valid_spawn(test_map)
         self.assertEqual(2, spawn_x)
         self.assertEqual(2, spawn_y)
 
-        mock_is_spawn_valid.side_effect = lambda x, y, m: x == 1 and y == 3
+        test_map = [
+            [1, 1, 1, 1, 1],
+            [1, 1, 1, 1, 1],
+            [1, 1, 1, 1, 1],
+            [1, 9, 1, 4, 1],
+            [1, 1, 1, 1, 1],
+        ]
         spawn_x, spawn_y = find_valid_spawn(test_map)
         self.assertEqual(1, spawn_x)
         self.assertEqual(3, spawn_y)
 
-        mock_is_spawn_valid.return_value = False
-        test_map_copy = [row[:] for row in test_map]
-        spawn_x, spawn_y = find_valid_spawn(test_map_copy)
-        self.assertEqual(1, spawn_x)
-        self.assertEqual(3, spawn_y)
-        self.assertEqual(0, test_map_copy[2][2])
+        test_map = [[1] * 5 for _ in range(5)]
+        spawn_x, spawn_y = find_valid_spawn(test_map)
+        self.assertEqual(2, spawn_x)
+        self.assertEqual(2, spawn_y)
+        self.assertEqual(0, test_map[2][2])
 
     def test_interact_raycast(self):
         result = interact_raycast(
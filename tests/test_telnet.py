@@ -0,0 +1,268 @@
+import asyncio
+import curses
+import os
+from unittest import TestCase
+
+import entities
+import world_instance
+from net import server
+from debug import DEBUG_CONSOLE
+from net.telnet import IAC, NAWS, SB, SE, WILL, TelnetDecoder
+from renderer.ansi_backend import AnsiBackend, sgr
+from utils import game_clock
+
+
+def naws(height, width):
+    return bytes([IAC, SB, NAWS, width >> 8, width & 255, height >> 8, height & 255, IAC, SE])
+
+
+class TestTelnetDecoder(TestCase):
+    def test_plain_keys(self):
+        self.assertEqual(([ord("w"), ord("a")], None), TelnetDecoder().feed(b"wa"))
+
+    def test_negotiation_replies_are_dropped(self):
+        keys, size = TelnetDecoder().feed(bytes([IAC, WILL, NAWS]) + b"d")
+        self.assertEqual(([ord("d")], None), (keys, size))
+
+    def test_window_size(self):
+        self.assertEqual(([], (50, 160)), TelnetDecoder().feed(naws(50, 160)))
+
+    def test_escaped_iac_in_window_size(self):
+        data = bytes([IAC, SB, NAWS, 0, IAC, IAC, 0, 40, IAC, SE])
+        self.assertEqual(([], (40, 255)), TelnetDecoder().feed(data))
+
+    def test_input_split_anywhere(self):
+        data = naws(30, 100) + b"w\x1b[Cx\r\n\x1bOR"
+        for split in range(len(data)):
+            decoder = TelnetDecoder()
+            first_keys, first_size = decoder.feed(data[:split])
+            second_keys, second_size = decoder.feed(data[split:])
+            self.assertEqual(
+                [ord("w"), curses.KEY_RIGHT, ord("x"), 10, curses.KEY_F3],
+                first_keys + second_keys,
+            )
+            self.assertEqual((30, 100), first_size or second_size)
+
+    def test_lone_escape_is_a_key(self):
+        self.assertEqual(([27, ord("w")], None), TelnetDecoder().feed(b"\x1bw"))
+
+
+class TestAnsiBackend(TestCase):
+    def test_attributes_only_change_at_boundaries(self):
+        screen = AnsiBackend(1, 6)
+        screen.addstr(0, 0, "aaa", 3 << 8)
+        screen.addstr(0, 3, "bb", 3 << 8)
+        frame = screen.encode_frame().decode()
+        self.assertEqual(1, frame.count(sgr(3 << 8)))
+        self.assertTrue(frame.endswith(sgr(3 << 8) + "aaabb"))
+
+    def test_only_changes_are_sent(self):
+        screen = AnsiBackend(3, 40)
+        screen.addstr(1, 0, "x" * 40, 2 << 8)
+        screen.encode_frame()
+        screen.addstr(1, 30, "yy", 2 << 8)
+        self.assertEqual(b"\x1b[2;31Hyy", screen.encode_frame())
+        self.assertEqual(b"", screen.encode_frame())
+
+    def test_short_gaps_are_rewritten_and_long_ones_skipped(self):
+        screen = AnsiBackend(1, 20)
+        screen.encode_frame()
+        screen.addstr(0, 0, "a  b")
+        screen.addstr(0, 15, "c")
+        self.assertEqual(b"\x1b[Ha  b\x1b[11Cc", screen.encode_frame())
+
+    def test_attributes_carry_over_between_frames(self):
+        screen = AnsiBackend(2, 10)
+        screen.addstr(0, 0, "a", 4 << 8)
+        screen.encode_frame()
+        screen.addstr(1, 0, "b", 4 << 8)
+        self.assertEqual(b"\x1b[2;1Hb", screen.encode_frame())
+
+    def test_invalidate_redraws_everything(self):
+        screen = AnsiBackend(2, 10)
+        screen.addstr(1, 2, "z")
+        first = screen.encode_frame()
+        screen.invalidate()
+        self.assertEqual(first, screen.encode_frame())
+
+    def test_present_writes_one_frame(self):
+        screen = AnsiBackend(4, 10)
+        screen.addstr(2, 2, "hello", 5 << 8)
+        read_end, write_end = os.pipe()
+        self.addCleanup(os.close, read_end)
+        self.addCleanup(os.close, write_end)
+        written = screen.present(write_end)
+        output = os.read(read_end, 4096)
+        self.assertEqual(written, len(output))
+        self.assertIn(b"hello", output)
+        self.assertEqual(0, screen.present(write_end))
+
+    def test_gray_pairs_use_the_256_color_ramp(self):
+        self.assertEqual("\x1b[0;38;5;255m", sgr(10 << 8))
+        self.assertEqual("\x1b[0;38;5;236m", sgr(15 << 8))
+
+    def test_unicode_cells(self):
+        screen = AnsiBackend(1, 2)
+        screen.addstr(0, 0, "█")
+        self.assertIn("█".encode(), screen.encode_frame())
+
+
+class FakeTransport:
+    def __init__(self):
+        self.written = []
+        self.closed = False
+
+    def set_write_buffer_limits(self, high=None, low=None):
+        pass
+
+    def write(self, data):
+        self.written.append(data)
+
+    def is_closing(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+
+class TestGameServer(TestCase):
+    def setUp(self):
+        self.original_state = {
+            name: getattr(module, name)
+            for module, names in world_instance.WORLD_STATE.items()
+            for name in names
+        }
+        self.addCleanup(self.restore_state)
+        self.addCleanup(game_clock.stop_ticks)
+        self.game_server = server.create_game_server()
+
+    def restore_state(self):
+        for module, names in world_instance.WORLD_STATE.items():
+            for name in names:
+                setattr(module, name, self.original_state[name])
+
+    def connect(self):
+        session = server.TelnetSession(self.game_server)
+        session.connection_made(FakeTransport())
+        return session
+
+    def tick(self, count=1):
+        for _ in range(count):
+            server.tick_server(self.game_server, game_clock.advance())
+
+    def test_players_share_the_surface(self):
+        first, second = self.connect(), self.connect()
+        world = self.game_server["worlds"][0]
+        self.assertEqual([first, second], world["sessions"])
+        self.assertEqual(world_instance.ENEMIES_PER_LEVEL, len(world["instance"].state["enemies"]))
+
+    def test_worlds_keep_their_own_entities(self):
+        self.connect()
+        entities.enemies = []
+        self.tick()
+        surface = self.game_server["worlds"][0]["instance"].state
+        self.assertEqual(world_instance.ENEMIES_PER_LEVEL, len(surface["enemies"]))
+        self.assertEqual([], entities.enemies)
+
+    def test_every_player_gets_their_own_frame(self):
+        first, second = self.connect(), self.connect()
+        second.data_received(naws(30, 100))
+        second.data_received(b"ww")
+        self.tick(3)
+        self.assertEqual(3, first.frames_sent)
+        self.assertEqual((30, 100), second.screen.getmaxyx())
+        self.assertNotEqual(server.SURFACE_SPAWN, (second.player["x"], second.player["y"]))
+        self.assertEqual(server.SURFACE_SPAWN, (first.player["x"], first.player["y"]))
+
+    def test_backed_up_sessions_skip_frames(self):
+        session = self.connect()
+        session.pause_writing()
+        self.tick(2)
+        self.assertEqual((0, 2), (session.frames_sent, session.frames_skipped))
+        session.resume_writing()
+        self.tick()
+        self.assertEqual(1, session.frames_sent)
+        self.assertIn(b"\x1b[2J", session.transport.written[-1])
+        self.assertEqual(session.bytes_sent, len(session.transport.written[-1]))
+
+    def test_console_keys_are_ignored(self):
+        session = self.connect()
+        session.data_received(b";")
+        self.tick()
+        self.assertFalse(DEBUG_CONSOLE["active"])
+
+    def test_quit_hangs_up(self):
+        session = self.connect()
+        session.data_received(b"q")
+        self.tick()
+        self.assertTrue(session.transport.closed)
+        session.connection_lost(None)
+        self.assertEqual([], self.game_server["sessions"])
+
+    def test_going_down_a_level_and_leaving_drops_the_dungeon(self):
+        session = self.connect()
+        session.next_depth = 1
+        self.tick()
+        self.assertIs(self.game_server["worlds"][1], session.world)
+        self.assertEqual(1, session.player["stages_descended"])
+        session.connection_lost(None)
+        self.assertEqual([0], list(self.game_server["worlds"]))
+
+    def test_dead_players_respawn_on_the_surface(self):
+        session = self.connect()
+        server.join_world(self.game_server, session, 1)
+        session.player["health"] = 0
+        self.tick()
+        self.assertEqual(0, session.world["depth"])
+        self.assertEqual(100, session.player["health"])
+
+
+class TestTelnetConnection(TestCase):
+    def setUp(self):
+        self.original_state = {
+            name: getattr(module, name)
+            for module, names in world_instance.WORLD_STATE.items()
+            for name in names
+        }
+        self.addCleanup(self.restore_state)
+
+    def restore_state(self):
+        for module, names in world_instance.WORLD_STATE.items():
+            for name in names:
+                setattr(module, name, self.original_state[name])
+
+    def test_clients_over_a_socket(self):
+        asyncio.run(self.play_over_socket())
+
+    async def play_over_socket(self):
+        game_server = server.create_game_server()
+        loop = asyncio.get_running_loop()
+        listener = await loop.create_server(
+            lambda: server.TelnetSession(game_server), "127.0.0.1", 0
+        )
+        port = listener.sockets[0].getsockname()[1]
+        stop = asyncio.Event()
+        ticks = asyncio.create_task(server.run_ticks(game_server, tick_rate=100, stop=stop))
+
+        clients = [await asyncio.open_connection("127.0.0.1", port) for _ in range(3)]
+        for _, writer in clients:
+            writer.write(naws(20, 60) + b"w")
+            await writer.drain()
+        await asyncio.sleep(0.2)
+
+        reader, _ = clients[0]
+        received = await reader.read(1 << 16)
+        self.assertTrue(received.startswith(bytes([IAC, WILL])))
+        self.assertEqual(3, len(game_server["sessions"]))
+        self.assertTrue(all(s.screen.getmaxyx() == (20, 60) for s in game_server["sessions"]))
+        self.assertTrue(all(s.frames_sent > 0 for s in game_server["sessions"]))
+
+        for _, writer in clients:
+            writer.close()
+            await writer.wait_closed()
+        stop.set()
+        await ticks
+        listener.close()
+        await listener.wait_closed()
+        await asyncio.sleep(0)
+        self.assertEqual([], game_server["sessions"])
@@ -0,0 +1,62 @@
+import random
+from unittest import TestCase, skipIf
+from map import tile_passes
+from map.tile_passes import fill_border, map_tiles, scatter_tiles
+
+
+def _tile_counts(grid):
+    counts = {}
+    for row in grid[1:-1]:
+        for tile in row[1:-1]:
+            counts[tile] = counts.get(tile, 0) + 1
+    return counts
+
+
+class TestTilePasses(TestCase):
+    def setUp(self):
+        random.seed(1510)
+
+    def _half_walls(self, size=130):
+        return [[1 if x % 2 else 0 for x in range(size)] for _ in range(size)]
+
+    def _assert_distribution(self, force_python):
+        grid = self._half_walls()
+        interior_walls = sum(row[1:-1].count(1) for row in grid[1:-1])
+        interior_floors = sum(row[1:-1].count(0) for row in grid[1:-1])
+
+        scatter_tiles(grid, 1, 8, 0, [3, 9], force_python=force_python)
+        counts = _tile_counts(grid)
+
+        self.assertAlmostEqual(0.15, counts[8] / interior_walls, delta=0.02)
+        decor_rate = (counts[3] + counts[9]) / interior_floors
+        self.assertAlmostEqual(0.05, decor_rate, delta=0.01)
+        self.assertAlmostEqual(1.0, counts[3] / counts[9], delta=0.25)
+        self.assertTrue(all(tile == 1 for tile in grid[0] + grid[-1]))
+        self.assertTrue(all(row[0] == 1 and row[-1] == 1 for row in grid))
+
+    def test_scatter_tiles_python_distribution(self):
+        self._assert_distribution(force_python=True)
+
+    @skipIf(tile_passes.np is None, "NumPy is not installed")
+    def test_scatter_tiles_numpy_distribution(self):
+        self._assert_distribution(force_python=False)
+
+    def test_scatter_tiles_leaves_paths_alone(self):
+        grid = [[4] * 10 for _ in range(10)]
+        scatter_tiles(grid, 1, 8, 0, [3], special_chance=1.0, decor_chance=1.0)
+        self.assertEqual([4] * 8, grid[5][1:9])
+
+    def test_fill_border(self):
+        grid = [[0] * 4 for _ in range(3)]
+        fill_border(grid, 8)
+        self.assertEqual([[8, 8, 8, 8], [8, 0, 0, 8], [8, 8, 8, 8]], grid)
+
+    def test_map_tiles(self):
+        grid = [[0, 1, 10], [4, 4, 0]]
+        lookup = {0: "a", 1: "b", 4: "c", 10: "d"}
+        self.assertEqual([["a", "b", "d"], ["c", "c", "a"]], map_tiles(grid, lookup))
+        big = [[(x + y) % 2 for x in range(80)] for y in range(80)]
+        self.assertEqual(
+            map_tiles(big, {0: "0", 1: "1"}, force_python=True),
+            map_tiles(big, {0: "0", 1: "1"}),
+        )
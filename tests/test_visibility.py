@@ -0,0 +1,118 @@
+import itertools
+import math
+import random
+from unittest import TestCase
+from map.distance_field import WALKABLE_TILES
+from map.map_cache import clear_cache, set_tile
+from map.visibility import (
+    SECTOR_SIZE,
+    build_pvs,
+    compute_sector_visibility,
+    get_visibility,
+    is_potentially_visible,
+    sector_of,
+)
+
+
+class TestVisibility(TestCase):
+    def setUp(self):
+        clear_cache()
+        # Two rooms separated by a solid wall at x == 12
+        self.test_map = [[1] * 25 for _ in range(10)]
+        for y in range(1, 9):
+            for x in range(1, 24):
+                if x != 12:
+                    self.test_map[y][x] = 0
+
+    def test_wall_hides_other_room(self):
+        pvs = compute_sector_visibility(self.test_map, sector_of(3.5, 3.5))
+        self.assertTrue(is_potentially_visible(pvs, 10.5, 7.5))
+        self.assertFalse(is_potentially_visible(pvs, 20.5, 4.5))
+
+    def test_opening_reveals_other_room(self):
+        self.test_map[4][12] = 0
+        pvs = compute_sector_visibility(self.test_map, sector_of(3.5, 3.5))
+        self.assertTrue(is_potentially_visible(pvs, 20.5, 4.5))
+
+    def test_max_distance_is_bounded_by_room(self):
+        pvs = compute_sector_visibility(self.test_map, (0, 0))
+        self.assertLess(pvs["max_distance"], 16)
+
+    def test_visibility_is_cached_until_map_changes(self):
+        first = get_visibility(self.test_map, 3.5, 3.5)
+        self.assertIs(first, get_visibility(self.test_map, 2.5, 1.5))
+        set_tile(self.test_map, 12, 4, 0)
+        second = get_visibility(self.test_map, 3.5, 3.5)
+        self.assertIsNot(first, second)
+        self.assertTrue(is_potentially_visible(second, 20.5, 4.5))
+
+    def test_build_pvs_covers_walkable_sectors(self):
+        sectors = build_pvs(self.test_map)
+        expected = {
+            (x // SECTOR_SIZE, y // SECTOR_SIZE)
+            for y in range(1, 9)
+            for x in range(1, 24)
+            if x != 12
+        }
+        self.assertEqual(expected, set(sectors))
+
+
+def has_line_of_sight(world_map, start, end, step=0.05):
+    """Walk the segment in small steps, checking that every point is on a walkable cell"""
+    length = math.dist(start, end)
+    steps = max(1, int(length / step))
+    for i in range(steps + 1):
+        x = start[0] + (end[0] - start[0]) * i / steps
+        y = start[1] + (end[1] - start[1]) * i / steps
+        if world_map[int(y)][int(x)] not in WALKABLE_TILES:
+            return False
+    return True
+
+
+def cell_points(x, y):
+    return [(x + dx, y + dy) for dx in (0.05, 0.5, 0.95) for dy in (0.05, 0.5, 0.95)]
+
+
+class TestVisibilityIsConservative(TestCase):
+    def setUp(self):
+        clear_cache()
+        rng = random.Random(34)
+        size = 24
+        self.test_map = [
+            [
+                1 if x in (0, size - 1) or y in (0, size - 1) or rng.random() < 0.3 else 0
+                for x in range(size)
+            ]
+            for y in range(size)
+        ]
+
+    def test_matches_brute_force_line_of_sight(self):
+        walkable = [
+            (x, y)
+            for y, row in enumerate(self.test_map)
+            for x, tile in enumerate(row)
+            if tile in WALKABLE_TILES
+        ]
+        for sector in [(1, 1), (3, 2), (4, 4)]:
+            pvs = compute_sector_visibility(self.test_map, sector)
+            sources = [cell for cell in walkable if sector_of(*cell) == sector]
+            for target in walkable:
+                for source in sources:
+                    farthest = math.hypot(
+                        abs(target[0] - source[0]) + 1, abs(target[1] - source[1]) + 1
+                    )
+                    if sector_of(*target) in pvs["sectors"] and farthest <= pvs["max_distance"]:
+                        continue  # Covered whether or not it is visible
+                    visible = [
+                        (start, end)
+                        for start, end in itertools.product(
+                            cell_points(*source), cell_points(*target)
+                        )
+                        if math.dist(start, end) <= 20.0
+                        and has_line_of_sight(self.test_map, start, end)
+                    ]
+                    if visible:
+                        self.assertIn(sector_of(*target), pvs["sectors"])
+                        longest = max(math.dist(start, end) for start, end in visible)
+                        self.assertLessEqual(longest, pvs["max_distance"])
+                        break
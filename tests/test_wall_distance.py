@@ -0,0 +1,54 @@
+import math
+import random
+from unittest import TestCase
+from map.map_cache import clear_cache, set_tile
+from map.wall_distance import build_wall_distance_field, get_wall_distance_field
+from renderer.world_renderer import march_ray, sphere_trace_ray
+
+
+class TestWallDistanceField(TestCase):
+    def setUp(self):
+        clear_cache()
+        rng = random.Random(9)
+        self.test_map = [
+            [1 if rng.random() < 0.15 else 0 for _ in range(30)] for _ in range(20)
+        ]
+
+    def test_matches_brute_force(self):
+        height, width = len(self.test_map), len(self.test_map[0])
+        opaque = [
+            (x, y)
+            for y in range(-1, height + 1)
+            for x in range(-1, width + 1)
+            if not (0 <= x < width and 0 <= y < height) or self.test_map[y][x] == 1
+        ]
+        field = build_wall_distance_field(self.test_map)
+        for y in range(height):
+            for x in range(width):
+                expected = min(max(abs(x - ox), abs(y - oy)) for ox, oy in opaque)
+                self.assertEqual(expected, field[y][x])
+
+    def test_field_is_rebuilt_after_set_tile(self):
+        self.test_map[10][10] = 0
+        first = get_wall_distance_field(self.test_map)
+        set_tile(self.test_map, 10, 10, 1)
+        second = get_wall_distance_field(self.test_map)
+        self.assertIsNot(first, second)
+        self.assertEqual(0, second[10][10])
+
+
+class TestSphereTracing(TestCase):
+    def test_matches_fixed_step_marching(self):
+        clear_cache()
+        test_map = [[1] * 40] + [[1] + [0] * 38 + [1] for _ in range(28)] + [[1] * 40]
+        for y in range(8, 20):
+            test_map[y][25] = 8
+        colors = [[str(tile) for tile in row] for row in test_map]
+
+        for i in range(360):
+            angle = i * 2 * math.pi / 360
+            marched = march_ray(12.3, 14.7, angle, test_map, colors)
+            traced = sphere_trace_ray(12.3, 14.7, angle, test_map, colors)
+            self.assertEqual(marched[0], traced[0])
+            self.assertEqual(marched[2:5], traced[2:5])
+            self.assertAlmostEqual(marched[1], traced[1], delta=0.051)
@@ -0,0 +1,83 @@
+from unittest import TestCase
+
+import entities
+from player import create_player
+from utils import game_clock
+from world_instance import VIEW_RADIUS, WORLD_STATE, WorldInstance
+
+
+def open_map(width=60, height=20):
+    return [[1] * width] + [[1] + [0] * (width - 2) + [1] for _ in range(height - 2)] + [[1] * width]
+
+
+class TestWorldInstance(TestCase):
+    def setUp(self):
+        self.original_state = {
+            name: getattr(module, name) for module, names in WORLD_STATE.items() for name in names
+        }
+        self.addCleanup(self.restore_state)
+        self.addCleanup(game_clock.stop_ticks)
+        game_clock.advance(1000.0)
+        self.world = WorldInstance(open_map(), None, (2.5, 2.5), enemy_count=0)
+        self.outside = self.world.enter()
+
+    def restore_state(self):
+        for module, names in WORLD_STATE.items():
+            for name in names:
+                setattr(module, name, self.original_state[name])
+
+    def add_player(self, x, y):
+        player_state = create_player()
+        self.world.add_player(player_state)
+        player_state["x"], player_state["y"] = x, y
+        return player_state
+
+    def test_enemies_chase_the_nearest_player(self):
+        self.add_player(5.5, 10.5)
+        near = self.add_player(40.5, 10.5)
+        enemy = entities.create_enemy(45.5, 10.5)
+        enemy["last_move"] = 0
+        self.world.step(0.1)
+        self.assertEqual("chase", enemy["state"])
+        self.assertLess(enemy["x"], 45.5)
+        self.assertGreater(enemy["x"], near["x"])
+
+    def test_enemies_idle_without_a_player_in_range(self):
+        self.add_player(5.5, 10.5)
+        enemy = entities.create_enemy(50.5, 10.5)
+        self.world.step(0.1)
+        self.assertEqual("idle", enemy["state"])
+
+    def test_enemy_projectiles_hit_whoever_they_reach(self):
+        first = self.add_player(10.5, 5.5)
+        second = self.add_player(30.5, 5.5)
+        entities.create_enemy_projectile(30.3, 5.5, 0.0, speed=0.0)
+        self.world.step(0.1)
+        self.assertEqual((100, 85), (first["health"], second["health"]))
+
+    def test_kills_go_to_the_shooter(self):
+        shooter = self.add_player(10.5, 5.5)
+        bystander = self.add_player(12.5, 5.5)
+        enemy = entities.create_enemy(20.5, 15.5, health=10)
+        entities.create_projectile(20.5, 15.5, 0.0, speed=0.0, owner=shooter)
+        self.world.step(0.1)
+        self.assertEqual("dead", enemy["state"])
+        self.assertEqual((1, 0), (shooter["kills"], bystander["kills"]))
+        self.assertGreater(shooter["exp"], 0)
+
+    def test_players_only_see_entities_in_range(self):
+        near = entities.create_enemy(8.5, 5.5)
+        far = entities.create_enemy(5.5 + VIEW_RADIUS + 5, 5.5)
+        self.add_player(5.5, 5.5)
+        self.world.step(0.0)
+        visible = self.world.visible_entities(5.5, 5.5)
+        self.assertIn(near, visible)
+        self.assertNotIn(far, visible)
+
+    def test_worlds_do_not_share_entities(self):
+        entities.create_enemy(8.5, 5.5)
+        self.world.leave(self.outside)
+        other = WorldInstance(open_map(), None, (2.5, 2.5), enemy_count=2)
+        self.assertEqual(2, len(other.state["enemies"]))
+        self.assertEqual(1, len(self.world.state["enemies"]))
+        self.outside = self.world.enter()
@@ -1,15 +1,35 @@
 import curses
-import time
 import math
-from anim.hand.fire import FireFrames
+from anim.assets import LazyAsset
+from renderer.color_utils import color_pair
 from renderer.console_renderer import render_console, DEBUG_CONSOLE
+from renderer.frame_atlas import get_frame_spans
+from utils import game_clock
+from utils.frame_profiler import FRAME_PROFILER, profiler_summary
+from utils.message_queue import MessageQueue
 
 UI_MESSAGE = "message"
 UI_STATUS = "status"
 UI_INVENTORY = "inventory"
 UI_ANIMATION = "animation"
 
-ui_elements = []
+MAX_VISIBLE_MESSAGES = 3
+PERF_OVERLAY_Y = 7  # Just below the player stats
+
+# One bounded queue per element type, so a flood of one kind cannot crowd out another
+ui_queues = {
+    UI_MESSAGE: MessageQueue(capacity=16),
+    UI_STATUS: MessageQueue(capacity=8),
+}
+
+FireFrames = LazyAsset("fire_frames")
+
+INTERACTION_HINTS = {
+    "door": "Descend",
+    "boss_door": "Enter the Boss Arena",
+    "stairs": "Climb the stairs",
+    "boss_corpse": "Claim your victory",
+}
 
 current_animation = {
     "active": False,
@@ -24,30 +44,32 @@ current_animation = {
 
 
 def add_message(text, duration=3.0, color=3, bold=True):
-    """Add a message to be displayed on screen for a specified duration"""
-    ui_elements.append(
+    """Add a message to be displayed on screen, merging it with an identical live one"""
+    ui_queues[UI_MESSAGE].push(
         {
             "type": UI_MESSAGE,
             "text": text,
-            "start_time": time.time(),
+            "start_time": game_clock.now(),
             "duration": duration,
             "color": color,
             "bold": bold,
-        }
+        },
+        key=(text, color, bold),
     )
 
 
 def add_status_effect(text, icon, duration=None, color=4):
     """Add a status effect to be displayed until duration expires"""
-    ui_elements.append(
+    ui_queues[UI_STATUS].push(
         {
             "type": UI_STATUS,
             "text": text,
             "icon": icon,
-            "start_time": time.time(),
+            "start_time": game_clock.now(),
             "duration": duration,
             "color": color,
-        }
+        },
+        key=(text, icon),
     )
 
 
@@ -60,7 +82,7 @@ def start_animation(animation_type="fire", midpoint_callback=None):
             "active": True,
             "type": "fire",
             "frame_index": 0,
-            "last_frame_time": time.time(),
+            "last_frame_time": game_clock.now(),
             "frame_delay": 0.1,
             "frames": FireFrames,
             "midpoint_callback": midpoint_callback,
@@ -78,7 +100,7 @@ def update_animation():
         current_animation["midpoint_triggered"] = False
         return False
 
-    current_time = time.time()
+    current_time = game_clock.now()
 
     if (
         current_time - current_animation["last_frame_time"]
@@ -110,14 +132,14 @@ def _display_end_screen(stdscr, title, title_color, player_state):
     stdscr.clear()
     height, width = stdscr.getmaxyx()
 
-    stdscr.attron(curses.color_pair(title_color) | curses.A_BOLD)
+    stdscr.attron(color_pair(title_color) | curses.A_BOLD)
     stdscr.box()
-    stdscr.attroff(curses.color_pair(title_color) | curses.A_BOLD)
+    stdscr.attroff(color_pair(title_color) | curses.A_BOLD)
 
     title_x = max(0, (width - len(title)) // 2)
-    stdscr.attron(curses.color_pair(title_color) | curses.A_BOLD)
+    stdscr.attron(color_pair(title_color) | curses.A_BOLD)
     stdscr.addstr(height // 2 - 5, title_x, title)
-    stdscr.attroff(curses.color_pair(title_color) | curses.A_BOLD)
+    stdscr.attroff(color_pair(title_color) | curses.A_BOLD)
 
     stats = [
         f"Final Level: {player_state.get('level', 1)}",
@@ -128,15 +150,15 @@ def _display_end_screen(stdscr, title, title_color, player_state):
     stats_y = height // 2 - 2
     for i, stat in enumerate(stats):
         stat_x = max(0, (width - len(stat)) // 2)
-        stdscr.attron(curses.color_pair(7))
+        stdscr.attron(color_pair(7))
         stdscr.addstr(stats_y + i, stat_x, stat)
-        stdscr.attroff(curses.color_pair(7))
+        stdscr.attroff(color_pair(7))
 
     footer_text = "Press any key to return to the menu"
     footer_x = max(0, (width - len(footer_text)) // 2)
-    stdscr.attron(curses.color_pair(3))
+    stdscr.attron(color_pair(3))
     stdscr.addstr(height - 3, footer_x, footer_text)
-    stdscr.attroff(curses.color_pair(3))
+    stdscr.attroff(color_pair(3))
 
     stdscr.refresh()
     stdscr.nodelay(False)
@@ -154,15 +176,18 @@ def display_win_screen(stdscr, player_state):
     _display_end_screen(stdscr, "and so they left", 6, player_state)
 
 
+def reset_ui():
+    """Drop every message and status effect and stop the animation, for a new game"""
+    for queue in ui_queues.values():
+        queue.clear()
+    current_animation["active"] = False
+    current_animation["midpoint_callback"] = None
+
+
 def clear_expired_elements(current_time):
     """Remove any UI elements that have expired"""
-    global ui_elements
-    ui_elements = [
-        elem
-        for elem in ui_elements
-        if elem["duration"] is None
-        or current_time - elem["start_time"] < elem["duration"]
-    ]
+    for queue in ui_queues.values():
+        queue.expire(current_time)
 
 
 def draw_player_stats(stdscr, player_state):
@@ -196,7 +221,7 @@ def draw_player_stats(stdscr, player_state):
 
     try:
 
-        stdscr.addstr(1, 2, level_text, curses.color_pair(3) | curses.A_BOLD)
+        stdscr.addstr(1, 2, level_text, color_pair(3) | curses.A_BOLD)
 
         health_color = 2
         if health_percent < 0.3:
@@ -204,14 +229,32 @@ def draw_player_stats(stdscr, player_state):
         elif health_percent < 0.7:
             health_color = 3
         stdscr.addstr(
-            2, 2, health_text, curses.color_pair(health_color) | curses.A_BOLD
+            2, 2, health_text, color_pair(health_color) | curses.A_BOLD
         )
 
-        stdscr.addstr(3, 2, exp_text, curses.color_pair(6) | curses.A_BOLD)
+        stdscr.addstr(3, 2, exp_text, color_pair(6) | curses.A_BOLD)
+
+        stdscr.addstr(4, 2, depth_text, color_pair(5) | curses.A_BOLD)
+
+        stdscr.addstr(5, 2, kills_text, color_pair(1) | curses.A_BOLD)
+    except curses.error:
+        pass
 
-        stdscr.addstr(4, 2, depth_text, curses.color_pair(5) | curses.A_BOLD)
 
-        stdscr.addstr(5, 2, kills_text, curses.color_pair(1) | curses.A_BOLD)
+def draw_interaction_hint(stdscr, interaction):
+    """Draw a "[E]" prompt under the crosshair when something can be interacted with"""
+    if interaction is None or interaction.kind not in INTERACTION_HINTS:
+        return
+
+    height, width = stdscr.getmaxyx()
+    hint = f"[E] {INTERACTION_HINTS[interaction.kind]}"
+    try:
+        stdscr.addstr(
+            height // 2 + 2,
+            max(0, (width - len(hint)) // 2),
+            hint,
+            color_pair(3) | curses.A_BOLD,
+        )
     except curses.error:
         pass
 
@@ -219,43 +262,47 @@ def draw_player_stats(stdscr, player_state):
 def draw_ui_layer(stdscr, player_state=None):
     """Draw all active UI elements on top of the game view"""
     height, width = stdscr.getmaxyx()
-    current_time = time.time()
+    current_time = game_clock.now()
 
     clear_expired_elements(current_time)
 
     if player_state:
         draw_player_stats(stdscr, player_state)
+        if not player_state.get("map_mode"):
+            draw_interaction_hint(stdscr, player_state.get("interaction"))
 
-    messages = [elem for elem in ui_elements if elem["type"] == UI_MESSAGE]
+    messages = ui_queues[UI_MESSAGE].newest(MAX_VISIBLE_MESSAGES)
     if messages:
 
-        msg_height = min(len(messages) + 2, 5)
+        msg_height = len(messages) + 2
         msg_y = height - msg_height - 1
 
-        messages.sort(key=lambda x: x["start_time"], reverse=True)
-        for i, msg in enumerate(messages[: msg_height - 2]):
+        for i, msg in enumerate(messages):
 
             time_left = msg["duration"] - (current_time - msg["start_time"])
             if time_left < 0.5:
 
                 if time_left < 0.1:
                     continue
-                style = curses.color_pair(msg["color"])
+                style = color_pair(msg["color"])
             else:
-                style = curses.color_pair(msg["color"]) | (
+                style = color_pair(msg["color"]) | (
                     curses.A_BOLD if msg["bold"] else 0
                 )
 
-            msg_x = (width - len(msg["text"])) // 2
+            text = msg["text"]
+            if msg["count"] > 1:
+                text = f"{text} x{msg['count']}"
+            msg_x = (width - len(text)) // 2
             try:
-                stdscr.addstr(msg_y + i + 1, msg_x, msg["text"], style)
+                stdscr.addstr(msg_y + i + 1, msg_x, text, style)
             except curses.error:
                 pass
 
-    statuses = [elem for elem in ui_elements if elem["type"] == UI_STATUS]
+    statuses = ui_queues[UI_STATUS].newest()
     if statuses:
         status_x = 2
-        for status in statuses:
+        for status in reversed(statuses):
 
             if status["duration"] is not None:
                 time_left = status["duration"] - (current_time - status["start_time"])
@@ -269,7 +316,7 @@ def draw_ui_layer(stdscr, player_state=None):
                     1,
                     status_x,
                     status_text,
-                    curses.color_pair(status["color"]) | curses.A_BOLD,
+                    color_pair(status["color"]) | curses.A_BOLD,
                 )
                 status_x += len(status_text) + 2
             except curses.error:
@@ -281,12 +328,31 @@ def draw_ui_layer(stdscr, player_state=None):
         draw_animation_frame(stdscr)
         update_animation()
 
+    if FRAME_PROFILER["enabled"]:
+        draw_perf_overlay(stdscr)
+
     if DEBUG_CONSOLE["active"]:
         render_console(stdscr)
 
     stdscr.noutrefresh()
 
 
+def draw_perf_overlay(stdscr):
+    """Draw the frame rate, frame time percentiles and slowest stage under the stats"""
+    summary = profiler_summary()
+    lines = [
+        f"FPS {summary['fps']:5.1f}  frame p50 {summary['p50_ms']:5.2f}ms"
+        f"  p99 {summary['p99_ms']:5.2f}ms"
+    ]
+    if summary["top_stage"]:
+        lines.append(f"top: {summary['top_stage']} {summary['top_ms']:.2f}ms")
+    for i, line in enumerate(lines):
+        try:
+            stdscr.addstr(PERF_OVERLAY_Y + i, 2, line, color_pair(7) | curses.A_BOLD)
+        except curses.error:
+            pass
+
+
 def draw_weapon_hud(stdscr):
     """Draw the static weapon HUD using the first animation frame"""
     if not current_animation["active"] and FireFrames:
@@ -312,31 +378,16 @@ def draw_fire_frame(stdscr, frame):
     """Draw a fire animation frame at the bottom right of the screen"""
     height, width = stdscr.getmaxyx()
 
-    lines = frame.split("\n")
-
     fixed_x = width - 118
     fixed_y = height - 65
 
-    for i, line in enumerate(lines):
-        y_pos = fixed_y + i
-
-        if y_pos >= height or y_pos < 0:
-            continue
-
-        for j, char in enumerate(line):
-            if char == " " or char == "\t":
-                continue
-
-            x_pos = fixed_x + j
-
-            if 0 <= y_pos < height and 0 <= x_pos < width:
-                try:
-
-                    stdscr.addstr(
-                        y_pos, x_pos, char, curses.color_pair(1) | curses.A_BOLD
-                    )
-                except curses.error:
-                    pass
+    # The atlas keeps each frame as clipped runs of visible characters
+    style = color_pair(1) | curses.A_BOLD
+    for y_pos, x_pos, text in get_frame_spans(frame, fixed_x, fixed_y, height, width):
+        try:
+            stdscr.addstr(y_pos, x_pos, text, style)
+        except curses.error:
+            pass
 
 
 def get_weapon_muzzle_position(screen_height, screen_width):
@@ -1,2 +1,3 @@
 from .collision import is_collision, would_collide
 from .math_utils import distance
+from .message_queue import MessageQueue
@@ -0,0 +1,179 @@
+"""Per-stage frame timing for the performance overlay"""
+
+import time
+
+
+HISTOGRAM_WINDOW = 120  # About four seconds of frames at 30 FPS
+SUB_BUCKETS = 8  # Buckets per power of two, so estimates are within about 6%
+MAX_BUCKET_BITS = 40
+
+FRAME_PROFILER = {
+    "enabled": False,
+    "stages": {},
+    "frame": None,
+    "interval": None,
+    "frame_start": 0,
+    "last_mark": 0,
+}
+
+
+def _bucket_of(nanoseconds):
+    """Map a duration to its histogram bucket: SUB_BUCKETS log-spaced buckets per octave"""
+    bits = min(max(nanoseconds, 1).bit_length(), MAX_BUCKET_BITS)
+    if bits <= 4:
+        return nanoseconds
+    mantissa = (nanoseconds >> (bits - 4)) & (SUB_BUCKETS - 1)
+    return (bits - 1) * SUB_BUCKETS + mantissa
+
+
+def _bucket_value(bucket):
+    """Get the midpoint of a histogram bucket in nanoseconds"""
+    if bucket < 16:
+        return bucket
+    bits = bucket // SUB_BUCKETS + 1
+    mantissa = bucket % SUB_BUCKETS
+    return int((SUB_BUCKETS + mantissa + 0.5) * (1 << (bits - 4)))
+
+
+class RollingHistogram:
+    """
+    A log-bucketed histogram of the most recent timings.
+
+    Each sample costs O(1) to add: its bucket is counted and the bucket of the sample
+    falling out of the window is uncounted. Percentiles walk the bucket counts.
+
+    >>> histogram = RollingHistogram(window=4)
+    >>> for sample in (1_000_000, 2_000_000, 3_000_000, 4_000_000, 100_000_000):
+    ...     histogram.add(sample)
+    >>> len(histogram), round(histogram.mean() / 1e6, 2)
+    (4, 27.25)
+    >>> 2.8 < histogram.percentile(50) / 1e6 < 3.2, 90 < histogram.percentile(99) / 1e6 < 110
+    (True, True)
+    """
+
+    __slots__ = ("window", "counts", "samples", "head", "size", "total")
+
+    def __init__(self, window=HISTOGRAM_WINDOW):
+        self.window = window
+        self.counts = [0] * (MAX_BUCKET_BITS * SUB_BUCKETS)
+        self.samples = [0] * window
+        self.head = 0
+        self.size = 0
+        self.total = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, nanoseconds):
+        """Record one timing, forgetting the oldest once the window is full"""
+        if self.size == self.window:
+            oldest = self.samples[self.head]
+            self.counts[_bucket_of(oldest)] -= 1
+            self.total -= oldest
+        else:
+            self.size += 1
+        self.samples[self.head] = nanoseconds
+        self.head = (self.head + 1) % self.window
+        self.counts[_bucket_of(nanoseconds)] += 1
+        self.total += nanoseconds
+
+    def mean(self):
+        """Get the exact mean of the window in nanoseconds"""
+        return self.total / self.size if self.size else 0.0
+
+    def percentile(self, q):
+        """Estimate a percentile of the window in nanoseconds"""
+        if not self.size:
+            return 0
+        rank = max(1, -(-self.size * q // 100))
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return _bucket_value(bucket)
+        return _bucket_value(len(self.counts) - 1)
+
+
+def toggle_profiler():
+    """
+    Turn stage timing and its overlay on or off, starting from empty histograms.
+
+    :postcondition: FRAME_PROFILER["enabled"] is flipped; turning on clears old samples.
+    :return: bool, whether the profiler is now enabled.
+    """
+    FRAME_PROFILER["enabled"] = not FRAME_PROFILER["enabled"]
+    if FRAME_PROFILER["enabled"]:
+        FRAME_PROFILER["stages"] = {}
+        FRAME_PROFILER["frame"] = RollingHistogram()
+        FRAME_PROFILER["interval"] = RollingHistogram()
+        FRAME_PROFILER["frame_start"] = 0
+    return FRAME_PROFILER["enabled"]
+
+
+def begin_frame():
+    """Start timing a frame"""
+    if not FRAME_PROFILER["enabled"]:
+        return
+    now = time.perf_counter_ns()
+    if FRAME_PROFILER["frame_start"]:
+        FRAME_PROFILER["interval"].add(now - FRAME_PROFILER["frame_start"])
+    FRAME_PROFILER["frame_start"] = FRAME_PROFILER["last_mark"] = now
+
+
+def mark(stage):
+    """
+    Charge the time since the previous mark (or the start of the frame) to a stage.
+
+    Does nothing but a dictionary lookup while the profiler is disabled.
+
+    :param stage: str, the name of the stage that just finished.
+    :precondition: begin_frame must have been called this frame.
+    :postcondition: Adds one sample to the stage's histogram when enabled.
+    :return: None
+    """
+    if not FRAME_PROFILER["enabled"] or not FRAME_PROFILER["last_mark"]:
+        return
+    now = time.perf_counter_ns()
+    histogram = FRAME_PROFILER["stages"].get(stage)
+    if histogram is None:
+        histogram = FRAME_PROFILER["stages"][stage] = RollingHistogram()
+    histogram.add(now - FRAME_PROFILER["last_mark"])
+    FRAME_PROFILER["last_mark"] = now
+
+
+def end_frame():
+    """Finish timing a frame; the time spent sleeping afterwards is not counted"""
+    if not FRAME_PROFILER["enabled"] or not FRAME_PROFILER["frame_start"]:
+        return
+    FRAME_PROFILER["frame"].add(time.perf_counter_ns() - FRAME_PROFILER["frame_start"])
+    FRAME_PROFILER["last_mark"] = 0
+
+
+def profiler_summary():
+    """
+    Summarize the recent frames for the overlay.
+
+    :precondition: The profiler should be enabled; otherwise the summary is empty.
+    :postcondition: Does not modify the histograms.
+    :return: dict, with "fps", "p50_ms" and "p99_ms" of the frame work time, the
+             "top_stage" by mean time and its "top_ms", and "stages", the mean ms of
+             every stage.
+    >>> profiler_summary()["fps"]
+    0.0
+    """
+    frame = FRAME_PROFILER["frame"]
+    interval = FRAME_PROFILER["interval"]
+    stages = {
+        name: histogram.mean() / 1e6
+        for name, histogram in FRAME_PROFILER["stages"].items()
+        if len(histogram)
+    }
+    top_stage = max(stages, key=stages.get) if stages else None
+    return {
+        "fps": 1e9 / interval.mean() if interval and len(interval) else 0.0,
+        "p50_ms": frame.percentile(50) / 1e6 if frame else 0.0,
+        "p99_ms": frame.percentile(99) / 1e6 if frame else 0.0,
+        "top_stage": top_stage,
+        "top_ms": stages.get(top_stage, 0.0),
+        "stages": stages,
+    }
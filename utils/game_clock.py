@@ -0,0 +1,133 @@
+"""
+The time the simulation sees, read once per tick.
+
+The game loop advances the clock at the start of every tick and everything in the tick
+reads that one timestamp. How far a tick moves the clock depends on its mode:
+
+- real: as far as the wall clock moved.
+- scaled: as far as the wall clock moved, times the scale.
+- paused: not at all.
+- simulated: a fixed step, however long the tick really took, so headless runs can go
+  as fast as the machine allows.
+"""
+
+import time
+
+
+CLOCK_REAL = "real"
+CLOCK_SCALED = "scaled"
+CLOCK_PAUSED = "paused"
+CLOCK_SIMULATED = "simulated"
+CLOCK_MODES = (CLOCK_REAL, CLOCK_SCALED, CLOCK_PAUSED, CLOCK_SIMULATED)
+
+DEFAULT_STEP = 1 / 30  # The frame time the game loop aims for
+
+GAME_CLOCK = {
+    "mode": CLOCK_REAL,
+    "scale": 1.0,
+    "step": DEFAULT_STEP,
+    "tick_time": None,
+    "last_wall": None,
+}
+
+
+def now():
+    """
+    Get the time of the current tick.
+
+    While the game loop runs, every read in a tick gets the same timestamp, so a tick
+    can be replayed exactly. Outside the loop this is the wall clock.
+
+    :postcondition: Does not change the clock.
+    :return: float, the game time in seconds.
+    >>> start_tick(1000.0)
+    >>> now(), now()
+    (1000.0, 1000.0)
+    >>> stop_ticks()
+    >>> now() > 1000.0
+    True
+    """
+    tick_time = GAME_CLOCK["tick_time"]
+    return time.time() if tick_time is None else tick_time
+
+
+def start_tick(tick_time):
+    """Fix the time every clock read returns until the next tick"""
+    GAME_CLOCK["tick_time"] = tick_time
+
+
+def advance(wall_time=None):
+    """
+    Start a new tick, moving the game time on according to the clock mode.
+
+    The first tick starts at the wall time, or at the time given to start_tick.
+
+    :param wall_time: float | None, the wall clock time, or None to read it.
+    :precondition: Called once at the start of every tick.
+    :postcondition: now() returns the new tick time until the next tick.
+    :return: float, the new tick time.
+    >>> set_clock_mode(CLOCK_SCALED, 0.5)
+    >>> advance(100.0), advance(101.0)
+    (100.0, 100.5)
+    >>> set_clock_mode(CLOCK_PAUSED)
+    >>> advance(105.0)
+    100.5
+    >>> set_clock_mode(CLOCK_SIMULATED, 0.25)
+    >>> advance(105.0), advance(105.0)
+    (100.75, 101.0)
+    >>> stop_ticks()
+    """
+    if wall_time is None:
+        wall_time = time.time()
+    tick_time = GAME_CLOCK["tick_time"]
+    last_wall = GAME_CLOCK["last_wall"]
+    mode = GAME_CLOCK["mode"]
+
+    if tick_time is None:
+        tick_time = wall_time
+    elif last_wall is None or mode == CLOCK_PAUSED:
+        pass
+    elif mode == CLOCK_SIMULATED:
+        tick_time += GAME_CLOCK["step"]
+    elif mode == CLOCK_SCALED:
+        tick_time += max(0.0, wall_time - last_wall) * GAME_CLOCK["scale"]
+    else:
+        tick_time += max(0.0, wall_time - last_wall)
+
+    GAME_CLOCK["tick_time"] = tick_time
+    GAME_CLOCK["last_wall"] = wall_time
+    return tick_time
+
+
+def set_clock_mode(mode, value=None):
+    """
+    Change how the clock advances from the next tick on.
+
+    :param mode: str, one of CLOCK_MODES.
+    :param value: float | None, the scale for CLOCK_SCALED or the step in seconds for
+                  CLOCK_SIMULATED; None keeps the current one.
+    :precondition: value must be positive when given.
+    :postcondition: Raises ValueError for an unknown mode or a value that is not positive.
+    :return: None
+    >>> set_clock_mode("rewind")
+    Traceback (most recent call last):
+    ...
+    ValueError: Unknown clock mode 'rewind'
+    """
+    if mode not in CLOCK_MODES:
+        raise ValueError(f"Unknown clock mode '{mode}'")
+    if value is not None and not value > 0:
+        raise ValueError("The clock scale and step must be positive")
+
+    GAME_CLOCK["mode"] = mode
+    if value is not None and mode == CLOCK_SCALED:
+        GAME_CLOCK["scale"] = value
+    elif value is not None and mode == CLOCK_SIMULATED:
+        GAME_CLOCK["step"] = value
+
+
+def stop_ticks():
+    """Go back to the wall clock in real mode, once the game loop has stopped"""
+    GAME_CLOCK.update(
+        mode=CLOCK_REAL, scale=1.0, step=DEFAULT_STEP, tick_time=None, last_wall=None
+    )
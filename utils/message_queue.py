@@ -0,0 +1,163 @@
+"""A bounded queue of timed UI elements"""
+
+import heapq
+
+
+class MessageQueue:
+    """
+    A fixed number of slots for UI elements, with a min-heap of their expiry times.
+
+    Elements are dicts with a "start_time" and a "duration" (None means it never
+    expires). Pushing an element whose key matches a live element coalesces the two:
+    the live element's "count" goes up and its timer restarts. A new element takes any
+    free slot, and only when every slot is live is the oldest element dropped, so a flood
+    of messages costs a bounded amount of memory. Age is kept in a separate
+    insertion-ordered index, since slots freed by expiry are reused out of order.
+
+    >>> queue = MessageQueue(capacity=3)
+    >>> for i in range(2):
+    ...     queue.push({"text": "HIT!", "start_time": i, "duration": 1.0}, key="HIT!")
+    >>> queue.push({"text": "Hello", "start_time": 1, "duration": 5.0}, key="Hello")
+    >>> [(element["text"], element["count"]) for element in queue.newest()]
+    [('Hello', 1), ('HIT!', 2)]
+    >>> queue.expire(2.0)
+    1
+    >>> len(queue)
+    1
+    """
+
+    __slots__ = (
+        "capacity", "slots", "free", "order", "stamp", "live", "expiry", "by_key", "sequence"
+    )
+
+    def __init__(self, capacity=32):
+        self.capacity = capacity
+        self.slots = [None] * capacity
+        self.free = list(range(capacity - 1, -1, -1))  # Free slots, lowest on top
+        self.order = {}  # Insertion stamp -> live element, oldest first
+        self.stamp = 0
+        self.live = 0
+        self.expiry = []
+        self.by_key = {}
+        self.sequence = 0
+
+    def __len__(self):
+        return self.live
+
+    def _remove(self, element):
+        """Take a live element out of its slot, the age index and the key index"""
+        self.slots[element["slot"]] = None
+        self.free.append(element["slot"])
+        del self.order[element["stamp"]]
+        self.live -= 1
+        if self.by_key.get(element["key"]) is element:
+            del self.by_key[element["key"]]
+
+    def push(self, element, key=None):
+        """
+        Add an element as the newest one, or coalesce it into a live duplicate.
+
+        :param element: dict, with at least "start_time" and "duration".
+        :param key: hashable | None, what makes two elements duplicates; None never
+                    coalesces.
+        :precondition: element must not already be in a queue.
+        :postcondition: The element, or the duplicate it was merged into, is the newest.
+        :return: None
+        """
+        existing = self.by_key.get(key) if key is not None else None
+        if existing is not None:
+            # Keep the live element, but restart its timer and move it to the front
+            existing["count"] += 1
+            existing["start_time"] = element["start_time"]
+            existing["duration"] = element["duration"]
+            self._remove(existing)
+            element = existing
+        else:
+            element["count"] = 1
+            element["key"] = key
+
+        if self.live == self.capacity:
+            self._remove(next(iter(self.order.values())))
+
+        element["slot"] = self.free.pop()
+        self.slots[element["slot"]] = element
+        self.stamp += 1
+        element["stamp"] = self.stamp
+        self.order[self.stamp] = element
+        self.live += 1
+        if key is not None:
+            self.by_key[key] = element
+
+        if element["duration"] is None:
+            element["expires_at"] = None
+        else:
+            element["expires_at"] = element["start_time"] + element["duration"]
+            self.sequence += 1
+            heapq.heappush(self.expiry, (element["expires_at"], self.sequence, element))
+            if len(self.expiry) > 4 * self.capacity:
+                self._compact_expiry()
+
+    def _compact_expiry(self):
+        """Rebuild the heap from the live elements, dropping entries for stale timers"""
+        self.expiry = []
+        for element in self.slots:
+            if element is not None and element["expires_at"] is not None:
+                self.sequence += 1
+                self.expiry.append((element["expires_at"], self.sequence, element))
+        heapq.heapify(self.expiry)
+
+    def expire(self, current_time):
+        """
+        Drop every element whose duration has run out.
+
+        Only the heap entries that are due are looked at. Entries left behind by
+        coalesced or overwritten elements are discarded as they come up.
+
+        :param current_time: float, the current time.
+        :precondition: current_time must use the same clock as the elements.
+        :postcondition: No element with expires_at <= current_time is left.
+        :return: int, how many elements expired.
+        """
+        expired = 0
+        expiry = self.expiry
+        while expiry and expiry[0][0] <= current_time:
+            expires_at, _, element = heapq.heappop(expiry)
+            if (
+                element["expires_at"] == expires_at
+                and self.order.get(element["stamp"]) is element
+            ):
+                self._remove(element)
+                expired += 1
+        return expired
+
+    def newest(self, limit=None):
+        """
+        Get the live elements from newest to oldest.
+
+        :param limit: int | None, the most elements to return, or None for all of them.
+        :precondition: limit must be None or a non-negative integer.
+        :postcondition: Does not modify the queue.
+        :return: list[dict], the elements, newest first.
+        """
+        if limit is None or limit > self.live:
+            limit = self.live
+        found = []
+        for element in reversed(self.order.values()):
+            if len(found) == limit:
+                break
+            found.append(element)
+        return found
+
+    def clear(self):
+        """
+        Remove every element.
+
+        :postcondition: The queue is empty.
+        :return: None
+        """
+        self.slots = [None] * self.capacity
+        self.free = list(range(self.capacity - 1, -1, -1))
+        self.order = {}
+        self.live = 0
+        self.expiry = []
+        self.by_key = {}
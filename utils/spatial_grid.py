@@ -0,0 +1,150 @@
+"""
+A uniform grid of positioned objects, for finding what is near a point without looking
+at everything.
+
+Objects are dicts with "x" and "y" keys, like entities and player states. The grid is
+rebuilt from scratch whenever the objects have moved, which costs one dict insert per
+object; queries then only visit the cells around the point they ask about.
+"""
+
+import math
+
+
+class SpatialGrid:
+    """
+    Objects bucketed by the grid cell their position falls in.
+
+    With a cell size of map.visibility.SECTOR_SIZE the cells are the visibility sectors,
+    so a potentially-visible set can filter the cells of a query.
+
+    >>> grid = SpatialGrid(4)
+    >>> grid.rebuild([{"x": 1.5, "y": 1.5}, {"x": 9.5, "y": 2.5}, {"x": 30.0, "y": 30.0}])
+    >>> [item["x"] for item in grid.query(2.0, 2.0, 8.0)]
+    [1.5, 9.5]
+    >>> grid.nearest(28.0, 28.0)["x"]
+    30.0
+    """
+
+    __slots__ = ("cell_size", "cells", "count", "bounds")
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.count = 0
+        self.bounds = None  # (min_x, min_y, max_x, max_y) of the cells in use
+
+    def __len__(self):
+        return self.count
+
+    def cell_of(self, x, y):
+        """Get the key of the cell a position falls in"""
+        return int(x) // self.cell_size, int(y) // self.cell_size
+
+    def rebuild(self, items):
+        """
+        Replace the contents of the grid.
+
+        :param items: iterable of dict, objects with "x" and "y" positions.
+        :precondition: Positions must not be negative.
+        :postcondition: The grid holds exactly items, bucketed by where they are now.
+        :return: None
+        """
+        cells = {}
+        count = 0
+        cell_size = self.cell_size
+        for item in items:
+            key = (int(item["x"]) // cell_size, int(item["y"]) // cell_size)
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [item]
+            else:
+                bucket.append(item)
+            count += 1
+        self.cells = cells
+        self.count = count
+        if cells:
+            xs = [key[0] for key in cells]
+            ys = [key[1] for key in cells]
+            self.bounds = (min(xs), min(ys), max(xs), max(ys))
+        else:
+            self.bounds = None
+
+    def query(self, x, y, radius, allowed_cells=None):
+        """
+        Find the objects within a distance of a point.
+
+        :param x: float, the x-coordinate of the point.
+        :param y: float, the y-coordinate of the point.
+        :param radius: float, the largest distance to include.
+        :param allowed_cells: set | frozenset | None, cell keys to search, such as the
+                              sectors of a potentially-visible set; None searches them all.
+        :precondition: radius must not be negative.
+        :postcondition: Only the cells overlapping the circle's bounding box are visited.
+        :return: list[dict], the objects found, cell by cell.
+        """
+        found = []
+        cell_size = self.cell_size
+        radius_squared = radius * radius
+        cells = self.cells
+        for cell_y in range(int(y - radius) // cell_size, int(y + radius) // cell_size + 1):
+            for cell_x in range(int(x - radius) // cell_size, int(x + radius) // cell_size + 1):
+                bucket = cells.get((cell_x, cell_y))
+                if bucket is None:
+                    continue
+                if allowed_cells is not None and (cell_x, cell_y) not in allowed_cells:
+                    continue
+                for item in bucket:
+                    dx = item["x"] - x
+                    dy = item["y"] - y
+                    if dx * dx + dy * dy <= radius_squared:
+                        found.append(item)
+        return found
+
+    def nearest(self, x, y, max_distance=math.inf):
+        """
+        Find the object closest to a point.
+
+        Searches rings of cells outwards from the point's cell, stopping once no
+        unsearched cell can hold anything closer than what was found.
+
+        :param x: float, the x-coordinate of the point.
+        :param y: float, the y-coordinate of the point.
+        :param max_distance: float, how far to look.
+        :precondition: max_distance must not be negative.
+        :postcondition: Ties go to the object found first.
+        :return: dict | None, the nearest object within max_distance, if any.
+        >>> grid = SpatialGrid(4)
+        >>> grid.rebuild([{"x": 10.0, "y": 0.0}])
+        >>> grid.nearest(0.0, 0.0, 5.0) is None, grid.nearest(0.0, 0.0, 10.0)["x"]
+        (True, 10.0)
+        """
+        if self.bounds is None:
+            return None
+        cell_size = self.cell_size
+        center_x, center_y = self.cell_of(x, y)
+        min_x, min_y, max_x, max_y = self.bounds
+        last_ring = max(
+            center_x - min_x, max_x - center_x, center_y - min_y, max_y - center_y
+        )
+        best = None
+        best_squared = max_distance * max_distance
+        ring = 0
+        while ring <= last_ring:
+            # Everything in this ring and beyond is at least this far away
+            if ring > 0 and ((ring - 1) * cell_size) ** 2 > best_squared:
+                break
+            for cell_y in range(center_y - ring, center_y + ring + 1):
+                on_edge = cell_y in (center_y - ring, center_y + ring)
+                step = 1 if on_edge else 2 * ring
+                for cell_x in range(center_x - ring, center_x + ring + 1, step or 1):
+                    for item in self.cells.get((cell_x, cell_y), ()):
+                        dx = item["x"] - x
+                        dy = item["y"] - y
+                        distance_squared = dx * dx + dy * dy
+                        if distance_squared <= best_squared and (
+                            best is None or distance_squared < best_squared
+                        ):
+                            best = item
+                            best_squared = distance_squared
+            ring += 1
+        return best
@@ -0,0 +1,227 @@
+"""
+One level simulated once for every player on it.
+
+The entity and UI modules keep the state of "the" world in module globals. A
+WorldInstance owns a separate copy of that state and lends it to the modules while it
+runs, so several instances can live side by side in one process.
+
+Each tick updates every entity once, whatever the number of players: enemies find the
+nearest player through a grid of the players' positions rather than checking each of
+them. Afterwards the entities are bucketed into a grid of visibility sectors, so what
+a player can see is found by visiting the sectors around them, not every entity.
+"""
+
+import curses
+
+import entities
+import ui
+from interaction import query_interaction
+from map.dungeon_generator import ARCHETYPES, generate_dungeon_level
+from map.map_cache import release_map
+from map.static_map import (
+    WORLD_COLORS,
+    WORLD_MAP,
+    find_valid_spawn,
+    get_color_layer,
+    is_spawn_valid,
+)
+from map.visibility import SECTOR_SIZE, get_visibility
+from player import update_input, update_player
+from utils.message_queue import MessageQueue
+from utils.spatial_grid import SpatialGrid
+
+
+SURFACE_SPAWN = (10.5, 8.5)
+DUNGEON_SIZE = (40, 20)
+ENEMIES_PER_LEVEL = 5
+VIEW_RADIUS = 20.0  # The farthest the 3D view draws entities
+PLAYER_SHOT_SPEED = 7.0
+PLAYER_SHOT_LIFETIME = 1.5
+
+# The console and the profiler overlay are per process, so players cannot open them
+BLOCKED_KEYS = {ord(";"), curses.KEY_F3}
+
+# The module-level state of entities and ui that belongs to one world
+WORLD_STATE = {
+    entities: ("entities", "projectiles", "enemies", "enemy_projectiles", "interactables"),
+    ui: ("ui_queues",),
+}
+
+
+class WorldInstance:
+    """
+    A level shared by any number of players, with its own entities and messages.
+
+    >>> world = WorldInstance([[1, 1, 1], [1, 0, 1], [1, 1, 1]], None, (1.5, 1.5), 0)
+    >>> player_state = {"x": 0.0, "y": 0.0, "health": 100}
+    >>> world.add_player(player_state)
+    >>> (player_state["x"], player_state["y"]), len(world.players)
+    ((1.5, 1.5), 1)
+    """
+
+    __slots__ = ("map", "colors", "spawn", "state", "players", "entity_grid", "player_grid")
+
+    def __init__(self, world_map, colors, spawn, enemy_count=ENEMIES_PER_LEVEL):
+        self.map = world_map
+        self.colors = colors
+        self.spawn = spawn
+        self.state = {
+            "entities": [],
+            "projectiles": [],
+            "enemies": [],
+            "enemy_projectiles": [],
+            "interactables": {},
+            "ui_queues": {
+                ui.UI_MESSAGE: MessageQueue(capacity=16),
+                ui.UI_STATUS: MessageQueue(capacity=8),
+            },
+        }
+        self.players = []
+        self.entity_grid = SpatialGrid(SECTOR_SIZE)
+        self.player_grid = SpatialGrid(SECTOR_SIZE)
+
+        outside = self.enter()
+        try:
+            entities.spawn_enemies(world_map, enemy_count, keep_away=spawn)
+        finally:
+            self.leave(outside)
+        self.entity_grid.rebuild(self.state["entities"])
+
+    def enter(self):
+        """
+        Point the entity and UI modules at this world's state.
+
+        :postcondition: Entities created and messages added go to this world until leave.
+        :return: dict, what the modules held before, to give back to leave.
+        """
+        outside = {}
+        for module, names in WORLD_STATE.items():
+            for name in names:
+                outside[name] = getattr(module, name)
+                setattr(module, name, self.state[name])
+        return outside
+
+    def leave(self, outside):
+        """Take this world's state back from the modules, which may have replaced the lists"""
+        for module, names in WORLD_STATE.items():
+            for name in names:
+                self.state[name] = getattr(module, name)
+                setattr(module, name, outside[name])
+
+    def close(self):
+        """Let the map cache forget the world's map, unless it is the shared overworld"""
+        if self.map is not WORLD_MAP:
+            release_map(self.map)
+
+    def add_player(self, player_state):
+        """Put a player at the spawn point of the world"""
+        player_state["x"], player_state["y"] = self.spawn
+        self.players.append(player_state)
+
+    def remove_player(self, player_state):
+        """Take a player out of the world"""
+        self.players.remove(player_state)
+
+    def apply_input(self, player_state, keys, delta_time, current_time, screen_size):
+        """
+        Apply a player's keys and movement, and handle their shooting and interactions.
+
+        :param player_state: dict, a player in this world.
+        :param keys: list[int], the keys the player pressed since the previous tick.
+        :param delta_time: float, the seconds since the previous tick.
+        :param current_time: float, the game clock time of the tick.
+        :param screen_size: tuple[int, int], the player's (height, width), which places
+                            the weapon's muzzle.
+        :precondition: The world must be entered.
+        :postcondition: Projectiles the player fires are theirs, for the XP of kills.
+        :return: str | None, "quit" if the player quit, "door" if they took a door down,
+                 otherwise None.
+        """
+        for key in keys:
+            if key not in BLOCKED_KEYS and update_input(player_state, key, True):
+                return "quit"
+
+        if player_state["map_mode"]:
+            return None
+
+        should_shoot, should_interact = update_player(player_state, delta_time, self.map)
+        if (
+            should_shoot
+            and current_time - player_state["last_shot_time"] > player_state["shot_cooldown"]
+        ):
+            world_x, world_y = ui.convert_screen_to_world(
+                ui.get_weapon_muzzle_position(*screen_size),
+                player_state["x"],
+                player_state["y"],
+                player_state["angle"],
+            )
+            entities.create_projectile(
+                world_x,
+                world_y,
+                player_state["angle"],
+                speed=PLAYER_SHOT_SPEED,
+                lifetime=PLAYER_SHOT_LIFETIME,
+                owner=player_state,
+            )
+            player_state["last_shot_time"] = current_time
+
+        interaction = query_interaction(
+            player_state["x"], player_state["y"], player_state["angle"], self.map
+        )
+        player_state["interaction"] = interaction
+        if should_interact and interaction.kind in ("door", "boss_door"):
+            return "door"
+        return None
+
+    def step(self, delta_time):
+        """
+        Update every entity of the world once, for all its players at the same time.
+
+        :param delta_time: float, the seconds since the previous step.
+        :precondition: The world must be entered, and the game clock must read the tick time.
+        :postcondition: Enemies have gone after the living player nearest to each of them.
+        :postcondition: The interest grid holds the entities where they are now.
+        :return: None
+        """
+        self.player_grid.rebuild(
+            player_state for player_state in self.players if player_state["health"] > 0
+        )
+        entities.update_entities(
+            delta_time, self.map, None, None, None, targets=self.player_grid
+        )
+        self.entity_grid.rebuild(entities.entities)
+
+    def visible_entities(self, x, y):
+        """
+        Find the entities a player at a position might see.
+
+        :param x: float, the player's x-coordinate.
+        :param y: float, the player's y-coordinate.
+        :precondition: step must have run since entities were last added or moved.
+        :postcondition: Only the sectors in view range and in the position's
+                        potentially-visible set are visited.
+        :return: list[dict], the entities within view range that walls do not hide
+                 from every position in the player's sector.
+        """
+        pvs = get_visibility(self.map, x, y)
+        radius = min(VIEW_RADIUS, pvs["max_distance"])
+        return self.entity_grid.query(x, y, radius, pvs["sectors"])
+
+
+def create_world_instance(depth):
+    """
+    Create a level for players to share: the surface at depth 0, a new dungeon below.
+
+    :param depth: int, how many levels below the surface the world is.
+    :precondition: depth must not be negative.
+    :postcondition: Spawns the world's enemies without touching any other world.
+    :return: WorldInstance, the new level.
+    """
+    if depth == 0:
+        return WorldInstance(WORLD_MAP, WORLD_COLORS, SURFACE_SPAWN)
+
+    world_map, spawn_x, spawn_y, archetype_key = generate_dungeon_level(*DUNGEON_SIZE)
+    colors = get_color_layer(world_map, ARCHETYPES[archetype_key]["color_shift"])
+    if not is_spawn_valid(spawn_x, spawn_y, world_map):
+        spawn_x, spawn_y = find_valid_spawn(world_map)
+    return WorldInstance(world_map, colors, (spawn_x + 0.5, spawn_y + 0.5))